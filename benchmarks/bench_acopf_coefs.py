@@ -0,0 +1,55 @@
+""" benchmark the AC-OPF Ohm's laws built from the precomputed branch coefficients (`build_model('acopf', precompute_coefs=True)`)
+against the original expressions: instantiation time, NL file size and writing time, and the IPOPT solve time.
+
+    python benchmarks/bench_acopf_coefs.py --cases case5 case14 case14x100 --solver ipopt
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import opf
+from cases import load_case
+
+
+def run(case, precompute_coefs, solver, solve):
+    network = load_case(case)
+    model = opf.build_model('acopf', precompute_coefs=precompute_coefs)
+    tic = time.time()
+    model.instantiate(network)
+    row = {'instantiate': time.time() - tic, 'solve': None, 'obj_cost': float('nan')}
+    with tempfile.TemporaryDirectory() as tmpdir:
+        fn = os.path.join(tmpdir, 'acopf.nl')
+        tic = time.time()
+        model.instance.write(fn)
+        row.update({'nl_write': time.time() - tic, 'nl_size': os.path.getsize(fn)})
+    if solve:
+        try:
+            tic = time.time()
+            result = model.solve(solver)
+            row.update({'solve': time.time() - tic, 'obj_cost': result['obj_cost']})
+        except Exception as e: # e.g., the solver is not installed
+            print(f"{solver}: {type(e).__name__}")
+    return row
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--cases', nargs='+', default=['case5', 'case14', 'case14x100', 'case14x300'])
+    parser.add_argument('--solver', default='ipopt')
+    parser.add_argument('--no-solve', action='store_true')
+    args = parser.parse_args()
+
+    rows = []
+    for case in args.cases:
+        for precompute_coefs in [False, True]:
+            rows.append((case, precompute_coefs, run(case, precompute_coefs, args.solver, not args.no_solve)))
+
+    fmt = lambda v: f"{v:10.3f}" if v is not None else f"{'-':>10s}"
+    print(f"\n{'case':<12s} {'coefs':<6s} {'instantiate':>12s} {'NL write':>10s} {'NL size':>10s} {'solve':>10s} {'obj_cost':>14s}")
+    for case, precompute_coefs, row in rows:
+        print(f"{case:<12s} {str(precompute_coefs):<6s} {row['instantiate']:12.3f} {row['nl_write']:10.3f} {row['nl_size']/1e6:8.2f}MB {fmt(row['solve'])} {row['obj_cost']:14.4f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+""" benchmark the AC-OPF formulations without the branch flow variables (`acopf-compact`) against `acopf`:
+KKT system size (variables, constraints, and Jacobian nonzeros of the NL file), IPOPT iterations, and wall time.
+
+    python benchmarks/bench_acopf_compact.py --cases case5 case14 --solver ipopt
+"""
+import argparse
+import os
+import re
+import tempfile
+import time
+
+import opf
+from cases import load_case, bundled_cases
+
+
+def nl_size(instance, fn):
+    """ the number of variables, constraints, and Jacobian nonzeros from the NL header
+    """
+    instance.write(fn)
+    with open(fn) as f:
+        header = [next(f) for _ in range(8)]
+    nvar, ncnst = (int(v) for v in header[1].split()[:2])
+    njac = int(header[7].split()[0])
+    return nvar, ncnst, njac
+
+
+def ipopt_iterations(logfile):
+    with open(logfile) as f:
+        found = re.search(r'Number of Iterations\.*:\s*(\d+)', f.read())
+    return int(found.group(1)) if found else None
+
+
+def run(case, model_type, kwargs, solver, tmpdir):
+    network = load_case(case)
+    model = opf.build_model(model_type, **kwargs)
+    tic = time.time()
+    model.instantiate(network)
+    row = {'instantiate': time.time() - tic, 'solve': None, 'iterations': None, 'obj_cost': float('nan')}
+    row['nvar'], row['ncnst'], row['njac'] = nl_size(model.instance, os.path.join(tmpdir, 'model.nl'))
+    try:
+        logfile = os.path.join(tmpdir, 'ipopt.log')
+        tic = time.time()
+        result = model.solve(solver, solver_option={'output_file': logfile} if solver == 'ipopt' else {})
+        row.update({'solve': time.time() - tic, 'obj_cost': result['obj_cost']})
+        if solver == 'ipopt':
+            row['iterations'] = ipopt_iterations(logfile)
+    except Exception as e: # e.g., the solver is not installed
+        print(f"{solver}: {type(e).__name__}")
+    return row
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--cases', nargs='+', default=[f.name.split('_')[2] for f in bundled_cases()], help='all the bundled cases by default')
+    parser.add_argument('--solver', default='ipopt')
+    args = parser.parse_args()
+
+    variants = [('acopf', {}), ('acopf-compact', {}), ('acopf-compact', {'rated_flow_vars': True})]
+    rows = []
+    with tempfile.TemporaryDirectory() as tmpdir:
+        for case in args.cases:
+            for model_type, kwargs in variants:
+                label = model_type + ('(rated)' if kwargs else '')
+                rows.append((case, label, run(case, model_type, kwargs, args.solver, tmpdir)))
+
+    fmt = lambda v, spec: format(v, spec) if v is not None else format('-', '>' + spec.rstrip('df').split('.')[0])
+    print(f"\n{'case':<12s} {'formulation':<22s} {'#var':>8s} {'#cnst':>8s} {'nnz(J)':>9s} {'instantiate':>12s} {'solve':>9s} {'#iter':>6s} {'obj_cost':>14s}")
+    for case, label, row in rows:
+        print(f"{case:<12s} {label:<22s} {row['nvar']:8d} {row['ncnst']:8d} {row['njac']:9d} {row['instantiate']:12.3f} "
+              f"{fmt(row['solve'], '9.3f')} {fmt(row['iterations'], '6d')} {row['obj_cost']:14.4f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,51 @@
+""" benchmark the initial points of `opf.solve_acopf` ('flat', 'dc', 'powerflow', and 'soc'):
+IPOPT iterations, AC-OPF solve time, and initialization time per strategy.
+
+    python benchmarks/bench_acopf_init.py --cases case5 case14 --init-solver clarabel --init-backend matrix
+"""
+import argparse
+import os
+import re
+import tempfile
+
+import opf
+from cases import load_case, bundled_cases
+
+
+def ipopt_iterations(logfile):
+    with open(logfile) as f:
+        found = re.search(r'Number of Iterations\.*:\s*(\d+)', f.read())
+    return int(found.group(1)) if found else None
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--cases', nargs='+', default=[f.name.split('_')[2] for f in bundled_cases()], help='all the bundled cases by default')
+    parser.add_argument('--inits', nargs='+', default=['flat', 'dc', 'powerflow', 'soc'])
+    parser.add_argument('--init-solver', default=None, help='solver of DC-OPF and the SOC relaxation (ipopt by default)')
+    parser.add_argument('--init-backend', default='pyomo', help="backend of DC-OPF ('pyomo' or 'matrix')")
+    args = parser.parse_args()
+
+    rows = []
+    with tempfile.TemporaryDirectory() as tmpdir:
+        logfile = os.path.join(tmpdir, 'ipopt.log')
+        for case in args.cases:
+            for init in args.inits:
+                # the matrix-backend solvers only take DC-OPF
+                init_solver = args.init_solver if init == 'dc' or args.init_solver not in ['highs', 'osqp', 'clarabel'] else None
+                try:
+                    result = opf.solve_acopf(load_case(case), init=init, solver_option={'output_file': logfile},
+                                             init_solver=init_solver, init_backend=args.init_backend)
+                except Exception as e: # e.g., the solver is not installed
+                    print(f"{case} {init}: {type(e).__name__}: {e}")
+                    continue
+                rows.append((case, init, result['termination_status'], ipopt_iterations(logfile),
+                             result['time'], result['init']['time'], result['obj_cost']))
+
+    print(f"\n{'case':<12s} {'init':<10s} {'status':<16s} {'#iter':>6s} {'solve':>9s} {'init time':>10s} {'obj_cost':>14s}")
+    for case, init, status, iterations, solve_time, init_time, obj_cost in rows:
+        print(f"{case:<12s} {init:<10s} {status:<16s} {iterations:6d} {solve_time:9.3f} {init_time:10.3f} {obj_cost:14.4f}")
+
+
+if __name__ == '__main__':
+    main()
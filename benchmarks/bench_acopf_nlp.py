@@ -0,0 +1,82 @@
+""" benchmark the callback backend of AC-OPF (`build_model('acopf', backend='callback')`) against the Pyomo model:
+setup time until IPOPT can start (Pyomo: instantiate and write the NL file, callback: instantiate the vectorized NLP),
+time to the first iteration, total solve time, and the cost of one evaluation of all the callbacks.
+
+    python benchmarks/bench_acopf_nlp.py --cases case5 case14 case14x100 case14x1000 --solver ipopt
+"""
+import argparse
+import os
+import tempfile
+import time
+import numpy as np
+
+import opf
+from cases import load_case
+
+
+def bench_pyomo(case, solver, solve):
+    network = load_case(case)
+    model = opf.build_model('acopf')
+    tic = time.time()
+    model.instantiate(network)
+    with tempfile.TemporaryDirectory() as tmpdir:
+        model.instance.write(os.path.join(tmpdir, 'acopf.nl'), io_options={'symbolic_solver_labels': False})
+        nl_size = os.path.getsize(os.path.join(tmpdir, 'acopf.nl'))
+    time_setup = time.time() - tic
+    row = {'setup': time_setup, 'first_iter': None, 'total': None, 'obj_cost': float('nan'), 'nl_size': nl_size}
+    if solve:
+        try:
+            tic = time.time()
+            result = model.solve(solver)
+            row.update({'total': time.time() - tic, 'obj_cost': result['obj_cost']})
+        except Exception as e: # e.g., IPOPT is not installed
+            print(f"pyomo/{solver}: {type(e).__name__}")
+    return row
+
+
+def bench_callback(case, solver, solve):
+    network = load_case(case)
+    model = opf.build_model('acopf', backend='callback')
+    tic = time.time()
+    model.instantiate(network)
+    time_setup = time.time() - tic
+
+    nlp, x, lagrange = model.instance, model.x0, np.ones(model.instance.m)
+    tic = time.time()
+    nlp.objective(x); nlp.gradient(x); nlp.constraints(x); nlp.jacobian(x); nlp.hessian(x, lagrange, 1.)
+    row = {'setup': time_setup, 'first_iter': None, 'total': None, 'obj_cost': float('nan'), 'evaluation': time.time() - tic}
+    if solve:
+        try:
+            tic = time.time()
+            result = model.solve(solver)
+            first_iter = nlp.time_first_iteration
+            row.update({'total': time.time() - tic, 'obj_cost': result['obj_cost'],
+                        'first_iter': time_setup + first_iter if first_iter is not None else None})
+        except Exception as e: # e.g., cyipopt is not installed
+            print(f"callback/{solver}: {type(e).__name__}")
+    return row
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--cases', nargs='+', default=['case5', 'case14', 'case14x100', 'case14x1000'])
+    parser.add_argument('--solver', default='ipopt', help="'ipopt' (cyipopt for the callback backend) or 'trust-constr' (callback backend only)")
+    parser.add_argument('--max-solve-buses', type=int, default=20000, help='only measure the setup above this size')
+    args = parser.parse_args()
+
+    rows = []
+    for case in args.cases:
+        nbus = len(load_case(case)['bus'])
+        solve = nbus <= args.max_solve_buses
+        rows.append((case, nbus, 'pyomo', bench_pyomo(case, args.solver, solve and args.solver == 'ipopt')))
+        rows.append((case, nbus, 'callback', bench_callback(case, args.solver, solve)))
+
+    fmt = lambda v: f"{v:10.3f}" if v is not None else f"{'-':>10s}"
+    print(f"\n{'case':<14s} {'#bus':>7s} {'backend':<10s} {'setup':>10s} {'1st iter':>10s} {'total':>10s} {'obj_cost':>14s}  notes")
+    for case, nbus, backend, row in rows:
+        notes = f"NL file {row['nl_size']/1e6:.1f} MB" if 'nl_size' in row else f"callbacks {row['evaluation']*1e3:.2f} ms/evaluation"
+        print(f"{case:<14s} {nbus:7d} {backend:<10s} {fmt(row['setup'])} {fmt(row['first_iter'])} {fmt(row['total'])} {row['obj_cost']:14.4f}  {notes}")
+
+
+if __name__ == '__main__':
+    main()
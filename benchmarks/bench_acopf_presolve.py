@@ -0,0 +1,62 @@
+""" benchmark the AC-OPF presolve options (`tighten_bounds` and `user_scaling` of `ACOPFModel`):
+IPOPT iterations, restoration phase entries, solve time, and objective per option.
+
+    python benchmarks/bench_acopf_presolve.py --cases case5 case14 case30
+"""
+import argparse
+import os
+import re
+import tempfile
+
+import opf
+from cases import load_case, bundled_cases
+
+
+OPTIONS = {'none': {}, 
+           'bounds': {'tighten_bounds': True}, 
+           'scaling': {'user_scaling': True}, 
+           'both': {'tighten_bounds': True, 'user_scaling': True}}
+
+
+def ipopt_log_stats(logfile):
+    """ the number of iterations and the number of entries into the restoration phase (iterations marked by 'r') of an IPOPT output file
+    """
+    with open(logfile) as f:
+        log = f.read()
+    found = re.search(r'Number of Iterations\.*:\s*(\d+)', log)
+    restoration, previous = 0, False
+    for marker in re.findall(r'^\s*\d+(r?)\s+[-+]?\d\.\d+e[-+]\d+', log, flags=re.MULTILINE):
+        restoration += int(marker == 'r' and not previous)
+        previous = marker == 'r'
+    return (int(found.group(1)) if found else None), restoration
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--cases', nargs='+', default=[f.name.split('_')[2] for f in bundled_cases()], help='all the bundled cases by default')
+    parser.add_argument('--options', nargs='+', default=list(OPTIONS.keys()), choices=list(OPTIONS.keys()))
+    args = parser.parse_args()
+
+    rows = []
+    with tempfile.TemporaryDirectory() as tmpdir:
+        logfile = os.path.join(tmpdir, 'ipopt.log')
+        for case in args.cases:
+            for option in args.options:
+                model = opf.build_model('acopf', **OPTIONS[option])
+                model.instantiate(load_case(case))
+                presolve_time = model.presolve_info['time'] if model.presolve_info is not None else 0.
+                try:
+                    result = model.solve('ipopt', {'output_file': logfile})
+                except Exception as e: # e.g., ipopt is not installed
+                    print(f"{case} {option}: {type(e).__name__}: {e}")
+                    continue
+                iterations, restoration = ipopt_log_stats(logfile)
+                rows.append((case, option, result['termination_status'], iterations, restoration, presolve_time, result['time'], result['obj_cost']))
+
+    print(f"\n{'case':<12s} {'option':<8s} {'status':<16s} {'#iter':>6s} {'#resto':>7s} {'presolve':>9s} {'solve':>9s} {'obj_cost':>14s}")
+    for case, option, status, iterations, restoration, presolve_time, solve_time, obj_cost in rows:
+        print(f"{case:<12s} {option:<8s} {status:<16s} {iterations:6d} {restoration:7d} {presolve_time:9.3f} {solve_time:9.3f} {obj_cost:14.4f}")
+
+
+if __name__ == '__main__':
+    main()
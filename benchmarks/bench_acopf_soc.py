@@ -0,0 +1,65 @@
+""" benchmark the SOC relaxation (`acopf-soc`) as a lower bound and as a warm start of `acopf`:
+IPOPT iterations and time of AC-OPF from the flat start and from the point recovered by `opf.soc_init_var`, and the optimality gap of the relaxation.
+
+    python benchmarks/bench_acopf_soc.py --cases case5 case14
+"""
+import argparse
+import os
+import re
+import tempfile
+import time
+
+import opf
+from cases import load_case, bundled_cases
+
+
+def ipopt_iterations(logfile):
+    with open(logfile) as f:
+        found = re.search(r'Number of Iterations\.*:\s*(\d+)', f.read())
+    return int(found.group(1)) if found else None
+
+
+def solve_ac(network, init_var, logfile):
+    model = opf.build_model('acopf')
+    model.instantiate(network, init_var=init_var)
+    tic = time.time()
+    result = model.solve('ipopt', solver_option={'output_file': logfile})
+    return result['obj_cost'], time.time() - tic, ipopt_iterations(logfile)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--cases', nargs='+', default=[f.name.split('_')[2] for f in bundled_cases()], help='all the bundled cases by default')
+    parser.add_argument('--soc-solver', default='ipopt')
+    args = parser.parse_args()
+
+    rows = []
+    with tempfile.TemporaryDirectory() as tmpdir:
+        logfile = os.path.join(tmpdir, 'ipopt.log')
+        for case in args.cases:
+            try:
+                cost_flat, time_flat, iter_flat = solve_ac(load_case(case), None, logfile)
+
+                network = load_case(case)
+                soc = opf.build_model('acopf-soc')
+                soc.instantiate(network)
+                tic = time.time()
+                soc_result = soc.solve(args.soc_solver)
+                time_soc = time.time() - tic
+                init_var = opf.soc_init_var(network, soc_result)
+                cost_warm, time_warm, iter_warm = solve_ac(network, init_var, logfile)
+            except Exception as e: # e.g., the solver is not installed
+                print(f"{case}: {type(e).__name__}: {e}")
+                continue
+            gap = (cost_flat - soc_result['obj_cost']) / abs(cost_flat)
+            rows.append((case, cost_flat, soc_result['obj_cost'], gap, iter_flat, time_flat, time_soc, iter_warm, time_warm, cost_warm))
+
+    print(f"\n{'case':<12s} {'AC cost':>14s} {'SOC bound':>14s} {'gap(%)':>8s} {'flat #iter':>11s} {'flat time':>10s} "
+          f"{'SOC time':>9s} {'warm #iter':>11s} {'warm time':>10s} {'warm AC cost':>14s}")
+    for case, cost_flat, cost_soc, gap, iter_flat, time_flat, time_soc, iter_warm, time_warm, cost_warm in rows:
+        print(f"{case:<12s} {cost_flat:14.4f} {cost_soc:14.4f} {100*gap:8.3f} {iter_flat:11d} {time_flat:10.3f} "
+              f"{time_soc:9.3f} {iter_warm:11d} {time_warm:10.3f} {cost_warm:14.4f}")
+
+
+if __name__ == '__main__':
+    main()
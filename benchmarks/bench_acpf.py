@@ -0,0 +1,107 @@
+""" benchmark the Newton-Raphson AC power flow (`opf.ac_power_flow`) against solving the same operating point through Pyomo,
+where the AC-OPF instance is turned into a square feasibility problem (fixed dispatch and voltage setpoints, no objective and no limits).
+
+    python benchmarks/bench_acpf.py --case case14x100 --solver ipopt
+"""
+import argparse
+import time
+import numpy as np
+import pyomo.environ as pyo
+
+import opf
+from opf.core.acpf import _bus_types
+from cases import load_case
+
+
+def pyomo_power_flow(network, dispatch, solver):
+    tic_build = time.time()
+    for branch in network['branch'].values():
+        branch.setdefault('rate_a', 0.)
+    model = opf.build_model('acopf')
+    model.instantiate(network)
+    m = model.instance
+    ref, pv, pq = _bus_types(network)
+    busids = list(network['bus'].keys())
+    ref_pv = set(busids[idx] for idx in np.concatenate([ref, pv]))
+    ref_bus = busids[ref[0]]
+
+    for gen_id, gen in network['gen'].items():
+        m.qg[gen_id].setlb(None); m.qg[gen_id].setub(None)
+        if gen['gen_bus'] == ref_bus:
+            m.pg[gen_id].setlb(None); m.pg[gen_id].setub(None)
+        else:
+            m.pg[gen_id].fix(dispatch['sol']['primal']['pg'][gen_id])
+        if gen['gen_bus'] not in ref_pv:
+            m.qg[gen_id].fix(gen['qg'])
+        else:
+            m.vm[gen['gen_bus']].fix(dispatch['sol']['primal'].get('vm', {}).get(gen['gen_bus'], gen['vg']))
+    # generators at the same PV bus share the reactive power equally
+    for bus_id in ref_pv:
+        genids = list(m.gen_per_bus[bus_id])
+        for gen_id in genids[1:]:
+            m.add_component(f'cnst_share_{gen_id}', pyo.Constraint(expr=m.qg[gen_id] == m.qg[genids[0]]))
+        if bus_id == ref_bus:
+            for gen_id in genids[1:]:
+                m.add_component(f'cnst_share_p_{gen_id}', pyo.Constraint(expr=m.pg[gen_id] == m.pg[genids[0]]))
+    primal = dispatch['sol']['primal']
+    for bus_id in m.B:
+        m.vm[bus_id].setlb(None); m.vm[bus_id].setub(None)
+        if 'vm' in primal:
+            m.vm[bus_id].set_value(primal['vm'][bus_id])
+            m.va[bus_id].set_value(primal['va'][bus_id])
+    m.cnst_thermal_branch_from.deactivate()
+    m.cnst_thermal_branch_to.deactivate()
+    m.cnst_dva.deactivate()
+    m.obj_cost.deactivate()
+    m.obj_zero = pyo.Objective(expr=0.)
+
+    time_build = time.time() - tic_build
+
+    tic = time.time()
+    opt_results = pyo.SolverFactory(solver).solve(m)
+    return str(opt_results.solver.termination_condition), time_build, time.time() - tic, np.asarray([m.vm[bus_id].value for bus_id in busids])
+
+
+def balanced_operating_point(case, flat=False):
+    """ operating point of the base case power flow replicated to every copy of a synthetic case, so that the tie lines carry (almost) no power.
+    Voltages are replicated as well unless `flat`, because Newton's method from a flat start struggles on the long chains of the synthetic cases.
+    """
+    base = load_case(case.split('x')[0])
+    primal_base = opf.ac_power_flow(base)['sol']['primal']
+    network = load_case(case)
+    genids_base = sorted(primal_base['pg'].keys(), key=int)
+    busids_base = sorted(primal_base['vm'].keys(), key=int)
+    primal = {'pg': { gen_id: primal_base['pg'][genids_base[(int(gen_id)-1) % len(genids_base)]] for gen_id in network['gen'].keys() }}
+    if not flat:
+        bus_base = { bus_id: busids_base[(int(bus_id)-1) % len(busids_base)] for bus_id in network['bus'].keys() }
+        primal['vm'] = { bus_id: primal_base['vm'][bus_base[bus_id]] for bus_id in network['bus'].keys() }
+        primal['va'] = { bus_id: primal_base['va'][bus_base[bus_id]] for bus_id in network['bus'].keys() }
+    return network, {'sol': {'primal': primal}}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--case', default='case14x100')
+    parser.add_argument('--solver', default='ipopt')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--flat', action='store_true')
+    parser.add_argument('--skip-pyomo', action='store_true')
+    args = parser.parse_args()
+
+    network, dispatch = balanced_operating_point(args.case, args.flat)
+    print(f"case {args.case}: {len(network['bus'])} buses, {len(network['branch'])} branches")
+
+    times = []
+    for _ in range(args.repeat):
+        result = opf.ac_power_flow(network, dispatch)
+        times.append(result['time'])
+    vm = np.asarray(list(result['sol']['primal']['vm'].values()))
+    print(f"{'newton-raphson':<24s} {np.median(times):8.3f} s  {result['termination_status']} in {result['iterations']} iterations, mismatch {result['mismatch']:.2e}")
+
+    if not args.skip_pyomo:
+        termination_status, time_build, time_solve, vm_pyomo = pyomo_power_flow(network, dispatch, args.solver)
+        print(f"{'pyomo/' + args.solver:<24s} {time_solve:8.3f} s  (+{time_build:.3f} s to build)  {termination_status}, max |vm difference| {np.abs(vm - vm_pyomo).max():.2e}")
+
+
+if __name__ == '__main__':
+    main()
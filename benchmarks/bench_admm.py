@@ -0,0 +1,58 @@
+""" benchmark the area-based ADMM (`opf.solve_admm`) against the centralized model of `build_model`:
+iterations, final residuals, wall time, and the cost gap per the number of regions and worker processes.
+
+    python benchmarks/bench_admm.py --cases case5 case14 --model dcopf --parts 2 3 --jobs 1 2 --solver gurobi_direct
+"""
+import argparse
+import time
+
+import opf
+from cases import load_case, bundled_cases
+
+
+def centralized(case, model_type, solver):
+    model = opf.build_model(model_type)
+    model.instantiate(load_case(case))
+    tic = time.time()
+    try:
+        result = model.solve(solver)
+    except Exception as e: # e.g., the solver is not installed, or it does not take the ipopt suffixes
+        print(f"{case} centralized: {type(e).__name__}")
+        return float('nan'), float('nan')
+    return result['obj_cost'], time.time() - tic
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--cases', nargs='+', default=[f.name.split('_')[2] for f in bundled_cases()], help='all the bundled cases by default')
+    parser.add_argument('--model', default='dcopf', choices=['dcopf', 'acopf'])
+    parser.add_argument('--parts', nargs='+', type=int, default=[2, 3])
+    parser.add_argument('--jobs', nargs='+', type=int, default=[1, 2])
+    parser.add_argument('--rho', type=float, default=1e3)
+    parser.add_argument('--max-iter', type=int, default=3000)
+    parser.add_argument('--solver', default='ipopt', help='solver of the subproblems and the centralized model')
+    args = parser.parse_args()
+
+    rows = []
+    for case in args.cases:
+        obj_central, time_central = centralized(case, args.model, args.solver)
+        for n_parts in args.parts:
+            for n_jobs in args.jobs:
+                try:
+                    result = opf.solve_admm(load_case(case), args.model, n_parts=n_parts, rho=args.rho, solver=args.solver,
+                                            max_iter=args.max_iter, n_jobs=n_jobs)
+                except Exception as e: # e.g., the solver is not installed
+                    print(f"{case} {n_parts} regions: {type(e).__name__}: {e}")
+                    continue
+                last = result['admm']['iterations'][-1]
+                rows.append((case, n_parts, n_jobs, result['admm']['nconsensus'], result['termination_status'], len(result['admm']['iterations']),
+                             last['primal_residual'], last['dual_residual'], result['time'], time_central,
+                             (result['obj_cost'] - obj_central) / abs(obj_central)))
+
+    print(f"\n{'case':<12s} {'regions':>7s} {'jobs':>4s} {'#cons':>6s} {'status':<14s} {'#iter':>6s} {'primal':>9s} {'dual':>9s} {'time':>8s} {'central':>8s} {'cost gap':>9s}")
+    for case, n_parts, n_jobs, nconsensus, status, iterations, primal, dual, wall, central, gap in rows:
+        print(f"{case:<12s} {n_parts:7d} {n_jobs:4d} {nconsensus:6d} {status:<14s} {iterations:6d} {primal:9.2e} {dual:9.2e} {wall:8.3f} {central:8.3f} {gap:9.2e}")
+
+
+if __name__ == '__main__':
+    main()
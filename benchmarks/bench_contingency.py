@@ -0,0 +1,53 @@
+""" benchmark N-1 line contingency screening (`opf.screen_contingencies`) against the dense LODF baseline.
+
+    python benchmarks/bench_contingency.py --case case14x200 --chunk-size 256 --n-jobs 4
+"""
+import argparse
+import time
+import numpy as np
+
+import opf
+from opf.core.contingency import get_branch_flows, get_branch_rating
+from cases import load_case, default_dispatch
+
+
+def dense_baseline(network, result, threshold):
+    branchidxs = list(range(len(network['branch'])))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        lodf = opf.compute_lodf(network, branchidxs)
+        pf = get_branch_flows(network, result)
+        rate = get_branch_rating(network)
+        pf_post = pf[:,None] + lodf * pf[None,:]
+        loading = np.abs(pf_post) / rate[:,None]
+        return int(np.sum(np.isfinite(loading) & (loading > threshold) & (np.abs(lodf).max(axis=0) < 1e8)[None,:]))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--case', default='case14x200')
+    parser.add_argument('--threshold', type=float, default=1.)
+    parser.add_argument('--top-k', type=int, default=100)
+    parser.add_argument('--chunk-size', type=int, default=256)
+    parser.add_argument('--n-jobs', type=int, default=4)
+    parser.add_argument('--skip-dense', action='store_true')
+    args = parser.parse_args()
+
+    network = load_case(args.case)
+    result = default_dispatch(network)
+    opf.screen_contingencies(network, result, outages=list(network['branch'].keys())[:1]) # preprocessing
+
+    print(f"case {args.case}: {len(network['bus'])} buses, {len(network['branch'])} branches")
+    if not args.skip_dense:
+        tic = time.time()
+        nviolation = dense_baseline(network, result, args.threshold)
+        print(f"{'dense LODF':<24s} {time.time()-tic:8.3f} s  violations {nviolation}")
+
+    configs = [('serial', 1, 'thread'), ('thread', args.n_jobs, 'thread'), ('process', args.n_jobs, 'process')]
+    for label, n_jobs, parallel in configs:
+        screened = opf.screen_contingencies(network, result, top_k=args.top_k, threshold=args.threshold,
+                                            chunk_size=args.chunk_size, n_jobs=n_jobs, parallel=parallel)
+        print(f"{label:<24s} {screened['time']:8.3f} s  violations {screened['nviolation']}  islanding {len(screened['islanding'])}")
+
+
+if __name__ == '__main__':
+    main()
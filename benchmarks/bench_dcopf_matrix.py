@@ -0,0 +1,53 @@
+""" benchmark the matrix backend of DC-OPF (`build_model('dcopf', backend='matrix')`) against the Pyomo model
+on the bundled cases and synthetic large cases.
+
+    python benchmarks/bench_dcopf_matrix.py --cases case5 case14 case14x100 case14x1000 --pyomo-solver ipopt
+"""
+import argparse
+import time
+
+import opf
+from cases import load_case
+
+
+def run(case, model_type, backend, solver):
+    network = load_case(case)
+    model = opf.build_model(model_type, backend=backend)
+    tic = time.time()
+    model.instantiate(network)
+    time_instantiate = time.time() - tic
+    tic = time.time()
+    try:
+        result = model.solve(solver, extract_dual=True)
+    except Exception as e: # e.g., the solver is not installed
+        return time_instantiate, None, f"{type(e).__name__}", float('nan')
+    return time_instantiate, time.time() - tic, result['termination_status'], result['obj_cost']
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--cases', nargs='+', default=['case5', 'case14', 'case14x100', 'case14x1000'])
+    parser.add_argument('--model-type', default='dcopf', choices=['dcopf', 'dcopf-ptdf'])
+    parser.add_argument('--solvers', nargs='+', default=['highs', 'osqp', 'clarabel'], help='solvers of the matrix backend')
+    parser.add_argument('--pyomo-solver', default='ipopt')
+    parser.add_argument('--pyomo-max-buses', type=int, default=20000, help='skip the Pyomo model above this size')
+    args = parser.parse_args()
+
+    rows = []
+    for case in args.cases:
+        nbus = len(load_case(case)['bus'])
+        runs = [('matrix', solver) for solver in args.solvers]
+        if nbus <= args.pyomo_max_buses:
+            runs.append(('pyomo', args.pyomo_solver))
+        for backend, solver in runs:
+            time_instantiate, time_solve, status, obj_cost = run(case, args.model_type, backend, solver)
+            rows.append((case, nbus, f"{backend}/{solver}", time_instantiate, time_solve, status, obj_cost))
+
+    print(f"\n{'case':<14s} {'#bus':>7s} {'backend/solver':<16s} {'instantiate':>12s} {'solve':>10s} {'status':<12s} {'obj_cost':>16s}")
+    for case, nbus, label, time_instantiate, time_solve, status, obj_cost in rows:
+        time_solve = f"{time_solve:10.3f}" if time_solve is not None else f"{'-':>10s}"
+        print(f"{case:<14s} {nbus:7d} {label:<16s} {time_instantiate:12.3f} {time_solve} {status:<12s} {obj_cost:16.4f}")
+
+
+if __name__ == '__main__':
+    main()
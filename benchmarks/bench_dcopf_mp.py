@@ -0,0 +1,84 @@
+""" benchmark the multi-period DC-OPF (`build_model('dcopf-mp')`) against T independent single-period DC-OPFs (`dcopf`):
+instantiation and solve times, and the cost of the ramp coupling, per the number of periods.
+
+The PGLib files have no ramp rates, so `--ramp` sets `ramp_30` to a fraction of pmax, and the load profile is a daily curve
+(with a little noise) scaling the loads of the file.
+
+    python benchmarks/bench_dcopf_mp.py --cases case14 --periods 24 96 288 --solver ipopt
+"""
+import argparse
+import time
+
+import numpy as np
+import opf
+from cases import load_case
+
+
+def daily_profile(network, T, seed=0):
+    """ T x L loads over a day: two peaks and noise of 2% on the loads of the file
+    """
+    rng = np.random.default_rng(seed)
+    pd = np.asarray([load['pd'] for load in network['load'].values()]) # the load indices follow the order of the file
+    hour = np.arange(T) * 24. / T
+    shape = 0.75 + 0.15 * np.exp(-(hour - 9.)**2 / 8.) + 0.25 * np.exp(-(hour - 19.)**2 / 6.)
+    return shape[:,None] * pd[None,:] * (1. + 0.02 * rng.standard_normal((T, pd.size)))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--cases', nargs='+', default=['case14'])
+    parser.add_argument('--periods', nargs='+', type=int, default=[24, 96, 288])
+    parser.add_argument('--ramp', type=float, default=0.1, help='ramp_30 as a fraction of pmax')
+    parser.add_argument('--solver', default='ipopt')
+    args = parser.parse_args()
+
+    rows = []
+    for case in args.cases:
+        network = load_case(case)
+        for gen in network['gen'].values():
+            gen['ramp_30'] = args.ramp * gen['pmax']
+        for T in args.periods:
+            interval = 24. * 60. / T
+            profile = daily_profile(network, T)
+
+            tic = time.time()
+            model = opf.build_model('dcopf-mp', interval=interval)
+            model.instantiate(network, profile)
+            time_build = time.time() - tic
+            ncnst = model.instance.nconstraints()
+            try:
+                result = model.solve(args.solver)
+                status, obj_mp, time_solve = result['termination_status'], result['obj_cost'], result['time']
+            except Exception as e: # e.g., the solver is not installed
+                print(f"{case} T={T}: {type(e).__name__}")
+                status, obj_mp, time_solve = 'error', float('nan'), float('nan')
+
+            # T independent single-period solves on the same loads
+            base_pd = { load_id: load['pd'] for load_id, load in network['load'].items() }
+            time_single_build, time_single_solve, obj_single = 0., 0., 0.
+            for t in range(T):
+                for col, load in enumerate(network['load'].values()):
+                    load['pd'] = profile[t,col]
+                tic = time.time()
+                single = opf.build_model('dcopf')
+                single.instantiate(network)
+                time_single_build += time.time() - tic
+                try:
+                    result = single.solve(args.solver)
+                    time_single_solve += result['time']
+                    obj_single += result['obj_cost']
+                except Exception:
+                    time_single_solve, obj_single = float('nan'), float('nan')
+            for load_id, load in network['load'].items():
+                load['pd'] = base_pd[load_id]
+
+            rows.append((case, T, ncnst, status, time_build, time_solve, time_single_build, time_single_solve,
+                         (obj_mp - obj_single) / abs(obj_single)))
+
+    print(f"\n{'case':<10s} {'T':>4s} {'#cnst':>7s} {'status':<14s} {'build':>8s} {'solve':>8s} {'T build':>8s} {'T solve':>8s} {'ramp cost':>9s}")
+    for case, T, ncnst, status, time_build, time_solve, time_single_build, time_single_solve, gap in rows:
+        print(f"{case:<10s} {T:4d} {ncnst:7d} {status:<14s} {time_build:8.3f} {time_solve:8.3f} {time_single_build:8.3f} {time_single_solve:8.3f} {gap:9.2e}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,54 @@
+""" benchmark the redundant thermal-limit presolve of DC-OPF (`drop_redundant_limits=True`):
+the number of removed limits, the presolve time, and the instantiate and solve times with and without it.
+The matrix backend is solved by `--solver`, and the Pyomo models are instantiated (and solved by IPOPT if installed).
+
+    python benchmarks/bench_dcopf_presolve.py --cases case14 case14x100 case14x300 --solver clarabel
+"""
+import argparse
+import time
+
+import opf
+from cases import load_case, bundled_cases
+
+
+def run(case, model_type, backend, solver, drop):
+    network = load_case(case)
+    model = opf.build_model(model_type, backend=backend, drop_redundant_limits=drop)
+    tic = time.time()
+    model.instantiate(network)
+    row = {'instantiate': time.time() - tic, 'solve': float('nan'), 'obj_cost': float('nan'),
+           'nremoved': model.presolve_info['nremoved'] if drop else 0, 'nlimits': len(network['branch'])}
+    try:
+        tic = time.time()
+        result = model.solve(solver)
+        row.update({'solve': time.time() - tic, 'obj_cost': result['obj_cost']})
+    except Exception as e: # e.g., the solver is not installed
+        print(f"{case} {model_type} {backend}: {type(e).__name__}")
+    return row
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--cases', nargs='+', default=[f.name.split('_')[2] for f in bundled_cases()] + ['case14x100', 'case14x300'])
+    parser.add_argument('--solver', default='highs', help="solver of the matrix backend ('highs', 'osqp', or 'clarabel')")
+    args = parser.parse_args()
+
+    rows = []
+    for case in args.cases:
+        for model_type in ['dcopf', 'dcopf-ptdf']:
+            for backend, solver in [('matrix', args.solver), ('pyomo', 'ipopt')]:
+                full = run(case, model_type, backend, solver, False)
+                presolved = run(case, model_type, backend, solver, True)
+                rows.append((case, model_type, backend, full, presolved))
+
+    print(f"\n{'case':<12s} {'model':<11s} {'backend':<8s} {'removed':>11s} {'instantiate':>12s} {'presolved':>10s} {'solve':>9s} {'presolved':>10s} {'speedup':>8s} {'|cost diff|':>12s}")
+    for case, model_type, backend, full, presolved in rows:
+        removed = f"{presolved['nremoved']}/{presolved['nlimits']}"
+        total_full = full['instantiate'] + full['solve']
+        total_presolved = presolved['instantiate'] + presolved['solve']
+        print(f"{case:<12s} {model_type:<11s} {backend:<8s} {removed:>11s} {full['instantiate']:12.3f} {presolved['instantiate']:10.3f} "
+              f"{full['solve']:9.3f} {presolved['solve']:10.3f} {total_full/total_presolved:8.2f} {abs(full['obj_cost']-presolved['obj_cost']):12.2e}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+""" benchmark the batched DC power flow (`opf.dc_power_flow`) against solving the injection patterns one by one.
+
+    python benchmarks/bench_dcpf.py --case case14x100 --n 1000
+"""
+import argparse
+import time
+import numpy as np
+from scipy.sparse.linalg import spsolve
+
+import opf
+from opf.core.utils import _get_slack_idx
+from cases import load_case
+
+
+def loop_baseline(network, pg, pd):
+    slack = _get_slack_idx(network)
+    S_b = opf.compute_bus_susceptance_matrix(network, slack).tocsc()
+    S_br = opf.compute_branch_susceptance_matrix(network)
+    I_g = opf.compute_generator_incidence_matrix(network)
+    I_l = opf.compute_load_incidence_matrix(network)
+    pf = np.empty((S_br.shape[0], pg.shape[1]))
+    for n in range(pg.shape[1]):
+        p = I_g @ pg[:,n] - I_l @ pd[:,n]
+        p[slack] = 0.
+        pf[:,n] = S_br @ spsolve(S_b, p)
+    return pf
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--case', default='case14x100')
+    parser.add_argument('--n', type=int, default=1000)
+    parser.add_argument('--chunk-size', type=int, default=None)
+    parser.add_argument('--skip-loop', action='store_true')
+    args = parser.parse_args()
+
+    network = load_case(args.case)
+    opf.dc_power_flow(network, np.zeros(len(network['bus']))) # preprocessing
+    G, L = len(network['gen']), len(network['load'])
+    rng = np.random.default_rng(0)
+    pg = rng.uniform(0., 1., size=(G, args.n))
+    pd = rng.uniform(0., 1., size=(L, args.n))
+    print(f"case {args.case}: {len(network['bus'])} buses, {len(network['branch'])} branches, {args.n} injection patterns")
+
+    if not args.skip_loop:
+        tic = time.time()
+        pf_loop = loop_baseline(network, pg, pd)
+        print(f"{'spsolve loop':<24s} {time.time()-tic:8.3f} s")
+
+    for label, dtype in [('batched float64', np.float64), ('batched float32', np.float32)]:
+        tic = time.time()
+        pf = opf.dc_power_flow(network, pg, load=pd, dtype=dtype, chunk_size=args.chunk_size, return_va=False)['pf']
+        print(f"{label:<24s} {time.time()-tic:8.3f} s  memory {pf.nbytes/1e6:.1f} MB", end='')
+        if not args.skip_loop:
+            print(f"  max error {np.abs(pf - pf_loop).max():.2e}", end='')
+        print()
+
+
+if __name__ == '__main__':
+    main()
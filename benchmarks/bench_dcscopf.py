@@ -0,0 +1,53 @@
+""" benchmark DC-SCOPF (`dcscopf`): iterative contingency constraint generation versus the extensive form,
+and the Benders decomposition of the preventive-corrective problem.
+
+    python benchmarks/bench_dcscopf.py --case case14x20 --rate-scale 2.0 --solver ipopt --ramp 0.2 --n-jobs 4
+"""
+import argparse
+import time
+
+import opf
+from cases import load_case
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--case', default='case14x20')
+    parser.add_argument('--rate-scale', type=float, default=2., help='scale branch ratings to obtain N-1 secure instances')
+    parser.add_argument('--solver', default='ipopt')
+    parser.add_argument('--ramp', type=float, default=0., help='ramp_10 of all generators for the corrective redispatch')
+    parser.add_argument('--n-jobs', type=int, default=1)
+    args = parser.parse_args()
+
+    print(f"{'method':<12s} {'instantiate':>12s} {'solve':>10s} {'obj_cost':>14s} {'#cont. cnst':>12s} {'#iter':>6s}")
+    for method in ['iterative', 'extensive', 'decomposition']:
+        network = load_case(args.case)
+        for branch in network['branch'].values():
+            branch['rate_a'] = branch['rate_a'] * args.rate_scale
+        for gen in network['gen'].values():
+            gen['ramp_10'] = args.ramp
+
+        model = opf.build_model('dcscopf')
+        tic = time.time()
+        model.instantiate(network, generator_contingency=[], line_contingency='all', n_jobs=args.n_jobs)
+        time_instantiate = time.time() - tic
+
+        result = model.solve(args.solver, solve_method=method, extract_contingency=True)
+        if result['termination_status'] != 'optimal':
+            print(f"{method:<12s} {result['termination_status']}")
+            continue
+        if method == 'decomposition':
+            ncnst = result['contingency']['ncut']
+        else:
+            ncnst = len(result['contingency']['line'])
+        niter = max(len(result['contingency']['iterations']), 1)
+        print(f"{method:<12s} {time_instantiate:12.3f} {result['time']:10.3f} {result['obj_cost']:14.4f} {ncnst:12d} {niter:6d}")
+        if method == 'decomposition':
+            print(f"  {'iter':>4s} {'lb':>14s} {'gap':>10s} {'max viol.':>10s} {'#cut':>5s} {'master':>8s} {'sub':>8s} {'sub(sum)':>9s}")
+            for it in result['contingency']['iterations']:
+                print(f"  {it['iteration']:4d} {it['lb']:14.4f} {it['gap']:10.2e} {it['max_violation']:10.2e} {it['ncut']:5d} "
+                      f"{it['time_master']:8.3f} {it['time_sub']:8.3f} {it['time_sub_sum']:9.3f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+""" benchmark the fast-decoupled power flow (`opf.FastDecoupledPowerFlow`) for many load patterns and outages on the same topology,
+against running Newton-Raphson (`opf.ac_power_flow`) case by case.
+
+    python benchmarks/bench_fdpf.py --case case14x100 --n 200 --noutage 200
+"""
+import argparse
+import time
+import numpy as np
+
+import opf
+from bench_acpf import balanced_operating_point
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--case', default='case14x100')
+    parser.add_argument('--n', type=int, default=200)
+    parser.add_argument('--noutage', type=int, default=200)
+    parser.add_argument('--method', default='XB')
+    parser.add_argument('--loop', type=int, default=10, help='the number of cases solved one by one for the baselines')
+    args = parser.parse_args()
+
+    network, operating_point = balanced_operating_point(args.case)
+    primal = operating_point['sol']['primal']
+    print(f"case {args.case}: {len(network['bus'])} buses, {len(network['branch'])} branches")
+
+    tic = time.time()
+    fdpf = opf.FastDecoupledPowerFlow(network, args.method)
+    print(f"{'factorization':<24s} {time.time()-tic:8.3f} s")
+
+    buses, gens = network['bus'], network['gen']
+    vm = np.asarray([primal['vm'][bus_id] for bus_id in buses.keys()])
+    va = np.asarray([primal['va'][bus_id] for bus_id in buses.keys()])
+    pg = np.empty(len(gens))
+    for gen_id, gen in gens.items():
+        pg[gen['index']] = primal['pg'][gen_id]
+    rng = np.random.default_rng(0)
+    scale = rng.uniform(0.97, 1.03, size=(1, args.n)) # loads and generations are scaled together
+    pd, qd = fdpf.setpoints['pd'][:,None] * scale, fdpf.setpoints['qd'][:,None] * scale
+
+    tic = time.time()
+    sol = fdpf.solve(pg=pg[:,None] * scale, pd=pd, qd=qd, vm=vm, va=va)
+    elapsed = time.time() - tic
+    print(f"{'fast-decoupled batch':<24s} {elapsed:8.3f} s  {args.n/elapsed:10.1f} cases/s  converged {sol['converged'].sum()}/{args.n}, mean iterations {sol['iterations'].mean():.1f}")
+
+    nloop = min(args.loop, args.n)
+    tic = time.time()
+    for n in range(nloop):
+        fdpf.solve(pg=pg * scale[0,n], pd=pd[:,n], qd=qd[:,n], vm=vm, va=va)
+    elapsed = time.time() - tic
+    print(f"{'fast-decoupled loop':<24s} {elapsed:8.3f} s  {nloop/elapsed:10.1f} cases/s")
+
+    tic = time.time()
+    for n in range(nloop):
+        for load in network['load'].values():
+            load['pd'], load['qd'] = pd[load['index'],n], qd[load['index'],n]
+        result = opf.ac_power_flow(network, {'sol': {'primal': {'pg': { gen_id: pg[gen['index']] * scale[0,n] for gen_id, gen in gens.items() }, 'vm': primal['vm'], 'va': primal['va']}}})
+    elapsed = time.time() - tic
+    print(f"{'newton-raphson loop':<24s} {elapsed:8.3f} s  {nloop/elapsed:10.1f} cases/s")
+
+    branchids = list(network['branch'].keys())[:args.noutage]
+    nconverged, nisland = 0, 0
+    tic = time.time()
+    for branch_id in branchids:
+        try:
+            nconverged += int(fdpf.solve(pg=pg, vm=vm, va=va, outage=branch_id)['converged'][0])
+        except ValueError:
+            nisland += 1
+    elapsed = time.time() - tic
+    print(f"{'fast-decoupled outages':<24s} {elapsed:8.3f} s  {len(branchids)/elapsed:10.1f} outages/s  converged {nconverged}, islanding {nisland}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+""" benchmark the graph partitioner (`opf.compute_graph_partition`) against the breadth-first chunks (`partition_network(method='bfs')`):
+wall time, cut edges, boundary buses, and the balance (largest and smallest parts over the average) per the number of parts.
+`--random N M` adds a random tree of N nodes with M random chords (without the breadth-first chunks, which need a network).
+
+    python benchmarks/bench_partition.py --cases case14x100 case14x3500 --parts 2 8 32 --random 50000 20000
+"""
+import argparse
+import time
+
+import numpy as np
+import opf
+from cases import load_case
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--cases', nargs='+', default=['case14x100', 'case14x1000', 'case14x3500'])
+    parser.add_argument('--parts', nargs='+', type=int, default=[2, 8, 32])
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--random', nargs=2, type=int, default=None)
+    args = parser.parse_args()
+
+    graphs = []
+    for case in args.cases:
+        network = load_case(case)
+        admittance = opf.compute_branch_admittance(network)
+        graphs.append((case, network, admittance['f_idx'], admittance['t_idx'], len(network['bus'])))
+    if args.random is not None:
+        n, nchord = args.random
+        rng = np.random.default_rng(args.seed)
+        parent = (rng.random(n - 1) * np.arange(1, n)).astype(int) # a uniform earlier node
+        f_idx = np.concatenate([np.arange(1, n), rng.integers(0, n, nchord)])
+        t_idx = np.concatenate([parent, rng.integers(0, n, nchord)])
+        graphs.append(('random', None, f_idx, t_idx, n))
+
+    rows = []
+    for case, network, f_idx, t_idx, B in graphs:
+        for n_parts in args.parts:
+            tic = time.time()
+            partition = opf.compute_graph_partition(f_idx, t_idx, n_parts, n_nodes=B, seed=args.seed)
+            elapsed = time.time() - tic
+            repeat = opf.compute_graph_partition(f_idx, t_idx, n_parts, n_nodes=B, seed=args.seed)
+            deterministic = np.array_equal(partition['parts'], repeat['parts'])
+
+            elapsed_bfs, cut_bfs = np.nan, -1
+            if network is not None:
+                tic = time.time()
+                regions = opf.partition_network(network, n_parts, method='bfs')
+                elapsed_bfs = time.time() - tic
+                parts_bfs = np.empty(B, dtype=int)
+                for bus_id, bus in network['bus'].items():
+                    parts_bfs[bus['index']] = regions[bus_id]
+                cut_bfs = int(np.sum(parts_bfs[f_idx] != parts_bfs[t_idx]))
+
+            rows.append((case, B, n_parts, elapsed, partition['cut_edges'].size, partition['boundary_nodes'].size,
+                         partition['sizes'].max() * n_parts / B, partition['sizes'].min() * n_parts / B, deterministic, elapsed_bfs, cut_bfs))
+
+    print(f"\n{'case':<12s} {'#bus':>7s} {'parts':>5s} {'time':>8s} {'#cut':>6s} {'#bound':>7s} {'max':>6s} {'min':>6s} {'det':>4s} {'bfs time':>8s} {'bfs cut':>7s}")
+    for case, B, n_parts, elapsed, ncut, nboundary, largest, smallest, deterministic, elapsed_bfs, cut_bfs in rows:
+        print(f"{case:<12s} {B:7d} {n_parts:5d} {elapsed:8.3f} {ncut:6d} {nboundary:7d} {largest:6.3f} {smallest:6.3f} {str(deterministic):>4s} {elapsed_bfs:8.3f} {cut_bfs:7d}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,101 @@
+""" benchmark the network reduction presolve (`opf.reduce`): buses and branches before/after, and DC-OPF (matrix backend)
+and AC-OPF (IPOPT, if installed) solve times on the original and the reduced networks.
+
+The bundled cases hardly have radial stubs, parallel circuits, or series buses, so `--augment` adds them to a fraction of the buses and branches
+(the structures of the large PGLib cases).
+
+    python benchmarks/bench_reduce.py --cases case14 case14x100 case14x1000 --augment 0.2
+"""
+import argparse
+import copy
+import time
+
+import numpy as np
+import opf
+from cases import load_case, bundled_cases
+
+
+def augment_network(network, fraction, seed=0):
+    """ add a dangling bus, a radial load bus, a parallel circuit, or a series bus to `fraction` of the branches
+    """
+    rng = np.random.default_rng(seed)
+    buses, branches, loads = network['bus'], network['branch'], network['load']
+    next_bus = max(int(bus_id) for bus_id in buses) + 1
+    next_branch = max(int(branch_id) for branch_id in branches) + 1
+    next_load = max(int(load_id) for load_id in loads) + 1
+    template_bus = next(bus for bus in buses.values() if bus['bus_type'] == 1)
+    for branch_id in list(branches.keys()):
+        if rng.random() >= fraction:
+            continue
+        branch = branches[branch_id]
+        kind = rng.integers(4)
+        if kind == 3: # parallel circuit
+            branches[str(next_branch)] = {**copy.deepcopy(branch), 'id': next_branch}
+            next_branch += 1
+            continue
+        bus = {**copy.deepcopy(template_bus), 'bus_i': next_bus, 'id': next_bus}
+        buses[str(next_bus)] = bus
+        if kind == 2: # series bus splitting the branch
+            branches[str(next_branch)] = {**copy.deepcopy(branch), 'id': next_branch, 'f_bus': str(next_bus), 'br_x': 0.5*branch['br_x']}
+            branch.update({'t_bus': str(next_bus), 'br_x': 0.5*branch['br_x']})
+        else: # dangling (kind 0) or radial load (kind 1) bus
+            branches[str(next_branch)] = {**copy.deepcopy(branch), 'id': next_branch, 't_bus': str(next_bus)}
+            if kind == 1:
+                loads[str(next_load)] = {'pd': 0.01, 'qd': 0.005, 'load_bus': str(next_bus), 'status': 1, 'id': next_load}
+                next_load += 1
+        next_branch += 1
+        next_bus += 1
+    return network
+
+
+def solve_dc(network):
+    model = opf.build_model('dcopf', backend='matrix')
+    model.instantiate(network)
+    tic = time.time()
+    result = model.solve('highs')
+    return result['obj_cost'], time.time() - tic
+
+
+def solve_ac(network):
+    model = opf.build_model('acopf')
+    model.instantiate(network)
+    tic = time.time()
+    result = model.solve('ipopt')
+    return result['obj_cost'], time.time() - tic
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--cases', nargs='+', default=[f.name.split('_')[2] for f in bundled_cases()] + ['case14x100'])
+    parser.add_argument('--augment', type=float, default=0.2, help='fraction of the branches with added structures (0 for the cases as they are)')
+    args = parser.parse_args()
+
+    rows = []
+    for case in args.cases:
+        network = augment_network(load_case(case), args.augment) if args.augment > 0. else load_case(case)
+        for level in ['ac', 'dc']:
+            original = copy.deepcopy(network)
+            reduction = opf.reduce(original, level)
+            summary = reduction.summary()
+            if level == 'dc':
+                cost_full, time_full = solve_dc(original)
+                cost_red, time_red = solve_dc(reduction.network)
+            else:
+                try:
+                    cost_full, time_full = solve_ac(original)
+                    cost_red, time_red = solve_ac(reduction.network)
+                except Exception as e: # e.g., the solver is not installed
+                    print(f"{case} ac: {type(e).__name__}")
+                    cost_full = time_full = cost_red = time_red = float('nan')
+            rows.append((case, level, summary, time_full, time_red, cost_full, cost_red))
+
+    print(f"\n{'case':<12s} {'level':<6s} {'#bus':>13s} {'#branch':>13s} {'reduce':>8s} {'solve':>9s} {'reduced':>9s} {'speedup':>8s} {'|cost diff|':>12s}")
+    for case, level, summary, time_full, time_red, cost_full, cost_red in rows:
+        nbus = f"{summary['bus'][0]}->{summary['bus'][1]}"
+        nbranch = f"{summary['branch'][0]}->{summary['branch'][1]}"
+        print(f"{case:<12s} {level:<6s} {nbus:>13s} {nbranch:>13s} {summary['time']:8.3f} {time_full:9.3f} {time_red:9.3f} "
+              f"{time_full/time_red:8.2f} {abs(cost_full-cost_red):12.2e}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+""" benchmark the rolling-horizon driver (`opf.solve_rolling_horizon`) on long hourly load profiles:
+wall time per window, peak Python memory (tracemalloc), and the committed cost against the monolithic `dcopf-mp` (for short horizons).
+
+The PGLib files have no ramp rates, so `--ramp` sets `ramp_30` to a fraction of pmax, and the load profile repeats a daily and a seasonal curve
+(with a little noise) on the loads of the file.
+
+    python benchmarks/bench_rolling.py --cases case14 --hours 168 8760 --window 48 --step 24 --solver ipopt
+"""
+import argparse
+import os
+import tempfile
+import tracemalloc
+
+import numpy as np
+import opf
+from cases import load_case
+
+
+def hourly_profile(network, T, seed=0):
+    rng = np.random.default_rng(seed)
+    pd = np.asarray([load['pd'] for load in network['load'].values()]) # the load indices follow the order of the file
+    hour = np.arange(T)
+    shape = (0.8 + 0.15 * np.sin(2 * np.pi * (hour % 24 - 8.) / 24.)) * (1. + 0.1 * np.cos(2 * np.pi * hour / 8760.))
+    return shape[:,None] * pd[None,:] * (1. + 0.02 * rng.standard_normal((T, pd.size)))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--cases', nargs='+', default=['case14'])
+    parser.add_argument('--hours', nargs='+', type=int, default=[168, 8760])
+    parser.add_argument('--window', type=int, default=48)
+    parser.add_argument('--step', type=int, default=24)
+    parser.add_argument('--ramp', type=float, default=0.1, help='ramp_30 as a fraction of pmax')
+    parser.add_argument('--monolithic', type=int, default=168, help='the longest horizon compared with the monolithic model')
+    parser.add_argument('--solver', default='ipopt')
+    args = parser.parse_args()
+
+    rows = []
+    for case in args.cases:
+        network = load_case(case)
+        for gen in network['gen'].values():
+            gen['ramp_30'] = args.ramp * gen['pmax']
+        for T in args.hours:
+            profile = hourly_profile(network, T)
+            with tempfile.TemporaryDirectory() as tmpdir:
+                tracemalloc.start()
+                try:
+                    result = opf.solve_rolling_horizon(network, profile, window=args.window, step=args.step, solver=args.solver,
+                                                       output=os.path.join(tmpdir, 'dispatch.jsonl'), log=os.path.join(tmpdir, 'progress.jsonl'))
+                except Exception as e: # e.g., the solver is not installed
+                    print(f"{case} T={T}: {type(e).__name__}")
+                    tracemalloc.stop()
+                    continue
+                peak = tracemalloc.get_traced_memory()[1] / 2**20
+                tracemalloc.stop()
+                size = os.path.getsize(os.path.join(tmpdir, 'dispatch.jsonl')) / 2**20
+
+            gap = float('nan')
+            if T <= args.monolithic:
+                model = opf.build_model('dcopf-mp')
+                model.instantiate(network, profile)
+                obj = model.solve(args.solver)['obj_cost']
+                gap = (result['obj_cost'] - obj) / abs(obj)
+            rows.append((case, T, result['termination_status'], result['nwindows'], result['time'], result['time'] / result['nwindows'], peak, size, gap))
+
+    print(f"\n{'case':<10s} {'hours':>6s} {'status':<14s} {'#win':>5s} {'time':>8s} {'per win':>8s} {'peak MB':>8s} {'file MB':>8s} {'cost gap':>9s}")
+    for case, T, status, nwindows, wall, per_window, peak, size, gap in rows:
+        print(f"{case:<10s} {T:6d} {status:<14s} {nwindows:5d} {wall:8.2f} {per_window:8.3f} {peak:8.2f} {size:8.2f} {gap:9.2e}")
+
+
+if __name__ == '__main__':
+    main()
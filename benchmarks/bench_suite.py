@@ -0,0 +1,180 @@
+""" benchmark suite of the pipeline stages for detecting performance regressions.
+
+For each case, the network stages (`parse_file`, `preprocess`, `compute_ptdf`, `compute_lodf`) and, for each formulation, the model stages
+(`build_model`, `instantiate` with `preprocess`/`compute_ptdf`/`create_instance`, and `solve` with `write_problem`/`run_solver`/`load_solution`/
+`extract_result`) are recorded by `opf.profiling`: the minimum wall and CPU times over `--repeat` runs, and the peak memory (tracemalloc) of one more run.
+The synthetic cases (e.g., 'case14x50') are tiled from the parsed bundled case, so they have no `parse_file` stage.
+
+Each run appends a JSON line to `--history` (the time, the commit, the machine, and the records keyed by 'case/formulation/stage'),
+and is compared with the median of the last `--baseline` runs of the same machine and solver. A stage regresses when its wall time or its peak memory
+exceeds the baseline by more than `--threshold` (relative) and by more than `--min-time` or `--min-memory` (absolute, against the noise of the short stages).
+With `--check`, the script exits with 1 on regressions.
+
+    python benchmarks/bench_suite.py --cases case5 case14 case14x10 case14x50 --formulations acopf dcopf dcopf-ptdf --solver ipopt --check
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+
+import numpy as np
+import opf
+from opf.core.utils import _preprocessing_network
+from cases import load_case, bundled_cases
+
+
+def case_file(case):
+    for f in bundled_cases():
+        if f'_{case}_' in f.name:
+            return f
+    return None
+
+
+def run_stages(case, formulation, solver, memory):
+    """ the stage records of one run. `formulation` None runs the network stages.
+    """
+    f = case_file(case)
+    network = load_case(case) if f is None else None
+    failed = None
+    with opf.profiling(memory=memory) as profiler:
+        if f is not None:
+            network = opf.parse_file(f)
+        if formulation is None:
+            _preprocessing_network(network)
+            opf.compute_ptdf(network)
+            with np.errstate(invalid='ignore', divide='ignore'): # the bridges have infinite LODF
+                opf.compute_lodf(network, list(range(len(network['branch']))))
+        else:
+            model = opf.build_model(formulation)
+            model.instantiate(network)
+            if solver:
+                try:
+                    model.solve(solver)
+                except Exception as e: # e.g., the solver is not installed
+                    failed = f"{type(e).__name__}: {e}".splitlines()[0]
+    stages = profiler.report()['stages']
+    if failed is not None:
+        stages = [record for record in stages if not record['stage'].startswith('solve')]
+    return stages, failed
+
+
+def run_suite(cases, formulations, solver, repeat):
+    results, failures = {}, {}
+    for case in cases:
+        for formulation in [None] + formulations:
+            name = formulation if formulation is not None else 'network'
+            runs = []
+            for _ in range(repeat):
+                stages, failed = run_stages(case, formulation, solver, memory=False)
+                runs.append(stages)
+            memory_stages, _ = run_stages(case, formulation, solver, memory=True) # tracemalloc slows down the allocations
+            if failed is not None:
+                failures[f"{case}/{name}"] = failed
+            for i, record in enumerate(runs[0]):
+                key = f"{case}/{name}/{record['stage']}"
+                results[key] = {'wall': min(run[i]['wall'] for run in runs),
+                                'cpu': min(run[i]['cpu'] for run in runs),
+                                'peak_memory': memory_stages[i]['peak_memory'] if i < len(memory_stages) else None}
+    return results, failures
+
+
+def machine_info():
+    return {'node': platform.node(), 'platform': platform.platform(), 'processor': platform.processor(),
+            'python': platform.python_version(), 'numpy': np.__version__}
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def load_history(path):
+    if not path or not os.path.exists(path):
+        return []
+    with open(path, 'r') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def baseline_of(history, machine, solver, nbaseline):
+    """ the median wall time and peak memory of each key over the last `nbaseline` runs of the same machine and solver
+    """
+    runs = [run for run in history if run['machine']['node'] == machine['node'] and run['machine']['python'] == machine['python']
+            and run['solver'] == solver][-nbaseline:]
+    baseline = {}
+    for key in set(key for run in runs for key in run['results']):
+        walls = [run['results'][key]['wall'] for run in runs if key in run['results']]
+        memories = [run['results'][key]['peak_memory'] for run in runs if key in run['results'] and run['results'][key]['peak_memory'] is not None]
+        baseline[key] = {'wall': statistics.median(walls), 'peak_memory': statistics.median(memories) if memories else None, 'nruns': len(walls)}
+    return baseline
+
+
+def compare(results, baseline, threshold, min_time, min_memory):
+    rows = []
+    for key, record in results.items():
+        base = baseline.get(key)
+        regressed = []
+        if base is not None:
+            if record['wall'] > base['wall'] * (1. + threshold) and record['wall'] - base['wall'] > min_time:
+                regressed.append('time')
+            if record['peak_memory'] is not None and base['peak_memory'] is not None \
+               and record['peak_memory'] > base['peak_memory'] * (1. + threshold) and record['peak_memory'] - base['peak_memory'] > min_memory:
+                regressed.append('memory')
+        rows.append((key, record, base, regressed))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--cases', nargs='+', default=[f.name.split('_')[2] for f in bundled_cases()] + ['case14x10', 'case14x50'])
+    parser.add_argument('--formulations', nargs='+', default=['acopf', 'dcopf', 'dcopf-ptdf'])
+    parser.add_argument('--solver', default='ipopt', help="solver of the formulations ('none' records the stages up to instantiate)")
+    parser.add_argument('--repeat', type=int, default=3, help='the runs for the minimum times')
+    parser.add_argument('--history', default=os.path.join(os.path.dirname(os.path.abspath(__file__)), 'history.jsonl'),
+                        help="JSON lines of the runs ('' to neither read nor write)")
+    parser.add_argument('--baseline', type=int, default=5, help='the last runs of the same machine and solver for the baseline')
+    parser.add_argument('--threshold', type=float, default=0.25, help='relative increase over the baseline for a regression')
+    parser.add_argument('--min-time', type=float, default=0.01, help='absolute increase of the wall time (s) for a regression')
+    parser.add_argument('--min-memory', type=float, default=1., help='absolute increase of the peak memory (MiB) for a regression')
+    parser.add_argument('--no-save', action='store_true', help='do not append this run to the history')
+    parser.add_argument('--check', action='store_true', help='exit with 1 on regressions')
+    args = parser.parse_args()
+    solver = None if args.solver.lower() == 'none' else args.solver
+
+    results, failures = run_suite(args.cases, args.formulations, solver, args.repeat)
+    machine = machine_info()
+    history = load_history(args.history)
+    baseline = baseline_of(history, machine, args.solver, args.baseline)
+    rows = compare(results, baseline, args.threshold, args.min_time, args.min_memory * 2**20)
+
+    print(f"\n{'case/formulation/stage':<55s} {'wall':>9s} {'baseline':>9s} {'ratio':>6s} {'cpu':>9s} {'peak MiB':>9s} {'baseline':>9s}  regression")
+    for key, record, base, regressed in rows:
+        peak = record['peak_memory'] / 2**20 if record['peak_memory'] is not None else float('nan')
+        base_wall = base['wall'] if base is not None else float('nan')
+        base_peak = base['peak_memory'] / 2**20 if base is not None and base['peak_memory'] is not None else float('nan')
+        print(f"{key:<55s} {record['wall']:9.4f} {base_wall:9.4f} {record['wall']/base_wall if base else float('nan'):6.2f} "
+              f"{record['cpu']:9.4f} {peak:9.2f} {base_peak:9.2f}  {','.join(regressed)}")
+    for key, failed in failures.items():
+        print(f"{key}: solve skipped ({failed})")
+
+    nregressed = sum(bool(regressed) for _, _, _, regressed in rows)
+    print(f"\n{len(rows)} stages, {nregressed} regressions against {max([b['nruns'] for b in baseline.values()], default=0)} previous runs")
+
+    if args.history and not args.no_save:
+        run = {'timestamp': datetime.datetime.now().isoformat(timespec='seconds'), 'commit': git_commit(), 'machine': machine,
+               'solver': args.solver, 'repeat': args.repeat, 'results': results, 'failures': failures}
+        with open(args.history, 'a') as f:
+            f.write(json.dumps(run) + '\n')
+
+    if args.check and nregressed > 0:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,58 @@
+""" benchmark the vectorized solution validator (`opf.Validator`) against evaluating the Pyomo constraints one by one.
+
+    python benchmarks/bench_validate.py --case case14x1000
+"""
+import argparse
+import time
+import numpy as np
+import pyomo.environ as pyo
+
+import opf
+from bench_acpf import balanced_operating_point
+
+
+def pyomo_baseline(network, primal):
+    for branch in network['branch'].values():
+        branch.setdefault('rate_a', 0.)
+    model = opf.build_model('acopf')
+    model.instantiate(network)
+    instance = model.instance
+    for name in ['pg', 'qg', 'vm', 'va', 'pf_from', 'pf_to', 'qf_from', 'qf_to']:
+        var = getattr(instance, name)
+        for idx in var:
+            var[idx].set_value(primal[name][idx], skip_validation=True)
+    tic = time.time()
+    max_violation = 0.
+    for cnst in instance.component_data_objects(pyo.Constraint, active=True):
+        body = pyo.value(cnst.body)
+        lb = pyo.value(cnst.lower) if cnst.has_lb() else -np.inf
+        ub = pyo.value(cnst.upper) if cnst.has_ub() else np.inf
+        max_violation = max(max_violation, lb - body, body - ub)
+    return max_violation, time.time() - tic
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--case', default='case14x1000')
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--skip-pyomo', action='store_true')
+    args = parser.parse_args()
+
+    network, operating_point = balanced_operating_point(args.case)
+    result = opf.ac_power_flow(network, operating_point)
+    print(f"case {args.case}: {len(network['bus'])} buses, {len(network['branch'])} branches")
+
+    tic = time.time()
+    validator = opf.Validator(network)
+    print(f"{'validator setup':<24s} {time.time()-tic:8.4f} s")
+    times = [validator.validate(result)['time'] for _ in range(args.repeat)]
+    report = validator.validate(result)
+    print(f"{'vectorized validate':<24s} {np.median(times):8.4f} s  max violation {report['max_violation']:.3e}")
+
+    if not args.skip_pyomo:
+        max_violation, elapsed = pyomo_baseline(network, result['sol']['primal'])
+        print(f"{'pyomo constraint loop':<24s} {elapsed:8.4f} s  max violation {max_violation:.3e}")
+
+
+if __name__ == '__main__':
+    main()
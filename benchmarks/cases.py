@@ -0,0 +1,102 @@
+""" network cases for benchmarks: the bundled PGLib cases and synthetic networks scaled from them.
+"""
+import copy
+from pathlib import Path
+from typing import Dict, Any, List
+
+import opf
+
+DATA_DIR = Path(__file__).resolve().parent.parent / 'data'
+
+
+def bundled_cases() -> List[Path]:
+    return sorted(DATA_DIR.glob('pglib_opf_*.m'), key=lambda f: f.stat().st_size)
+
+
+def synthetic_network(base:Dict[str,Any], ncopy:int, nties:int = 2) -> Dict[str,Any]:
+    """ tile `ncopy` copies of the base network and connect consecutive copies with `nties` tie lines.
+    Only the first copy keeps the slack bus. The cost of each copy is slightly perturbed to avoid degenerate solutions.
+
+    Args:
+        base (Dict[str,Any]): parsed (unpreprocessed) pglib network
+        ncopy (int): the number of copies
+        nties (int): the number of tie lines between consecutive copies
+
+    Returns:
+        Dict[str,Any]: synthetic network
+    """
+    busids = sorted(base['bus'].keys(), key=int)
+    offset = max(int(busid) for busid in busids)
+    ngen, nbranch, nload, nshunt = len(base['gen']), len(base['branch']), len(base['load']), len(base['shunt'])
+    template = base['branch'][sorted(base['branch'].keys(), key=int)[0]]
+
+    network = {k: copy.deepcopy(v) for k, v in base.items() if k not in ['bus', 'gen', 'branch', 'load', 'shunt']}
+    network['name'] = f"{base['name']}_x{ncopy}"
+    network.update({'bus': {}, 'gen': {}, 'branch': {}, 'load': {}, 'shunt': {}, 'preprocessed': False})
+
+    def bus_of(busid, c):
+        return str(int(busid) + c*offset)
+
+    for c in range(ncopy):
+        for busid, bus in base['bus'].items():
+            bus = copy.deepcopy(bus)
+            bus['bus_i'] = bus['id'] = int(bus_of(busid, c))
+            if c > 0 and bus['bus_type'] == 3:
+                bus['bus_type'] = 2
+            network['bus'][bus_of(busid, c)] = bus
+        for genid, gen in base['gen'].items():
+            gen = copy.deepcopy(gen)
+            gen['id'] = int(genid) + c*ngen
+            gen['gen_bus'] = bus_of(gen['gen_bus'], c)
+            gen['cost'] = [cst * (1. + 1e-3*c) for cst in gen['cost']]
+            network['gen'][str(gen['id'])] = gen
+        for branchid, branch in base['branch'].items():
+            branch = copy.deepcopy(branch)
+            branch['id'] = int(branchid) + c*nbranch
+            branch['f_bus'] = bus_of(branch['f_bus'], c)
+            branch['t_bus'] = bus_of(branch['t_bus'], c)
+            network['branch'][str(branch['id'])] = branch
+        for loadid, load in base['load'].items():
+            load = copy.deepcopy(load)
+            load['id'] = int(loadid) + c*nload
+            load['load_bus'] = bus_of(load['load_bus'], c)
+            network['load'][str(load['id'])] = load
+        for shuntid, shunt in base['shunt'].items():
+            shunt = copy.deepcopy(shunt)
+            shunt['id'] = int(shuntid) + c*nshunt
+            shunt['shunt_bus'] = bus_of(shunt['shunt_bus'], c)
+            network['shunt'][str(shunt['id'])] = shunt
+
+    branch_id = ncopy * nbranch
+    for c in range(1, ncopy):
+        for t in range(nties):
+            busid = busids[(c + t*len(busids)//max(nties,1)) % len(busids)]
+            branch = copy.deepcopy(template)
+            branch_id += 1
+            branch['id'] = branch_id
+            branch['f_bus'] = bus_of(busid, c-1)
+            branch['t_bus'] = bus_of(busid, c)
+            network['branch'][str(branch_id)] = branch
+
+    return network
+
+
+def load_case(name:str) -> Dict[str,Any]:
+    """ load a case by its name: a bundled case such as 'case14' or a synthetic one such as 'case14x100'.
+    """
+    if 'x' in name:
+        base_name, ncopy = name.split('x')
+        return synthetic_network(load_case(base_name), int(ncopy))
+    for f in bundled_cases():
+        if f'_{name}_' in f.name:
+            return opf.parse_file(f)
+    raise ValueError(f"case {name} is not found in {DATA_DIR}.")
+
+
+def default_dispatch(network:Dict[str,Any]) -> Dict[str,Any]:
+    """ a feasible-looking dispatch that serves the total load proportionally to pmax, in the format of `model.solve` result
+    """
+    total_load = sum(load['pd'] for load in network['load'].values())
+    total_pmax = sum(gen['pmax'] for gen in network['gen'].values() if gen['gen_status'] > 0)
+    pg = {genid: gen['pmax'] * total_load / total_pmax for genid, gen in network['gen'].items()}
+    return {'sol': {'primal': {'pg': pg}}}
@@ -1,5 +1,19 @@
 from .func import build_model
 from .ptdf import compute_ptdf
 from .lodf import compute_lodf
+from .contingency import screen_contingencies
+from .sensitivity import DCSensitivity
+from .dcpf import dc_power_flow, DCPowerFlow
+from .acpf import ac_power_flow, FastDecoupledPowerFlow
+from .ybus import AdmittanceMatrix
+from .validate import validate, Validator
+from .acopf_soc import soc_init_var, solve_acopf_soc_warmstart
+from .acopf_init import solve_acopf, dc_init_var, ac_init_var
+from .reduce import reduce, NetworkReduction
+from .presolve import compute_flow_bounds, redundant_thermal_limits, compute_angle_bounds, compute_nlp_scaling_factors
+from .partition import compute_graph_partition, partition_network
+from .admm import solve_admm
+from .rolling import solve_rolling_horizon, read_rolling_horizon
+from .profiler import profiling, Profiler
+from .stats import parse_ipopt_log
 from .utils import * 
-
@@ -1,23 +1,113 @@
 from typing import Any, Dict
+import time
 import pyomo.environ as pyo
 import numpy as np
 import math
 
 from .base import NormalOPFModel
 from .acopf_exp import *
+from .presolve import compute_angle_bounds, compute_nlp_scaling_factors, _set_nlp_scaling_factors
+from .utils import compute_branch_flow_coefficients
+from .profiler import _stage
 
 
 class ACOPFModel(NormalOPFModel):
     """ AC-OPF optimization model class.  
+    The branches with rate_a == 0 (dropped from the branch data by the parser) are unlimited, as in MATPOWER.
+
+    Args:
+        model_type (str): model type
+        precompute_coefs (bool): define the Ohm's laws with the per-branch coefficients of `compute_branch_flow_coefficients` (g_ff, b_ff, g_ft, ...)
+                                 and the shared subexpressions vm_f*vm_t, cos(va_f-va_t), and sin(va_f-va_t) of each branch (named Expressions),
+                                 instead of rebuilding them from g, b, T_R, T_I, and T_m in each of the four equations. 
+                                 The expression graphs and the NL file become smaller. Note that the branch Params (g, b, T_R, ...) are then not referred to by the constraints.
+        tighten_bounds (bool): bound the voltage angles by the angle difference limits chained from the slack bus (`compute_angle_bounds`)
+                               and the branch flows by -rate_a <= pf, qf <= rate_a (branches with rate_a > 0)
+        user_scaling (bool): set the `scaling_factor` suffix of the objective, the thermal limits, and the Ohm's laws (`compute_nlp_scaling_factors`),
+                             and solve IPOPT with `nlp_scaling_method=user-scaling` unless it is given in `solver_option`
+    The presolve summary of `tighten_bounds` and `user_scaling` is kept in `presolve_info` after `instantiate`.
     """
-    def __init__(self, model_type):
+    def __init__(self, model_type, precompute_coefs:bool = False, tighten_bounds:bool = False, user_scaling:bool = False):
         super().__init__(model_type)
+        self.precompute_coefs = precompute_coefs
+        self.tighten_bounds = tighten_bounds
+        self.user_scaling = user_scaling
+        self.presolve_info = None
+        self._scaling_factors = None
 
     def _build_model(self) -> None:
         """ Define the (abstract) AC-OPF optimization model. 
             This is enabled without having the specific parameter values.
         """
-        
+        self._build_sets_and_params()
+
+        # # ====================
+        # # II.    Variables
+        # # ====================
+        self.model.pg = pyo.Var(self.model.G, initialize=self.model.pg_init, bounds=pg_bound_exp, within=pyo.Reals) # active generation (injection), continuous
+        self.model.qg = pyo.Var(self.model.G, initialize=self.model.qg_init, bounds=qg_bound_exp, within=pyo.Reals) # reactive generation (injection), continuous
+        self.model.vm = pyo.Var(self.model.B, initialize=self.model.vm_init, bounds=vm_bound_exp, within=pyo.Reals) # voltage magnitude, continuous
+        va_bound, flow_bound = (va_bound_exp, flow_bound_exp) if self.tighten_bounds else (None, None)
+        self.model.va = pyo.Var(self.model.B, initialize=self.model.va_init, bounds=va_bound, within=pyo.Reals) # voltage angle, continuous
+
+        self.model.pf_from = pyo.Var(self.model.E, initialize=self.model.pf_from_init, bounds=flow_bound, within=pyo.Reals) # active power flow (from), continuous
+        self.model.pf_to   = pyo.Var(self.model.E, initialize=self.model.pf_to_init, bounds=flow_bound, within=pyo.Reals) # active power flow (to), continuous
+        self.model.qf_from = pyo.Var(self.model.E, initialize=self.model.qf_from_init, bounds=flow_bound, within=pyo.Reals) # reactive power flow (from), continuous
+        self.model.qf_to   = pyo.Var(self.model.E, initialize=self.model.qf_to_init, bounds=flow_bound, within=pyo.Reals) # reactive power flow (to), continuous
+
+        # ====================
+        # III.   Constraints
+        # ====================
+
+        # ====================
+        # III.a Voltage Angle at Slack Bus
+        # ====================
+        self.model.cnst_slack_va = pyo.Constraint(self.model.slack, rule=cnst_slack_va_exp)
+
+        # ====================
+        # III.b Thermal Limits
+        # ====================
+        self.model.cnst_thermal_branch_from = pyo.Constraint(self.model.E, rule=cnst_thermal_branch_from_exp)
+        self.model.cnst_thermal_branch_to   = pyo.Constraint(self.model.E, rule=cnst_thermal_branch_to_exp)
+
+        # ====================
+        # III.c Ohm's Law
+        # ====================
+        if self.precompute_coefs:
+            self.model.vv = pyo.Expression(self.model.E, rule=vv_exp) # shared by the four flows of each branch
+            self.model.cos_dva = pyo.Expression(self.model.E, rule=cos_dva_exp)
+            self.model.sin_dva = pyo.Expression(self.model.E, rule=sin_dva_exp)
+            self.model.cnst_ohm_pf_from = pyo.Constraint(self.model.E, rule=cnst_ohm_pf_from_coef_exp)
+            self.model.cnst_ohm_pf_to   = pyo.Constraint(self.model.E, rule=cnst_ohm_pf_to_coef_exp)
+            self.model.cnst_ohm_qf_from = pyo.Constraint(self.model.E, rule=cnst_ohm_qf_from_coef_exp)
+            self.model.cnst_ohm_qf_to   = pyo.Constraint(self.model.E, rule=cnst_ohm_qf_to_coef_exp)
+        else:
+            self.model.cnst_ohm_pf_from = pyo.Constraint(self.model.E, rule=cnst_ohm_pf_from_exp)
+            self.model.cnst_ohm_pf_to   = pyo.Constraint(self.model.E, rule=cnst_ohm_pf_to_exp)
+            self.model.cnst_ohm_qf_from = pyo.Constraint(self.model.E, rule=cnst_ohm_qf_from_exp)
+            self.model.cnst_ohm_qf_to   = pyo.Constraint(self.model.E, rule=cnst_ohm_qf_to_exp)
+
+        # ====================
+        # III.d Power Balance
+        # ====================
+        self.model.sets_balance = pyo.BuildAction(rule=define_sets_balance_exp)
+        self.model.cnst_p_balance = pyo.Constraint(self.model.B, rule=cnst_p_balance_exp)
+        self.model.cnst_q_balance = pyo.Constraint(self.model.B, rule=cnst_q_balance_exp)
+
+        # ====================
+        # III.e Voltage Angle Difference
+        # ====================
+        self.model.cnst_dva = pyo.Constraint(self.model.E, rule=cnst_dva_exp)
+
+        # ====================
+        # IIII.   Objective
+        # ====================
+        self.model.obj_cost = pyo.Objective(sense=pyo.minimize, rule=obj_cost_exp)
+
+
+    def _build_sets_and_params(self) -> None:
+        """ sets and parameters shared by the AC-OPF formulations
+        """
         self.model.B = pyo.Set() # bus indices
         self.model.G = pyo.Set() # generator indices
         self.model.E = pyo.Set() # branch indices
@@ -52,6 +142,9 @@ class ACOPFModel(NormalOPFModel):
         self.model.vmmax = pyo.Param(self.model.B, within=pyo.Reals, mutable=True)
         self.model.dvamin = pyo.Param(self.model.E, within=pyo.Reals, mutable=True)
         self.model.dvamax = pyo.Param(self.model.E, within=pyo.Reals, mutable=True)
+        if self.tighten_bounds:
+            self.model.vamin = pyo.Param(self.model.B, within=pyo.Reals, mutable=True) # -inf and inf for no bounds
+            self.model.vamax = pyo.Param(self.model.B, within=pyo.Reals, mutable=True)
 
         self.model.pd = pyo.Param(self.model.L, within=pyo.Reals, mutable=True)
         self.model.qd = pyo.Param(self.model.L, within=pyo.Reals, mutable=True)
@@ -73,63 +166,42 @@ class ACOPFModel(NormalOPFModel):
         self.model.T_I = pyo.Param(self.model.E, within=pyo.Reals, mutable=True)
         self.model.g = pyo.Param(self.model.E, within=pyo.Reals, mutable=True)
         self.model.b = pyo.Param(self.model.E, within=pyo.Reals, mutable=True)
+        if self.precompute_coefs:
+            for name in ['g_ff', 'b_ff', 'g_ft', 'b_ft', 'g_tt', 'b_tt', 'g_tf', 'b_tf']:
+                setattr(self.model, name, pyo.Param(self.model.E, within=pyo.Reals, mutable=True))
 
-        # # ====================
-        # # II.    Variables
-        # # ====================
-        self.model.pg = pyo.Var(self.model.G, initialize=self.model.pg_init, bounds=pg_bound_exp, within=pyo.Reals) # active generation (injection), continuous
-        self.model.qg = pyo.Var(self.model.G, initialize=self.model.qg_init, bounds=qg_bound_exp, within=pyo.Reals) # reactive generation (injection), continuous
-        self.model.vm = pyo.Var(self.model.B, initialize=self.model.vm_init, bounds=vm_bound_exp, within=pyo.Reals) # voltage magnitude, continuous
-        self.model.va = pyo.Var(self.model.B, initialize=self.model.va_init, within=pyo.Reals) # voltage angle, continuous
-
-        self.model.pf_from = pyo.Var(self.model.E, initialize=self.model.pf_from_init, within=pyo.Reals) # active power flow (from), continuous
-        self.model.pf_to   = pyo.Var(self.model.E, initialize=self.model.pf_to_init, within=pyo.Reals) # active power flow (to), continuous
-        self.model.qf_from = pyo.Var(self.model.E, initialize=self.model.qf_from_init, within=pyo.Reals) # reactive power flow (from), continuous
-        self.model.qf_to   = pyo.Var(self.model.E, initialize=self.model.qf_to_init, within=pyo.Reals) # reactive power flow (to), continuous
-
-        # ====================
-        # III.   Constraints
-        # ====================
-
-        # ====================
-        # III.a Voltage Angle at Slack Bus
-        # ====================
-        self.model.cnst_slack_va = pyo.Constraint(self.model.slack, rule=cnst_slack_va_exp)
-
-        # ====================
-        # III.b Thermal Limits
-        # ====================
-        self.model.cnst_thermal_branch_from = pyo.Constraint(self.model.E, rule=cnst_thermal_branch_from_exp)
-        self.model.cnst_thermal_branch_to   = pyo.Constraint(self.model.E, rule=cnst_thermal_branch_to_exp)
-
-        # ====================
-        # III.c Ohm's Law
-        # ====================
-        self.model.cnst_ohm_pf_from = pyo.Constraint(self.model.E, rule=cnst_ohm_pf_from_exp)
-        self.model.cnst_ohm_pf_to   = pyo.Constraint(self.model.E, rule=cnst_ohm_pf_to_exp)
-        self.model.cnst_ohm_qf_from = pyo.Constraint(self.model.E, rule=cnst_ohm_qf_from_exp)
-        self.model.cnst_ohm_qf_to   = pyo.Constraint(self.model.E, rule=cnst_ohm_qf_to_exp)
-
-        # ====================
-        # III.d Power Balance
-        # ====================
-        self.model.sets_balance = pyo.BuildAction(rule=define_sets_balance_exp)
-        self.model.cnst_p_balance = pyo.Constraint(self.model.B, rule=cnst_p_balance_exp)
-        self.model.cnst_q_balance = pyo.Constraint(self.model.B, rule=cnst_q_balance_exp)
+    def _instantiate(self, network:Dict[str,Any], init_var:Dict[str,Any] = None, verbose:bool = False) -> pyo.ConcreteModel:
+        """ create ConcreteModel
+        """
+        data = self._instance_data(network, init_var)
+        with _stage('create_instance'):
+            instance = self.model.create_instance({None: data}, report_timing=verbose) # create instance (ConcreteModel), 
+        # note that self.model is not duplicated because it is desired to be AbstractModel 
+        # for taking different types of problem instances consistently.
 
-        # ====================
-        # III.e Voltage Angle Difference
-        # ====================
-        self.model.cnst_dva = pyo.Constraint(self.model.E, rule=cnst_dva_exp)
+        return instance
 
-        # ====================
-        # IIII.   Objective
-        # ====================
-        self.model.obj_cost = pyo.Objective(sense=pyo.minimize, rule=obj_cost_exp)
+    def append_suffix(self, instance:pyo.ConcreteModel) -> None:
+        super().append_suffix(instance)
+        if self.user_scaling:
+            _set_nlp_scaling_factors(instance, self._scaling_factors)
+        return None
 
+    def _solve(self, optimizer:pyo.SolverFactory,
+                     solve_method:bool = None,
+                     tee:bool = False,
+                     extract_dual:bool = False,
+                     extract_contingency:bool = False) -> Dict[str,Any]:
+        if not (self.user_scaling and optimizer.name == 'ipopt' and 'nlp_scaling_method' not in optimizer.options):
+            return super()._solve(optimizer, solve_method, tee, extract_dual, extract_contingency)
+        optimizer.options['nlp_scaling_method'] = 'user-scaling' # only for this solve, not for the later solves with the same optimizer
+        try:
+            return super()._solve(optimizer, solve_method, tee, extract_dual, extract_contingency)
+        finally:
+            del optimizer.options['nlp_scaling_method']
 
-    def _instantiate(self, network:Dict[str,Any], init_var:Dict[str,Any] = None, verbose:bool = False) -> pyo.ConcreteModel:
-        """ create ConcreteModel
+    def _instance_data(self, network:Dict[str,Any], init_var:Dict[str,Any] = None) -> Dict[str,Any]:
+        """ collect the data for `create_instance`
         """
         gens = network['gen']
         buses = network['bus']
@@ -205,9 +277,7 @@ class ACOPFModel(NormalOPFModel):
         dvamin, dvamax = {}, {}
         for branch_id in branchids:
             branch = branches[branch_id]
-            rate_a_val = branch['rate_a']
-            if rate_a_val == 0.: rate_a_val + 1e12
-            rate_a[branch_id] = rate_a_val
+            rate_a[branch_id] = branch.get('rate_a', 0.) # 0 (or missing, as parsed) for unlimited
             bus_from[branch_id] = branch['f_bus']
             bus_to[branch_id] = branch['t_bus']
             g_from[branch_id] = branch['g_fr']
@@ -281,18 +351,32 @@ class ACOPFModel(NormalOPFModel):
             'T_R': T_R, 'T_I': T_I, 'T_m': T_m, 'g':g, 'b':b,
             'dvamin': dvamin, 'dvamax': dvamax
         }
+        if self.precompute_coefs:
+            branch = { name: np.asarray([values[branch_id] for branch_id in branchids], dtype=float)
+                       for name, values in [('g', g), ('b', b), ('T_R', T_R), ('T_I', T_I), ('T_m', T_m),
+                                            ('g_fr', g_from), ('b_fr', b_from), ('g_to', g_to), ('b_to', b_to)] }
+            for name, values in compute_branch_flow_coefficients(branch).items():
+                data[name] = dict(zip(branchids, values.tolist()))
+        if self.tighten_bounds or self.user_scaling:
+            tic = time.time()
+            self.presolve_info = {}
+            if self.tighten_bounds:
+                va_bounds = compute_angle_bounds(network)
+                data['vamin'] = { bus_id: va_bounds[bus_id][0] for bus_id in busids }
+                data['vamax'] = { bus_id: va_bounds[bus_id][1] for bus_id in busids }
+                self.presolve_info['nbounded_va'] = sum(1 for lower, upper in va_bounds.values() if math.isfinite(lower) and math.isfinite(upper))
+                self.presolve_info['nbounded_flows'] = 4 * sum(1 for branch_id in branchids if rate_a[branch_id] > 0.)
+            if self.user_scaling:
+                self._scaling_factors = compute_nlp_scaling_factors(network)
+                self.presolve_info['obj_scaling'] = self._scaling_factors['obj_cost']
+            self.presolve_info['time'] = time.time() - tic
 
         self.model.gen_per_bus_raw = gen_per_bus
         self.model.load_per_bus_raw = load_per_bus
         self.model.branch_in_per_bus_raw = branch_in_per_bus
         self.model.branch_out_per_bus_raw = branch_out_per_bus
         self.model.shunt_per_bus_raw = shunt_per_bus
-        
-        instance = self.model.create_instance({None: data}, report_timing=verbose) # create instance (ConcreteModel), 
-        # note that self.model is not duplicated because it is desired to be AbstractModel 
-        # for taking different types of problem instances consistently.
-
-        return instance
+        return data
 
     
     
\ No newline at end of file
@@ -0,0 +1,114 @@
+from typing import Any, Dict
+import pyomo.environ as pyo
+
+from .acopf import ACOPFModel
+from .acopf_exp import *
+
+
+class ACOPFCompactModel(ACOPFModel):
+    """ AC-OPF without the branch flow variables (acopf-compact).
+    The flows are named Expressions of vm and va (with the precomputed branch coefficients of `precompute_coefs`)
+    substituted into the power balance and thermal limit constraints, which removes 4E variables and 4E equality constraints of `ACOPFModel`.
+    Branches without a thermal limit (rate_a == 0 in PGLib) are regarded as unlimited, as in `ACOPFModel`.
+
+    The returned primal solution still includes 'pf_from', 'pf_to', 'qf_from', and 'qf_to' of all the branches, evaluated from the expressions.
+
+    Args:
+        model_type (str): model type
+        rated_flow_vars (bool): keep the flow variables and their Ohm's laws only for the branches with thermal limits,
+                                so that the thermal limits stay quadratic in the variables
+    """
+    def __init__(self, model_type, rated_flow_vars:bool = False):
+        super().__init__(model_type, precompute_coefs=True)
+        self.rated_flow_vars = rated_flow_vars
+
+    def _build_model(self) -> None:
+        """ Define the (abstract) compact AC-OPF optimization model.
+        """
+        self._build_sets_and_params()
+        self.model.E_var = pyo.Set(within=self.model.E) # branches keeping the flow variables
+        self.model.E_thermal = pyo.Set(within=self.model.E) # branches with thermal limits
+        for name in ['pf_from', 'pf_to', 'qf_from', 'qf_to']: # the initial flows only of the branches keeping the variables
+            self.model.del_component(name+'_init')
+            self.model.add_component(name+'_init', pyo.Param(self.model.E_var, within=pyo.Reals, mutable=True))
+
+        # # ====================
+        # # II.    Variables
+        # # ====================
+        self.model.pg = pyo.Var(self.model.G, initialize=self.model.pg_init, bounds=pg_bound_exp, within=pyo.Reals) # active generation (injection), continuous
+        self.model.qg = pyo.Var(self.model.G, initialize=self.model.qg_init, bounds=qg_bound_exp, within=pyo.Reals) # reactive generation (injection), continuous
+        self.model.vm = pyo.Var(self.model.B, initialize=self.model.vm_init, bounds=vm_bound_exp, within=pyo.Reals) # voltage magnitude, continuous
+        self.model.va = pyo.Var(self.model.B, initialize=self.model.va_init, within=pyo.Reals) # voltage angle, continuous
+
+        self.model.pf_from = pyo.Var(self.model.E_var, initialize=self.model.pf_from_init, within=pyo.Reals) # active power flow (from), continuous
+        self.model.pf_to   = pyo.Var(self.model.E_var, initialize=self.model.pf_to_init, within=pyo.Reals) # active power flow (to), continuous
+        self.model.qf_from = pyo.Var(self.model.E_var, initialize=self.model.qf_from_init, within=pyo.Reals) # reactive power flow (from), continuous
+        self.model.qf_to   = pyo.Var(self.model.E_var, initialize=self.model.qf_to_init, within=pyo.Reals) # reactive power flow (to), continuous
+
+        # ====================
+        # II.a  Branch Flows
+        # ====================
+        self.model.vv = pyo.Expression(self.model.E, rule=vv_exp)
+        self.model.cos_dva = pyo.Expression(self.model.E, rule=cos_dva_exp)
+        self.model.sin_dva = pyo.Expression(self.model.E, rule=sin_dva_exp)
+        self.model.pf_from_exp = pyo.Expression(self.model.E, rule=pf_from_coef_exp)
+        self.model.pf_to_exp   = pyo.Expression(self.model.E, rule=pf_to_coef_exp)
+        self.model.qf_from_exp = pyo.Expression(self.model.E, rule=qf_from_coef_exp)
+        self.model.qf_to_exp   = pyo.Expression(self.model.E, rule=qf_to_coef_exp)
+
+        # ====================
+        # III.   Constraints
+        # ====================
+
+        # ====================
+        # III.a Voltage Angle at Slack Bus
+        # ====================
+        self.model.cnst_slack_va = pyo.Constraint(self.model.slack, rule=cnst_slack_va_exp)
+
+        # ====================
+        # III.b Thermal Limits
+        # ====================
+        self.model.cnst_thermal_branch_from = pyo.Constraint(self.model.E_thermal, rule=cnst_thermal_branch_from_compact_exp)
+        self.model.cnst_thermal_branch_to   = pyo.Constraint(self.model.E_thermal, rule=cnst_thermal_branch_to_compact_exp)
+
+        # ====================
+        # III.c Ohm's Law (only for the flow variables)
+        # ====================
+        self.model.cnst_ohm_pf_from = pyo.Constraint(self.model.E_var, rule=cnst_ohm_pf_from_compact_exp)
+        self.model.cnst_ohm_pf_to   = pyo.Constraint(self.model.E_var, rule=cnst_ohm_pf_to_compact_exp)
+        self.model.cnst_ohm_qf_from = pyo.Constraint(self.model.E_var, rule=cnst_ohm_qf_from_compact_exp)
+        self.model.cnst_ohm_qf_to   = pyo.Constraint(self.model.E_var, rule=cnst_ohm_qf_to_compact_exp)
+
+        # ====================
+        # III.d Power Balance
+        # ====================
+        self.model.sets_balance = pyo.BuildAction(rule=define_sets_balance_exp)
+        self.model.cnst_p_balance = pyo.Constraint(self.model.B, rule=cnst_p_balance_compact_exp)
+        self.model.cnst_q_balance = pyo.Constraint(self.model.B, rule=cnst_q_balance_compact_exp)
+
+        # ====================
+        # III.e Voltage Angle Difference
+        # ====================
+        self.model.cnst_dva = pyo.Constraint(self.model.E, rule=cnst_dva_exp)
+
+        # ====================
+        # IIII.   Objective
+        # ====================
+        self.model.obj_cost = pyo.Objective(sense=pyo.minimize, rule=obj_cost_exp)
+
+    def _instance_data(self, network:Dict[str,Any], init_var:Dict[str,Any] = None) -> Dict[str,Any]:
+        data = super()._instance_data(network, init_var)
+        rated = [branch_id for branch_id in data['E'][None] if data['rate_a'][branch_id] > 0.]
+        data['E_thermal'] = {None: rated}
+        data['E_var'] = {None: rated if self.rated_flow_vars else []}
+        for name in ['pf_from_init', 'pf_to_init', 'qf_from_init', 'qf_to_init']:
+            data[name] = { branch_id: data[name][branch_id] for branch_id in data['E_var'][None] }
+        return data
+
+    def _write_output(self, results:Dict[str,Any], extract_dual:bool = False, extract_contingency:bool = False) -> None:
+        super()._write_output(results, extract_dual, extract_contingency)
+        primal_sol = results['sol']['primal']
+        for name in ['pf_from', 'pf_to', 'qf_from', 'qf_to']: # flows of all the branches in the same format as `ACOPFModel`
+            flow = self.instance.component(name+'_exp')
+            primal_sol[name] = { str(e): pyo.value(flow[e]) for e in self.instance.E }
+        return None
@@ -11,13 +11,23 @@ def qg_bound_exp(m, g):
 def vm_bound_exp(m, b):
     return (m.vmmin[b], m.vmmax[b])
 
+def va_bound_exp(m, b): # only with `tighten_bounds`
+    return (m.vamin[b], m.vamax[b])
+
+def flow_bound_exp(m, e): # only with `tighten_bounds`, and rate_a == 0 is regarded as unlimited
+    return (-m.rate_a[e], m.rate_a[e]) if pyo.value(m.rate_a[e]) > 0. else (None, None)
+
 def cnst_slack_va_exp(m, s):
     return m.va[s] == 0.
 
-def cnst_thermal_branch_from_exp(m, e):
+def cnst_thermal_branch_from_exp(m, e): # rate_a == 0 is regarded as unlimited
+    if pyo.value(m.rate_a[e]) <= 0.:
+        return pyo.Constraint.Skip
     return m.pf_from[e]**2 + m.qf_from[e]**2 - m.rate_a[e]**2 <= 0.
 
 def cnst_thermal_branch_to_exp(m, e):
+    if pyo.value(m.rate_a[e]) <= 0.:
+        return pyo.Constraint.Skip
     return m.pf_to[e]**2 + m.qf_to[e]**2 - m.rate_a[e]**2 <= 0.
 
 def cnst_ohm_pf_from_exp(m, e):
@@ -40,6 +50,138 @@ def cnst_ohm_qf_to_exp(m, e):
                 - ((-m.b[e] * m.T_R[e] + m.g[e] * m.T_I[e])/m.T_m[e]**2) * (m.vm[m.bus_from[e]] * m.vm[m.bus_to[e]]) * pyo.cos(m.va[m.bus_from[e]] - m.va[m.bus_to[e]])\
                 + ((-m.g[e] * m.T_R[e] - m.b[e] * m.T_I[e])/m.T_m[e]**2) * (m.vm[m.bus_from[e]] * m.vm[m.bus_to[e]]) * pyo.sin(-m.va[m.bus_from[e]] + m.va[m.bus_to[e]])
             
+# ================================================================================
+# Only for AC-OPF with the precomputed branch coefficients (precompute_coefs=True)
+# ================================================================================
+def vv_exp(m, e):
+    return m.vm[m.bus_from[e]] * m.vm[m.bus_to[e]]
+
+def cos_dva_exp(m, e):
+    return pyo.cos(m.va[m.bus_from[e]] - m.va[m.bus_to[e]])
+
+def sin_dva_exp(m, e):
+    return pyo.sin(m.va[m.bus_from[e]] - m.va[m.bus_to[e]])
+
+def pf_from_coef_exp(m, e):
+    return m.g_ff[e] * m.vm[m.bus_from[e]]**2 + m.vv[e] * (m.g_ft[e] * m.cos_dva[e] + m.b_ft[e] * m.sin_dva[e])
+
+def pf_to_coef_exp(m, e):
+    return m.g_tt[e] * m.vm[m.bus_to[e]]**2 + m.vv[e] * (m.g_tf[e] * m.cos_dva[e] - m.b_tf[e] * m.sin_dva[e])
+
+def qf_from_coef_exp(m, e):
+    return -m.b_ff[e] * m.vm[m.bus_from[e]]**2 - m.vv[e] * (m.b_ft[e] * m.cos_dva[e] - m.g_ft[e] * m.sin_dva[e])
+
+def qf_to_coef_exp(m, e):
+    return -m.b_tt[e] * m.vm[m.bus_to[e]]**2 - m.vv[e] * (m.b_tf[e] * m.cos_dva[e] + m.g_tf[e] * m.sin_dva[e])
+
+def cnst_ohm_pf_from_coef_exp(m, e):
+    return m.pf_from[e] == pf_from_coef_exp(m, e)
+
+def cnst_ohm_pf_to_coef_exp(m, e):
+    return m.pf_to[e] == pf_to_coef_exp(m, e)
+
+def cnst_ohm_qf_from_coef_exp(m, e):
+    return m.qf_from[e] == qf_from_coef_exp(m, e)
+
+def cnst_ohm_qf_to_coef_exp(m, e):
+    return m.qf_to[e] == qf_to_coef_exp(m, e)
+
+# ================================================================================
+# Only for AC-OPF without the flow variables (acopf-compact). 
+# The flows of the branches without the variables (E_var) are substituted by their expressions.
+# ================================================================================
+def _flow(m, name, e):
+    return m.component(name)[e] if e in m.E_var else m.component(name+'_exp')[e]
+
+def cnst_ohm_pf_from_compact_exp(m, e):
+    return m.pf_from[e] == m.pf_from_exp[e]
+
+def cnst_ohm_pf_to_compact_exp(m, e):
+    return m.pf_to[e] == m.pf_to_exp[e]
+
+def cnst_ohm_qf_from_compact_exp(m, e):
+    return m.qf_from[e] == m.qf_from_exp[e]
+
+def cnst_ohm_qf_to_compact_exp(m, e):
+    return m.qf_to[e] == m.qf_to_exp[e]
+
+def cnst_thermal_branch_from_compact_exp(m, e):
+    return _flow(m, 'pf_from', e)**2 + _flow(m, 'qf_from', e)**2 - m.rate_a[e]**2 <= 0.
+
+def cnst_thermal_branch_to_compact_exp(m, e):
+    return _flow(m, 'pf_to', e)**2 + _flow(m, 'qf_to', e)**2 - m.rate_a[e]**2 <= 0.
+
+def cnst_p_balance_compact_exp(m, b):
+    return quicksum(m.pg[g] for g in m.gen_per_bus[b])\
+            - quicksum(_flow(m, 'pf_to', e) for e in m.branch_in_per_bus[b])\
+            - quicksum(m.pd[l] for l in m.load_per_bus[b])\
+            - quicksum(_flow(m, 'pf_from', e) for e in m.branch_out_per_bus[b])\
+            - quicksum(m.gs[s] for s in m.shunt_per_bus[b]) * m.vm[b]**2 \
+            == 0.
+
+def cnst_q_balance_compact_exp(m, b):
+    return quicksum(m.qg[g] for g in m.gen_per_bus[b])\
+            - quicksum(_flow(m, 'qf_to', e) for e in m.branch_in_per_bus[b])\
+            - quicksum(m.qd[l] for l in m.load_per_bus[b])\
+            - quicksum(_flow(m, 'qf_from', e) for e in m.branch_out_per_bus[b])\
+            + quicksum(m.bs[s] for s in m.shunt_per_bus[b]) * m.vm[b]**2\
+            == 0.
+
+# ================================================================================
+# Only for the second-order cone relaxation in W-space (acopf-soc).
+# w = vm^2 at the buses, wr = vm_f*vm_t*cos(va_f-va_t) and wi = vm_f*vm_t*sin(va_f-va_t) at the branches
+# ================================================================================
+def w_bound_soc_exp(m, b):
+    return (m.vmmin[b]**2, m.vmmax[b]**2)
+
+def w_init_soc_exp(m, b):
+    return pyo.value(m.vm_init[b])**2
+
+def wr_init_soc_exp(m, e):
+    f, t = m.bus_from[e], m.bus_to[e]
+    return max(pyo.value(m.vm_init[f] * m.vm_init[t]) * math.cos(pyo.value(m.va_init[f] - m.va_init[t])), 0.) # wr >= 0
+
+def wi_init_soc_exp(m, e):
+    f, t = m.bus_from[e], m.bus_to[e]
+    return pyo.value(m.vm_init[f] * m.vm_init[t]) * math.sin(pyo.value(m.va_init[f] - m.va_init[t]))
+
+def cnst_ohm_pf_from_soc_exp(m, e):
+    return m.pf_from[e] == m.g_ff[e] * m.w[m.bus_from[e]] + m.g_ft[e] * m.wr[e] + m.b_ft[e] * m.wi[e]
+
+def cnst_ohm_pf_to_soc_exp(m, e):
+    return m.pf_to[e] == m.g_tt[e] * m.w[m.bus_to[e]] + m.g_tf[e] * m.wr[e] - m.b_tf[e] * m.wi[e]
+
+def cnst_ohm_qf_from_soc_exp(m, e):
+    return m.qf_from[e] == -m.b_ff[e] * m.w[m.bus_from[e]] - m.b_ft[e] * m.wr[e] + m.g_ft[e] * m.wi[e]
+
+def cnst_ohm_qf_to_soc_exp(m, e):
+    return m.qf_to[e] == -m.b_tt[e] * m.w[m.bus_to[e]] - m.b_tf[e] * m.wr[e] - m.g_tf[e] * m.wi[e]
+
+def cnst_soc_exp(m, e): # relaxation of wr^2 + wi^2 == w_f * w_t
+    return m.wr[e]**2 + m.wi[e]**2 - m.w[m.bus_from[e]] * m.w[m.bus_to[e]] <= 0.
+
+def cnst_dva_max_soc_exp(m, e): # dva <= dvamax, i.e., wi <= tan(dvamax) wr for wr >= 0 (dvamax within +-90 degrees)
+    return pyo.cos(m.dvamax[e]) * m.wi[e] - pyo.sin(m.dvamax[e]) * m.wr[e] <= 0.
+
+def cnst_dva_min_soc_exp(m, e):
+    return pyo.cos(m.dvamin[e]) * m.wi[e] - pyo.sin(m.dvamin[e]) * m.wr[e] >= 0.
+
+def cnst_p_balance_soc_exp(m, b):
+    return quicksum(m.pg[g] for g in m.gen_per_bus[b])\
+            - quicksum(m.pf_to[e] for e in m.branch_in_per_bus[b])\
+            - quicksum(m.pd[l] for l in m.load_per_bus[b])\
+            - quicksum(m.pf_from[e] for e in m.branch_out_per_bus[b])\
+            - quicksum(m.gs[s] for s in m.shunt_per_bus[b]) * m.w[b] \
+            == 0.
+
+def cnst_q_balance_soc_exp(m, b):
+    return quicksum(m.qg[g] for g in m.gen_per_bus[b])\
+            - quicksum(m.qf_to[e] for e in m.branch_in_per_bus[b])\
+            - quicksum(m.qd[l] for l in m.load_per_bus[b])\
+            - quicksum(m.qf_from[e] for e in m.branch_out_per_bus[b])\
+            + quicksum(m.bs[s] for s in m.shunt_per_bus[b]) * m.w[b]\
+            == 0.
+
 def define_sets_balance_exp(m):
     for busid, genlist in m.gen_per_bus_raw.items():
         if len(genlist) > 0:
@@ -0,0 +1,139 @@
+from typing import Any, Dict, Union
+import time
+import warnings
+import numpy as np
+import pyomo.environ as pyo
+
+from .acpf import ac_power_flow, _bus_types, _power_flow_setpoints, _power_flow_output
+from .dcpf import DCPowerFlow
+from .utils import compute_admittance_matrix, _preprocessing_network
+
+
+_flow_keys = {'pf_from': 'pf1', 'pf_to': 'pf2', 'qf_from': 'qf1', 'qf_to': 'qf2'}
+
+
+def _clip(values:Dict[str,float], entries:Dict[str,Dict[str,Any]], lower:str, upper:str) -> Dict[str,float]:
+    return { idx: min(max(value, entries[idx][lower]), entries[idx][upper]) for idx, value in values.items() }
+
+
+def ac_init_var(network:Dict[str,Any], primal:Dict[str,Dict[str,float]]) -> Dict[str,Dict[str,float]]:
+    """ `init_var` of `ACOPFModel.instantiate` from a primal solution in the AC-OPF result format
+    (e.g., `ac_power_flow` or `acopf` of a similar network). pg, qg, and vm are projected onto their bounds.
+
+    Returns:
+        Dict[str,Dict[str,float]]: 'pg', 'qg', 'vm', 'va', 'pf1', 'pf2', 'qf1', 'qf2'
+    """
+    init_var = {'pg': _clip(primal['pg'], network['gen'], 'pmin', 'pmax'),
+                'qg': _clip(primal['qg'], network['gen'], 'qmin', 'qmax'),
+                'vm': _clip(primal['vm'], network['bus'], 'vmin', 'vmax'),
+                'va': dict(primal['va'])}
+    for name, key in _flow_keys.items():
+        init_var[key] = dict(primal[name])
+    return init_var
+
+
+def dc_init_var(network:Dict[str,Any], dc_result:Dict[str,Any]) -> Dict[str,Dict[str,float]]:
+    """ `init_var` of `ACOPFModel.instantiate` from a DC-OPF solution (`dcopf` or `dcopf-ptdf`, with any backend).
+    The active generations are taken from DC-OPF, and the voltage angles are the DC angles (the DC power flow of the dispatch if not included).
+    The voltage magnitudes are the generator setpoints ('vg') at the slack and PV buses and 1 elsewhere, within the bounds.
+    The reactive generations (and the slack generation to cover the losses) and the branch flows are then evaluated from these voltages,
+    as in `ac_power_flow`.
+
+    Returns:
+        Dict[str,Dict[str,float]]: 'pg', 'qg', 'vm', 'va', 'pf1', 'pf2', 'qf1', 'qf2'
+    """
+    _preprocessing_network(network)
+    buses = network['bus']
+    primal = dc_result['sol']['primal']
+    ref, pv, _ = _bus_types(network)
+    setpoints = _power_flow_setpoints(network, {'sol': {'primal': {'pg': primal['pg']}}})
+
+    if 'va' in primal:
+        va = np.zeros(len(buses))
+        for bus_id, bus in buses.items():
+            va[bus['index']] = primal['va'][bus_id]
+    else:
+        va = DCPowerFlow(network).solve(setpoints['pg'], setpoints['pd'])['va']
+    va = -(va - va[ref[0]]) # DC angles follow the sign of the (negative) branch susceptance of `compute_branch_susceptance_matrix`
+
+    vm = np.ones(len(buses))
+    vm[pv] = setpoints['vg'][pv]
+    vm[ref] = setpoints['vg'][ref]
+    vmin, vmax = np.empty(len(buses)), np.empty(len(buses))
+    for bus in buses.values():
+        vmin[bus['index']], vmax[bus['index']] = bus['vmin'], bus['vmax']
+    V = np.clip(vm, vmin, vmax) * np.exp(1j * va)
+
+    Ybus, Yf, Yt = compute_admittance_matrix(network)
+    return ac_init_var(network, _power_flow_output(network, Ybus, Yf, Yt, V, setpoints, ref, pv))
+
+
+def solve_acopf(network:Dict[str,Any],
+                init:str = 'flat',
+                solver:Union[str,pyo.SolverFactory] = 'ipopt',
+                solver_option:Dict[str,Any] = {},
+                init_solver:Union[str,pyo.SolverFactory] = None,
+                init_solver_option:Dict[str,Any] = None,
+                init_backend:str = 'pyomo',
+                tee:bool = False,
+                extract_dual:bool = False) -> Dict[str,Any]:
+    """ solve `acopf` from an initial point given by `init`.
+
+        result = opf.solve_acopf(network, init='dc')
+
+    Args:
+        network (Dict[str,Any]): pglib network
+        init (str): 'flat':      vm = max(vmin, 1), va = 0, and the generations of the input file (the default of `ACOPFModel`)
+                    'dc':        `dc_init_var` of the DC-OPF solution
+                    'powerflow': Newton-Raphson AC power flow at the generator setpoints of the input file
+                    'soc':       `soc_init_var` of the SOC relaxation (`acopf-soc`)
+        solver (Union[str,pyo.SolverFactory]): solver of AC-OPF
+        solver_option (Dict[str,Any]): options of the AC-OPF solver
+        init_solver (Union[str,pyo.SolverFactory]): solver of DC-OPF or the SOC relaxation (`solver` by default)
+        init_solver_option (Dict[str,Any]): options of the solver of DC-OPF or the SOC relaxation (none by default)
+        init_backend (str): backend of DC-OPF ('pyomo' or 'matrix' with `init_solver` in 'highs', 'osqp', and 'clarabel')
+        tee (bool): show the solver logs
+        extract_dual (bool): extract the duals of AC-OPF
+
+    Returns:
+        Dict[str,Any]: result of AC-OPF, with 'init' for 'method', 'termination_status', 'time', and 'obj_cost' of the initialization
+                       ('obj_cost' of DC-OPF or the SOC relaxation, None otherwise)
+    """
+    from .func import build_model
+    from .acopf_soc import soc_init_var
+    if init not in ['flat', 'dc', 'powerflow', 'soc']:
+        raise ValueError(f"init should be one of 'flat', 'dc', 'powerflow', and 'soc'. But it is now {init}.")
+    init_solver = init_solver if init_solver is not None else solver
+    init_solver_option = init_solver_option if init_solver_option is not None else {}
+
+    tic = time.time()
+    init_var, status, init_cost = None, 'flat', None
+    if init == 'dc':
+        model = build_model('dcopf', backend=init_backend)
+        model.instantiate(network)
+        init_result = model.solve(init_solver, init_solver_option, tee=tee)
+        status, init_cost = init_result['termination_status'], init_result.get('obj_cost')
+        if 'primal' not in init_result['sol']:
+            raise RuntimeError(f"DC-OPF for the initial point is not solved. The termination status is {status}.")
+        init_var = dc_init_var(network, init_result)
+    elif init == 'powerflow':
+        init_result = ac_power_flow(network)
+        status = init_result['termination_status']
+        if status != 'converged':
+            warnings.warn(f"AC power flow for the initial point did not converge (mismatch {init_result['mismatch']:.2e}). The last iterate is used.", RuntimeWarning)
+        init_var = ac_init_var(network, init_result['sol']['primal'])
+    elif init == 'soc':
+        model = build_model('acopf-soc')
+        model.instantiate(network)
+        init_result = model.solve(init_solver, init_solver_option, tee=tee)
+        status, init_cost = init_result['termination_status'], init_result.get('obj_cost')
+        if 'primal' not in init_result['sol']:
+            raise RuntimeError(f"The SOC relaxation for the initial point is not solved. The termination status is {status}.")
+        init_var = soc_init_var(network, init_result)
+    init_time = time.time() - tic
+
+    model = build_model('acopf')
+    model.instantiate(network, init_var=init_var)
+    result = model.solve(solver, solver_option, tee=tee, extract_dual=extract_dual)
+    result['init'] = {'method': init, 'termination_status': status, 'time': init_time, 'obj_cost': init_cost}
+    return result
@@ -0,0 +1,470 @@
+from typing import Any, Dict, List, Tuple
+import warnings
+import time
+from functools import wraps
+import numpy as np
+from scipy.sparse import coo_array, csr_array
+
+from .base import OPFBaseModel
+from .utils import compute_branch_admittance, _branch_flow_coefficients, _preprocessing_network
+from .profiler import _stage, _profiled
+
+
+def _evaluation(name:str):
+    """ decorator counting the calls of the evaluation `name` and their time in `ACOPFNLP.nevaluation` and `ACOPFNLP.time_evaluation`
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(self, *args):
+            tic = time.perf_counter()
+            value = func(self, *args)
+            self.time_evaluation += time.perf_counter() - tic
+            self.nevaluation[name] += 1
+            return value
+        return wrapper
+    return decorator
+
+
+class ACOPFNLP:
+    """ AC-OPF of `ACOPFModel` as a nonlinear program with vectorized first and second derivatives.
+
+    The variables are x = [pg, qg, vm, va, pf_from, pf_to, qf_from, qf_to] and the constraints
+    cl <= g(x) <= cu are stacked in the order of `ACOPFModel` (cnst_slack_va, cnst_thermal_branch_from/to, cnst_ohm_*, cnst_p/q_balance, cnst_dva).
+    The sparsity structures of the Jacobian and the (lower triangular) Lagrangian Hessian are fixed in the constructor,
+    and each evaluation only fills their values from the branch arrays.
+    The methods follow the problem interface of cyipopt (objective, gradient, constraints, jacobian, jacobianstructure, hessian, hessianstructure).
+
+    Args:
+        network (Dict[str,Any]): pglib network (preprocessed)
+    """
+    flows = ['pf_from', 'pf_to', 'qf_from', 'qf_to']
+
+    def __init__(self, network:Dict[str,Any]):
+        _preprocessing_network(network)
+        gens, buses, branches = network['gen'], network['bus'], network['branch']
+        loads, shunts = network['load'], network['shunt']
+        G, B, E = len(gens), len(buses), len(branches)
+        self.G, self.B, self.E = G, B, E
+        getter = lambda entries, field: np.fromiter((entry[field] for entry in entries.values()), dtype=float, count=len(entries))
+        bus_index = lambda bus_id: buses[bus_id]['index']
+
+        # variable offsets
+        self.offset = {}
+        n = 0
+        for name, size in [('pg', G), ('qg', G), ('vm', B), ('va', B), ('pf_from', E), ('pf_to', E), ('qf_from', E), ('qf_to', E)]:
+            self.offset[name] = n
+            n += size
+        self.n = n
+
+        # data ordered by the indices
+        self.cost = np.asarray([gen['cost'] for gen in gens.values()], dtype=float).reshape(-1, 3)
+        self.gen_bus = np.fromiter((bus_index(gen['gen_bus']) for gen in gens.values()), dtype=int, count=G)
+        self.branch = compute_branch_admittance(network)
+        self.f_idx, self.t_idx = self.branch['f_idx'], self.branch['t_idx']
+        self.coef = _branch_flow_coefficients(self.branch)
+        load_bus = np.fromiter((bus_index(load['load_bus']) for load in loads.values()), dtype=int, count=len(loads))
+        self.pd = np.bincount(load_bus, weights=getter(loads, 'pd'), minlength=B)
+        self.qd = np.bincount(load_bus, weights=getter(loads, 'qd'), minlength=B)
+        shunt_bus = np.fromiter((bus_index(shunt['shunt_bus']) for shunt in shunts.values()), dtype=int, count=len(shunts))
+        self.gs = np.bincount(shunt_bus, weights=getter(shunts, 'gs'), minlength=B)
+        self.bs = np.bincount(shunt_bus, weights=getter(shunts, 'bs'), minlength=B)
+        self.slack = np.asarray([buses[bus_id]['index'] for bus_id in sorted(buses.keys()) if buses[bus_id]['bus_type'] == 3], dtype=int)
+        rate_a = np.fromiter((branch.get('rate_a', 0.) for branch in branches.values()), dtype=float, count=E) # the parser drops the zero ratings
+        self.rated = rate_a > 0. # the unrated branches are unlimited, as in `ACOPFModel`
+
+        # bounds: pg, qg, and vm are bounded, va and the flows are free
+        inf = np.inf
+        self.lb = np.concatenate([getter(gens, 'pmin'), getter(gens, 'qmin'), getter(buses, 'vmin'), np.full(B + 4*E, -inf)])
+        self.ub = np.concatenate([getter(gens, 'pmax'), getter(gens, 'qmax'), getter(buses, 'vmax'), np.full(B + 4*E, inf)])
+
+        # constraint offsets
+        S = self.slack.size
+        self.cnst_offset = {}
+        m = 0
+        for name, size in [('cnst_slack_va', S), ('cnst_thermal_branch_from', E), ('cnst_thermal_branch_to', E),
+                           ('cnst_ohm_pf_from', E), ('cnst_ohm_pf_to', E), ('cnst_ohm_qf_from', E), ('cnst_ohm_qf_to', E),
+                           ('cnst_p_balance', B), ('cnst_q_balance', B), ('cnst_dva', E)]:
+            self.cnst_offset[name] = m
+            m += size
+        self.m = m
+        self.cl = np.concatenate([np.zeros(S), np.full(2*E, -inf), np.zeros(4*E), self.pd, self.qd, getter(branches, 'angmin')])
+        thermal = np.where(self.rated, rate_a**2, inf)
+        self.cu = np.concatenate([np.zeros(S), thermal, thermal, np.zeros(4*E), self.pd, self.qd, getter(branches, 'angmax')])
+
+        self._build_structure()
+        self.reset_statistics()
+
+    # ================================================================================
+    # sparsity structures
+    # ================================================================================
+    def _var(self, name:str, idx:np.ndarray) -> np.ndarray:
+        return self.offset[name] + idx
+
+    def _cnst(self, name:str, idx:np.ndarray) -> np.ndarray:
+        return self.cnst_offset[name] + idx
+
+    def _build_structure(self) -> None:
+        G, B, E = self.G, self.B, self.E
+        e, bus, gen = np.arange(E), np.arange(B), np.arange(G)
+        f, t = self.f_idx, self.t_idx
+        vf, vt, af, at = self._var('vm', f), self._var('vm', t), self._var('va', f), self._var('va', t)
+
+        # Jacobian: the constant entries first, then the entries of the Ohm's laws (4 per flow)
+        rows, cols, vals = [], [], []
+        def add(row, col, val):
+            rows.append(row); cols.append(col); vals.append(np.broadcast_to(val, row.shape).astype(float))
+        add(self._cnst('cnst_slack_va', np.arange(self.slack.size)), self._var('va', self.slack), 1.)
+        for name in self.flows:
+            add(self._cnst('cnst_ohm_'+name, e), self._var(name, e), 1.)
+        add(self._cnst('cnst_p_balance', self.gen_bus), self._var('pg', gen), 1.)
+        add(self._cnst('cnst_q_balance', self.gen_bus), self._var('qg', gen), 1.)
+        for name, balance in [('pf_from', 'p'), ('pf_to', 'p'), ('qf_from', 'q'), ('qf_to', 'q')]:
+            add(self._cnst(f'cnst_{balance}_balance', f if name.endswith('from') else t), self._var(name, e), -1.)
+        add(self._cnst('cnst_dva', e), af, 1.)
+        add(self._cnst('cnst_dva', e), at, -1.)
+        self._jac_const = np.concatenate(vals)
+
+        # entries updated at each evaluation
+        for side in ['from', 'to']:
+            for p in ['pf', 'qf']:
+                row = self._cnst(f'cnst_thermal_branch_{side}', e)
+                rows.append(row); cols.append(self._var(f'{p}_{side}', e))
+        for name in self.flows:
+            row = self._cnst('cnst_ohm_'+name, e)
+            for col in [vf, vt, af, at]:
+                rows.append(row); cols.append(col)
+        rows.append(self._cnst('cnst_p_balance', bus)); cols.append(self._var('vm', bus))
+        rows.append(self._cnst('cnst_q_balance', bus)); cols.append(self._var('vm', bus))
+
+        rows, cols = np.concatenate(rows), np.concatenate(cols)
+        self._jac_rows, self._jac_cols, self._jac_map = self._coalesce(rows, cols)
+
+        # Hessian of the Lagrangian (lower triangle): objective, thermal limits, Ohm's laws (10 per flow), and shunts
+        hrows, hcols = [self._var('pg', gen)], [self._var('pg', gen)]
+        for side in ['from', 'to']:
+            for p in ['pf', 'qf']:
+                hrows.append(self._var(f'{p}_{side}', e)); hcols.append(self._var(f'{p}_{side}', e))
+        pairs = [(vf, vf), (vt, vt), (vf, vt), (vf, af), (vf, at), (vt, af), (vt, at), (af, af), (at, at), (af, at)]
+        for _ in self.flows:
+            for r, c in pairs:
+                hrows.append(r); hcols.append(c)
+        hrows.append(self._var('vm', bus)); hcols.append(self._var('vm', bus))
+        hrows, hcols = np.concatenate(hrows), np.concatenate(hcols)
+        hrows, hcols = np.maximum(hrows, hcols), np.minimum(hrows, hcols)
+        self._hess_rows, self._hess_cols, self._hess_map = self._coalesce(hrows, hcols)
+
+    @staticmethod
+    def _coalesce(rows:np.ndarray, cols:np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """ unique (row, col) pairs and the map from the raw entries to them (duplicates are summed)
+        """
+        keys = rows.astype(np.int64) * (max(cols.max(initial=0), rows.max(initial=0)) + 1) + cols
+        unique, inverse = np.unique(keys, return_inverse=True)
+        first = np.zeros(unique.size, dtype=int)
+        first[inverse[::-1]] = np.arange(keys.size)[::-1]
+        return rows[first], cols[first], inverse
+
+    def jacobianstructure(self) -> Tuple[np.ndarray, np.ndarray]:
+        return self._jac_rows, self._jac_cols
+
+    def hessianstructure(self) -> Tuple[np.ndarray, np.ndarray]:
+        return self._hess_rows, self._hess_cols
+
+    # ================================================================================
+    # evaluations
+    # ================================================================================
+    def _split(self, x:np.ndarray) -> Dict[str,np.ndarray]:
+        sizes = {'pg': self.G, 'qg': self.G, 'vm': self.B, 'va': self.B}
+        return { name: x[offset:offset + sizes.get(name, self.E)] for name, offset in self.offset.items() }
+
+    def _branch_terms(self, v:Dict[str,np.ndarray]) -> Tuple[np.ndarray, ...]:
+        """ shared subexpressions of the four flows: vm_f, vm_t, vm_f*vm_t, cos and sin of the angle differences
+        """
+        vf, vt = v['vm'][self.f_idx], v['vm'][self.t_idx]
+        theta = v['va'][self.f_idx] - v['va'][self.t_idx]
+        return vf, vt, vf * vt, np.cos(theta), np.sin(theta)
+
+    @_evaluation('objective')
+    def objective(self, x:np.ndarray) -> float:
+        pg = x[:self.G]
+        return float(np.sum((self.cost[:,0] * pg + self.cost[:,1]) * pg + self.cost[:,2]))
+
+    @_evaluation('gradient')
+    def gradient(self, x:np.ndarray) -> np.ndarray:
+        grad = np.zeros(self.n)
+        grad[:self.G] = 2. * self.cost[:,0] * x[:self.G] + self.cost[:,1]
+        return grad
+
+    @_evaluation('constraints')
+    def constraints(self, x:np.ndarray) -> np.ndarray:
+        v = self._split(x)
+        vf, vt, W, cos, sin = self._branch_terms(v)
+        f, t = self.f_idx, self.t_idx
+        g = [v['va'][self.slack],
+             v['pf_from']**2 + v['qf_from']**2,
+             v['pf_to']**2 + v['qf_to']**2]
+        for name in self.flows:
+            a, c, s, at_from = self.coef[name]
+            vk = vf if at_from else vt
+            g.append(v[name] - a * vk**2 - W * (c * cos + s * sin))
+        vm2 = v['vm']**2
+        p = np.bincount(self.gen_bus, weights=v['pg'], minlength=self.B)\
+            - np.bincount(f, weights=v['pf_from'], minlength=self.B) - np.bincount(t, weights=v['pf_to'], minlength=self.B) - self.gs * vm2
+        q = np.bincount(self.gen_bus, weights=v['qg'], minlength=self.B)\
+            - np.bincount(f, weights=v['qf_from'], minlength=self.B) - np.bincount(t, weights=v['qf_to'], minlength=self.B) + self.bs * vm2
+        g += [p, q, v['va'][f] - v['va'][t]] # the loads are in the bounds (cl == cu == pd, qd)
+        return np.concatenate(g)
+
+    @_evaluation('jacobian')
+    def jacobian(self, x:np.ndarray) -> np.ndarray:
+        v = self._split(x)
+        vf, vt, W, cos, sin = self._branch_terms(v)
+        vals = [self._jac_const,
+                2. * v['pf_from'], 2. * v['qf_from'], 2. * v['pf_to'], 2. * v['qf_to']]
+        for name in self.flows:
+            a, c, s, at_from = self.coef[name]
+            C = c * cos + s * sin
+            D = -c * sin + s * cos
+            vals += [-(2. * a * vf * at_from + vt * C),
+                     -(2. * a * vt * (not at_from) + vf * C),
+                     -W * D,
+                     W * D]
+        vals += [-2. * self.gs * v['vm'], 2. * self.bs * v['vm']]
+        return np.bincount(self._jac_map, weights=np.concatenate(vals), minlength=self._jac_rows.size)
+
+    @_evaluation('hessian')
+    def hessian(self, x:np.ndarray, lagrange:np.ndarray, obj_factor:float) -> np.ndarray:
+        v = self._split(x)
+        vf, vt, W, cos, sin = self._branch_terms(v)
+        E = self.E
+        lam = lambda name: lagrange[self.cnst_offset[name]:self.cnst_offset[name] + (self.B if name.endswith('balance') else E)]
+        vals = [obj_factor * 2. * self.cost[:,0]]
+        lam_from, lam_to = lam('cnst_thermal_branch_from'), lam('cnst_thermal_branch_to')
+        vals += [2. * lam_from, 2. * lam_from, 2. * lam_to, 2. * lam_to]
+        for name in self.flows:
+            a, c, s, at_from = self.coef[name]
+            mu = -lam('cnst_ohm_'+name) # constraint: flow - h(vm, va)
+            C = c * cos + s * sin
+            D = -c * sin + s * cos
+            vals += [mu * 2. * a * at_from, mu * 2. * a * (not at_from), mu * C,
+                     mu * vt * D, -mu * vt * D, mu * vf * D, -mu * vf * D,
+                     -mu * W * C, -mu * W * C, mu * W * C]
+        vals.append(-2. * self.gs * lam('cnst_p_balance') + 2. * self.bs * lam('cnst_q_balance'))
+        vals = [np.broadcast_to(val, (E,)) if np.ndim(val) == 0 else val for val in vals]
+        return np.bincount(self._hess_map, weights=np.concatenate(vals), minlength=self._hess_rows.size)
+
+    def intermediate(self, alg_mod, iter_count, obj_value, inf_pr, inf_du, mu, d_norm, regularization_size, alpha_du, alpha_pr, ls_trials) -> bool:
+        if self.time_first_iteration is None:
+            self.time_first_iteration = time.time() - self.tic
+        self.iterations = int(iter_count)
+        restoration = alg_mod == 1 # 0: regular, 1: restoration phase
+        if restoration:
+            self.restoration_iterations += 1
+            self.restoration_entries += not self._restoration
+        self._restoration = restoration
+        self.last_iterate = {'objective': float(obj_value), 'constraint_violation': float(inf_pr), 'dual_infeasibility': float(inf_du), 'barrier_parameter': float(mu)}
+        return True
+
+    def reset_statistics(self) -> None:
+        self.tic = time.time()
+        self.time_first_iteration = None
+        self.iterations = 0
+        self.restoration_iterations = 0
+        self.restoration_entries = 0
+        self._restoration = False
+        self.last_iterate = {}
+        self.nevaluation = {'objective': 0, 'gradient': 0, 'constraints': 0, 'jacobian': 0, 'hessian': 0}
+        self.time_evaluation = 0.
+
+    # ================================================================================
+    # conversion between the vector and the dictionaries of `model.solve`
+    # ================================================================================
+    def initial_point(self, network:Dict[str,Any], init_var:Dict[str,Any] = None) -> np.ndarray:
+        """ starting point of `ACOPFModel`: generator set points, vm = max(vmin, 1), and zero angles and flows unless `init_var` is given
+        """
+        gens, buses, branches = network['gen'], network['bus'], network['branch']
+        x0 = np.zeros(self.n)
+        x0[self.offset['pg']:self.offset['pg']+self.G] = [gen['pg'] for gen in gens.values()]
+        x0[self.offset['qg']:self.offset['qg']+self.G] = [gen['qg'] for gen in gens.values()]
+        x0[self.offset['vm']:self.offset['vm']+self.B] = [max(bus['vmin'], 1.) for bus in buses.values()]
+        if init_var is not None:
+            aliases = {'pf_from': 'pf1', 'pf_to': 'pf2', 'qf_from': 'qf1', 'qf_to': 'qf2'} # keys of `ACOPFModel` init_var
+            for name, entries in [('pg', gens), ('qg', gens), ('vm', buses), ('va', buses),
+                                  ('pf_from', branches), ('pf_to', branches), ('qf_from', branches), ('qf_to', branches)]:
+                values = init_var.get(name, init_var.get(aliases.get(name), None))
+                if values is not None:
+                    x0[self.offset[name]:self.offset[name]+len(entries)] = [values[entry_id] for entry_id in entries]
+        return x0
+
+
+class ACOPFCallbackModel(OPFBaseModel):
+    """ AC-OPF solved by handing the vectorized callbacks of `ACOPFNLP` to IPOPT through cyipopt, without Pyomo and the NL file.
+    The formulation, the result dictionary, and the sign conventions of the duals are the same as `ACOPFModel` solved by IPOPT through Pyomo.
+    `solver='trust-constr'` uses the same callbacks with `scipy.optimize.minimize` when IPOPT is not available (small cases only).
+    """
+    solvers = ['ipopt', 'trust-constr']
+
+    def __init__(self, model_type:str):
+        super().__init__(model_type)
+        self.model = None # nothing is defined before the network is given
+        self.x0 = None
+
+    def _build_model(self) -> None:
+        pass
+
+    def is_constructed(self) -> bool:
+        return self.instance is not None
+
+    @_profiled('instantiate')
+    def instantiate(self, network:Dict[str,Any], init_var:Dict[str,Any] = None, verbose:bool = False) -> None:
+        print('instantiate model...', end=' ', flush=True)
+        if self.instance is not None:
+            warnings.warn("instance is already created. instantiating again will destroy the previous instance", RuntimeWarning)
+        _preprocessing_network(network)
+        self.instance = ACOPFNLP(network)
+        self.x0 = self.instance.initial_point(network, init_var)
+        self._ids = {'pg': list(network['gen'].keys()), 'vm': list(network['bus'].keys()), 'va': list(network['bus'].keys()),
+                     'E': list(network['branch'].keys()), 'slack': [bus_id for bus_id in sorted(network['bus'].keys()) if network['bus'][bus_id]['bus_type'] == 3]}
+        if verbose:
+            print(f"{self.instance.n} variables, {self.instance.m} constraints, {self.instance._jac_rows.size} Jacobian and {self.instance._hess_rows.size} Hessian nonzeros", end=' ')
+        print('end', flush=True)
+
+    def setup_warmstart(self, warmstart_dict:Dict[str,Any]) -> None:
+        """ set the primal starting point from the dictionary of `result['sol']`
+        """
+        if not self.is_constructed():
+            raise RuntimeError("instance for warmstarting should be constructed before.")
+        if 'primal' in warmstart_dict.keys():
+            for name, ids, _ in self._variables():
+                if name in warmstart_dict['primal']:
+                    values = warmstart_dict['primal'][name]
+                    offset = self.instance.offset[name]
+                    self.x0[offset:offset+len(ids)] = [values[idx] for idx in ids]
+        return None
+
+    def _variables(self) -> List[Tuple[str, List[str], bool]]:
+        """ (name, IDs ordered by the indices, whether bounded) of the variables in the order of `ACOPFNLP`
+        """
+        gen_ids, bus_ids, branch_ids = self._ids['pg'], self._ids['vm'], self._ids['E']
+        return [('pg', gen_ids, True), ('qg', gen_ids, True), ('vm', bus_ids, True), ('va', bus_ids, False)]\
+               + [(name, branch_ids, False) for name in ACOPFNLP.flows]
+
+    @_profiled('solve', result=True)
+    def solve(self, solver:str = 'ipopt',
+                    solver_option:Dict[str,Any] = {},
+                    solve_method:bool = None,
+                    tee:bool = False,
+                    extract_dual:bool = False,
+                    extract_contingency:bool = False) -> Dict[str,Any]:
+        if not self.is_constructed():
+            raise RuntimeError("instance has not included in the model class. Please execute `model.instantiate(network)` first to create it.")
+        if not isinstance(solver, str) or solver.lower() not in self.solvers:
+            raise ValueError(f"solver should be one of {self.solvers} for the callback backend. But it is now {solver}.")
+        return self._solve(solver.lower(), solver_option, tee, extract_dual)
+
+    def _solve(self, solver:str,
+                     solver_option:Dict[str,Any] = {},
+                     tee:bool = False,
+                     extract_dual:bool = False) -> Dict[str,Any]:
+        nlp = self.instance
+        nlp.reset_statistics()
+        with _stage('run_solver'):
+            if solver == 'ipopt':
+                status, x, y, z = self._solve_ipopt(solver_option, tee)
+            else:
+                status, x, y, z = self._solve_trust_constr(solver_option, tee)
+
+        elapsed = time.time() - nlp.tic
+        results = {'termination_status': status,
+                   'time': elapsed,
+                   'obj_cost': nlp.objective(x),
+                   'sol': {},
+                   'stats': self._stats(solver, elapsed)
+                   }
+        if status in ['optimal', 'locallyOptimal', 'globallyOptimal']:
+            with _stage('extract_result'):
+                self._write_output(results, x, y, z, extract_dual)
+        return results
+
+    def _stats(self, solver:str, elapsed:float) -> Dict[str,Any]:
+        """ the statistics of the last solve from the callbacks, in the keys of `parse_ipopt_log`
+        (the restoration phase and the errors of the last iterate are reported by the intermediate callback of cyipopt)
+        """
+        nlp = self.instance
+        stats = {'solver': solver,
+                 'iterations': nlp.iterations,
+                 'restoration_iterations': nlp.restoration_iterations,
+                 'restoration_entries': nlp.restoration_entries,
+                 'evaluations': dict(nlp.nevaluation),
+                 'time_total': elapsed,
+                 'time_function_evaluations': nlp.time_evaluation,
+                 'nvariables': nlp.n}
+        stats.update(nlp.last_iterate)
+        return stats
+
+    def _solve_ipopt(self, solver_option:Dict[str,Any], tee:bool) -> Tuple[str, np.ndarray, np.ndarray, np.ndarray]:
+        try:
+            import cyipopt
+        except ImportError:
+            raise RuntimeError("cyipopt is required for the callback backend with solver='ipopt'. Install it by `pip install cyipopt` (or conda-forge).")
+        nlp = self.instance
+        problem = cyipopt.Problem(n=nlp.n, m=nlp.m, problem_obj=nlp, lb=nlp.lb, ub=nlp.ub, cl=nlp.cl, cu=nlp.cu)
+        problem.add_option('print_level', 5 if tee else 0)
+        problem.add_option('sb', 'yes')
+        for k, v in solver_option.items():
+            problem.add_option(k, v)
+        x, info = problem.solve(self.x0)
+        status = {0: 'optimal', 1: 'optimal', -1: 'maxIterations', 2: 'infeasible', -4: 'maxTimeLimit'}.get(info['status'], 'other') # 1: solved to acceptable level
+        # IPOPT: grad f + J'lambda - zL + zU = 0. Pyomo reports -lambda for the constraints and -zU for the upper bounds.
+        return status, x, -np.asarray(info['mult_g']), np.asarray(info['mult_x_L']) - np.asarray(info['mult_x_U'])
+
+    def _solve_trust_constr(self, solver_option:Dict[str,Any], tee:bool) -> Tuple[str, np.ndarray, np.ndarray, np.ndarray]:
+        from scipy.optimize import minimize, NonlinearConstraint, Bounds
+        nlp = self.instance
+        jac = lambda x: csr_array((nlp.jacobian(x), (nlp._jac_rows, nlp._jac_cols)), shape=(nlp.m, nlp.n))
+        def hess(x, v):
+            H = coo_array((nlp.hessian(x, v, 0.), (nlp._hess_rows, nlp._hess_cols)), shape=(nlp.n, nlp.n)).tocsr()
+            return H + H.T - csr_array((H.diagonal(), (np.arange(nlp.n), np.arange(nlp.n))), shape=(nlp.n, nlp.n))
+        obj_hess = lambda x: csr_array((2. * nlp.cost[:,0], (np.arange(nlp.G), np.arange(nlp.G))), shape=(nlp.n, nlp.n))
+        constraint = NonlinearConstraint(nlp.constraints, nlp.cl, nlp.cu, jac=jac, hess=hess)
+        options = {'verbose': 2 if tee else 0, 'gtol': 1e-9, 'xtol': 1e-12, 'barrier_tol': 1e-10, 'maxiter': 5000}
+        options.update(solver_option)
+        res = minimize(nlp.objective, np.clip(self.x0, nlp.lb, nlp.ub), jac=nlp.gradient, hess=obj_hess, method='trust-constr',
+                       bounds=Bounds(nlp.lb, nlp.ub, keep_feasible=False), constraints=[constraint], options=options)
+        nlp.iterations = int(res.nit)
+        nlp.last_iterate = {'objective': float(res.fun), 'constraint_violation': float(res.constr_violation),
+                            'dual_infeasibility': float(res.optimality), 'barrier_parameter': float(res.barrier_parameter)}
+        status = 'optimal' if res.status in [1, 2] and res.constr_violation < 1e-6 else ('maxIterations' if res.status == 0 else 'other')
+        # trust-constr: grad f + J'v + z = 0 with v and z the multipliers of the constraints and the bounds
+        return status, res.x, -np.asarray(res.v[0]), -np.asarray(res.v[1])
+
+    def _write_output(self, results:Dict[str,Any], x:np.ndarray, y:np.ndarray, z:np.ndarray, extract_dual:bool = False) -> None:
+        nlp = self.instance
+        primal_sol = {}
+        for name, ids, _ in self._variables():
+            offset = nlp.offset[name]
+            primal_sol[name] = dict(zip(ids, x[offset:offset+len(ids)].tolist()))
+        results['sol']['primal'] = primal_sol
+
+        if extract_dual:
+            dual_sol = {}
+            for name, offset in nlp.cnst_offset.items():
+                ids = self._ids['slack'] if name == 'cnst_slack_va' else (self._ids['vm'] if name.endswith('balance') else self._ids['E'])
+                duals = zip(ids, y[offset:offset+len(ids)].tolist())
+                if name.startswith('cnst_thermal'): # only the rated branches have the thermal limits in `ACOPFModel`
+                    duals = (entry for entry, rated in zip(duals, nlp.rated) if rated)
+                dual_sol[name] = dict(duals)
+            results['sol']['dual'] = dual_sol
+
+            bound_sol = {}
+            for name, ids, bounded in self._variables():
+                bound_sol_var = {}
+                if bounded:
+                    offset = nlp.offset[name]
+                    zL = np.maximum(z[offset:offset+len(ids)], 0.).tolist()
+                    zU = np.minimum(z[offset:offset+len(ids)], 0.).tolist()
+                    for i, idx in enumerate(ids):
+                        bound_sol_var["lb_"+idx] = zL[i]
+                        bound_sol_var["ub_"+idx] = zU[i]
+                bound_sol[name] = bound_sol_var
+            results['sol']['bound'] = bound_sol
+        return None
@@ -0,0 +1,190 @@
+from typing import Any, Dict, Union
+import numpy as np
+import pyomo.environ as pyo
+from scipy.sparse import coo_array
+from scipy.sparse.csgraph import breadth_first_order
+
+from .acopf import ACOPFModel
+from .acopf_exp import *
+from .utils import compute_branch_admittance, _branch_flow_coefficients, _preprocessing_network
+
+
+class ACOPFSOCModel(ACOPFModel):
+    """ second-order cone (SOC) relaxation of AC-OPF in W-space (acopf-soc).
+    The products of the voltages are lifted to w = vm^2 at the buses and wr = vm_f*vm_t*cos(va_f-va_t), wi = vm_f*vm_t*sin(va_f-va_t) at the branches,
+    so that the Ohm's laws and the power balances become linear, and the only nonconvexity wr^2 + wi^2 == w_f*w_t is relaxed to the rotated cone <=.
+    The optimal cost is a lower bound of AC-OPF, and the solution gives a warm start of `ACOPFModel` through `soc_init_var`.
+    The voltage angle differences are bounded by tan(dvamin) wr <= wi <= tan(dvamax) wr with wr >= 0 (in the form of the cosines and sines of the
+    mutable bounds), so the bounds beyond +-90 degrees are clamped to +-90 degrees.
+
+    The primal solution includes 'pg', 'qg', 'w', 'wr', 'wi', 'pf_from', 'pf_to', 'qf_from', and 'qf_to'.
+
+    Args:
+        model_type (str): model type
+    """
+    def __init__(self, model_type):
+        super().__init__(model_type, precompute_coefs=True)
+
+    def _build_model(self) -> None:
+        """ Define the (abstract) SOC relaxation of AC-OPF.
+        """
+        self._build_sets_and_params()
+
+        # # ====================
+        # # II.    Variables
+        # # ====================
+        self.model.pg = pyo.Var(self.model.G, initialize=self.model.pg_init, bounds=pg_bound_exp, within=pyo.Reals) # active generation (injection), continuous
+        self.model.qg = pyo.Var(self.model.G, initialize=self.model.qg_init, bounds=qg_bound_exp, within=pyo.Reals) # reactive generation (injection), continuous
+        self.model.w  = pyo.Var(self.model.B, initialize=w_init_soc_exp, bounds=w_bound_soc_exp, within=pyo.NonNegativeReals) # squared voltage magnitude, continuous
+        self.model.wr = pyo.Var(self.model.E, initialize=wr_init_soc_exp, within=pyo.NonNegativeReals) # real part of the voltage product (|dva| <= 90 degrees), continuous
+        self.model.wi = pyo.Var(self.model.E, initialize=wi_init_soc_exp, within=pyo.Reals) # imaginary part of the voltage product, continuous
+
+        self.model.pf_from = pyo.Var(self.model.E, initialize=self.model.pf_from_init, within=pyo.Reals) # active power flow (from), continuous
+        self.model.pf_to   = pyo.Var(self.model.E, initialize=self.model.pf_to_init, within=pyo.Reals) # active power flow (to), continuous
+        self.model.qf_from = pyo.Var(self.model.E, initialize=self.model.qf_from_init, within=pyo.Reals) # reactive power flow (from), continuous
+        self.model.qf_to   = pyo.Var(self.model.E, initialize=self.model.qf_to_init, within=pyo.Reals) # reactive power flow (to), continuous
+
+        # ====================
+        # III.   Constraints
+        # ====================
+
+        # ====================
+        # III.a Second-Order Cone
+        # ====================
+        self.model.cnst_soc = pyo.Constraint(self.model.E, rule=cnst_soc_exp)
+
+        # ====================
+        # III.b Thermal Limits
+        # ====================
+        self.model.cnst_thermal_branch_from = pyo.Constraint(self.model.E, rule=cnst_thermal_branch_from_exp)
+        self.model.cnst_thermal_branch_to   = pyo.Constraint(self.model.E, rule=cnst_thermal_branch_to_exp)
+
+        # ====================
+        # III.c Ohm's Law (linear in W-space)
+        # ====================
+        self.model.cnst_ohm_pf_from = pyo.Constraint(self.model.E, rule=cnst_ohm_pf_from_soc_exp)
+        self.model.cnst_ohm_pf_to   = pyo.Constraint(self.model.E, rule=cnst_ohm_pf_to_soc_exp)
+        self.model.cnst_ohm_qf_from = pyo.Constraint(self.model.E, rule=cnst_ohm_qf_from_soc_exp)
+        self.model.cnst_ohm_qf_to   = pyo.Constraint(self.model.E, rule=cnst_ohm_qf_to_soc_exp)
+
+        # ====================
+        # III.d Power Balance
+        # ====================
+        self.model.sets_balance = pyo.BuildAction(rule=define_sets_balance_exp)
+        self.model.cnst_p_balance = pyo.Constraint(self.model.B, rule=cnst_p_balance_soc_exp)
+        self.model.cnst_q_balance = pyo.Constraint(self.model.B, rule=cnst_q_balance_soc_exp)
+
+        # ====================
+        # III.e Voltage Angle Difference
+        # ====================
+        self.model.cnst_dva_max = pyo.Constraint(self.model.E, rule=cnst_dva_max_soc_exp)
+        self.model.cnst_dva_min = pyo.Constraint(self.model.E, rule=cnst_dva_min_soc_exp)
+
+        # ====================
+        # IIII.   Objective
+        # ====================
+        self.model.obj_cost = pyo.Objective(sense=pyo.minimize, rule=obj_cost_exp)
+
+    def _instance_data(self, network:Dict[str,Any], init_var:Dict[str,Any] = None) -> Dict[str,Any]:
+        data = super()._instance_data(network, init_var)
+        for name in ['dvamin', 'dvamax']: # the angle difference cuts are valid within +-90 degrees
+            data[name] = { branch_id: min(max(value, -np.pi/2), np.pi/2) for branch_id, value in data[name].items() }
+        return data
+
+
+def soc_init_var(network:Dict[str,Any], soc_result:Dict[str,Any]) -> Dict[str,Dict[str,float]]:
+    """ recover the AC-OPF variables from a solution of `acopf-soc` to be passed as `init_var` of `ACOPFModel.instantiate`.
+    vm = sqrt(w), and va is propagated from the slack bus along a breadth-first spanning tree with va_f - va_t = atan2(wi, wr).
+    The branch flows are then evaluated from the recovered vm and va, so that the initial point satisfies the Ohm's laws.
+
+    Args:
+        network (Dict[str,Any]): pglib network
+        soc_result (Dict[str,Any]): result of `model.solve` of the `acopf-soc` model
+
+    Returns:
+        Dict[str,Dict[str,float]]: 'pg', 'qg', 'vm', 'va', 'pf1', 'pf2', 'qf1', 'qf2'
+    """
+    _preprocessing_network(network)
+    primal = soc_result['sol']['primal']
+    buses = network['bus']
+    busids = list(buses.keys())
+    branchids = list(network['branch'].keys()) # ordered by the indices after `_preprocessing_network`
+    B = len(busids)
+    branch = compute_branch_admittance(network)
+    f_idx, t_idx = branch['f_idx'], branch['t_idx']
+
+    w = np.zeros(B)
+    for bus_id in busids:
+        w[buses[bus_id]['index']] = primal['w'][bus_id]
+    wr = np.asarray([primal['wr'][branch_id] for branch_id in branchids], dtype=float)
+    wi = np.asarray([primal['wi'][branch_id] for branch_id in branchids], dtype=float)
+    vm = np.sqrt(np.maximum(w, 0.))
+    dva = np.arctan2(wi, wr)
+
+    # spanning forest rooted at the slack buses (then any bus left in islands without the slack)
+    graph = coo_array((np.ones(len(branchids)), (f_idx, t_idx)), shape=(B, B)).tocsr()
+    edge = {}
+    for k in range(len(branchids) - 1, -1, -1): # the first branch of the parallel ones
+        edge[(f_idx[k], t_idx[k])] = k
+        edge[(t_idx[k], f_idx[k])] = k
+    slack = [buses[bus_id]['index'] for bus_id in busids if buses[bus_id]['bus_type'] == 3]
+    va = np.zeros(B)
+    visited = np.zeros(B, dtype=bool)
+    for root in slack + list(range(B)):
+        if visited[root]:
+            continue
+        order, predecessor = breadth_first_order(graph, root, directed=False, return_predecessors=True)
+        for node in order[1:]:
+            parent = predecessor[node]
+            k = edge[(parent, node)]
+            va[node] = va[parent] - dva[k] if f_idx[k] == parent else va[parent] + dva[k]
+        visited[order] = True
+
+    init_var = {'pg': dict(primal['pg']), 'qg': dict(primal['qg']),
+                'vm': { bus_id: float(vm[buses[bus_id]['index']]) for bus_id in busids },
+                'va': { bus_id: float(va[buses[bus_id]['index']]) for bus_id in busids }}
+    vv = vm[f_idx] * vm[t_idx]
+    cos, sin = np.cos(va[f_idx] - va[t_idx]), np.sin(va[f_idx] - va[t_idx])
+    for key, (a, c, s, at_from) in zip(['pf1', 'pf2', 'qf1', 'qf2'], _branch_flow_coefficients(branch).values()):
+        flow = a * (vm[f_idx] if at_from else vm[t_idx])**2 + vv * (c * cos + s * sin)
+        init_var[key] = dict(zip(branchids, flow.tolist()))
+    return init_var
+
+
+def solve_acopf_soc_warmstart(network:Dict[str,Any],
+                              solver:Union[str,pyo.SolverFactory] = 'ipopt',
+                              solver_option:Dict[str,Any] = {},
+                              soc_solver:Union[str,pyo.SolverFactory] = None,
+                              soc_solver_option:Dict[str,Any] = None,
+                              tee:bool = False,
+                              extract_dual:bool = False) -> Dict[str,Any]:
+    """ solve `acopf-soc` first, and then `acopf` from the recovered point of `soc_init_var` (`solve_acopf` with init='soc'),
+    and report the relaxation gap.
+
+        result = opf.solve_acopf_soc_warmstart(network)
+        print(result['obj_cost'], result['soc']['obj_cost'], result['soc']['gap'])
+
+    Args:
+        network (Dict[str,Any]): pglib network
+        solver (Union[str,pyo.SolverFactory]): solver of AC-OPF
+        solver_option (Dict[str,Any]): options of the AC-OPF solver
+        soc_solver (Union[str,pyo.SolverFactory]): solver of the relaxation (`solver` by default)
+        soc_solver_option (Dict[str,Any]): options of the relaxation solver (`solver_option` by default)
+        tee (bool): show the solver logs
+        extract_dual (bool): extract the duals of AC-OPF
+
+    Returns:
+        Dict[str,Any]: result of AC-OPF, with 'soc' for 'termination_status', 'time', 'obj_cost' (lower bound),
+                       and 'gap' = (AC cost - SOC cost) / |AC cost| of the relaxation
+    """
+    from .acopf_init import solve_acopf
+    result = solve_acopf(network, init='soc', solver=solver, solver_option=solver_option,
+                         init_solver=soc_solver, init_solver_option=soc_solver_option if soc_solver_option is not None else solver_option,
+                         tee=tee, extract_dual=extract_dual)
+    init = result.pop('init')
+    gap = (result['obj_cost'] - init['obj_cost']) / abs(result['obj_cost']) if 'primal' in result['sol'] else float('nan')
+    result['soc'] = {'termination_status': init['termination_status'],
+                     'time': init['time'],
+                     'obj_cost': init['obj_cost'],
+                     'gap': gap}
+    return result
@@ -0,0 +1,377 @@
+from typing import Dict, Any, Tuple
+import time
+import numpy as np
+from scipy.sparse import csc_array, csr_array, diags, bmat
+from scipy.sparse.linalg import splu
+
+from .utils import (compute_admittance_matrix,
+                    compute_branch_admittance,
+                    compute_shunt_admittance,
+                    compute_generator_incidence_matrix,
+                    compute_load_incidence_matrix,
+                    _admittance_stamps,
+                    _assemble_admittance_matrix,
+                    _preprocessing_network)
+
+
+def _bus_types(network:Dict[str,Any]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """ indices of the slack, PV and PQ buses. PV buses (bus_type 2) without in-service generators are regarded as PQ buses,
+    and isolated buses (bus_type 4) are excluded.
+    """
+    buses = network['bus']
+    B = len(buses)
+    bus_type = np.empty(B, dtype=int)
+    for bus in buses.values():
+        bus_type[bus['index']] = bus['bus_type']
+    has_gen = np.zeros(B, dtype=bool)
+    for gen in network['gen'].values():
+        has_gen[buses[gen['gen_bus']]['index']] = True
+
+    ref = np.nonzero(bus_type == 3)[0]
+    pv = np.nonzero((bus_type == 2) & has_gen)[0]
+    pq = np.nonzero((bus_type == 1) | ((bus_type == 2) & ~has_gen))[0]
+    if ref.size != 1:
+        raise ValueError(f'The number of slack buses should be 1. But it is now {ref.size}.')
+    return ref, pv, pq
+
+
+def _dS_dV(Ybus:csc_array, V:np.ndarray) -> Tuple[csr_array, csr_array]:
+    """ partial derivatives of the bus power injections with respect to the voltage angles and magnitudes
+    """
+    Ibus = Ybus @ V
+    diagV = diags(V)
+    diagIbus = diags(Ibus)
+    diagVnorm = diags(V / np.abs(V))
+    dS_dVa = csr_array(1j * diagV @ (diagIbus - Ybus @ diagV).conj())
+    dS_dVm = csr_array(diagV @ (Ybus @ diagVnorm).conj() + diagIbus.conj() @ diagVnorm)
+    return dS_dVa, dS_dVm
+
+
+def _newton_raphson(Ybus:csc_array,
+                    Sbus:np.ndarray,
+                    V0:np.ndarray,
+                    pv:np.ndarray,
+                    pq:np.ndarray,
+                    tol:float = 1e-8,
+                    max_iter:int = 20) -> Tuple[np.ndarray, bool, int, float]:
+    """ Newton-Raphson power flow in polar coordinates. The Jacobian is assembled as a sparse block matrix and factorized by sparse LU.
+
+    Returns:
+        Tuple[np.ndarray, bool, int, float]: complex bus voltages, convergence, the number of iterations, and the final mismatch (inf-norm)
+    """
+    V = V0.astype(complex)
+    Va, Vm = np.angle(V), np.abs(V)
+    pvpq = np.concatenate([pv, pq])
+    npvpq, npq = pvpq.size, pq.size
+
+    def mismatch(V):
+        mis = V * np.conj(Ybus @ V) - Sbus
+        return np.concatenate([mis[pvpq].real, mis[pq].imag])
+
+    F = mismatch(V)
+    normF = np.linalg.norm(F, np.inf) if F.size > 0 else 0.
+    it = 0
+    while normF > tol and it < max_iter:
+        it += 1
+        dS_dVa, dS_dVm = _dS_dV(Ybus, V)
+        J = bmat([[dS_dVa[pvpq][:,pvpq].real, dS_dVm[pvpq][:,pq].real],
+                  [dS_dVa[pq][:,pvpq].imag, dS_dVm[pq][:,pq].imag]], format='csc')
+        dx = -splu(J).solve(F)
+        Va[pvpq] += dx[:npvpq]
+        Vm[pq] += dx[npvpq:npvpq+npq]
+        V = Vm * np.exp(1j * Va)
+        F = mismatch(V)
+        normF = np.linalg.norm(F, np.inf)
+    return V, normF <= tol, it, normF
+
+
+class FastDecoupledPowerFlow:
+    """ fast-decoupled AC power flow (XB or BX version) for many cases on the same topology.
+    B' and B'' are built and factorized once in the constructor, and every call of `solve` reuses the factorizations:
+    columns of the inputs (generation/load patterns) are iterated together, and a branch outage is handled
+    by a low-rank (Woodbury) correction of the base factorizations instead of refactorizing.
+
+    Args:
+        network (Dict[str,Any]): pglib network
+        method (str): 'XB' (resistances ignored in B') or 'BX' (resistances ignored in B'')
+    """
+    def __init__(self, network:Dict[str,Any], method:str = 'XB'):
+        if method not in ['XB', 'BX']:
+            raise ValueError(f"method should be 'XB' or 'BX'. But it is now {method}.")
+        _preprocessing_network(network)
+        self.method = method
+        self.branch_idx = { branch_id: branch['index'] for branch_id, branch in network['branch'].items() }
+        self.ref, self.pv, self.pq = _bus_types(network)
+        self.pvpq = np.concatenate([self.pv, self.pq])
+        self.I_g = compute_generator_incidence_matrix(network).tocsr()
+        self.I_l = compute_load_incidence_matrix(network).tocsr()
+        self.setpoints = _power_flow_setpoints(network)
+
+        branch = compute_branch_admittance(network)
+        Ysh = compute_shunt_admittance(network)
+        self.f_idx, self.t_idx = branch['f_idx'], branch['t_idx']
+        self.Ybus, self.Yf, self.Yt = _assemble_admittance_matrix(branch, Ysh)
+        self.stamps = np.stack(_admittance_stamps(branch), axis=1) # Ex4 (Yff, Yft, Ytf, Ytt)
+
+        zeros = np.zeros_like(branch['g'])
+        # B': no shunts, no line charging, and no tap ratios (phase shifts are kept)
+        branch_p = {**branch, 'g_fr': zeros, 'b_fr': zeros, 'g_to': zeros, 'b_to': zeros, 'T_m': np.ones_like(zeros),
+                    'T_R': branch['T_R'] / branch['T_m'], 'T_I': branch['T_I'] / branch['T_m']}
+        # B'': no phase shifts
+        branch_pp = {**branch, 'T_R': branch['T_m'], 'T_I': zeros}
+        lossless = lambda br: {**br, 'g': zeros, 'b': (br['g']**2 + br['b']**2) / br['b']} # series susceptance -1/x
+        if method == 'XB':
+            branch_p = lossless(branch_p)
+        else:
+            branch_pp = lossless(branch_pp)
+        self.stamps_p = -np.stack(_admittance_stamps(branch_p), axis=1).imag
+        self.stamps_pp = -np.stack(_admittance_stamps(branch_pp), axis=1).imag
+        Bp = csr_array(-_assemble_admittance_matrix(branch_p, np.zeros_like(Ysh))[0].imag)
+        Bpp = csr_array(-_assemble_admittance_matrix(branch_pp, Ysh)[0].imag)
+        self.lu_p = splu(csc_array(Bp[self.pvpq][:,self.pvpq]))
+        self.lu_pp = splu(csc_array(Bpp[self.pq][:,self.pq]))
+
+        B = self.Ybus.shape[0]
+        self.pos_p = np.full(B, -1, dtype=int)
+        self.pos_p[self.pvpq] = np.arange(self.pvpq.size)
+        self.pos_pp = np.full(B, -1, dtype=int)
+        self.pos_pp[self.pq] = np.arange(self.pq.size)
+
+    def _outage_solver(self, lu, stamps:np.ndarray, pos:np.ndarray, branch_id:str):
+        """ solver of (B - U M U^T) x = r using the factorization of B, where M is the 2x2 stamp of the outaged branch l
+        restricted to the buses in the system (U selects their positions).
+        """
+        l = self.branch_idx[branch_id]
+        buses = np.asarray([self.f_idx[l], self.t_idx[l]])
+        keep = pos[buses] >= 0
+        if not np.any(keep):
+            return lu.solve
+        M = stamps[l].reshape(2, 2)[np.ix_(keep, keep)]
+        U = np.zeros((lu.shape[0], M.shape[0]))
+        U[pos[buses[keep]], np.arange(M.shape[0])] = 1.
+        Z = lu.solve(U) # B^-1 U
+        K = np.eye(M.shape[0]) - M @ Z[pos[buses[keep]]]
+        if np.linalg.cond(K) > 1e12:
+            raise ValueError(f"The outage of branch ID {branch_id} causes network isolation.")
+        W = np.linalg.solve(K, M) # (I - M U^T B^-1 U)^-1 M
+
+        def solve(r):
+            y = lu.solve(r)
+            return y + Z @ (W @ y[pos[buses[keep]]])
+        return solve
+
+    def solve(self, pg:np.ndarray = None,
+                    pd:np.ndarray = None,
+                    qd:np.ndarray = None,
+                    qg:np.ndarray = None,
+                    vm:np.ndarray = None,
+                    va:np.ndarray = None,
+                    outage:str = None,
+                    tol:float = 1e-8,
+                    max_iter:int = 30) -> Dict[str,np.ndarray]:
+        """ solve the power flows of N cases together. The inputs not given are taken from the network setpoints.
+
+        Args:
+            pg, qg (np.ndarray): GxN generations
+            pd, qd (np.ndarray): LxN loads
+            vm, va (np.ndarray): BxN initial voltages, where vm also gives the setpoints of the PV and slack buses. Flat start with 'vg' if None.
+            outage (str): branch ID taken out of service in all the cases
+            tol (float): tolerance of the power mismatch (inf-norm, per unit)
+            max_iter (int): maximum number of P-Q half-iteration pairs
+
+        Returns:
+            Dict[str,np.ndarray]: BxN 'vm' and 'va', ExN 'pf_from', 'pf_to', 'qf_from', 'qf_to', and N 'converged', 'iterations', 'mismatch'
+        """
+        inputs = {'pg': pg, 'qg': qg, 'pd': pd, 'qd': qd, 'vm': vm, 'va': va}
+        N = max([np.atleast_2d(np.asarray(x).T).T.shape[1] for x in inputs.values() if x is not None] + [1])
+        for k, x in inputs.items():
+            x = self.setpoints[k if k != 'vm' else 'vg'] if x is None else np.asarray(x, dtype=float)
+            inputs[k] = np.broadcast_to(np.atleast_2d(x.T).T, (x.shape[0], N))
+
+        Ybus, f_idx, t_idx = self.Ybus, self.f_idx, self.t_idx
+        solve_p, solve_pp = self.lu_p.solve, self.lu_pp.solve
+        l = None
+        if outage is not None:
+            if outage not in self.branch_idx:
+                raise RuntimeError(f"Branch ID {outage} is not placed in the given network.")
+            l = self.branch_idx[outage]
+            solve_p = self._outage_solver(self.lu_p, self.stamps_p, self.pos_p, outage)
+            solve_pp = self._outage_solver(self.lu_pp, self.stamps_pp, self.pos_pp, outage)
+
+        def current(V):
+            I = Ybus @ V
+            if l is not None: # remove the contribution of the outaged branch
+                Yff, Yft, Ytf, Ytt = self.stamps[l]
+                I[f_idx[l]] -= Yff * V[f_idx[l]] + Yft * V[t_idx[l]]
+                I[t_idx[l]] -= Ytf * V[f_idx[l]] + Ytt * V[t_idx[l]]
+            return I
+
+        Sbus = self.I_g @ (inputs['pg'] + 1j*inputs['qg']) - self.I_l @ (inputs['pd'] + 1j*inputs['qd'])
+        Vm = inputs['vm'].copy()
+        if vm is None:
+            Vm[self.pq] = 1.
+        Va = inputs['va'].copy()
+        pvpq, pq = self.pvpq, self.pq
+
+        converged = np.zeros(N, dtype=bool)
+        iterations = np.zeros(N, dtype=int)
+        mismatch = np.full(N, np.inf)
+        active = np.arange(N)
+        for it in range(max_iter + 1):
+            V = Vm[:,active] * np.exp(1j * Va[:,active])
+            mis = (V * np.conj(current(V)) - Sbus[:,active]) / Vm[:,active]
+            normF = np.maximum(np.abs(mis[pvpq].real).max(axis=0, initial=0.), np.abs(mis[pq].imag).max(axis=0, initial=0.))
+            mismatch[active] = normF
+            done = normF <= tol
+            converged[active[done]] = True
+            active = active[~done]
+            if active.size == 0 or it == max_iter:
+                break
+            iterations[active] += 1
+            mis = mis[:,~done]
+
+            # P half-iteration
+            Va[np.ix_(pvpq, active)] -= solve_p(np.ascontiguousarray(mis[pvpq].real))
+            # Q half-iteration
+            V = Vm[:,active] * np.exp(1j * Va[:,active])
+            mis = (V * np.conj(current(V)) - Sbus[:,active]) / Vm[:,active]
+            Vm[np.ix_(pq, active)] -= solve_pp(np.ascontiguousarray(mis[pq].imag))
+
+        V = Vm * np.exp(1j * Va)
+        Sf = V[f_idx] * np.conj(self.Yf @ V)
+        St = V[t_idx] * np.conj(self.Yt @ V)
+        if l is not None:
+            Sf[l] = 0.
+            St[l] = 0.
+        return {'vm': Vm, 'va': Va,
+                'pf_from': Sf.real, 'pf_to': St.real, 'qf_from': Sf.imag, 'qf_to': St.imag,
+                'converged': converged, 'iterations': iterations, 'mismatch': mismatch}
+
+
+def _power_flow_setpoints(network:Dict[str,Any], result:Dict[str,Any] = None) -> Dict[str,np.ndarray]:
+    """ generator, load, and voltage setpoints ordered by the indices. A solution of `model.solve` overrides pg (and vm, va, qg if exist).
+    """
+    buses = network['bus']
+    gens = network['gen']
+    loads = network['load']
+    B, G, L = len(buses), len(gens), len(loads)
+    primal = result['sol']['primal'] if result is not None else {}
+
+    pg, qg, vg = np.zeros(G), np.zeros(G), np.ones(B)
+    for gen_id, gen in gens.items():
+        pg[gen['index']] = primal['pg'][gen_id] if 'pg' in primal else gen['pg']
+        qg[gen['index']] = primal['qg'][gen_id] if 'qg' in primal else gen['qg']
+        vg[buses[gen['gen_bus']]['index']] = gen['vg']
+    pd, qd = np.zeros(L), np.zeros(L)
+    for load_id, load in loads.items():
+        pd[load['index']] = load['pd']
+        qd[load['index']] = load['qd']
+
+    vm, va = np.ones(B), np.zeros(B)
+    for bus_id, bus in buses.items():
+        if 'vm' in primal:
+            vm[bus['index']] = vg[bus['index']] = primal['vm'][bus_id]
+        if 'va' in primal:
+            va[bus['index']] = primal['va'][bus_id]
+    return {'pg': pg, 'qg': qg, 'vg': vg, 'pd': pd, 'qd': qd, 'vm': vm, 'va': va}
+
+
+def _power_flow_output(network:Dict[str,Any],
+                       Ybus:csc_array, Yf:csc_array, Yt:csc_array,
+                       V:np.ndarray,
+                       setpoints:Dict[str,np.ndarray],
+                       ref:np.ndarray, pv:np.ndarray) -> Dict[str,Dict[str,float]]:
+    """ primal solution dictionary in the same format as the AC-OPF results.
+    The slack active power and the reactive power of PV and slack buses are shared equally by the generators at the bus.
+    """
+    buses = network['bus']
+    gens = network['gen']
+    branches = network['branch']
+    gen_bus_idx = np.empty(len(gens), dtype=int)
+    for gen in gens.values():
+        gen_bus_idx[gen['index']] = buses[gen['gen_bus']]['index']
+    f_idx = np.empty(len(branches), dtype=int)
+    t_idx = np.empty(len(branches), dtype=int)
+    for branch in branches.values():
+        f_idx[branch['index']] = buses[branch['f_bus']]['index']
+        t_idx[branch['index']] = buses[branch['t_bus']]['index']
+
+    # generation needed at each bus = net injection + load
+    Sgen_bus = V * np.conj(Ybus @ V) + compute_load_incidence_matrix(network) @ (setpoints['pd'] + 1j*setpoints['qd'])
+    share = 1. / np.bincount(gen_bus_idx, minlength=V.size)[gen_bus_idx]
+    mask_ref = np.isin(gen_bus_idx, ref)
+    mask_pvref = mask_ref | np.isin(gen_bus_idx, pv)
+    pg, qg = setpoints['pg'].copy(), setpoints['qg'].copy()
+    pg[mask_ref] = Sgen_bus[gen_bus_idx[mask_ref]].real * share[mask_ref]
+    qg[mask_pvref] = Sgen_bus[gen_bus_idx[mask_pvref]].imag * share[mask_pvref]
+
+    Sf = V[f_idx] * np.conj(Yf @ V)
+    St = V[t_idx] * np.conj(Yt @ V)
+
+    vm, va = np.abs(V), np.angle(V)
+    return {
+        'pg': { gen_id: float(pg[gen['index']]) for gen_id, gen in gens.items() },
+        'qg': { gen_id: float(qg[gen['index']]) for gen_id, gen in gens.items() },
+        'vm': { bus_id: float(vm[bus['index']]) for bus_id, bus in buses.items() },
+        'va': { bus_id: float(va[bus['index']]) for bus_id, bus in buses.items() },
+        'pf_from': { branch_id: float(Sf[branch['index']].real) for branch_id, branch in branches.items() },
+        'pf_to': { branch_id: float(St[branch['index']].real) for branch_id, branch in branches.items() },
+        'qf_from': { branch_id: float(Sf[branch['index']].imag) for branch_id, branch in branches.items() },
+        'qf_to': { branch_id: float(St[branch['index']].imag) for branch_id, branch in branches.items() },
+    }
+
+
+def ac_power_flow(network:Dict[str,Any],
+                  result:Dict[str,Any] = None,
+                  method:str = 'newton',
+                  tol:float = 1e-8,
+                  max_iter:int = None) -> Dict[str,Any]:
+    """ AC power flow by Newton-Raphson or fast-decoupled method.
+    Slack, PV, and PQ buses follow 'bus_type', where the voltage magnitudes of PV and slack buses are fixed at the generator setpoints ('vg').
+    Generator reactive power limits are not enforced.
+
+    Args:
+        network (Dict[str,Any]): pglib network
+        result (Dict[str,Any]): (optional) solution of `model.solve` (e.g., DC-OPF or AC-OPF) to evaluate.
+            'pg' gives the dispatch, and 'vm' and 'va' (if exist) give the voltage setpoints and the initial point.
+        method (str): 'newton', 'fdxb' (fast-decoupled, XB version), or 'fdbx' (fast-decoupled, BX version).
+            Use `FastDecoupledPowerFlow` directly to reuse the factorizations across many cases.
+        tol (float): tolerance of the power mismatch (inf-norm, per unit)
+        max_iter (int): maximum number of iterations (20 for 'newton' and 30 for the fast-decoupled methods if None)
+
+    Returns:
+        Dict[str,Any]: 'termination_status' ('converged' or 'maxIterations'), 'iterations', 'mismatch', 'time',
+            and 'sol' with the primal solution in the same format as the AC-OPF results
+    """
+    if method not in ['newton', 'fdxb', 'fdbx']:
+        raise ValueError(f"method should be one of 'newton', 'fdxb', and 'fdbx'. But it is now {method}.")
+    tic = time.time()
+    _preprocessing_network(network)
+    ref, pv, pq = _bus_types(network)
+    setpoints = _power_flow_setpoints(network, result)
+
+    if method == 'newton':
+        Ybus, Yf, Yt = compute_admittance_matrix(network)
+        I_g = compute_generator_incidence_matrix(network)
+        I_l = compute_load_incidence_matrix(network)
+        Sbus = I_g @ (setpoints['pg'] + 1j*setpoints['qg']) - I_l @ (setpoints['pd'] + 1j*setpoints['qd'])
+
+        vm0 = setpoints['vm'].copy()
+        vm0[pv] = setpoints['vg'][pv]
+        vm0[ref] = setpoints['vg'][ref]
+        V0 = vm0 * np.exp(1j * setpoints['va'])
+        V, converged, it, normF = _newton_raphson(Ybus, Sbus, V0, pv, pq, tol, 20 if max_iter is None else max_iter)
+    else:
+        fdpf = FastDecoupledPowerFlow(network, method[2:].upper())
+        Ybus, Yf, Yt = fdpf.Ybus, fdpf.Yf, fdpf.Yt
+        vm0 = setpoints['vm'] if result is not None and 'vm' in result['sol']['primal'] else None
+        sol = fdpf.solve(setpoints['pg'], setpoints['pd'], setpoints['qd'], setpoints['qg'], vm0, setpoints['va'],
+                         tol=tol, max_iter=30 if max_iter is None else max_iter)
+        V = sol['vm'][:,0] * np.exp(1j * sol['va'][:,0])
+        converged, it, normF = sol['converged'][0], int(sol['iterations'][0]), sol['mismatch'][0]
+
+    return {'termination_status': 'converged' if converged else 'maxIterations',
+            'iterations': it,
+            'mismatch': float(normF),
+            'time': time.time() - tic,
+            'sol': {'primal': _power_flow_output(network, Ybus, Yf, Yt, V, setpoints, ref, pv)}}
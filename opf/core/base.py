@@ -4,6 +4,8 @@ from typing import Dict, Any, Union, List
 import warnings
 
 from .utils import _preprocessing_network
+from .profiler import _stage, _profiled, _solver_stages
+from .stats import _solver_stats
 
 
 class OPFBaseModel(ABC):
@@ -34,6 +36,7 @@ class OPFBaseModel(ABC):
                      extract_contingency:bool = False) -> Dict[str,Any]: pass
 
 
+    @_profiled('solve', result=True)
     def solve(self, solver:Union[bool,pyo.SolverFactory] = 'ipopt', 
                     solver_option:Dict[str,Any] = {}, 
                     solve_method:bool = None, 
@@ -44,7 +47,7 @@ class OPFBaseModel(ABC):
             raise RuntimeError("instance has not included in the model class. Please execute `model.instantiate(network)` first to create it.")
         if isinstance(solver, str):
             optimizer = pyo.SolverFactory(solver.lower())
-        elif isinstance(solver, type(pyo.SolverFactory)):
+        elif hasattr(solver, 'solve'): # an optimizer of `pyo.SolverFactory`, whose type is the plugin of the solver
             optimizer = solver
         else:
             raise RuntimeError("solver should be string (such as ipopt or gurobi) or `pyo.SolverFactory` object.")
@@ -88,16 +91,19 @@ class NormalOPFModel(OPFBaseModel):
                      tee:bool = False, 
                      extract_dual:bool = False,
                      extract_contingency:bool = False) -> Dict[str,Any]:
-        opt_results = optimizer.solve(self.instance, tee=tee)
+        with _solver_stages(optimizer):
+            opt_results = optimizer.solve(self.instance, tee=tee)
 
         results = {'termination_status': str(opt_results.solver.termination_condition), 
                    'time': float(opt_results.solver.time),
                    'obj_cost': pyo.value(self.instance.obj_cost),
-                   'sol': {}
+                   'sol': {},
+                   'stats': _solver_stats(optimizer)
                    }
 
         if results['termination_status'] in ['optimal', 'locallyOptimal', 'globallyOptimal']:
-            self._write_output(results, extract_dual, extract_contingency)
+            with _stage('extract_result'):
+                self._write_output(results, extract_dual, extract_contingency)
         
         return results
         
@@ -166,6 +172,7 @@ class NormalOPFModel(OPFBaseModel):
 
         return None
 
+    @_profiled('instantiate')
     def instantiate(self, network:Dict[str,Any], init_var:Dict[str,Any] = None, verbose:bool = False) -> None: 
         print('instantiate model...', end=' ', flush=True)
         if isinstance(self.instance,pyo.ConcreteModel):
@@ -196,6 +203,7 @@ class SCOPFModel(OPFBaseModel):
         return self.instantiate(network=network, init_var=init_var, generator_contingency='all', line_contingency='all', verbose=verbose)
 
 
+    @_profiled('instantiate')
     def instantiate(self, network:Dict[str,Any], 
                           init_var:Dict[str,Any] = None, 
                           generator_contingency:Union[str,List[str]] = 'all',
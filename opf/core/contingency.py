@@ -0,0 +1,221 @@
+from typing import Dict, Any, List, Union, Tuple
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+import time
+import numpy as np
+from scipy.sparse.linalg import splu
+
+from .utils import (compute_bus_susceptance_matrix,
+                    compute_branch_susceptance_matrix,
+                    compute_line_incidence_matrix,
+                    _get_slack_idx,
+                    _preprocessing_network)
+from .dcpf import DCPowerFlow
+
+
+class _ScreeningContext:
+    """ data shared by every chunk of the N-1 line outage screening.
+    The bus susceptance matrix is factorized only once, and each chunk of outages only solves for its own LODF columns.
+    """
+    def __init__(self, S_b, S_br, PHI, slack, rate, tol=1e-8):
+        self.lu = splu(S_b.tocsc())
+        self.S_br = S_br
+        self.PHI = PHI.tocsc()
+        self.slack = slack
+        self.rate = rate
+        self.tol = tol
+
+    def lodf(self, outage_idxs:np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """ compute the LODF columns of the given outages
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: ExK LODF matrix, and the boolean mask of the outages causing network isolation
+        """
+        noutage = outage_idxs.size
+        S_inv_PHI = self.lu.solve(self.PHI[:,outage_idxs].toarray())
+        S_inv_PHI[self.slack, :] = 0.
+        PTDF_MO = self.S_br @ S_inv_PHI # ExK branch-to-branch PTDF
+        PTDF_OO = PTDF_MO[outage_idxs, np.arange(noutage)]
+        islanding = np.abs(1.-PTDF_OO) <= self.tol
+        denom = np.where(islanding, 1., 1.-PTDF_OO)
+        LODF = PTDF_MO * (1./denom)
+        LODF[outage_idxs, np.arange(noutage)] = -1.
+        LODF[:, islanding] = np.nan
+        return LODF, islanding
+
+    def post_contingency_flows(self, pf:np.ndarray, outage_idxs:np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """ ExK post-contingency flows, pf_k = pf + LODF[:,k] * pf[k]
+        """
+        LODF, islanding = self.lodf(outage_idxs)
+        return pf[:,None] + LODF * pf[outage_idxs][None,:], islanding
+
+    def screen_chunk(self, pf:np.ndarray, outage_idxs:np.ndarray, threshold:float, top_k:int = None) -> Dict[str,np.ndarray]:
+        pf_post, islanding = self.post_contingency_flows(pf, outage_idxs)
+        with np.errstate(invalid='ignore'):
+            loading = np.abs(pf_post) / self.rate[:,None]
+            mask = loading > threshold # nan (isolation) is excluded here
+        branch_pos, outage_pos = np.nonzero(mask)
+        loading_viol = loading[branch_pos, outage_pos]
+        nviolation = loading_viol.size
+        if top_k is not None and nviolation > top_k: # keep only top-k in each chunk to bound the memory
+            keep = np.argpartition(-loading_viol, top_k-1)[:top_k]
+            branch_pos, outage_pos, loading_viol = branch_pos[keep], outage_pos[keep], loading_viol[keep]
+        return {
+            'branch': branch_pos,
+            'outage': outage_idxs[outage_pos],
+            'flow': pf_post[branch_pos, outage_pos],
+            'loading': loading_viol,
+            'islanding': outage_idxs[islanding],
+            'nviolation': nviolation
+        }
+
+
+_worker_context = None
+
+def _init_worker(S_b, S_br, PHI, slack, rate):
+    global _worker_context
+    _worker_context = _ScreeningContext(S_b, S_br, PHI, slack, rate)
+
+def _screen_chunk_worker(pf, outage_idxs, threshold, top_k):
+    return _worker_context.screen_chunk(pf, outage_idxs, threshold, top_k)
+
+
+def get_branch_rating(network:Dict[str,Any], rating:str = 'rate_a') -> np.ndarray:
+    """ branch thermal ratings ordered by the branch indices. Branches without the rating are regarded as unlimited.
+
+    Args:
+        network (Dict[str,Any]): pglib network
+        rating (str): 'rate_a' (long term), 'rate_b' (short term) or 'rate_c' (emergency)
+
+    Returns:
+        np.ndarray: E-dimensional rating vector
+    """
+    if rating not in ['rate_a', 'rate_b', 'rate_c']:
+        raise ValueError(f"rating should be one of 'rate_a', 'rate_b', and 'rate_c'. But it is now {rating}.")
+    _preprocessing_network(network)
+    branches = network['branch']
+    rate = np.full(len(branches), np.inf)
+    for branch_id, branch in branches.items():
+        rate_val = branch.get(rating, 0.)
+        if rate_val > 0.:
+            rate[branch['index']] = rate_val
+    return rate
+
+
+def get_branch_flows(network:Dict[str,Any], result:Dict[str,Any]) -> np.ndarray:
+    """ extract (active, DC) base-case branch flows ordered by the branch indices from the result of `model.solve`.
+    Uses the flow variables if exists (DC-OPF: 'pf', AC-OPF: 'pf_from'), otherwise computes DC flows from 'pg'.
+
+    Returns:
+        np.ndarray: E-dimensional branch flow vector
+    """
+    _preprocessing_network(network)
+    branches = network['branch']
+    primal = result['sol']['primal']
+    pf_sol = primal.get('pf', primal.get('pf_from', None))
+
+    pf = np.empty(len(branches))
+    if pf_sol is not None:
+        for branch_id, branch in branches.items():
+            pf[branch['index']] = pf_sol[branch_id]
+        return pf
+
+    gens = network['gen']
+    loads = network['load']
+    pg = np.zeros(len(gens))
+    pd = np.zeros(len(loads))
+    for gen_id, gen in gens.items():
+        pg[gen['index']] = primal['pg'][gen_id]
+    for load_id, load in loads.items():
+        pd[load['index']] = load['pd']
+    return DCPowerFlow(network).solve(pg, pd, return_va=False)['pf']
+
+
+def screen_contingencies(network:Dict[str,Any],
+                         result:Dict[str,Any],
+                         outages:Union[str,List[str]] = 'all',
+                         top_k:int = None,
+                         rating:str = 'rate_a',
+                         threshold:float = 1.,
+                         chunk_size:int = 256,
+                         n_jobs:int = 1,
+                         parallel:str = 'thread') -> Dict[str,Any]:
+    """ N-1 line contingency screening based on LODF.
+    Post-contingency flows of all the monitored branches are evaluated as matrix operations on the base flows and LODF columns,
+    where the outages are processed in chunks so that the full ExE LODF matrix is never materialized.
+
+    Args:
+        network (Dict[str,Any]): pglib network
+        result (Dict[str,Any]): base-case solution obtained by `model.solve`
+        outages (Union[str,List[str]]): 'all' or branch ID list of the outages
+        top_k (int): the number of the worst violations to return. All violations are returned if None.
+        rating (str): 'rate_a', 'rate_b' or 'rate_c' used as post-contingency limits
+        threshold (float): loading (|flow|/rating) above which the flow is reported as a violation
+        chunk_size (int): the number of outages evaluated at once
+        n_jobs (int): the number of workers to run chunks
+        parallel (str): 'thread' or 'process'
+
+    Returns:
+        Dict[str,Any]: violations ranked by loading in descending order, and outages causing network isolation
+    """
+    tic = time.time()
+    _preprocessing_network(network)
+    branches = network['branch']
+    branchids = sorted(list(branches.keys()))
+
+    if isinstance(outages,str):
+        if outages.lower() != 'all':
+            raise RuntimeError("The argument 'outages' should be 'all' or specify the branch ID list")
+        outages = branchids
+    elif isinstance(outages,list):
+        for branch_id in outages:
+            if not branch_id in branches:
+                raise RuntimeError(f"Branch ID {branch_id} in the argument 'outages' is not placed in the given network.")
+    else:
+        raise RuntimeError("The argument 'outages' should be 'all' or specify the branch ID list")
+
+    if parallel not in ['thread', 'process']:
+        raise ValueError(f"parallel should be 'thread' or 'process'. But it is now {parallel}.")
+
+    slack = _get_slack_idx(network)
+    S_b = compute_bus_susceptance_matrix(network, slack) # BxB
+    S_br = compute_branch_susceptance_matrix(network) # ExB
+    PHI = compute_line_incidence_matrix(network) # BxE
+    rate = get_branch_rating(network, rating)
+    pf = get_branch_flows(network, result)
+
+    outage_idxs = np.asarray([branches[branch_id]['index'] for branch_id in outages], dtype=int)
+    chunks = [outage_idxs[i:i+chunk_size] for i in range(0, outage_idxs.size, chunk_size)]
+
+    if n_jobs <= 1:
+        context = _ScreeningContext(S_b, S_br, PHI, slack, rate)
+        screened = [context.screen_chunk(pf, chunk, threshold, top_k) for chunk in chunks]
+    elif parallel == 'thread': # factorization is shared. scipy and numpy release GIL for the heavy lifting.
+        context = _ScreeningContext(S_b, S_br, PHI, slack, rate)
+        with ThreadPoolExecutor(max_workers=n_jobs) as executor:
+            screened = list(executor.map(lambda chunk: context.screen_chunk(pf, chunk, threshold, top_k), chunks))
+    else: # each process factorizes the susceptance matrix once
+        with ProcessPoolExecutor(max_workers=n_jobs, initializer=_init_worker, initargs=(S_b, S_br, PHI, slack, rate)) as executor:
+            futures = [executor.submit(_screen_chunk_worker, pf, chunk, threshold, top_k) for chunk in chunks]
+            screened = [future.result() for future in futures]
+
+    branch_pos = np.concatenate([s['branch'] for s in screened] + [np.empty(0, dtype=int)])
+    outage_pos = np.concatenate([s['outage'] for s in screened] + [np.empty(0, dtype=int)])
+    flow = np.concatenate([s['flow'] for s in screened] + [np.empty(0)])
+    loading = np.concatenate([s['loading'] for s in screened] + [np.empty(0)])
+    islanding = np.concatenate([s['islanding'] for s in screened] + [np.empty(0, dtype=int)])
+
+    order = np.lexsort((branch_pos, outage_pos, -loading)) # rank by loading, ties are broken by indices for determinism
+    if top_k is not None:
+        order = order[:top_k]
+
+    violations = [{'outage': branchids[outage_pos[i]],
+                   'branch': branchids[branch_pos[i]],
+                   'flow': float(flow[i]),
+                   'rating': float(rate[branch_pos[i]]),
+                   'loading': float(loading[i])} for i in order]
+
+    return {'violations': violations,
+            'islanding': [branchids[idx] for idx in islanding],
+            'nviolation': int(sum(s['nviolation'] for s in screened)),
+            'noutage': int(outage_idxs.size),
+            'time': time.time() - tic}
@@ -6,13 +6,23 @@ import math
 from .base import NormalOPFModel
 from .dcopf_exp import *
 from .acopf_exp import pg_bound_exp, obj_cost_exp
+from .presolve import _thermal_limit_presolve
+from .profiler import _stage
 
 
 class DCOPFModel(NormalOPFModel):
     """ DC-OPF optimization model class.  
+    The branches with rate_a == 0 (dropped from the branch data by the parser) are unlimited, as in MATPOWER (and in `dcopf-mp` and the matrix backend).
+
+    Args:
+        model_type (str): model type
+        drop_redundant_limits (bool): drop the flow bounds of the branches that can never reach rate_a within the generator bounds
+                                      (`redundant_thermal_limits`). The summary is kept in `presolve_info` after `instantiate`.
     """
-    def __init__(self, model_type):
+    def __init__(self, model_type, drop_redundant_limits:bool = False):
         super().__init__(model_type)
+        self.drop_redundant_limits = drop_redundant_limits
+        self.presolve_info = None
 
     def _build_model(self) -> None:
         """ Define the (abstract) DC-OPF optimization model. 
@@ -51,7 +61,11 @@ class DCOPFModel(NormalOPFModel):
         # # ====================
         self.model.pg = pyo.Var(self.model.G, initialize=self.model.pg_init, bounds=pg_bound_exp, within=pyo.Reals) # active generation (injection), continuous
         self.model.va = pyo.Var(self.model.B, initialize=self.model.va_init, within=pyo.Reals) # voltage angle, continuous
-        self.model.pf = pyo.Var(self.model.E, initialize=self.model.pf_init, bounds=pf_bound_exp, within=pyo.Reals) # active flow (at each branch)
+        if self.drop_redundant_limits:
+            self.model.E_limited = pyo.Set(within=self.model.E) # branches whose thermal limits may be reached
+            self.model.pf = pyo.Var(self.model.E, initialize=self.model.pf_init, bounds=pf_bound_limited_exp, within=pyo.Reals) # active flow (at each branch)
+        else:
+            self.model.pf = pyo.Var(self.model.E, initialize=self.model.pf_init, bounds=pf_bound_exp, within=pyo.Reals) # active flow (at each branch)
 
         # ====================
         # III.   Constraints
@@ -134,9 +148,7 @@ class DCOPFModel(NormalOPFModel):
         ang2pf = {}
         for branch_id in branchids:
             branch = branches[branch_id]
-            rate_a_val = branch['rate_a']
-            if rate_a_val == 0.: rate_a_val + 1e12
-            rate_a[branch_id] = rate_a_val
+            rate_a[branch_id] = branch.get('rate_a', 0.) # 0 (or missing, as parsed) for unlimited
             dvamin[branch_id] = branch['angmin']
             dvamax[branch_id] = branch['angmax']
             f_bus = branch['f_bus']
@@ -182,6 +194,10 @@ class DCOPFModel(NormalOPFModel):
             'ang2pf': ang2pf,
             'dvamin': dvamin, 'dvamax': dvamax
         }
+        if self.drop_redundant_limits:
+            self.presolve_info = _thermal_limit_presolve(network)
+            redundant = set(self.presolve_info['redundant_limits'])
+            data['E_limited'] = {None: [branch_id for branch_id in branchids if branch_id not in redundant]}
 
         self.model.gen_per_bus_raw = gen_per_bus
         self.model.load_per_bus_raw = load_per_bus
@@ -189,7 +205,8 @@ class DCOPFModel(NormalOPFModel):
         self.model.branch_out_per_bus_raw = branch_out_per_bus
         self.model.bus_per_branch_raw = bus_per_branch
 
-        instance = self.model.create_instance({None: data}, report_timing=verbose) # create instance (ConcreteModel)
+        with _stage('create_instance'):
+            instance = self.model.create_instance({None: data}, report_timing=verbose) # create instance (ConcreteModel)
         return instance
 
 
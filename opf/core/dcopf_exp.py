@@ -3,8 +3,11 @@ from pyomo.core.util import quicksum
 from pyomo.core.expr.numeric_expr import LinearExpression
 
 
-def pf_bound_exp(m, e):
-    return (-m.rate_a[e], m.rate_a[e])
+def pf_bound_exp(m, e): # rate_a == 0 is regarded as unlimited
+    return (-m.rate_a[e], m.rate_a[e]) if pyo.value(m.rate_a[e]) > 0. else (None, None)
+
+def pf_bound_limited_exp(m, e): # the limits of the branches outside E_limited are redundant (drop_redundant_limits=True)
+    return (-m.rate_a[e], m.rate_a[e]) if e in m.E_limited and pyo.value(m.rate_a[e]) > 0. else (None, None)
     
 def cnst_slack_va_exp(m, s):
     return m.va[s] == 0.
@@ -44,5 +47,58 @@ def cnst_power_bal_ptdf_exp(m):
     return quicksum(m.pd[l] for l in m.L) == quicksum(m.pg[g] for g in m.G)
 
 def cnst_pf_ptdf_exp(m, e):
+    if pyo.value(m.rate_a[e]) <= 0.: # rate_a == 0 is regarded as unlimited
+        return pyo.Constraint.Skip
     m.gen_injection = LinearExpression(constant=0, linear_coefs=m.ptdf_g[e], linear_vars=[m.pg[g] for g in m.G])
-    return (-m.rate_a[e], m.gen_injection - m.load_injection[e], m.rate_a[e])
\ No newline at end of file
+    return (-m.rate_a[e], m.gen_injection - m.load_injection[e], m.rate_a[e])
+
+# ================================================================================
+# Only for DC-SCOPF
+# ================================================================================
+def cnst_pf_line_cont_exp(m, e, k):
+    # post-contingency flow at branch e for the outage of branch k: pf_e + LODF_ek * pf_k
+    lodf = m.lodf_raw[m.branch_idx[e], m.line_cont_idx[k]]
+    coefs = [ptdf_e + lodf * ptdf_k for ptdf_e, ptdf_k in zip(m.ptdf_g[e], m.ptdf_g[k])]
+    gen_injection = LinearExpression(constant=0, linear_coefs=coefs, linear_vars=[m.pg[g] for g in m.G])
+    return (-m.rate_cont[e], gen_injection - m.load_injection[e] - lodf * m.load_injection[k], m.rate_cont[e])
+
+def cnst_pf_gen_cont_exp(m, e, k):
+    # post-contingency flow at branch e for the outage of generator k: pf_e + GODF_ek * pg_k
+    coefs = list(m.ptdf_g[e])
+    coefs[m.gen_idx[k]] += m.godf_raw[m.branch_idx[e], m.gen_cont_idx[k]]
+    gen_injection = LinearExpression(constant=0, linear_coefs=coefs, linear_vars=[m.pg[g] for g in m.G])
+    return (-m.rate_cont[e], gen_injection - m.load_injection[e], m.rate_cont[e])
+
+def cnst_gen_cont_reserve_exp(m, k):
+    # the remaining generators should be able to pick up the lost generation
+    return quicksum(m.pgmax[g] - m.pg[g] for g in m.G if g != k) >= m.pg[k]
+
+# ================================================================================
+# Only for multi-period DC-OPF
+# ================================================================================
+def pg_bound_mp_exp(m, g, t):
+    return (m.pgmin[g], m.pgmax[g])
+
+def pf_bound_mp_exp(m, e, t): # rate_a == 0 is regarded as unlimited
+    return (-m.rate_a[e], m.rate_a[e]) if pyo.value(m.rate_a[e]) > 0. else (None, None)
+
+def cnst_slack_va_mp_exp(m, s, t):
+    return m.va[s,t] == 0.
+
+def cnst_pf_mp_exp(m, e, t):
+    return m.pf[e,t] - quicksum(m.ang2pf[e,b]*m.va[b,t] for b in m.bus_per_branch[e]) == 0.
+
+def cnst_power_bal_mp_exp(m, b, t):
+    return quicksum(m.pf[e,t] for e in m.branch_out_per_bus[b]) - quicksum(m.pf[e,t] for e in m.branch_in_per_bus[b])\
+            - quicksum(m.pg[g,t] for g in m.gen_per_bus[b]) + quicksum(m.pd[l,t] for l in m.load_per_bus[b]) == 0.
+
+def cnst_ramp_mp_exp(m, g, t):
+    if t == m.T.first():
+        return pyo.Constraint.Skip
+    return (-m.ramp[g], m.pg[g,t] - m.pg[g,m.T.prev(t)], m.ramp[g])
+
+def cnst_ramp_init_mp_exp(m, g): # from the generation before the first period (the boundary condition of `pg_prev`)
+    return (-m.ramp[g], m.pg[g,m.T.first()] - m.pg_prev[g], m.ramp[g])
+
+def obj_cost_mp_exp(m):
+    return quicksum(m.pg[g,t]*m.pg[g,t]*m.cost[g,0] + m.pg[g,t]*m.cost[g,1] + m.cost[g,2] for g in m.G for t in m.T)
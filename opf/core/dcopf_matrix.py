@@ -0,0 +1,370 @@
+from typing import Any, Dict, List, Tuple
+import warnings
+import time
+import numpy as np
+from scipy.sparse import csc_array, csr_array, csc_matrix, diags, eye, vstack, hstack, triu, tril
+
+from .base import OPFBaseModel
+from .ptdf import compute_ptdf
+from .presolve import _thermal_limit_presolve
+from .utils import (compute_branch_susceptance_matrix,
+                    compute_generator_incidence_matrix,
+                    compute_load_incidence_matrix,
+                    compute_line_incidence_matrix,
+                    _preprocessing_network)
+from .profiler import _stage, _profiled
+
+
+class DCOPFMatrixModel(OPFBaseModel):
+    """ DC-OPF (`dcopf` or `dcopf-ptdf`) assembled directly in the matrix form
+
+        min  1/2 x'Px + q'x + const   s.t.  row_lb <= Ax <= row_ub,  col_lb <= x <= col_ub
+
+    from the network arrays, and solved by the in-memory API of HiGHS, OSQP, or Clarabel without generating Pyomo components.
+    The variables, constraints, and the returned dictionary follow `DCOPFModel` (pg, va, pf / cnst_slack_va, cnst_pf, cnst_power_bal)
+    and `DCOPFModelPTDF` (pg / cnst_pf_ptdf, cnst_power_bal), including the sign conventions of the duals obtained by Pyomo and IPOPT:
+    the constraint duals are the sensitivities of the objective to the right-hand sides, and the bound duals are nonnegative (lb_) and nonpositive (ub_).
+
+    Args:
+        model_type (str): 'dcopf' or 'dcopf-ptdf'
+        drop_redundant_limits (bool): leave out the flow bounds (dcopf) or the PTDF rows (dcopf-ptdf) of the branches that can never reach rate_a
+                                      (`redundant_thermal_limits`). The summary is kept in `presolve_info` after `instantiate`.
+    """
+    solvers = ['highs', 'osqp', 'clarabel']
+
+    def __init__(self, model_type:str, drop_redundant_limits:bool = False):
+        super().__init__(model_type)
+        self.model = None # nothing is defined before the network is given
+        self.drop_redundant_limits = drop_redundant_limits
+        self.presolve_info = None
+
+    def _build_model(self) -> None:
+        pass
+
+    def is_constructed(self) -> bool:
+        return self.instance is not None
+
+    @_profiled('instantiate')
+    def instantiate(self, network:Dict[str,Any], init_var:Dict[str,Any] = None, verbose:bool = False) -> None:
+        print('instantiate model...', end=' ', flush=True)
+        if self.instance is not None:
+            warnings.warn("instance is already created. instantiating again will destroy the previous instance", RuntimeWarning)
+
+        tic = time.time()
+        _preprocessing_network(network)
+        if self.model_type == 'dcopf':
+            self.instance = self._assemble_dcopf(network)
+        else:
+            self.instance = self._assemble_dcopf_ptdf(network)
+        if init_var is not None:
+            self.setup_warmstart({'primal': init_var})
+        if verbose:
+            print(f"{self.instance['A'].shape[1]} variables, {self.instance['A'].shape[0]} constraints, {time.time()-tic:.3f} s", end=' ')
+        print('end', flush=True)
+
+    @staticmethod
+    def _network_arrays(network:Dict[str,Any]) -> Dict[str,Any]:
+        """ generator, load, and branch data ordered by their indices
+        """
+        gens = network['gen']
+        loads = network['load']
+        branches = network['branch']
+        getter = lambda entries, value: np.fromiter(map(value, entries.values()), dtype=float, count=len(entries))
+        cost = np.asarray([gen['cost'] for gen in gens.values()], dtype=float).reshape(-1, 3)
+        rate_a = getter(branches, lambda branch: branch.get('rate_a', 0.)) # the parser drops the zero ratings
+        rate_a[rate_a == 0.] = np.inf # unlimited branches
+        return {
+            'pgmin': getter(gens, lambda gen: gen['pmin']),
+            'pgmax': getter(gens, lambda gen: gen['pmax']),
+            'pg': getter(gens, lambda gen: gen['pg']),
+            'cost': cost,
+            'pd': getter(loads, lambda load: load['pd']),
+            'rate_a': rate_a,
+        }
+
+    @staticmethod
+    def _sorted_positions(entries:Dict[str,Any], offset:int = 0) -> Tuple[List[str], np.ndarray]:
+        """ IDs in the (sorted) order of the pyomo sets, and their positions in the vector ordered by the indices
+        """
+        ids = sorted(entries.keys())
+        return ids, offset + np.asarray([entries[entry_id]['index'] for entry_id in ids], dtype=int)
+
+    def _assemble_dcopf(self, network:Dict[str,Any]) -> Dict[str,Any]:
+        buses = network['bus']
+        data = self._network_arrays(network)
+        G, B, E = data['pgmin'].size, len(buses), data['rate_a'].size
+
+        I_g = compute_generator_incidence_matrix(network) # BxG
+        I_l = compute_load_incidence_matrix(network) # BxL
+        I_e = compute_line_incidence_matrix(network) # BxE
+        S_br = compute_branch_susceptance_matrix(network) # ExB
+        if self.drop_redundant_limits:
+            self.presolve_info = _thermal_limit_presolve(network)
+            data['rate_a'][[network['branch'][branch_id]['index'] for branch_id in self.presolve_info['redundant_limits']]] = np.inf
+        slack_ids = sorted(bus_id for bus_id, bus in buses.items() if bus['bus_type'] == 3)
+        slack = np.asarray([buses[bus_id]['index'] for bus_id in slack_ids], dtype=int)
+        S = slack.size
+
+        # x = [pg, va, pf]
+        A_slack = csr_array((np.ones(S), (np.arange(S), G + slack)), shape=(S, G+B+E))
+        A_pf = hstack([csc_array((E, G)), -S_br, eye(E)], format='csr')
+        A_bal = hstack([-I_g, csc_array((B, B)), I_e], format='csr')
+        rhs_bal = -(I_l @ data['pd'])
+
+        gen_ids, gen_pos = self._sorted_positions(network['gen'])
+        bus_ids, bus_pos = self._sorted_positions(buses)
+        branch_ids, branch_pos = self._sorted_positions(network['branch'])
+        x0 = np.concatenate([data['pg'], np.zeros(B), np.zeros(E)])
+        return {
+            'P': csc_array(diags(np.concatenate([2.*data['cost'][:,0], np.zeros(B+E)]))),
+            'q': np.concatenate([data['cost'][:,1], np.zeros(B+E)]),
+            'const': float(data['cost'][:,2].sum()),
+            'A': vstack([A_slack, A_pf, A_bal], format='csr'),
+            'row_lb': np.concatenate([np.zeros(S), np.zeros(E), rhs_bal]),
+            'row_ub': np.concatenate([np.zeros(S), np.zeros(E), rhs_bal]),
+            'col_lb': np.concatenate([data['pgmin'], np.full(B, -np.inf), -data['rate_a']]),
+            'col_ub': np.concatenate([data['pgmax'], np.full(B, np.inf), data['rate_a']]),
+            'x0': x0,
+            'variables': [('pg', gen_ids, gen_pos, True),
+                          ('va', bus_ids, G + bus_pos, False),
+                          ('pf', branch_ids, G + B + branch_pos, True)],
+            'constraints': [('cnst_slack_va', slack_ids, np.arange(S)),
+                            ('cnst_pf', branch_ids, S + branch_pos),
+                            ('cnst_power_bal', bus_ids, S + E + bus_pos)],
+        }
+
+    def _assemble_dcopf_ptdf(self, network:Dict[str,Any]) -> Dict[str,Any]:
+        data = self._network_arrays(network)
+        G, E = data['pgmin'].size, data['rate_a'].size
+
+        ptdf_g, ptdf_l = compute_ptdf(network) # ExG, ExL
+        load_injection = ptdf_l @ data['pd']
+        gen_ids, gen_pos = self._sorted_positions(network['gen'])
+        branch_ids, branch_pos = self._sorted_positions(network['branch'])
+        rows = np.arange(E)
+        if self.drop_redundant_limits: # the rows of the redundant limits are left out
+            self.presolve_info = _thermal_limit_presolve(network, (ptdf_g, ptdf_l))
+            redundant = set(self.presolve_info['redundant_limits'])
+            kept = np.asarray([branch_id not in redundant for branch_id in branch_ids], dtype=bool)
+            branch_ids, branch_pos = [branch_id for branch_id, keep in zip(branch_ids, kept) if keep], branch_pos[kept]
+            rows = np.sort(branch_pos)
+            branch_pos = np.searchsorted(rows, branch_pos)
+            E = rows.size
+        return {
+            'P': csc_array(diags(2.*data['cost'][:,0])),
+            'q': data['cost'][:,1].copy(),
+            'const': float(data['cost'][:,2].sum()),
+            'A': vstack([csr_array(ptdf_g[rows]), csr_array(np.ones((1, G)))], format='csr'),
+            'row_lb': np.concatenate([load_injection[rows] - data['rate_a'][rows], [data['pd'].sum()]]),
+            'row_ub': np.concatenate([load_injection[rows] + data['rate_a'][rows], [data['pd'].sum()]]),
+            'col_lb': data['pgmin'],
+            'col_ub': data['pgmax'],
+            'x0': data['pg'].copy(),
+            'variables': [('pg', gen_ids, gen_pos, True)],
+            'constraints': [('cnst_pf_ptdf', branch_ids, branch_pos),
+                            ('cnst_power_bal', ['None'], np.asarray([E]))],
+        }
+
+    def setup_warmstart(self, warmstart_dict:Dict[str,Any]) -> None:
+        """ set the primal starting point (used by HiGHS and OSQP) from the dictionary of `result['sol']`
+        """
+        if not self.is_constructed():
+            raise RuntimeError("instance for warmstarting should be constructed before.")
+        if 'primal' in warmstart_dict.keys():
+            primal_ws_dict = warmstart_dict['primal']
+            x0 = self.instance['x0']
+            for name, ids, pos, _ in self.instance['variables']:
+                if name in primal_ws_dict:
+                    x0[pos] = np.fromiter(map(primal_ws_dict[name].__getitem__, ids), dtype=float, count=len(ids))
+        return None
+
+    @_profiled('solve', result=True)
+    def solve(self, solver:str = 'highs',
+                    solver_option:Dict[str,Any] = {},
+                    solve_method:bool = None,
+                    tee:bool = False,
+                    extract_dual:bool = False,
+                    extract_contingency:bool = False) -> Dict[str,Any]:
+        if not self.is_constructed():
+            raise RuntimeError("instance has not included in the model class. Please execute `model.instantiate(network)` first to create it.")
+        if not isinstance(solver, str) or solver.lower() not in self.solvers:
+            raise ValueError(f"solver should be one of {self.solvers} for the matrix backend. But it is now {solver}.")
+        return self._solve(solver.lower(), solver_option, tee, extract_dual)
+
+    def _solve(self, solver:str,
+                     solver_option:Dict[str,Any] = {},
+                     tee:bool = False,
+                     extract_dual:bool = False) -> Dict[str,Any]:
+        inst = self.instance
+        with _stage('run_solver'):
+            if solver == 'highs':
+                status, solve_time, x, y, z = _solve_highs(inst, solver_option, tee)
+            elif solver == 'osqp':
+                status, solve_time, x, y, z = _solve_osqp(inst, solver_option, tee)
+            else:
+                status, solve_time, x, y, z = _solve_clarabel(inst, solver_option, tee)
+
+        results = {'termination_status': status,
+                   'time': solve_time,
+                   'obj_cost': float(0.5 * x @ (inst['P'] @ x) + inst['q'] @ x + inst['const']) if x is not None else float('nan'),
+                   'sol': {}
+                   }
+        if status == 'optimal':
+            with _stage('extract_result'):
+                self._write_output(results, x, y, z, extract_dual)
+        return results
+
+    def _write_output(self, results:Dict[str,Any], x:np.ndarray, y:np.ndarray, z:np.ndarray, extract_dual:bool = False) -> None:
+        inst = self.instance
+        results['sol']['primal'] = { name: dict(zip(ids, x[pos].tolist())) for name, ids, pos, _ in inst['variables'] }
+        if extract_dual:
+            results['sol']['dual'] = { name: dict(zip(ids, y[pos].tolist())) for name, ids, pos in inst['constraints'] }
+            bound_sol = {}
+            for name, ids, pos, bounded in inst['variables']:
+                bound_sol_var = {}
+                if bounded:
+                    zL, zU = np.maximum(z[pos], 0.).tolist(), np.minimum(z[pos], 0.).tolist()
+                    for i, idx in enumerate(ids):
+                        bound_sol_var["lb_"+idx] = zL[i]
+                        bound_sol_var["ub_"+idx] = zU[i]
+                bound_sol[name] = bound_sol_var
+            results['sol']['bound'] = bound_sol
+        return None
+
+
+# ================================================================================
+# Solver interfaces. Each returns (status, time, x, y, z) where y (constraint duals) and z (bound duals)
+# satisfy the stationarity Px + q = A'y + z.
+# ================================================================================
+def _import_solver(module:str, package:str):
+    try:
+        return __import__(module)
+    except ImportError:
+        raise RuntimeError(f"{package} is required for the matrix backend with solver='{module}'. Install it by `pip install {package}`.")
+
+
+def _solve_highs(inst:Dict[str,Any], solver_option:Dict[str,Any], tee:bool) -> Tuple[str, float, np.ndarray, np.ndarray, np.ndarray]:
+    highspy = _import_solver('highspy', 'highspy')
+    m, n = inst['A'].shape
+    A = csc_array(inst['A'])
+    P = csc_array(tril(inst['P'], format='csc')) # HiGHS takes the lower triangle
+
+    lp = highspy.HighsLp()
+    lp.num_col_, lp.num_row_ = n, m
+    lp.col_cost_, lp.offset_ = inst['q'], inst['const']
+    lp.col_lower_, lp.col_upper_ = inst['col_lb'], inst['col_ub']
+    lp.row_lower_, lp.row_upper_ = inst['row_lb'], inst['row_ub']
+    lp.a_matrix_.format_ = highspy.MatrixFormat.kColwise
+    lp.a_matrix_.start_, lp.a_matrix_.index_, lp.a_matrix_.value_ = A.indptr, A.indices, A.data
+    lp.a_matrix_.num_col_, lp.a_matrix_.num_row_ = n, m
+    model = highspy.HighsModel()
+    model.lp_ = lp
+    if P.nnz > 0:
+        model.hessian_.dim_ = n
+        model.hessian_.format_ = highspy.HessianFormat.kTriangular
+        model.hessian_.start_, model.hessian_.index_, model.hessian_.value_ = P.indptr, P.indices, P.data
+
+    h = highspy.Highs()
+    h.setOptionValue('output_flag', bool(tee))
+    for k, v in solver_option.items():
+        h.setOptionValue(k, v)
+    h.passModel(model)
+    if P.nnz == 0: # the starting point is used only by the simplex method
+        sol = highspy.HighsSolution()
+        sol.col_value = inst['x0']
+        sol.value_valid = True
+        h.setSolution(sol)
+    h.run()
+
+    model_status = h.getModelStatus()
+    status = {highspy.HighsModelStatus.kOptimal: 'optimal',
+              highspy.HighsModelStatus.kInfeasible: 'infeasible',
+              highspy.HighsModelStatus.kUnbounded: 'unbounded',
+              highspy.HighsModelStatus.kUnboundedOrInfeasible: 'infeasibleOrUnbounded',
+              highspy.HighsModelStatus.kIterationLimit: 'maxIterations',
+              highspy.HighsModelStatus.kTimeLimit: 'maxTimeLimit'}.get(model_status, 'other')
+    sol = h.getSolution()
+    x = np.asarray(sol.col_value) if sol.value_valid else None
+    y = np.asarray(sol.row_dual) if sol.dual_valid else None
+    z = np.asarray(sol.col_dual) if sol.dual_valid else None
+    return status, float(h.getRunTime()), x, y, z
+
+
+def _bound_rows(inst:Dict[str,Any]) -> Tuple[csr_array, np.ndarray, np.ndarray, np.ndarray]:
+    """ identity rows of the variables with finite bounds, for the solvers taking only the constraint rows
+    """
+    col_lb, col_ub = inst['col_lb'], inst['col_ub']
+    bounded = np.nonzero(np.isfinite(col_lb) | np.isfinite(col_ub))[0]
+    n = col_lb.size
+    I = csr_array((np.ones(bounded.size), (np.arange(bounded.size), bounded)), shape=(bounded.size, n))
+    return I, col_lb[bounded], col_ub[bounded], bounded
+
+
+def _solve_osqp(inst:Dict[str,Any], solver_option:Dict[str,Any], tee:bool) -> Tuple[str, float, np.ndarray, np.ndarray, np.ndarray]:
+    osqp = _import_solver('osqp', 'osqp')
+    m, n = inst['A'].shape
+    I, lb, ub, bounded = _bound_rows(inst)
+    A = csc_matrix(vstack([inst['A'], I], format='csc')) # the OSQP interface takes scipy matrices (not arrays)
+    l = np.clip(np.concatenate([inst['row_lb'], lb]), -1e30, 1e30)
+    u = np.clip(np.concatenate([inst['row_ub'], ub]), -1e30, 1e30)
+
+    settings = {'eps_abs': 1e-8, 'eps_rel': 1e-8, 'polishing': True, 'max_iter': 100000} # accuracy comparable to the interior point solvers
+    settings.update(solver_option)
+    prob = osqp.OSQP()
+    prob.setup(csc_matrix(triu(inst['P'], format='csc')), inst['q'], A, l, u, verbose=bool(tee), **settings)
+    prob.warm_start(x=inst['x0'])
+    res = prob.solve()
+
+    status = {'solved': 'optimal',
+              'solved inaccurate': 'other',
+              'primal infeasible': 'infeasible',
+              'dual infeasible': 'unbounded',
+              'maximum iterations reached': 'maxIterations',
+              'run time limit reached': 'maxTimeLimit'}.get(res.info.status, 'other')
+    if res.x is None or not np.all(np.isfinite(res.x)):
+        return status, float(res.info.run_time), None, None, None
+    # OSQP: Px + q + A'y = 0
+    z = np.zeros(n)
+    z[bounded] = -res.y[m:]
+    return status, float(res.info.run_time), np.asarray(res.x), -np.asarray(res.y[:m]), z
+
+
+def _solve_clarabel(inst:Dict[str,Any], solver_option:Dict[str,Any], tee:bool) -> Tuple[str, float, np.ndarray, np.ndarray, np.ndarray]:
+    clarabel = _import_solver('clarabel', 'clarabel')
+    m, n = inst['A'].shape
+    I, lb, ub, bounded = _bound_rows(inst)
+    A = vstack([inst['A'], I], format='csr')
+    row_lb, row_ub = np.concatenate([inst['row_lb'], lb]), np.concatenate([inst['row_ub'], ub])
+
+    # Clarabel: Ax + s = b with s in the cones. Equalities go to the zero cone, and each finite side of the ranges to the nonnegative cone.
+    eq = np.nonzero(row_lb == row_ub)[0]
+    up = np.nonzero((row_lb != row_ub) & np.isfinite(row_ub))[0]
+    lo = np.nonzero((row_lb != row_ub) & np.isfinite(row_lb))[0]
+    A_cl = vstack([A[eq], A[up], -A[lo]], format='csc')
+    b_cl = np.concatenate([row_ub[eq], row_ub[up], -row_lb[lo]])
+    cones = [clarabel.ZeroConeT(eq.size), clarabel.NonnegativeConeT(up.size + lo.size)]
+
+    settings = clarabel.DefaultSettings()
+    settings.verbose = bool(tee)
+    for k, v in solver_option.items():
+        setattr(settings, k, v)
+    solver = clarabel.DefaultSolver(csc_array(triu(inst['P'], format='csc')), inst['q'], A_cl, b_cl, cones, settings)
+    sol = solver.solve()
+
+    status = {'Solved': 'optimal',
+              'PrimalInfeasible': 'infeasible',
+              'DualInfeasible': 'unbounded',
+              'MaxIterations': 'maxIterations',
+              'MaxTime': 'maxTimeLimit'}.get(str(sol.status), 'other')
+    x = np.asarray(sol.x)
+    if x.size != n or not np.all(np.isfinite(x)):
+        return status, float(sol.solve_time), None, None, None
+    # Px + q + A_cl'z = 0: the dual of each row gathers its equality, upper, and lower parts
+    z_cl = np.asarray(sol.z)
+    dual = np.zeros(m + bounded.size)
+    np.add.at(dual, eq, -z_cl[:eq.size])
+    np.add.at(dual, up, -z_cl[eq.size:eq.size+up.size])
+    np.add.at(dual, lo, z_cl[eq.size+up.size:])
+    z = np.zeros(n)
+    z[bounded] = dual[m:]
+    return status, float(sol.solve_time), x, dual[:m], z
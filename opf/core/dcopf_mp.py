@@ -0,0 +1,230 @@
+from typing import Any, Dict
+from itertools import product
+import warnings
+import pyomo.environ as pyo
+import numpy as np
+
+from .base import NormalOPFModel
+from .dcopf_exp import *
+from .utils import _preprocessing_network
+from .profiler import _stage, _profiled
+
+
+_ramp_minutes = {'ramp_agc': 1., 'ramp_10': 10., 'ramp_30': 30.} # the MATPOWER ramp rates are per minute, per 10 minutes, and per 30 minutes
+
+
+class DCOPFMultiPeriodModel(NormalOPFModel):
+    """ multi-period DC-OPF optimization model class. The DC-OPF of a single period is replicated over the periods T of a load profile,
+    and the generations of consecutive periods are coupled by the ramp limits. The branches with rate_a == 0 are unlimited, as in `DCOPFModel`.
+
+        model = opf.build_model('dcopf-mp', ramp='ramp_30', interval=60.)
+        model.instantiate(network, load_profile) # T x L active loads (p.u.), the columns ordered by the load indices
+
+    The variables are indexed by (ID, period), e.g., `result['sol']['primal']['pg']["('1', 0)"]`.
+
+    Args:
+        model_type (str): model type
+        ramp (str): generator field of the ramp rate ('ramp_agc' per minute, 'ramp_10' per 10 minutes, or 'ramp_30' per 30 minutes).
+                    Generators without the field (or with zero) are not ramp-limited.
+        interval (float): length of a period in minutes. The ramp limit between consecutive periods is the rate times the interval.
+    """
+    def __init__(self, model_type, ramp:str = 'ramp_30', interval:float = 60.):
+        super().__init__(model_type)
+        if ramp not in _ramp_minutes:
+            raise ValueError(f"ramp should be 'ramp_agc', 'ramp_10', or 'ramp_30'. But it is now {ramp}.")
+        if interval <= 0.:
+            raise ValueError(f"interval should be positive. But it is now {interval}.")
+        self.ramp = ramp
+        self.interval = interval
+
+    def _build_model(self) -> None:
+        """ Define the (abstract) multi-period DC-OPF optimization model.
+            The per-period sets (the buses, branches, ...) are shared by all the periods.
+        """
+        self.model.T = pyo.Set(ordered=True) # periods
+        self.model.B = pyo.Set() # bus indices
+        self.model.G = pyo.Set() # generator indices
+        self.model.E = pyo.Set() # branch indices
+        self.model.L = pyo.Set() # load indices
+        self.model.slack = pyo.Set() # the slack buses
+        self.model.ncost = pyo.Set() # the number of costs
+        self.model.G_ramp = pyo.Set(within=self.model.G) # ramp-limited generators
+        self.model.G_prev = pyo.Set(within=self.model.G_ramp) # ramp-limited generators with the generation before the first period
+
+        self.model.gen_per_bus = pyo.Set(self.model.B, within=self.model.G)
+        self.model.load_per_bus = pyo.Set(self.model.B, within=self.model.L)
+        self.model.branch_in_per_bus = pyo.Set(self.model.B, within=self.model.E)
+        self.model.branch_out_per_bus = pyo.Set(self.model.B, within=self.model.E)
+        self.model.bus_per_branch = pyo.Set(self.model.E, within=self.model.B)
+
+        # # ====================
+        # # I.    Parameters
+        # # ====================
+        self.model.pg_init = pyo.Param(self.model.G, self.model.T, within=pyo.Reals, mutable=True)
+        self.model.va_init = pyo.Param(self.model.B, self.model.T, within=pyo.Reals, mutable=True)
+        self.model.pf_init = pyo.Param(self.model.E, self.model.T, within=pyo.Reals, mutable=True)
+
+        self.model.pgmin = pyo.Param(self.model.G, within=pyo.Reals, mutable=True)
+        self.model.pgmax = pyo.Param(self.model.G, within=pyo.Reals, mutable=True)
+        self.model.pd = pyo.Param(self.model.L, self.model.T, within=pyo.Reals, mutable=True)
+        self.model.rate_a = pyo.Param(self.model.E, within=pyo.NonNegativeReals, mutable=True)
+        self.model.ang2pf = pyo.Param(self.model.E, self.model.B, within=pyo.Reals, mutable=True) # branch susceptance
+        self.model.ramp = pyo.Param(self.model.G_ramp, within=pyo.NonNegativeReals, mutable=True) # ramp limit per period
+        self.model.pg_prev = pyo.Param(self.model.G_prev, within=pyo.Reals, mutable=True)
+
+        self.model.cost = pyo.Param(self.model.G, self.model.ncost, within=pyo.Reals, mutable=True)
+
+        # # ====================
+        # # II.    Variables
+        # # ====================
+        self.model.pg = pyo.Var(self.model.G, self.model.T, initialize=self.model.pg_init, bounds=pg_bound_mp_exp, within=pyo.Reals)
+        self.model.va = pyo.Var(self.model.B, self.model.T, initialize=self.model.va_init, within=pyo.Reals)
+        self.model.pf = pyo.Var(self.model.E, self.model.T, initialize=self.model.pf_init, bounds=pf_bound_mp_exp, within=pyo.Reals)
+
+        # ====================
+        # III.   Constraints
+        # ====================
+        self.model.cnst_slack_va = pyo.Constraint(self.model.slack, self.model.T, rule=cnst_slack_va_mp_exp)
+        self.model.sets_balance = pyo.BuildAction(rule=define_sets_balance_exp)
+        self.model.cnst_pf = pyo.Constraint(self.model.E, self.model.T, rule=cnst_pf_mp_exp)
+        self.model.cnst_power_bal = pyo.Constraint(self.model.B, self.model.T, rule=cnst_power_bal_mp_exp)
+
+        # ====================
+        # III.e Ramp Limits between Consecutive Periods
+        # ====================
+        self.model.cnst_ramp = pyo.Constraint(self.model.G_ramp, self.model.T, rule=cnst_ramp_mp_exp)
+        self.model.cnst_ramp_init = pyo.Constraint(self.model.G_prev, rule=cnst_ramp_init_mp_exp)
+
+        # ====================
+        # IIII.   Objective
+        # ====================
+        self.model.obj_cost = pyo.Objective(sense=pyo.minimize, rule=obj_cost_mp_exp)
+
+
+    @_profiled('instantiate')
+    def instantiate(self, network:Dict[str,Any],
+                          load_profile:np.ndarray,
+                          init_var:Dict[str,Any] = None,
+                          pg_prev:Dict[str,float] = None,
+                          verbose:bool = False) -> None:
+        """ create the instance over the periods of `load_profile`
+
+        Args:
+            network (Dict[str,Any]): pglib network (the loads of the file are replaced by `load_profile`)
+            load_profile (np.ndarray): T x L active loads (p.u.), the columns ordered by the load indices
+            init_var (Dict[str,Any]): (optional) initial 'pg', 'va', and 'pf' indexed by (ID, period)
+            pg_prev (Dict[str,float]): (optional) generations before the first period, ramp-limited to the first period (e.g., the last period of a previous horizon)
+            verbose (bool): report the timing of the instance construction
+        """
+        print('instantiate model...', end=' ', flush=True)
+        if isinstance(self.instance,pyo.ConcreteModel):
+            warnings.warn("instance is already created. instantiating again will destroy the previous instance", RuntimeWarning)
+
+        _preprocessing_network(network)
+        self.instance = self._instantiate(network, init_var, verbose, load_profile, pg_prev)
+        self.append_suffix(self.instance)
+        print('end', flush=True)
+
+
+    def _instantiate(self, network:Dict[str,Any],
+                           init_var:Dict[str,Any] = None,
+                           verbose:bool = False,
+                           load_profile:np.ndarray = None,
+                           pg_prev:Dict[str,float] = None) -> pyo.ConcreteModel:
+        gens = network['gen']
+        buses = network['bus']
+        branches = network['branch']
+        loads = network['load']
+
+        load_profile = np.asarray(load_profile, dtype=float)
+        if load_profile.ndim != 2 or load_profile.shape[1] != len(loads):
+            raise ValueError(f"load_profile should be a T x L array with L = {len(loads)} loads. But its shape is now {load_profile.shape}.")
+        T = load_profile.shape[0]
+        periods = list(range(T))
+
+        busids = sorted(list(buses.keys())) # sort this for consistency between the pyomo vector and the input matpower
+        loadids = sorted(list(loads.keys()))
+        branchids = sorted(list(branches.keys()))
+        genids = sorted(list(gens.keys()))
+        ncost = 3 # all PGLib input files have three cost coefficients
+
+        # the per-period structure, shared by all the periods
+        gen_per_bus = { busid: [] for busid in busids }
+        load_per_bus = { busid: [] for busid in busids }
+        branch_in_per_bus = { busid: [] for busid in busids }
+        branch_out_per_bus = { busid: [] for busid in busids }
+        bus_per_branch = { branchid: set() for branchid in branchids }
+
+        pgmax, pgmin, cost, ramp = {}, {}, {}, {}
+        for gen_id in genids:
+            gen = gens[gen_id]
+            pgmax[gen_id] = gen['pmax']
+            pgmin[gen_id] = gen['pmin']
+            for i in range(ncost):
+                cost[(gen_id,i)] = gen['cost'][i]
+            if gen.get(self.ramp, 0.) > 0.:
+                ramp[gen_id] = gen[self.ramp] / _ramp_minutes[self.ramp] * self.interval
+            gen_per_bus[gen['gen_bus']].append(gen_id)
+
+        for load_id in loadids:
+            load_per_bus[loads[load_id]['load_bus']].append(load_id)
+
+        slack = [bus_id for bus_id in busids if buses[bus_id]['bus_type'] == 3]
+
+        rate_a, ang2pf = {}, {}
+        for branch_id in branchids:
+            branch = branches[branch_id]
+            rate_a[branch_id] = branch.get('rate_a', 0.) # 0 (or missing, as parsed) for unlimited
+            f_bus, t_bus = branch['f_bus'], branch['t_bus']
+            b = -branch['br_x'] / (branch['br_r']**2 + branch['br_x']**2) # susceptance
+            ang2pf[(branch_id,f_bus)] = ang2pf.get((branch_id,f_bus), 0.) + b
+            ang2pf[(branch_id,t_bus)] = ang2pf.get((branch_id,t_bus), 0.) - b
+            branch_out_per_bus[f_bus].append(branch_id) # from buses
+            branch_in_per_bus[t_bus].append(branch_id)
+            bus_per_branch[branch_id].add(f_bus)
+            bus_per_branch[branch_id].add(t_bus)
+
+        # the time-indexed data from the arrays at once: product() runs over the periods fastest
+        load_cols = np.asarray([loads[load_id]['index'] for load_id in loadids], dtype=int)
+        pd = dict(zip(product(loadids, periods), load_profile[:,load_cols].T.ravel().tolist()))
+        if init_var is not None:
+            pg_init, va_init, pf_init = init_var['pg'], init_var['va'], init_var['pf']
+        else:
+            pg = np.asarray([gens[gen_id]['pg'] for gen_id in genids])
+            pg_init = dict(zip(product(genids, periods), np.repeat(pg, T).tolist()))
+            va_init = dict.fromkeys(product(busids, periods), 0.)
+            pf_init = dict.fromkeys(product(branchids, periods), 0.)
+
+        pg_prev = pg_prev if pg_prev is not None else {}
+        data = {
+            'T': {None: periods},
+            'G': {None: genids},
+            'B': {None: busids},
+            'E': {None: branchids},
+            'L': {None: loadids},
+            'slack': {None: slack},
+            'G_ramp': {None: list(ramp.keys())},
+            'G_prev': {None: [gen_id for gen_id in ramp if gen_id in pg_prev]},
+            'pg_init': pg_init,
+            'va_init': va_init,
+            'pf_init': pf_init,
+            'ncost': {None: np.arange(ncost)},
+            'pd': pd,
+            'pgmax': pgmax,
+            'pgmin': pgmin,
+            'cost': cost,
+            'rate_a': rate_a,
+            'ang2pf': ang2pf,
+            'ramp': ramp,
+            'pg_prev': { gen_id: pg_prev[gen_id] for gen_id in ramp if gen_id in pg_prev },
+        }
+
+        self.model.gen_per_bus_raw = gen_per_bus
+        self.model.load_per_bus_raw = load_per_bus
+        self.model.branch_in_per_bus_raw = branch_in_per_bus
+        self.model.branch_out_per_bus_raw = branch_out_per_bus
+        self.model.bus_per_branch_raw = bus_per_branch
+
+        with _stage('create_instance'):
+            instance = self.model.create_instance({None: data}, report_timing=verbose) # create instance (ConcreteModel)
+        return instance
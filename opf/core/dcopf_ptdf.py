@@ -6,13 +6,23 @@ from .base import NormalOPFModel
 from .dcopf_exp import cnst_power_bal_ptdf_exp, cnst_pf_ptdf_exp
 from .acopf_exp import pg_bound_exp, obj_cost_exp
 from .ptdf import compute_ptdf
+from .presolve import _thermal_limit_presolve
+from .profiler import _stage
 
 
 class DCOPFModelPTDF(NormalOPFModel):
     """ DC-OPF using PTDF (power transfer distribution factor) optimization model class.  
+    The branches with rate_a == 0 (dropped from the branch data by the parser) are unlimited (without cnst_pf_ptdf), as in MATPOWER.
+
+    Args:
+        model_type (str): model type
+        drop_redundant_limits (bool): define cnst_pf_ptdf only for the branches that may reach rate_a within the generator bounds
+                                      (`redundant_thermal_limits`). The summary is kept in `presolve_info` after `instantiate`.
     """
-    def __init__(self, model_type):
+    def __init__(self, model_type, drop_redundant_limits:bool = False):
         super().__init__(model_type)
+        self.drop_redundant_limits = drop_redundant_limits
+        self.presolve_info = None
 
     def _build_model(self) -> None:
         """ Define the (abstract) DC-OPF optimization model. 
@@ -48,7 +58,11 @@ class DCOPFModelPTDF(NormalOPFModel):
         # ====================
         # III.a Power Flow
         # ====================
-        self.model.cnst_pf_ptdf = pyo.Constraint(self.model.E, rule=cnst_pf_ptdf_exp)
+        if self.drop_redundant_limits:
+            self.model.E_limited = pyo.Set(within=self.model.E) # branches whose thermal limits may be reached
+            self.model.cnst_pf_ptdf = pyo.Constraint(self.model.E_limited, rule=cnst_pf_ptdf_exp)
+        else:
+            self.model.cnst_pf_ptdf = pyo.Constraint(self.model.E, rule=cnst_pf_ptdf_exp)
 
         # ====================
         # III.b Power Balance
@@ -62,6 +76,15 @@ class DCOPFModelPTDF(NormalOPFModel):
 
 
     def _instantiate(self, network:Dict[str,Any], init_var:Dict[str,Any] = None, verbose:bool = False) -> pyo.ConcreteModel:
+        data = self._instance_data(network, init_var)
+        with _stage('create_instance'):
+            instance = self.model.create_instance({None: data}, report_timing=verbose) # create instance (ConcreteModel)
+        
+        return instance
+
+    def _instance_data(self, network:Dict[str,Any], init_var:Dict[str,Any] = None) -> Dict[str,Any]:
+        """ collect the data for `create_instance`. PTDF matrices are also kept in the model to define the flow constraints.
+        """
         gens = network['gen']
         buses = network['bus']
         branches = network['branch']
@@ -107,9 +130,7 @@ class DCOPFModelPTDF(NormalOPFModel):
         ang2pf = {}
         for branch_id in branchids:
             branch = branches[branch_id]
-            rate_a_val = branch['rate_a']
-            if rate_a_val == 0.: rate_a_val + 1e12
-            rate_a[branch_id] = rate_a_val
+            rate_a[branch_id] = branch.get('rate_a', 0.) # 0 (or missing, as parsed) for unlimited
         
         if init_var is not None:
             pg_init = init_var['pg']
@@ -128,6 +149,9 @@ class DCOPFModelPTDF(NormalOPFModel):
         for branch_id in branchids:
             self.model.ptdf_g[branch_id] = ptdf_g_raw[branches[branch_id]['index'],genidxs].tolist()
 
+        self.model.ptdf_g_raw = ptdf_g_raw
+        self.model.load_injection_raw = load_injection_raw
+
         data = {
             'G': {None: genids},
             'B': {None: busids},
@@ -143,7 +167,8 @@ class DCOPFModelPTDF(NormalOPFModel):
             'rate_a': rate_a,
             'load_injection': load_injection
         }
-        
-        instance = self.model.create_instance({None: data}, report_timing=verbose) # create instance (ConcreteModel)
-        
-        return instance
\ No newline at end of file
+        if self.drop_redundant_limits:
+            self.presolve_info = _thermal_limit_presolve(network, (ptdf_g_raw, ptdf_l_raw))
+            redundant = set(self.presolve_info['redundant_limits'])
+            data['E_limited'] = {None: [branch_id for branch_id in branchids if branch_id not in redundant]}
+        return data
\ No newline at end of file
@@ -0,0 +1,91 @@
+from typing import Dict, Any
+import numpy as np
+from scipy.sparse.linalg import splu
+
+from .utils import (compute_bus_susceptance_matrix,
+                    compute_branch_susceptance_matrix,
+                    compute_generator_incidence_matrix,
+                    compute_load_incidence_matrix,
+                    _get_slack_idx,
+                    _preprocessing_network)
+
+
+class DCPowerFlow:
+    """ DC power flow solver keeping the LU factorization of the bus susceptance matrix,
+    so that any number of injection patterns (right-hand sides) can be solved against one factorization.
+    Keep the object to reuse the factorization across calls on the same topology.
+
+    Args:
+        network (Dict[str,Any]): pglib network
+    """
+    def __init__(self, network:Dict[str,Any]):
+        _preprocessing_network(network)
+        self.slack = _get_slack_idx(network)
+        self.lu = splu(compute_bus_susceptance_matrix(network, self.slack).tocsc()) # BxB
+        self.S_br = compute_branch_susceptance_matrix(network).tocsr() # ExB
+        self.I_g = compute_generator_incidence_matrix(network).tocsr() # BxG
+        self.I_l = compute_load_incidence_matrix(network).tocsr() # BxL
+
+    def solve(self, injections:np.ndarray,
+                    load:np.ndarray = None,
+                    dtype:np.dtype = np.float64,
+                    chunk_size:int = None,
+                    return_va:bool = True) -> Dict[str,np.ndarray]:
+        """ solve DC power flows
+
+        Args:
+            injections (np.ndarray): BxN bus injections, or GxN generations if `load` is given. 1-D vectors are regarded as N=1.
+            load (np.ndarray): LxN loads
+            dtype (np.dtype): dtype of the outputs (e.g., np.float32 to halve the memory). The solve itself is in double precision.
+            chunk_size (int): the number of right-hand sides solved at once to bound the memory of the intermediates
+            return_va (bool): whether to return the voltage angles
+
+        Returns:
+            Dict[str,np.ndarray]: 'pf' (ExN branch flows), 'va' (BxN voltage angles), and 'p_slack' (N power injections at the slack bus)
+        """
+        vector = np.ndim(injections) == 1
+        injections = np.atleast_2d(np.asarray(injections, dtype=np.float64).T).T
+        if load is not None:
+            load = np.atleast_2d(np.asarray(load, dtype=np.float64).T).T
+            if injections.shape[0] != self.I_g.shape[1] or load.shape[0] != self.I_l.shape[1]:
+                raise ValueError(f"The shapes of injections and load should be ({self.I_g.shape[1]},N) and ({self.I_l.shape[1]},N).")
+        elif injections.shape[0] != self.I_g.shape[0]:
+            raise ValueError(f"The shape of injections should be ({self.I_g.shape[0]},N).")
+
+        B, E, N = self.I_g.shape[0], self.S_br.shape[0], injections.shape[1]
+        chunk_size = N if chunk_size is None else max(chunk_size, 1)
+
+        pf = np.empty((E, N), dtype=dtype)
+        va = np.empty((B, N), dtype=dtype) if return_va else None
+        p_slack = np.empty(N, dtype=dtype)
+        for start in range(0, N, chunk_size):
+            cols = slice(start, min(start + chunk_size, N))
+            if load is not None:
+                p = self.I_g @ injections[:,cols] - self.I_l @ load[:,cols]
+            else:
+                p = injections[:,cols].copy()
+            p_slack[cols] = p[self.slack] - p.sum(axis=0) # the slack bus balances the injections
+            p[self.slack] = 0.
+            va_chunk = self.lu.solve(p)
+            pf[:,cols] = self.S_br @ va_chunk
+            if return_va:
+                va[:,cols] = va_chunk
+
+        if vector:
+            return {'pf': pf[:,0], 'va': va[:,0] if return_va else None, 'p_slack': p_slack[0]}
+        return {'pf': pf, 'va': va, 'p_slack': p_slack}
+
+
+def dc_power_flow(network:Dict[str,Any],
+                  injections:np.ndarray,
+                  load:np.ndarray = None,
+                  dtype:np.dtype = np.float64,
+                  chunk_size:int = None,
+                  return_va:bool = True) -> Dict[str,np.ndarray]:
+    """ batched DC power flow for many injection patterns. Rows follow the bus/generator/load/branch indices of `_preprocessing_network`.
+    See `DCPowerFlow.solve` for the arguments.
+
+        pf = opf.dc_power_flow(network, pg, load=pd)['pf'] # GxN generations and LxN loads
+        pf = opf.dc_power_flow(network, p)['pf']           # BxN bus injections
+    """
+    return DCPowerFlow(network).solve(injections, load, dtype, chunk_size, return_va)
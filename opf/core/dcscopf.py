@@ -0,0 +1,312 @@
+from typing import Any, Dict, List
+import time
+import warnings
+import pyomo.environ as pyo
+import numpy as np
+
+from .base import SCOPFModel
+from .dcopf_ptdf import DCOPFModelPTDF
+from .dcopf_exp import cnst_pf_line_cont_exp, cnst_pf_gen_cont_exp, cnst_gen_cont_reserve_exp
+from .lodf import compute_lodf, check_line_contingency
+from .contingency import get_branch_rating
+from .dcscopf_decomp import solve_benders
+from .profiler import _stage, _solver_stages
+from .stats import _solver_stats
+
+
+class DCSCOPFModel(SCOPFModel, DCOPFModelPTDF):
+    """ DC security constrained OPF (preventive) based on the PTDF formulation.
+    Post-contingency flows are represented with LODF for line outages and with generator outage distribution factors (GODF) for generator outages.
+    The lost generation is picked up by the remaining generators in proportion to their `pmax`.
+
+    Post-contingency flow constraints are added to the instance lazily.
+    The default solve method ('iterative') solves the problem, screens all post-contingency flows, adds only the violated (branch, contingency) pairs, and repeats until secure.
+    The solve method 'extensive' adds all of them before solving once.
+
+    The solve method 'decomposition' solves the preventive-corrective problem by Benders decomposition:
+    after each contingency, generators can be redispatched within their ramp limits (`ramp_10` or `ramp_30`),
+    and the per-contingency subproblems are solved in parallel worker processes (see `dcscopf_decomp.py`).
+    """
+    def __init__(self, model_type):
+        super().__init__(model_type)
+
+    def _build_model(self) -> None:
+        """ Define the (abstract) DC-SCOPF optimization model on top of DC-OPF using PTDF.
+        """
+        DCOPFModelPTDF._build_model(self)
+
+        self.model.CL = pyo.Set() # line contingency IDs
+        self.model.CG = pyo.Set() # generator contingency IDs
+        self.model.ECL = pyo.Set(dimen=2, within=self.model.E*self.model.CL) # (branch, line contingency) pairs monitored
+        self.model.ECG = pyo.Set(dimen=2, within=self.model.E*self.model.CG) # (branch, generator contingency) pairs monitored
+
+        # # ====================
+        # # I.    Parameters
+        # # ====================
+        self.model.rate_cont = pyo.Param(self.model.E, within=pyo.NonNegativeReals, mutable=True) # post-contingency rating
+
+        # ====================
+        # III.   Constraints
+        # ====================
+
+        # ====================
+        # III.c Post-contingency Power Flow
+        # ====================
+        self.model.cnst_pf_line_cont = pyo.Constraint(self.model.ECL, rule=cnst_pf_line_cont_exp)
+        self.model.cnst_pf_gen_cont = pyo.Constraint(self.model.ECG, rule=cnst_pf_gen_cont_exp)
+
+        # ====================
+        # III.d Reserve for Generator Contingency
+        # ====================
+        self.model.cnst_gen_cont_reserve = pyo.Constraint(self.model.CG, rule=cnst_gen_cont_reserve_exp)
+
+        # ====================
+        # III.e Benders Cuts (only for the decomposition)
+        # ====================
+        self.model.cnst_benders_cut = pyo.ConstraintList()
+
+
+    def _instantiate(self, network:Dict[str,Any],
+                          init_var:Dict[str,Any] = None,
+                          generator_contingency:List[str] = [],
+                          line_contingency:List[str] = [],
+                          verbose:bool = False,
+                          rating:str = 'rate_a',
+                          max_iter:int = 50,
+                          tol:float = 1e-6,
+                          corrective_ramp:str = 'ramp_10',
+                          n_jobs:int = 1,
+                          overload_penalty:float = None) -> pyo.ConcreteModel:
+        """ create ConcreteModel
+
+        Args:
+            rating (str): branch rating used for post-contingency flows ('rate_a', 'rate_b', or 'rate_c')
+            max_iter (int): the maximum number of iterations for the iterative and decomposition solve methods
+            tol (float): tolerance of post-contingency flow violations
+            corrective_ramp (str): generator field limiting the corrective redispatch in the decomposition ('ramp_10' or 'ramp_30').
+                                   Generators without the field cannot be redispatched.
+            n_jobs (int): the number of worker processes for the subproblems in the decomposition
+            overload_penalty (float): cost per p.u. of the post-contingency overloads in the upper bound of the decomposition.
+                                      Default is 100 times the largest marginal cost at pmax.
+        """
+        if corrective_ramp not in ['ramp_10', 'ramp_30']:
+            raise ValueError(f"corrective_ramp should be 'ramp_10' or 'ramp_30'. But it is now {corrective_ramp}.")
+        gens = network['gen']
+        branches = network['branch']
+        branchids = sorted(list(branches.keys()))
+        genids = sorted(list(gens.keys()))
+
+        line_contingency = check_line_contingency(network, line_contingency) # factor out the outages causing network isolation
+
+        data = self._instance_data(network, init_var)
+        ptdf_g_raw = self.model.ptdf_g_raw
+
+        # line outage distribution factors
+        line_cont_idxs = [branches[branch_id]['index'] for branch_id in line_contingency]
+        lodf_raw = compute_lodf(network, line_cont_idxs) if len(line_cont_idxs) > 0 else np.zeros((len(branchids),0))
+
+        # generator outage distribution factors with the participation proportional to pmax (in the order of genids)
+        genidxs = np.asarray([gens[gen_id]['index'] for gen_id in genids])
+        genpos = { gen_id: pos for pos, gen_id in enumerate(genids) }
+        pmax = np.asarray([gens[gen_id]['pmax'] for gen_id in genids])
+        generator_contingency_out = []
+        for gen_id in generator_contingency:
+            if pmax.sum() - pmax[genpos[gen_id]] <= 0.:
+                warnings.warn(f"Generator contingency ID {gen_id} is excluded because no other generator can pick up its generation.")
+            else:
+                generator_contingency_out.append(gen_id)
+        generator_contingency = generator_contingency_out
+        godf_raw = np.zeros((len(branchids), len(generator_contingency)))
+        for col, gen_id in enumerate(generator_contingency):
+            participation = pmax.copy()
+            participation[genpos[gen_id]] = 0.
+            participation = participation / participation.sum()
+            participation[genpos[gen_id]] = -1.
+            godf_raw[:,col] = ptdf_g_raw[:,genidxs] @ participation
+
+        rate = get_branch_rating(network, rating)
+        rate = np.where(np.isinf(rate), 1e12, rate)
+
+        data.update({
+            'CL': {None: line_contingency},
+            'CG': {None: generator_contingency},
+            'ECL': {None: []},
+            'ECG': {None: []},
+            'rate_cont': { branch_id: rate[branches[branch_id]['index']] for branch_id in branchids },
+        })
+
+        self.model.branch_idx = { branch_id: branches[branch_id]['index'] for branch_id in branchids }
+        self.model.gen_idx = { gen_id: gens[gen_id]['index'] for gen_id in genids }
+        self.model.line_cont_idx = { branch_id: col for col, branch_id in enumerate(line_contingency) }
+        self.model.gen_cont_idx = { gen_id: col for col, gen_id in enumerate(generator_contingency) }
+        self.model.lodf_raw = lodf_raw
+        self.model.godf_raw = godf_raw
+
+        self.rate_cont_raw = rate
+        self.ramp_raw = np.zeros(len(genids))
+        for gen_id in genids:
+            self.ramp_raw[gens[gen_id]['index']] = gens[gen_id].get(corrective_ramp, 0.)
+
+        if overload_penalty is None:
+            overload_penalty = 100. * max([2. * gens[gen_id]['cost'][0] * gens[gen_id]['pmax'] + gens[gen_id]['cost'][1] for gen_id in genids] + [1.])
+        if overload_penalty <= 0.:
+            raise ValueError(f"overload_penalty should be positive. But it is now {overload_penalty}.")
+
+        self.max_iter = max_iter
+        self.tol = tol
+        self.overload_penalty = overload_penalty
+        self.n_jobs = n_jobs
+
+        with _stage('create_instance'):
+            instance = self.model.create_instance({None: data}, report_timing=verbose) # create instance (ConcreteModel)
+        return instance
+
+
+    def _post_contingency_flows(self):
+        """ post-contingency flows for all the line and generator contingencies at the current solution
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: ExK_line and ExK_gen post-contingency flows
+        """
+        m = self.instance
+        genids = list(m.G)
+        pg = np.zeros(len(genids))
+        for gen_id in genids:
+            pg[m.gen_idx[gen_id]] = m.pg[gen_id].value
+        pf = m.ptdf_g_raw @ pg - m.load_injection_raw
+
+        line_cont_idxs = np.asarray([m.branch_idx[branch_id] for branch_id in m.CL], dtype=int)
+        gen_cont_idxs = np.asarray([m.gen_idx[gen_id] for gen_id in m.CG], dtype=int)
+        pf_line = pf[:,None] + m.lodf_raw * pf[line_cont_idxs][None,:]
+        pf_gen = pf[:,None] + m.godf_raw * pg[gen_cont_idxs][None,:]
+        return pf_line, pf_gen
+
+
+    def _add_violated_constraints(self) -> int:
+        """ screen post-contingency flows and add the constraints of the violated (branch, contingency) pairs
+
+        Returns:
+            int: the number of constraints added
+        """
+        m = self.instance
+        branchids = list(m.E)
+        rate = np.asarray([pyo.value(m.rate_cont[branch_id]) for branch_id in branchids])
+        branch_pos = np.asarray([m.branch_idx[branch_id] for branch_id in branchids])
+        pf_line, pf_gen = self._post_contingency_flows()
+
+        nadded = 0
+        for flows, cont_set, pair_set, cnst, rule in [(pf_line, m.CL, m.ECL, m.cnst_pf_line_cont, cnst_pf_line_cont_exp),
+                                                      (pf_gen, m.CG, m.ECG, m.cnst_pf_gen_cont, cnst_pf_gen_cont_exp)]:
+            contids = list(cont_set)
+            violation = np.abs(flows[branch_pos,:]) - rate[:,None]
+            for row, col in zip(*np.nonzero(violation > self.tol)):
+                pair = (branchids[row], contids[col])
+                if pair in pair_set:
+                    continue
+                pair_set.add(pair)
+                cnst.add(pair, rule(m, *pair))
+                nadded += 1
+        return nadded
+
+
+    def _add_all_constraints(self) -> int:
+        """ add all post-contingency flow constraints (extensive form)
+        """
+        m = self.instance
+        nadded = 0
+        for cont_set, pair_set, cnst, rule in [(m.CL, m.ECL, m.cnst_pf_line_cont, cnst_pf_line_cont_exp),
+                                               (m.CG, m.ECG, m.cnst_pf_gen_cont, cnst_pf_gen_cont_exp)]:
+            for cont_id in cont_set:
+                for branch_id in m.E:
+                    pair = (branch_id, cont_id)
+                    if pair in pair_set or (cont_set is m.CL and branch_id == cont_id): # flow of the outaged branch is zero
+                        continue
+                    pair_set.add(pair)
+                    cnst.add(pair, rule(m, *pair))
+                    nadded += 1
+        return nadded
+
+
+    def _solve(self, optimizer:pyo.SolverFactory,
+                     solve_method:str = None,
+                     tee:bool = False,
+                     extract_dual:bool = False,
+                     extract_contingency:bool = False) -> Dict[str,Any]:
+        """ solve DC-SCOPF
+
+        Args:
+            solve_method (str): 'iterative' (default), 'extensive', or 'decomposition'
+        """
+        solve_method = 'iterative' if solve_method is None else solve_method
+        if solve_method not in ['iterative', 'extensive', 'decomposition']:
+            raise ValueError(f"solve_method should be 'iterative', 'extensive', or 'decomposition'. But it is now {solve_method}.")
+        if extract_dual:
+            warnings.warn("extracting dual is not supported for SCOPF", RuntimeWarning)
+
+        tic = time.time()
+        iterations = []
+        if solve_method == 'decomposition':
+            return self._solve_decomposition(optimizer, tee, extract_contingency)
+
+        if solve_method == 'extensive':
+            self._add_all_constraints()
+
+        for it in range(self.max_iter):
+            tic_it = time.time()
+            with _solver_stages(optimizer):
+                opt_results = optimizer.solve(self.instance, tee=tee)
+            termination_status = str(opt_results.solver.termination_condition)
+            if termination_status not in ['optimal', 'locallyOptimal', 'globallyOptimal'] or solve_method == 'extensive':
+                break
+            nadded = self._add_violated_constraints()
+            iterations.append({'iteration': it, 'obj_cost': pyo.value(self.instance.obj_cost), 'nadded': nadded, 'time': time.time()-tic_it})
+            if nadded == 0:
+                break
+        else:
+            termination_status = 'maxIterations'
+            warnings.warn(f"DC-SCOPF is not secure after {self.max_iter} iterations", RuntimeWarning)
+
+        results = {'termination_status': termination_status,
+                   'time': time.time() - tic,
+                   'obj_cost': pyo.value(self.instance.obj_cost),
+                   'sol': {},
+                   'stats': _solver_stats(optimizer) # of the last solve
+                   }
+
+        if results['termination_status'] in ['optimal', 'locallyOptimal', 'globallyOptimal']:
+            with _stage('extract_result'):
+                self._write_output(results, False, extract_contingency)
+            if extract_contingency:
+                results['contingency'] = {
+                    'line': list(self.instance.ECL),
+                    'gen': list(self.instance.ECG),
+                    'iterations': iterations
+                }
+
+        return results
+
+
+    def _solve_decomposition(self, optimizer:pyo.SolverFactory,
+                                   tee:bool = False,
+                                   extract_contingency:bool = False) -> Dict[str,Any]:
+        tic = time.time()
+        decomp = solve_benders(self, optimizer, tee)
+
+        results = {'termination_status': decomp['termination_status'],
+                   'time': time.time() - tic,
+                   'obj_cost': pyo.value(self.instance.obj_cost),
+                   'sol': {}
+                   }
+
+        if results['termination_status'] in ['optimal', 'locallyOptimal', 'globallyOptimal']:
+            with _stage('extract_result'):
+                self._write_output(results, False, extract_contingency)
+        if extract_contingency:
+            results['contingency'] = {
+                'iterations': decomp['iterations'],
+                'redispatch': decomp['redispatch'],
+                'ncut': len(self.instance.cnst_benders_cut),
+                'time_setup': decomp['time_setup']
+            }
+
+        return results
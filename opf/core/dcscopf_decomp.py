@@ -0,0 +1,184 @@
+""" Benders decomposition for preventive-corrective DC-SCOPF.
+The master problem is the base-case DC-OPF with Benders feasibility cuts,
+and each contingency has a subproblem finding the corrective redispatch (within the ramp limits) that minimizes the post-contingency overloads.
+"""
+from typing import Any, Dict, Hashable, Tuple
+import time
+import pyomo.environ as pyo
+from pyomo.core.expr.numeric_expr import LinearExpression
+import numpy as np
+
+from .parallel import PersistentWorkerPool
+
+
+class CorrectiveSubproblem:
+    """ post-contingency subproblem for a line outage or a generator outage.
+
+        min_{pg, dpg, s}  sum(s)
+        s.t.  pg = pg_hat                                                    (dual gives the Benders cut)
+              -rate - s <= A (pg + dpg) - c <= rate + s                      (post-contingency flows)
+              sum(dpg) = 0,  pgmin <= pg + dpg <= pgmax,  -ramp <= dpg <= ramp
+              pg_k + dpg_k = 0                                               (for the outage of generator k)
+
+    The instance is built once and only `pg_hat` is updated in the later iterations.
+    """
+    def __init__(self, key:Tuple[str,Hashable], shared:Dict[str,Any]):
+        self.key = key
+        cont_type, cont_col = key[0], shared['cont_col'][key]
+        ptdf = shared['ptdf_g']
+        load_injection = shared['load_injection']
+        if cont_type == 'line':
+            lodf = shared['lodf'][:,cont_col]
+            branch_idx = shared['line_cont_branch_idx'][cont_col]
+            A = ptdf + lodf[:,None] * ptdf[branch_idx][None,:]
+            c = load_injection + lodf * load_injection[branch_idx]
+            outaged_gen = None
+        else:
+            A = ptdf
+            c = load_injection
+            outaged_gen = shared['gen_cont_gen_idx'][cont_col]
+
+        G = ptdf.shape[1]
+        rate = shared['rate']
+        monitored = np.nonzero(np.isfinite(rate))[0] # branches with the rating
+        ramp = shared['ramp']
+
+        m = pyo.ConcreteModel()
+        m.G = pyo.RangeSet(0, G-1)
+        m.E = pyo.Set(initialize=monitored.tolist())
+        m.pg_hat = pyo.Param(m.G, initialize=dict(enumerate(shared['pg_init'])), mutable=True)
+        m.pg = pyo.Var(m.G, within=pyo.Reals)
+        m.dpg = pyo.Var(m.G, within=pyo.Reals)
+        m.s = pyo.Var(m.E, within=pyo.NonNegativeReals)
+        for g in m.G:
+            if g != outaged_gen:
+                m.dpg[g].setlb(-ramp[g])
+                m.dpg[g].setub(ramp[g])
+
+        m.cnst_fix = pyo.Constraint(m.G, rule=lambda m, g: m.pg[g] == m.pg_hat[g])
+        m.cnst_pg_post = pyo.Constraint(m.G, rule=lambda m, g: (shared['pgmin'][g], m.pg[g] + m.dpg[g], shared['pgmax'][g]) if g != outaged_gen else m.pg[g] + m.dpg[g] == 0.)
+        m.cnst_redispatch = pyo.Constraint(rule=lambda m: pyo.quicksum(m.dpg[g] for g in m.G) == 0.)
+
+        def post_flow(m, e):
+            return LinearExpression(constant=-c[e], linear_coefs=A[e].tolist()*2, linear_vars=[m.pg[g] for g in m.G] + [m.dpg[g] for g in m.G])
+        m.cnst_pf_upper = pyo.Constraint(m.E, rule=lambda m, e: post_flow(m, e) - m.s[e] <= rate[e])
+        m.cnst_pf_lower = pyo.Constraint(m.E, rule=lambda m, e: post_flow(m, e) + m.s[e] >= -rate[e])
+        m.obj = pyo.Objective(expr=pyo.quicksum(m.s[e] for e in m.E), sense=pyo.minimize)
+        m.dual = pyo.Suffix(direction=pyo.Suffix.IMPORT)
+
+        self.instance = m
+        self.optimizer = pyo.SolverFactory(shared['solver'])
+        for k, v in shared['solver_option'].items():
+            self.optimizer.options[k] = v
+
+    def solve(self, pg_hat:np.ndarray) -> Dict[str,Any]:
+        """ solve the subproblem at the base-case dispatch `pg_hat`
+
+        Returns:
+            Dict[str,Any]: total overload (violation), its subgradient with respect to pg_hat, redispatch, and solve time
+        """
+        m = self.instance
+        for g in m.G:
+            m.pg_hat[g] = pg_hat[g]
+        tic = time.time()
+        opt_results = self.optimizer.solve(m)
+        termination_status = str(opt_results.solver.termination_condition)
+        if termination_status not in ['optimal', 'locallyOptimal', 'globallyOptimal']:
+            raise RuntimeError(f"subproblem {self.key} is not solved: {termination_status}")
+        return {'violation': max(pyo.value(m.obj), 0.),
+                'subgradient': np.asarray([m.dual[m.cnst_fix[g]] for g in m.G]),
+                'redispatch': np.asarray([m.dpg[g].value for g in m.G]),
+                'time': time.time() - tic}
+
+
+def _build_subproblem(key, shared):
+    return CorrectiveSubproblem(key, shared)
+
+
+def solve_benders(model, optimizer:pyo.SolverFactory, tee:bool = False) -> Dict[str,Any]:
+    """ Benders decomposition of the preventive-corrective DC-SCOPF instantiated in `model` (DCSCOPFModel).
+    Subproblems are solved in parallel by `model.n_jobs` worker processes keeping their instances alive.
+
+    The lower bound is the cost of the master problem. The upper bound is the running minimum of the cost of the master dispatch
+    plus `model.overload_penalty` times the total post-contingency overload after the corrective redispatch (the cost itself once secure),
+    i.e., of the problem with the overloads penalized, which is exact for a large enough penalty.
+
+    Returns:
+        Dict[str,Any]: termination status and per-iteration statistics (bounds, gap, maximum violation, and timing)
+    """
+    m = model.instance
+    genids = list(m.G)
+    genidxs = np.asarray([m.gen_idx[gen_id] for gen_id in genids])
+
+    keys = [('line', branch_id) for branch_id in m.CL] + [('gen', gen_id) for gen_id in m.CG]
+    shared = {
+        'ptdf_g': m.ptdf_g_raw[:,genidxs],
+        'load_injection': m.load_injection_raw,
+        'lodf': m.lodf_raw,
+        'line_cont_branch_idx': [m.branch_idx[branch_id] for branch_id in m.CL],
+        'gen_cont_gen_idx': [genids.index(gen_id) for gen_id in m.CG],
+        'cont_col': {**{('line', branch_id): col for branch_id, col in m.line_cont_idx.items()},
+                     **{('gen', gen_id): col for gen_id, col in m.gen_cont_idx.items()}},
+        'rate': np.where(model.rate_cont_raw >= 1e12, np.inf, model.rate_cont_raw),
+        'ramp': model.ramp_raw[genidxs],
+        'pgmin': np.asarray([pyo.value(m.pgmin[gen_id]) for gen_id in genids]),
+        'pgmax': np.asarray([pyo.value(m.pgmax[gen_id]) for gen_id in genids]),
+        'pg_init': np.asarray([pyo.value(m.pg_init[gen_id]) for gen_id in genids]),
+        'solver': optimizer.name,
+        'solver_option': dict(optimizer.options),
+    }
+
+    iterations = []
+    ub, termination_status = np.inf, 'maxIterations'
+    tic = time.time()
+    with PersistentWorkerPool(_build_subproblem, keys, shared, n_jobs=model.n_jobs) as pool:
+        time_setup = time.time() - tic
+        for it in range(model.max_iter):
+            tic_master = time.time()
+            opt_results = optimizer.solve(m, tee=tee)
+            termination_status = str(opt_results.solver.termination_condition)
+            time_master = time.time() - tic_master
+            if termination_status not in ['optimal', 'locallyOptimal', 'globallyOptimal']:
+                break
+            lb = pyo.value(m.obj_cost)
+            pg_hat = np.asarray([m.pg[gen_id].value for gen_id in genids])
+
+            tic_sub = time.time()
+            sub_results = pool.call('solve', { key: (pg_hat,) for key in keys })
+            time_sub = time.time() - tic_sub
+
+            ncut = 0
+            for key, sub in sub_results.items():
+                if sub['violation'] <= model.tol:
+                    continue
+                # v_k(pg) >= v_k(pg_hat) + subgradient^T (pg - pg_hat) should be non-positive
+                expr = sub['violation'] + pyo.quicksum(float(lam) * (m.pg[gen_id] - float(pg_val)) for gen_id, lam, pg_val in zip(genids, sub['subgradient'], pg_hat) if lam != 0.)
+                m.cnst_benders_cut.add(expr <= 0.)
+                ncut += 1
+
+            violations = [sub['violation'] for sub in sub_results.values()]
+            max_violation = max(violations + [0.])
+            ub = min(ub, lb if ncut == 0 else lb + model.overload_penalty * sum(violations)) # the master cost is the cost of pg_hat
+            iterations.append({'iteration': it,
+                               'lb': lb,
+                               'ub': ub,
+                               'gap': max(ub - lb, 0.) / abs(ub) if ub != 0. else 0.,
+                               'max_violation': max_violation,
+                               'ncut': ncut,
+                               'time_master': time_master,
+                               'time_sub': time_sub,
+                               'time_sub_sum': sum(sub['time'] for sub in sub_results.values())})
+            if ncut == 0:
+                break
+        else:
+            termination_status = 'maxIterations'
+
+    redispatch = {}
+    if termination_status in ['optimal', 'locallyOptimal', 'globallyOptimal']:
+        for key, sub in sub_results.items():
+            redispatch[key] = { gen_id: float(dpg) for gen_id, dpg in zip(genids, sub['redispatch']) }
+
+    return {'termination_status': termination_status,
+            'iterations': iterations,
+            'redispatch': redispatch,
+            'time_setup': time_setup}
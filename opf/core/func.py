@@ -1,28 +1,63 @@
 from .base import OPFBaseModel
 from .acopf import ACOPFModel
+from .acopf_compact import ACOPFCompactModel
+from .acopf_soc import ACOPFSOCModel
 from .dcopf import DCOPFModel
 from .dcopf_ptdf import DCOPFModelPTDF
+from .dcopf_mp import DCOPFMultiPeriodModel
+from .dcscopf import DCSCOPFModel
+from .dcopf_matrix import DCOPFMatrixModel
+from .acopf_nlp import ACOPFCallbackModel
+from .profiler import _profiled
 
-def build_model(model_type:str) -> OPFBaseModel:
+@_profiled('build_model')
+def build_model(model_type:str, backend:str = 'pyomo', **kwargs) -> OPFBaseModel:
     """ build optimal power flow model
 
     Args:
         model_type (str): optimal power flow model type 
                           acopf:        AC-OPF
+                          acopf-compact: AC-OPF without the branch flow variables
+                          acopf-soc:    second-order cone relaxation of AC-OPF in W-space
                           dcopf:        DC-OPF 
                           dcopf-ptdf:   DC-OPF based on PTDF matrix
+                          dcopf-mp:     multi-period DC-OPF over a load profile with ramp limits
+                          dcscopf:      DC security constrained OPF based on PTDF and LODF matrices
+        backend (str): 'pyomo', 'matrix', or 'callback'. The matrix backend ('dcopf' and 'dcopf-ptdf' only) assembles the problem
+                       as sparse matrices and solves it by the in-memory API of HiGHS, OSQP, or Clarabel.
+                       The callback backend ('acopf' only) hands vectorized derivative callbacks to IPOPT through cyipopt
+        kwargs: formulation options of the model class, e.g., `precompute_coefs` of `ACOPFModel`
 
     Returns:
         OPFBaseModel: abstract power model
     """
     
+    if backend not in ['pyomo', 'matrix', 'callback']:
+        raise ValueError(f"backend should be 'pyomo', 'matrix', or 'callback'. But it is now {backend}.")
+    if backend == 'matrix' and model_type not in ['dcopf', 'dcopf-ptdf']:
+        raise ValueError(f"The matrix backend supports 'dcopf' and 'dcopf-ptdf'. But it is now {model_type}.")
+    if backend == 'callback' and model_type != 'acopf':
+        raise ValueError(f"The callback backend supports 'acopf'. But it is now {model_type}.")
+
     print('build model...', end=' ', flush=True)
-    if model_type == 'acopf':
-        model = ACOPFModel(model_type)
+    if backend == 'matrix':
+        model = DCOPFMatrixModel(model_type, **kwargs)
+    elif backend == 'callback':
+        model = ACOPFCallbackModel(model_type, **kwargs)
+    elif model_type == 'acopf':
+        model = ACOPFModel(model_type, **kwargs)
+    elif model_type == 'acopf-compact':
+        model = ACOPFCompactModel(model_type, **kwargs)
+    elif model_type == 'acopf-soc':
+        model = ACOPFSOCModel(model_type, **kwargs)
     elif model_type == 'dcopf':
-        model = DCOPFModel(model_type)
+        model = DCOPFModel(model_type, **kwargs)
     elif model_type == 'dcopf-ptdf':
-        model = DCOPFModelPTDF(model_type) 
+        model = DCOPFModelPTDF(model_type, **kwargs)
+    elif model_type == 'dcopf-mp':
+        model = DCOPFMultiPeriodModel(model_type, **kwargs)
+    elif model_type == 'dcscopf':
+        model = DCSCOPFModel(model_type, **kwargs)
     else:
         assert False
 
@@ -4,8 +4,10 @@ import numpy as np
 import warnings
 
 from .utils import compute_bus_susceptance_matrix, compute_line_incidence_matrix, compute_branch_susceptance_matrix, _preprocessing_network
+from .profiler import _profiled
  
 
+@_profiled('compute_lodf')
 def compute_lodf(network:Dict[str,Any], branch_outage_idxs:List[int]) ->  np.ndarray:
     """ compute line outage distribution factor (LODF) matrix for N-1 contingencies
     It assumes that we are monitoring all the branches while the outage occurs at one line (N-1 line contingency).
@@ -0,0 +1,110 @@
+from typing import Any, Callable, Dict, Hashable, List, Tuple
+import multiprocessing as mp
+import traceback
+
+
+def _worker_loop(conn, factory:Callable, keys:List[Hashable], shared:Any) -> None:
+    """ worker process: build the objects once and serve method calls until 'close' is received
+    """
+    try:
+        objects = { key: factory(key, shared) for key in keys }
+        conn.send(('ready', None))
+    except Exception:
+        conn.send(('error', traceback.format_exc()))
+        return
+
+    while True:
+        command, method, args_per_key = conn.recv()
+        if command == 'close':
+            break
+        try:
+            conn.send(('ok', { key: getattr(objects[key], method)(*args) for key, args in args_per_key.items() }))
+        except Exception:
+            conn.send(('error', traceback.format_exc()))
+    conn.close()
+
+
+class PersistentWorkerPool:
+    """ a pool of worker processes each of which keeps its own objects (e.g., Pyomo instances) alive across calls.
+    The objects are created once by `factory(key, shared)` and distributed to the workers in a round-robin manner,
+    so that the object of each key always lives in the same process and only the changes are sent in the later calls.
+    With `n_jobs <= 1`, the objects are kept in the current process.
+
+    Args:
+        factory (Callable): module-level (picklable) function creating the object of the given key
+        keys (List[Hashable]): keys of the objects
+        shared (Any): data shared by all the objects, sent to each worker once
+        n_jobs (int): the number of worker processes
+    """
+    def __init__(self, factory:Callable, keys:List[Hashable], shared:Any = None, n_jobs:int = 1):
+        self.keys = list(keys)
+        self.n_jobs = max(min(n_jobs, len(self.keys)), 1)
+        self.objects = None
+        self.workers = []
+
+        if self.n_jobs <= 1:
+            self.objects = { key: factory(key, shared) for key in self.keys }
+            return
+
+        self.assignment = {}
+        for i, key in enumerate(self.keys):
+            self.assignment[key] = i % self.n_jobs
+
+        for i in range(self.n_jobs):
+            keys_worker = [key for key in self.keys if self.assignment[key] == i]
+            parent_conn, child_conn = mp.Pipe()
+            process = mp.Process(target=_worker_loop, args=(child_conn, factory, keys_worker, shared), daemon=True)
+            process.start()
+            self.workers.append((process, parent_conn))
+
+        for process, conn in self.workers:
+            self._receive(conn)
+
+    def _receive(self, conn) -> Any:
+        status, payload = conn.recv()
+        if status == 'error':
+            self.close()
+            raise RuntimeError(f"worker process failed:\n{payload}")
+        return payload
+
+    def call(self, method:str, args_per_key:Dict[Hashable,Tuple]) -> Dict[Hashable,Any]:
+        """ call `method` of the objects with the given arguments in parallel
+
+        Args:
+            method (str): method name of the objects
+            args_per_key (Dict[Hashable,Tuple]): positional arguments for each key. Keys not included are not called.
+
+        Returns:
+            Dict[Hashable,Any]: returned values for each key
+        """
+        if self.objects is not None:
+            return { key: getattr(self.objects[key], method)(*args) for key, args in args_per_key.items() }
+
+        requests = [{} for _ in self.workers]
+        for key, args in args_per_key.items():
+            requests[self.assignment[key]][key] = args
+        for (process, conn), request in zip(self.workers, requests):
+            conn.send(('call', method, request))
+
+        results = {}
+        for process, conn in self.workers:
+            results.update(self._receive(conn))
+        return results
+
+    def close(self) -> None:
+        for process, conn in self.workers:
+            try:
+                conn.send(('close', None, None))
+            except (BrokenPipeError, OSError):
+                pass
+        for process, conn in self.workers:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+        self.workers = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
@@ -0,0 +1,195 @@
+from typing import Any, Dict, List, Tuple
+import time
+import numpy as np
+
+import pyomo.environ as pyo
+from scipy.sparse import coo_array
+from scipy.sparse.csgraph import shortest_path
+from scipy.sparse.linalg import splu
+
+from .utils import (compute_branch_admittance,
+                    compute_branch_flow_coefficients,
+                    compute_branch_susceptance_matrix,
+                    compute_bus_susceptance_matrix,
+                    compute_generator_incidence_matrix,
+                    compute_load_incidence_matrix,
+                    _get_slack_idx,
+                    _preprocessing_network)
+
+
+def _max_linear_over_box_and_sum(A:np.ndarray, lb:np.ndarray, ub:np.ndarray, total:float) -> np.ndarray:
+    """ max a'x subject to lb <= x <= ub and sum(x) == total for each row a of A.
+    The LP with a single equality is solved greedily: start from lb and raise the variables with the largest coefficients first.
+    """
+    cap = ub - lb
+    order = np.argsort(-A, axis=1, kind='stable')
+    A_sorted = np.take_along_axis(A, order, axis=1)
+    cap_sorted = cap[order]
+    before = np.cumsum(cap_sorted, axis=1) - cap_sorted
+    fill = np.clip(total - lb.sum() - before, 0., cap_sorted)
+    return A @ lb + (A_sorted * fill).sum(axis=1)
+
+
+def _generator_ptdf_and_load_flow(network:Dict[str,Any], pd:np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """ ExG PTDF of the generators and the flows of the loads (PTDF_l pd) by one sparse LU,
+    without the ExL PTDF of the loads of `compute_ptdf`
+    """
+    slack = _get_slack_idx(network)
+    S_br = compute_branch_susceptance_matrix(network)
+    lu = splu(compute_bus_susceptance_matrix(network, slack).tocsc())
+    x_g = lu.solve(compute_generator_incidence_matrix(network).toarray())
+    x_l = lu.solve(compute_load_incidence_matrix(network) @ pd)
+    x_g[slack,:] = 0.
+    x_l[slack] = 0.
+    return S_br @ x_g, S_br @ x_l
+
+
+def compute_flow_bounds(network:Dict[str,Any],
+                        ptdf:Tuple[np.ndarray,np.ndarray] = None,
+                        chunk_size:int = None) -> Tuple[np.ndarray, np.ndarray]:
+    """ the smallest and the largest DC flows of the branches over all the dispatches within the generator bounds (pgmin, pgmax)
+    that meet the total load. pf = PTDF_g pg - PTDF_l pd, and each bound is the exact optimum of the LP with the box and the power balance.
+
+    Args:
+        network (Dict[str,Any]): pglib network
+        ptdf (Tuple[np.ndarray,np.ndarray]): (optional) ExG and ExL PTDF matrices of `compute_ptdf`
+        chunk_size (int): the number of branches processed at once (about 4M entries of the ExG PTDF by default)
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: E-dimensional lower and upper bounds ordered by the branch indices (-inf and inf if no dispatch meets the load)
+    """
+    _preprocessing_network(network)
+    gens, loads = network['gen'], network['load']
+    pgmin = np.fromiter((gen['pmin'] for gen in gens.values()), dtype=float, count=len(gens))
+    pgmax = np.fromiter((gen['pmax'] for gen in gens.values()), dtype=float, count=len(gens))
+    pd = np.fromiter((load['pd'] for load in loads.values()), dtype=float, count=len(loads))
+    if ptdf is not None:
+        ptdf_g, load_flow = ptdf[0], ptdf[1] @ pd
+    else:
+        ptdf_g, load_flow = _generator_ptdf_and_load_flow(network, pd)
+    E, G = ptdf_g.shape
+    total = pd.sum()
+    if not (pgmin.sum() <= total <= pgmax.sum()):
+        return np.full(E, -np.inf), np.full(E, np.inf)
+
+    lower, upper = np.empty(E), np.empty(E)
+    chunk_size = chunk_size if chunk_size is not None else max(1, 4_000_000 // max(G, 1))
+    for start in range(0, E, chunk_size):
+        rows = slice(start, min(start + chunk_size, E))
+        A = np.asarray(ptdf_g[rows], dtype=float)
+        upper[rows] = _max_linear_over_box_and_sum(A, pgmin, pgmax, total) - load_flow[rows]
+        lower[rows] = -_max_linear_over_box_and_sum(-A, pgmin, pgmax, total) - load_flow[rows]
+    return lower, upper
+
+
+def redundant_thermal_limits(network:Dict[str,Any],
+                             ptdf:Tuple[np.ndarray,np.ndarray] = None,
+                             tol:float = 1e-6) -> List[str]:
+    """ IDs of the branches whose thermal limits (rate_a > 0) can never be reached by `compute_flow_bounds`,
+    i.e., -rate_a + tol <= lower and upper <= rate_a - tol. Dropping them does not change the feasible set of DC-OPF.
+
+        redundant = opf.redundant_thermal_limits(network)
+        model = opf.build_model('dcopf-ptdf', drop_redundant_limits=True)
+    """
+    lower, upper = compute_flow_bounds(network, ptdf)
+    redundant = []
+    for branch_id, branch in network['branch'].items():
+        rate_a = branch.get('rate_a', 0.) # the parser drops the zero (unlimited) ratings
+        idx = branch['index']
+        if rate_a > 0. and -rate_a + tol <= lower[idx] and upper[idx] <= rate_a - tol:
+            redundant.append(branch_id)
+    return redundant
+
+
+def _thermal_limit_presolve(network:Dict[str,Any], ptdf:Tuple[np.ndarray,np.ndarray] = None) -> Dict[str,Any]:
+    """ presolve summary kept by the DC-OPF models with `drop_redundant_limits=True`
+    """
+    tic = time.time()
+    redundant = redundant_thermal_limits(network, ptdf)
+    return {'redundant_limits': redundant,
+            'nlimits': len(network['branch']),
+            'nremoved': len(redundant),
+            'time': time.time() - tic}
+
+
+def compute_angle_bounds(network:Dict[str,Any]) -> Dict[str,Tuple[float,float]]:
+    """ bounds of the voltage angles implied by the angle difference limits (angmin <= va_f - va_t <= angmax) and va = 0 at the slack bus.
+    va_t <= va_f - angmin and va_f <= va_t + angmax are chained from the slack, so that the upper bound of each bus is
+    the shortest path from the slack with the weights -angmin (f -> t) and angmax (t -> f), and the lower bound is the negative shortest path to the slack.
+
+    Args:
+        network (Dict[str,Any]): pglib network
+
+    Returns:
+        Dict[str,Tuple[float,float]]: (lower, upper) of each bus ID ((-inf, inf) for the buses not connected to the slack)
+    """
+    _preprocessing_network(network)
+    buses, branches = network['bus'], network['branch']
+    B = len(buses)
+    index = { bus_id: bus['index'] for bus_id, bus in buses.items() }
+    f_idx = np.fromiter((index[branch['f_bus']] for branch in branches.values()), dtype=int, count=len(branches))
+    t_idx = np.fromiter((index[branch['t_bus']] for branch in branches.values()), dtype=int, count=len(branches))
+    angmin = np.fromiter((branch['angmin'] for branch in branches.values()), dtype=float, count=len(branches))
+    angmax = np.fromiter((branch['angmax'] for branch in branches.values()), dtype=float, count=len(branches))
+
+    # the tightest of the parallel arcs (coo_array would sum them up)
+    rows, cols = np.concatenate([f_idx, t_idx]), np.concatenate([t_idx, f_idx])
+    weights = np.concatenate([-angmin, angmax])
+    order = np.lexsort((weights, cols, rows))
+    rows, cols, weights = rows[order], cols[order], weights[order]
+    first = np.ones(rows.size, dtype=bool)
+    first[1:] = (rows[1:] != rows[:-1]) | (cols[1:] != cols[:-1])
+    graph = coo_array((weights[first], (rows[first], cols[first])), shape=(B, B)).tocsr()
+
+    slack = [bus['index'] for bus in buses.values() if bus['bus_type'] == 3]
+    upper = shortest_path(graph, indices=slack).min(axis=0)
+    lower = 0. - shortest_path(graph.T.tocsr(), indices=slack).min(axis=0)
+    return { bus_id: (float(lower[idx]), float(upper[idx])) for bus_id, idx in index.items() }
+
+
+def compute_nlp_scaling_factors(network:Dict[str,Any], max_gradient:float = 100.) -> Dict[str,Any]:
+    """ scaling factors of the objective and the constraints of AC-OPF for IPOPT (`nlp_scaling_method=user-scaling`).
+    The gradient-based rule of IPOPT, min(1, max_gradient / max|gradient|), is applied to the largest gradients over the variable bounds
+    instead of the gradients at the initial point, and the thermal limits are normalized by rate_a^2.
+
+    Args:
+        network (Dict[str,Any]): pglib network
+        max_gradient (float): the largest gradient after scaling (`nlp_scaling_max_gradient` of IPOPT)
+
+    Returns:
+        Dict[str,Any]: 'obj_cost' (float), and 'thermal', 'ohm_from', and 'ohm_to' of the branch IDs
+    """
+    _preprocessing_network(network)
+    gens, branches = network['gen'], network['branch']
+    gradient = 0.
+    for gen in gens.values():
+        c2, c1 = gen['cost'][0], gen['cost'][1]
+        gradient = max(gradient, abs(2 * c2 * gen['pmin'] + c1), abs(2 * c2 * gen['pmax'] + c1))
+    factors = {'obj_cost': min(1., max_gradient / gradient) if gradient > 0. else 1.}
+
+    coefs = compute_branch_flow_coefficients(compute_branch_admittance(network))
+    ohm_from = np.max(np.abs([coefs[name] for name in ['g_ff', 'b_ff', 'g_ft', 'b_ft']]), axis=0) * 2 # vm_f^2 and vv are 2 at most at the bounds
+    ohm_to = np.max(np.abs([coefs[name] for name in ['g_tt', 'b_tt', 'g_tf', 'b_tf']]), axis=0) * 2
+    branchids = list(branches.keys()) # ordered by the indices after `_preprocessing_network`
+    factors['ohm_from'] = dict(zip(branchids, np.minimum(1., max_gradient / np.maximum(ohm_from, 1.)).tolist()))
+    factors['ohm_to'] = dict(zip(branchids, np.minimum(1., max_gradient / np.maximum(ohm_to, 1.)).tolist()))
+    factors['thermal'] = { branch_id: 1. / branch['rate_a']**2 for branch_id, branch in branches.items() if branch.get('rate_a', 0.) > 0. }
+    return factors
+
+
+def _set_nlp_scaling_factors(instance:pyo.ConcreteModel, factors:Dict[str,Any]) -> None:
+    """ `scaling_factor` suffix of the AC-OPF instances from `compute_nlp_scaling_factors`.
+    Only the components defined in the instance are scaled, and the others are left to 1 by IPOPT.
+    """
+    instance.scaling_factor = pyo.Suffix(direction=pyo.Suffix.EXPORT)
+    instance.scaling_factor[instance.obj_cost] = factors['obj_cost']
+    for name, key in [('cnst_thermal_branch_from', 'thermal'), ('cnst_thermal_branch_to', 'thermal'),
+                      ('cnst_ohm_pf_from', 'ohm_from'), ('cnst_ohm_qf_from', 'ohm_from'),
+                      ('cnst_ohm_pf_to', 'ohm_to'), ('cnst_ohm_qf_to', 'ohm_to')]:
+        cnst = instance.component(name)
+        if cnst is None:
+            continue
+        for e in cnst:
+            if e in factors[key]:
+                instance.scaling_factor[cnst[e]] = factors[key][e]
+    return None
@@ -0,0 +1,202 @@
+""" per-stage profiling of the pipeline (parsing, preprocessing, PTDF/LODF, instantiation, solve, and result extraction).
+Nothing is recorded unless a `profiling` context is active, and the instrumented stages then cost a single check of the active profiler.
+
+    with opf.profiling(memory=True, components=True) as prof:
+        network = opf.parse_file(path)
+        model = opf.build_model('dcopf')
+        model.instantiate(network)
+        result = model.solve()
+    print(result['profile']['stages']) # the stages of this solve, or prof.report() for all of them
+
+Each stage is recorded with its wall time, CPU time, and peak memory (tracemalloc, with `memory=True`), under the path of the enclosing stages
+(e.g., 'instantiate/create_instance'). The records are sent to the `callback` and to the logger `opf.core.profiler` (INFO) as they finish.
+With `components=True`, the construction times of the Pyomo components are collected from the timing logger of Pyomo (`report_timing`).
+The active profiler is a context variable, so the stages run in other threads (e.g., the thread pools of the contingency analysis) are not recorded.
+"""
+from typing import Any, Callable, Dict, List
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from functools import wraps
+import logging
+import time
+import tracemalloc
+
+
+_logger = logging.getLogger(__name__)
+_construction_logger = logging.getLogger('pyomo.common.timing.construction') # the logger of `pyomo.common.timing.report_timing`
+_null = nullcontext()
+_per_stage_peaks = hasattr(tracemalloc, 'reset_peak') # Python >= 3.9
+_active: ContextVar = ContextVar('opf_profiler', default=None) # the profiler of the innermost `profiling` context (of this thread)
+
+
+class _ConstructionHandler(logging.Handler):
+    """ collects the `ConstructionTimer` records of Pyomo into the profiler
+    """
+    def __init__(self, profiler:'Profiler'):
+        super().__init__(logging.INFO)
+        self.profiler = profiler
+
+    def emit(self, record:logging.LogRecord) -> None:
+        timer = record.msg
+        if not hasattr(timer, 'obj') or not hasattr(timer, 'timer'):
+            return
+        obj = timer.obj
+        try:
+            nindices = len(obj) if obj.is_indexed() else 1
+        except (AttributeError, TypeError):
+            nindices = None
+        self.profiler.components.append({'stage': self.profiler.path(),
+                                         'component': timer.name,
+                                         'type': getattr(getattr(obj, 'ctype', None), '__name__', type(obj).__name__),
+                                         'nindices': nindices,
+                                         'time': float(timer.timer)})
+
+
+class Profiler:
+    """ records of the stages (and the Pyomo components) within a `profiling` context
+
+    Args:
+        callback (Callable[[Dict[str,Any]],None]): (optional) called with each stage record when the stage finishes
+        memory (bool): track the peak memory of each stage by tracemalloc (slows down the allocations).
+                       It needs `tracemalloc.reset_peak` (Python >= 3.9), and the peak memory stays None on Python 3.8.
+        components (bool): collect the construction time of each Pyomo component
+    """
+    def __init__(self, callback:Callable[[Dict[str,Any]],None] = None, memory:bool = False, components:bool = False):
+        self.callback = callback
+        self.memory = memory and _per_stage_peaks
+        self.components_enabled = components
+        self.stages: List[Dict[str,Any]] = []
+        self.components: List[Dict[str,Any]] = []
+        self._stack: List[Dict[str,Any]] = []
+
+    def path(self) -> str:
+        return '/'.join(frame['name'] for frame in self._stack)
+
+    @contextmanager
+    def stage(self, name:str):
+        """ record the block as a stage nested in the running stages
+        """
+        record = {'stage': '/'.join([frame['name'] for frame in self._stack] + [name]), 'wall': None, 'cpu': None, 'peak_memory': None}
+        self.stages.append(record) # in the order of the starts
+        frame = {'name': name, 'base': 0, 'peak': 0}
+        if self.memory:
+            current, peak = tracemalloc.get_traced_memory()
+            if self._stack: # the peak so far belongs to the parent
+                self._stack[-1]['peak'] = max(self._stack[-1]['peak'], peak)
+            tracemalloc.reset_peak()
+            frame['base'] = frame['peak'] = current
+        self._stack.append(frame)
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield record
+        finally:
+            record['wall'] = time.perf_counter() - wall
+            record['cpu'] = time.process_time() - cpu
+            self._stack.pop()
+            if self.memory:
+                peak = max(frame['peak'], tracemalloc.get_traced_memory()[1])
+                record['peak_memory'] = peak - frame['base'] # above the memory at the start of the stage
+                if self._stack:
+                    self._stack[-1]['peak'] = max(self._stack[-1]['peak'], peak)
+                tracemalloc.reset_peak()
+            _logger.info("%s: %.4f s wall, %.4f s cpu%s", record['stage'], record['wall'], record['cpu'],
+                         f", {record['peak_memory'] / 2**20:.2f} MiB peak" if record['peak_memory'] is not None else '')
+            if self.callback is not None:
+                self.callback(record)
+
+    def report(self, start:int = 0, components_start:int = 0) -> Dict[str,Any]:
+        """ the `profile` section of the results: 'stages' (the finished stages in the order of the starts) and 'components',
+        from the `start`-th stage and the `components_start`-th component
+        """
+        return {'stages': [dict(record) for record in self.stages[start:] if record['wall'] is not None],
+                'components': [dict(record) for record in self.components[components_start:]]}
+
+
+@contextmanager
+def profiling(callback:Callable[[Dict[str,Any]],None] = None, memory:bool = False, components:bool = False):
+    """ activate a `Profiler` for the block. The results of `model.solve` in the block get the 'profile' section.
+
+    Args:
+        callback (Callable[[Dict[str,Any]],None]): (optional) called with each stage record ('stage', 'wall', 'cpu', 'peak_memory') when the stage finishes
+        memory (bool): track the peak memory of each stage by tracemalloc (Python >= 3.9, otherwise ignored)
+        components (bool): collect the construction time of each Pyomo component ('stage', 'component', 'type', 'nindices', 'time')
+    """
+    profiler = Profiler(callback, memory, components)
+    token = _active.set(profiler)
+    started = profiler.memory and not tracemalloc.is_tracing()
+    if started:
+        tracemalloc.start()
+    if components:
+        handler = _ConstructionHandler(profiler)
+        level, propagate = _construction_logger.level, _construction_logger.propagate
+        _construction_logger.setLevel(logging.INFO)
+        _construction_logger.propagate = False # not printed by the handlers of Pyomo
+        _construction_logger.addHandler(handler)
+    try:
+        yield profiler
+    finally:
+        _active.reset(token)
+        if components:
+            _construction_logger.removeHandler(handler)
+            _construction_logger.setLevel(level)
+            _construction_logger.propagate = propagate
+        if started:
+            tracemalloc.stop()
+
+
+def _stage(name:str):
+    """ the stage of the active profiler, or a shared no-op context
+    """
+    profiler = _active.get()
+    return _null if profiler is None else profiler.stage(name)
+
+
+def _profiled(name:str, result:bool = False):
+    """ decorator recording the calls as the stage `name`. With `result`, the returned result dictionary gets the 'profile' section
+    of the stages (and the components) recorded during the call.
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            profiler = _active.get()
+            if profiler is None:
+                return func(*args, **kwargs)
+            start, components_start = len(profiler.stages), len(profiler.components)
+            with profiler.stage(name):
+                returned = func(*args, **kwargs)
+            if result and isinstance(returned, dict):
+                returned['profile'] = profiler.report(start, components_start)
+            return returned
+        return wrapper
+    return decorator
+
+
+@contextmanager
+def _solver_stages(optimizer):
+    """ split `optimizer.solve` of Pyomo into 'write_problem' (e.g., the NL file), 'run_solver', and 'load_solution' stages
+    by wrapping the phases of the solver object during the block
+    """
+    if _active.get() is None:
+        yield
+        return
+    phases = [(attr, stage) for attr, stage in [('_presolve', 'write_problem'), ('_apply_solver', 'run_solver'), ('_postsolve', 'load_solution')]
+              if callable(getattr(optimizer, attr, None))]
+    originals = { attr: optimizer.__dict__.get(attr) for attr, _ in phases }
+
+    def timed(method, stage):
+        @wraps(method)
+        def wrapper(*args, **kwargs):
+            with _stage(stage):
+                return method(*args, **kwargs)
+        return wrapper
+
+    for attr, stage in phases:
+        setattr(optimizer, attr, timed(getattr(optimizer, attr), stage))
+    try:
+        yield
+    finally:
+        for attr, _ in phases:
+            if originals[attr] is None:
+                delattr(optimizer, attr)
+            else:
+                setattr(optimizer, attr, originals[attr])
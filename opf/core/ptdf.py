@@ -7,8 +7,10 @@ from .utils import (compute_branch_susceptance_matrix,
                     compute_generator_incidence_matrix,
                     compute_load_incidence_matrix,
                     _preprocessing_network)
+from .profiler import _profiled
 
 
+@_profiled('compute_ptdf')
 def compute_ptdf(network:Dict[str,Any]) ->  Tuple[Dict[str,Any], Dict[str,Any]]:
     _preprocessing_network(network)
     buses = network['bus']
@@ -0,0 +1,313 @@
+from typing import Any, Dict, List
+import copy
+import time
+import warnings
+import numpy as np
+
+from .dcpf import DCPowerFlow
+from .utils import (compute_admittance_matrix,
+                    compute_branch_susceptance_matrix,
+                    _admittance_stamps,
+                    _branch_admittance,
+                    _preprocessing_network)
+
+
+def _dc_susceptance(branch:Dict[str,Any]) -> float:
+    """ susceptance of `compute_branch_susceptance_matrix`, i.e., pf = b (va_f - va_t) in the DC models
+    """
+    r, x = branch['br_r'], branch['br_x']
+    return -x / (r**2 + x**2)
+
+
+def _equivalent_rate(rates:List[float], shares:List[float]) -> float:
+    """ limit of the total flow such that each branch carrying `share` of it is within its rate_a (0 for unlimited)
+    """
+    limits = [rate / share for rate, share in zip(rates, shares) if rate > 0.]
+    return min(limits) if len(limits) > 0 else 0.
+
+
+class NetworkReduction:
+    """ network reduction presolve. The reduced network has the same format as the input and can be given to any model of the level,
+    and `expand` maps its solutions back to the original IDs.
+
+    level 'ac' (exact for the AC and DC models):
+        - dangling buses (degree one without generators, loads, and shunts, except the slack bus) are removed.
+          The charging of the stub branch is kept as an equivalent shunt (Kron reduction of the bus) at the neighboring bus.
+        - parallel branches with the same tap ratio and phase shift are merged into one pi-model branch (the series admittances and the charging are summed).
+          rate_a of the merged branch is the smallest total flow that keeps each branch at its series-admittance share within its limit,
+          which is exact for identical circuits. The angle difference limits are intersected.
+    level 'dc' (exact for the DC models, whose branches are the susceptances of `compute_branch_susceptance_matrix`):
+        - radial buses (degree one without generators, except the slack bus) are removed and their loads are moved to the neighboring bus.
+          The flow of the stub branch is then fixed by the loads, and a warning is raised if it violates rate_a.
+        - all the parallel branches are merged by summing the susceptances (rate_a by the susceptance shares).
+        - zero-injection buses of degree two are Kron-reduced by merging the two series branches (rate_a is the smaller one, as they carry the same flow).
+          Zero-injection buses of higher degrees are kept, since their reduction fills in the network and turns the thermal limits of the
+          eliminated branches into constraints on several buses.
+    The reduction is repeated until nothing changes, as merging branches creates new dangling, parallel, or series structures.
+    The thermal limits of the removed stubs and the voltage limits of the removed buses (level 'ac') are not part of the reduced model.
+    The equivalent branches take the ID of one of the merged branches.
+
+        reduction = opf.reduce(network, level='dc')
+        model.instantiate(reduction.network)
+        result = reduction.expand(model.solve())
+
+    Args:
+        network (Dict[str,Any]): pglib network
+        level (str): 'ac' or 'dc'
+    """
+    def __init__(self, network:Dict[str,Any], level:str = 'ac'):
+        if level not in ['ac', 'dc']:
+            raise ValueError(f"level should be 'ac' or 'dc'. But it is now {level}.")
+        tic = time.time()
+        _preprocessing_network(network)
+        self.level = level
+        self.original = network
+        self.network = { key: ({ idx: dict(entry) for idx, entry in value.items() } if key in ['bus', 'gen', 'branch', 'load', 'shunt'] else copy.deepcopy(value))
+                         for key, value in network.items() } # the entries are only reassigned field by field
+        self.network['preprocessed'] = False
+        self.network['name'] = f"{network.get('name', '')}_reduced_{level}"
+        self.eliminated = [] # (bus ID, [(neighboring bus ID, weight)], offset) in the order of the elimination
+        self.merged = {} # equivalent branch ID -> merged branch IDs
+        self._next_shunt_id = max([int(shunt_id) for shunt_id in network['shunt'] if shunt_id.isdigit()], default=0) + 1
+        self._reduce()
+        self.network['preprocessed'] = False
+        _preprocessing_network(self.network)
+        self.time = time.time() - tic
+
+    def _reduce(self) -> None:
+        net = self.network
+        self.incident = { bus_id: set() for bus_id in net['bus'] }
+        for branch_id, branch in net['branch'].items():
+            self.incident[branch['f_bus']].add(branch_id)
+            self.incident[branch['t_bus']].add(branch_id)
+        self.gen_buses = { gen['gen_bus'] for gen in net['gen'].values() }
+        self.attached = {'load': { bus_id: [] for bus_id in net['bus'] }, 'shunt': { bus_id: [] for bus_id in net['bus'] }}
+        for component, field in [('load', 'load_bus'), ('shunt', 'shunt_bus')]:
+            for idx, entry in net[component].items():
+                self.attached[component][entry[field]].append(idx)
+        self.slack = { bus_id for bus_id, bus in net['bus'].items() if bus['bus_type'] == 3 }
+
+        changed = True
+        while changed:
+            changed = self._merge_parallel()
+            for bus_id in list(net['bus'].keys()):
+                if bus_id in self.slack or bus_id in self.gen_buses:
+                    continue
+                degree = len(self.incident[bus_id])
+                if degree == 1:
+                    changed |= self._remove_radial(bus_id)
+                elif degree == 2 and self.level == 'dc':
+                    changed |= self._merge_series(bus_id)
+
+    def _move(self, component:str, field:str, bus_id:str, neighbor:str) -> None:
+        """ move the loads or shunts of the bus to the neighboring bus
+        """
+        for idx in self.attached[component].pop(bus_id):
+            self.network[component][idx][field] = neighbor
+            self.attached[component][neighbor].append(idx)
+        self.attached[component][bus_id] = []
+
+    def _remove_bus(self, bus_id:str, branch_ids:List[str]) -> None:
+        net = self.network
+        for branch_id in branch_ids:
+            branch = net['branch'].pop(branch_id)
+            self.incident[branch['f_bus']].discard(branch_id)
+            self.incident[branch['t_bus']].discard(branch_id)
+        del net['bus'][bus_id]
+        del self.incident[bus_id]
+        del self.attached['load'][bus_id]
+        del self.attached['shunt'][bus_id]
+
+    def _remove_radial(self, bus_id:str) -> bool:
+        net = self.network
+        branch_id = next(iter(self.incident[bus_id]))
+        branch = net['branch'][branch_id]
+        neighbor = branch['t_bus'] if branch['f_bus'] == bus_id else branch['f_bus']
+        if neighbor == bus_id:
+            return False
+        loads = self.attached['load'][bus_id]
+        shunts = self.attached['shunt'][bus_id]
+
+        if self.level == 'ac':
+            if len(loads) > 0 or len(shunts) > 0:
+                return False
+            Yff, Yft, Ytf, Ytt = (Y[0] for Y in _admittance_stamps(_branch_admittance([branch], {branch['f_bus']: 0, branch['t_bus']: 1})))
+            Ymm, Ymn, Ynm, Ynn = (Ytt, Ytf, Yft, Yff) if branch['t_bus'] == bus_id else (Yff, Yft, Ytf, Ytt)
+            Ysh = Ynn - Ynm * Ymn / Ymm # equivalent shunt seen from the neighbor, and V_m = -Ymn V_n / Ymm
+            if abs(Ysh) > 0.:
+                shunt_id = str(self._next_shunt_id)
+                self._next_shunt_id += 1
+                net['shunt'][shunt_id] = {'gs': float(Ysh.real), 'bs': float(Ysh.imag), 'shunt_bus': neighbor, 'status': 1, 'id': int(shunt_id)}
+                self.attached['shunt'][neighbor].append(shunt_id)
+            self.eliminated.append((bus_id, [(neighbor, -Ymn / Ymm)], 0.))
+        else:
+            # the stub carries the load of the bus: b (va_n - va_m) = pd as the flow from the neighbor (in either orientation)
+            pd = sum(net['load'][load_id]['pd'] for load_id in loads)
+            b = _dc_susceptance(branch)
+            rate_a = branch.get('rate_a', 0.) # the parser drops the zero (unlimited) ratings
+            if rate_a > 0. and abs(pd) > rate_a:
+                warnings.warn(f"The flow {pd} of the radial branch {branch_id} to bus {bus_id} exceeds rate_a {rate_a}.", RuntimeWarning)
+            self._move('load', 'load_bus', bus_id, neighbor)
+            self._move('shunt', 'shunt_bus', bus_id, neighbor) # not in the DC models
+            self.eliminated.append((bus_id, [(neighbor, 1.)], -pd / b))
+        self._remove_bus(bus_id, [branch_id])
+        return True
+
+    def _merge_series(self, bus_id:str) -> bool:
+        net = self.network
+        if len(self.attached['load'][bus_id]) > 0:
+            return False
+        (id1, branch1), (id2, branch2) = ((branch_id, net['branch'][branch_id]) for branch_id in sorted(self.incident[bus_id]))
+        bus_a = branch1['t_bus'] if branch1['f_bus'] == bus_id else branch1['f_bus']
+        bus_c = branch2['t_bus'] if branch2['f_bus'] == bus_id else branch2['f_bus']
+        b1, b2 = _dc_susceptance(branch1), _dc_susceptance(branch2)
+        if bus_a == bus_c or b1 + b2 == 0.:
+            return False
+        b = b1 * b2 / (b1 + b2) # flow from a to c: b1 (va_a - va_m) = b2 (va_m - va_c) = b (va_a - va_c)
+        self._move('shunt', 'shunt_bus', bus_id, bus_a) # not in the DC models
+        self.eliminated.append((bus_id, [(bus_a, b1 / (b1 + b2)), (bus_c, b2 / (b1 + b2))], 0.))
+
+        equivalent = dict(branch1)
+        equivalent.update({'f_bus': bus_a, 't_bus': bus_c, 'br_r': 0., 'br_x': -1. / b, 'tap': 1., 'shift': 0., 'transformer': False,
+                           'g_fr': 0., 'b_fr': 0., 'g_to': 0., 'b_to': 0.,
+                           'rate_a': _equivalent_rate([branch1.get('rate_a', 0.), branch2.get('rate_a', 0.)], [1., 1.]),
+                           'angmin': branch1['angmin'] + branch2['angmin'], 'angmax': branch1['angmax'] + branch2['angmax']})
+        self._remove_bus(bus_id, [id1, id2])
+        self._add_branch(id1, equivalent, [id1, id2])
+        return True
+
+    def _add_branch(self, branch_id:str, branch:Dict[str,Any], merged:List[str]) -> None:
+        self.network['branch'][branch_id] = branch
+        self.incident[branch['f_bus']].add(branch_id)
+        self.incident[branch['t_bus']].add(branch_id)
+        self.merged[branch_id] = [original for merged_id in merged for original in self.merged.pop(merged_id, [merged_id])]
+
+    def _merge_parallel(self) -> bool:
+        net = self.network
+        groups = {}
+        for branch_id, branch in net['branch'].items():
+            f_bus, t_bus = branch['f_bus'], branch['t_bus']
+            flip = f_bus > t_bus
+            if self.level == 'ac':
+                if branch['tap'] == 1. and branch['shift'] == 0.: # lines can be flipped
+                    key = (min(f_bus, t_bus), max(f_bus, t_bus), 1., 0.)
+                else:
+                    key, flip = (f_bus, t_bus, branch['tap'], branch['shift']), False
+            else:
+                key = (min(f_bus, t_bus), max(f_bus, t_bus))
+            groups.setdefault(key, []).append((branch_id, flip))
+
+        changed = False
+        for key, members in groups.items():
+            if len(members) < 2:
+                continue
+            ids = sorted(branch_id for branch_id, _ in members)
+            branches = []
+            for branch_id, flip in sorted(members):
+                branch = dict(net['branch'][branch_id])
+                if flip:
+                    branch.update({'f_bus': branch['t_bus'], 't_bus': branch['f_bus'],
+                                   'g_fr': branch['g_to'], 'g_to': branch['g_fr'], 'b_fr': branch['b_to'], 'b_to': branch['b_fr'],
+                                   'angmin': -branch['angmax'], 'angmax': -branch['angmin']})
+                branches.append(branch)
+
+            if self.level == 'ac':
+                ys = [1. / (branch['br_r'] + 1j*branch['br_x']) for branch in branches]
+                y = sum(ys)
+                if y == 0.:
+                    continue
+                z = 1. / y
+                shares = [abs(yk / y) for yk in ys]
+                update = {'br_r': z.real, 'br_x': z.imag}
+                for field in ['g_fr', 'b_fr', 'g_to', 'b_to']:
+                    update[field] = sum(branch[field] for branch in branches)
+            else:
+                bs = [_dc_susceptance(branch) for branch in branches]
+                b = sum(bs)
+                if b == 0. or any(bk * b <= 0. for bk in bs): # series capacitors in parallel are kept
+                    continue
+                shares = [bk / b for bk in bs]
+                update = {'br_r': 0., 'br_x': -1. / b, 'tap': 1., 'shift': 0., 'transformer': False,
+                          'g_fr': 0., 'b_fr': 0., 'g_to': 0., 'b_to': 0.}
+            for field in ['rate_a', 'rate_b', 'rate_c']: # a missing rating is unlimited
+                if any(field in branch for branch in branches):
+                    update[field] = _equivalent_rate([branch.get(field, 0.) for branch in branches], shares)
+            update['angmin'] = max(branch['angmin'] for branch in branches)
+            update['angmax'] = min(branch['angmax'] for branch in branches)
+
+            equivalent = branches[0]
+            equivalent.update(update)
+            for branch_id in ids:
+                branch = net['branch'].pop(branch_id)
+                self.incident[branch['f_bus']].discard(branch_id)
+                self.incident[branch['t_bus']].discard(branch_id)
+            self._add_branch(ids[0], equivalent, ids)
+            changed = True
+        return changed
+
+    def summary(self) -> Dict[str,Any]:
+        """ the numbers of buses and branches before and after the reduction
+        """
+        return {'level': self.level,
+                'bus': (len(self.original['bus']), len(self.network['bus'])),
+                'branch': (len(self.original['branch']), len(self.network['branch'])),
+                'time': self.time}
+
+    def _expand_voltages(self, values:Dict[str,complex]) -> Dict[str,complex]:
+        values = dict(values)
+        for bus_id, neighbors, offset in reversed(self.eliminated):
+            values[bus_id] = sum(weight * values[neighbor] for neighbor, weight in neighbors) + offset
+        return values
+
+    def expand(self, result:Dict[str,Any]) -> Dict[str,Any]:
+        """ map a solution of the reduced network (`model.solve` or `ac_power_flow`) to the original IDs.
+        The voltages of the eliminated buses are recovered from their neighbors, and the flows of all the original branches are
+        evaluated from the voltages (by the DC power flow of the dispatch if the solution has no angles, e.g., `dcopf-ptdf`).
+        The generators are not changed by the reduction, so 'pg' and 'qg' are kept. Only the primal solution is expanded.
+
+        Returns:
+            Dict[str,Any]: result with the primal solution over the original buses and branches
+        """
+        primal = result['sol']['primal']
+        expanded = dict(primal)
+        buses = self.original['bus']
+        branches = self.original['branch']
+        bus_array = lambda values: np.fromiter((values[bus_id] for bus_id in buses), dtype=complex, count=len(buses))
+
+        if 'vm' in primal: # AC
+            V = self._expand_voltages({ bus_id: primal['vm'][bus_id] * np.exp(1j * primal['va'][bus_id]) for bus_id in primal['vm'] })
+            expanded['vm'] = { bus_id: float(abs(V[bus_id])) for bus_id in buses }
+            expanded['va'] = { bus_id: float(np.angle(V[bus_id])) for bus_id in buses }
+            if 'pf_from' in primal:
+                _, Yf, Yt = compute_admittance_matrix(self.original)
+                V = bus_array(V)
+                f_idx = np.fromiter((buses[branch['f_bus']]['index'] for branch in branches.values()), dtype=int, count=len(branches))
+                t_idx = np.fromiter((buses[branch['t_bus']]['index'] for branch in branches.values()), dtype=int, count=len(branches))
+                Sf = V[f_idx] * np.conj(Yf @ V)
+                St = V[t_idx] * np.conj(Yt @ V)
+                for name, values in [('pf_from', Sf.real), ('qf_from', Sf.imag), ('pf_to', St.real), ('qf_to', St.imag)]:
+                    expanded[name] = dict(zip(branches.keys(), values.tolist()))
+        elif 'va' in primal: # DC with angles
+            va = self._expand_voltages(primal['va'])
+            expanded['va'] = { bus_id: float(np.real(va[bus_id])) for bus_id in buses }
+            if 'pf' in primal:
+                pf = compute_branch_susceptance_matrix(self.original) @ bus_array(expanded['va']).real
+                expanded['pf'] = dict(zip(branches.keys(), pf.tolist()))
+        elif 'qg' not in primal: # DC without angles
+            gens, loads = self.original['gen'], self.original['load']
+            pg = np.fromiter((primal['pg'][gen_id] for gen_id in gens), dtype=float, count=len(gens))
+            pd = np.fromiter((load['pd'] for load in loads.values()), dtype=float, count=len(loads))
+            pf = DCPowerFlow(self.original).solve(pg, pd, return_va=False)['pf']
+            expanded['pf'] = dict(zip(branches.keys(), pf.tolist()))
+        return {**result, 'sol': {'primal': expanded}}
+
+
+def reduce(network:Dict[str,Any], level:str = 'ac') -> NetworkReduction:
+    """ network reduction presolve (dangling and radial buses, parallel branches, and series Kron reduction for 'dc').
+    See `NetworkReduction` for the levels.
+
+        reduction = opf.reduce(network, level='dc')
+        print(reduction.summary())
+        result = reduction.expand(solve(reduction.network))
+    """
+    return NetworkReduction(network, level)
@@ -0,0 +1,191 @@
+""" rolling-horizon multi-period DC-OPF for long load profiles (e.g., a year of hourly loads).
+The horizon is covered by overlapping windows of `window` periods (`DCOPFMultiPeriodModel`), and only the first `step` periods of each window are committed:
+
+    window k:   periods [k*step, k*step + window)   ->  commit [k*step, (k+1)*step)
+    window k+1: the ramps start from the last committed generation (`pg_prev`), and the warm start is the solution of window k shifted by `step`
+
+The instances are built once per window length and reused by updating the loads and the boundary conditions (mutable parameters),
+and the committed periods are written to disk as JSON lines after each window, so that the memory does not grow with the horizon.
+"""
+from typing import Any, Dict, Union
+import json
+import time
+import numpy as np
+import pyomo.environ as pyo
+
+from .dcopf_mp import DCOPFMultiPeriodModel
+from .utils import _preprocessing_network
+
+
+_primal_vars = ['pg', 'va', 'pf']
+
+
+def _window_values(instance:pyo.ConcreteModel, name:str, ids:list, length:int) -> np.ndarray:
+    """ (IDs x periods) values of a variable of the multi-period instance
+    """
+    var = getattr(instance, name)
+    return np.asarray([[var[i,t].value for t in range(length)] for i in ids], dtype=float)
+
+
+def _shifted_warmstart(values:Dict[str,np.ndarray], ids:Dict[str,list], shift:int, length:int) -> Dict[str,Any]:
+    """ primal warm start of `setup_warmstart` from the previous window shifted by `shift` periods.
+    The periods after the end of the previous window repeat its last period.
+    """
+    primal = {}
+    for name, array in values.items():
+        cols = np.minimum(np.arange(length) + shift, array.shape[1] - 1)
+        shifted = array[:,cols]
+        primal[name] = { str((idx, t)): shifted[row,t] for row, idx in enumerate(ids[name]) for t in range(length) }
+    return {'primal': primal}
+
+
+def solve_rolling_horizon(network:Dict[str,Any],
+                          load_profile:np.ndarray,
+                          window:int = 24,
+                          step:int = None,
+                          solver:Union[str,pyo.SolverFactory] = 'ipopt',
+                          solver_option:Dict[str,Any] = {},
+                          ramp:str = 'ramp_30',
+                          interval:float = 60.,
+                          pg_prev:Dict[str,float] = None,
+                          output:str = None,
+                          log:str = None,
+                          tee:bool = False) -> Dict[str,Any]:
+    """ solve the multi-period DC-OPF of a long load profile by rolling horizon.
+
+        result = opf.solve_rolling_horizon(network, load_profile, window=48, step=24, output='dispatch.jsonl', log='progress.jsonl')
+        dispatch = opf.read_rolling_horizon('dispatch.jsonl')
+
+    Args:
+        network (Dict[str,Any]): pglib network
+        load_profile (np.ndarray): T x L active loads (p.u.), the columns ordered by the load indices
+        window (int): the number of periods of each window (the look-ahead)
+        step (int): the number of committed periods of each window (window // 2 by default)
+        solver (Union[str,pyo.SolverFactory]): solver of the windows
+        solver_option (Dict[str,Any]): options of the solver (e.g., {'warm_start_init_point': 'yes'} of IPOPT)
+        ramp (str): `ramp` of `DCOPFMultiPeriodModel`
+        interval (float): `interval` of `DCOPFMultiPeriodModel` in minutes
+        pg_prev (Dict[str,float]): (optional) generations before the first period
+        output (str): (optional) path of the JSON lines of the committed periods ('period', 'window', 'pg', 'va', 'pf').
+                      The solutions are kept in the result instead if not given.
+        log (str): (optional) path of the JSON lines of the window summaries ('window', 'start', 'length', 'committed', 'termination_status', 'time', 'obj_cost')
+        tee (bool): show the solver logs
+
+    Returns:
+        Dict[str,Any]: 'termination_status' ('optimal', or the status of the first window not solved), 'time', 'obj_cost' of the committed periods,
+                       'nwindows', 'nperiods' (committed), 'output', and 'sol' with the multi-period primal solution if `output` is not given
+    """
+    load_profile = np.asarray(load_profile, dtype=float)
+    T = load_profile.shape[0]
+    step = step if step is not None else max(window // 2, 1)
+    if not 1 <= step <= window:
+        raise ValueError(f"step should be between 1 and window {window}. But it is now {step}.")
+    tic = time.time()
+    _preprocessing_network(network)
+    gens, buses, branches = network['gen'], network['bus'], network['branch']
+    ids = {'pg': sorted(gens.keys()), 'va': sorted(buses.keys()), 'pf': sorted(branches.keys())}
+    cost = np.asarray([gens[gen_id]['cost'] for gen_id in ids['pg']], dtype=float)
+    pgmin = np.asarray([gens[gen_id]['pmin'] for gen_id in ids['pg']], dtype=float)
+    pgmax = np.asarray([gens[gen_id]['pmax'] for gen_id in ids['pg']], dtype=float)
+    rate_a = np.asarray([branches[branch_id].get('rate_a', 0.) for branch_id in ids['pf']], dtype=float) # the parser drops the zero ratings
+    rate_a = np.where(rate_a > 0., rate_a, np.inf)
+
+    models = {} # the instances per (window length, generators of pg_prev)
+    values, prev = None, pg_prev
+    total_cost, status, nwindows, ncommitted = 0., 'optimal', 0, 0
+    sol = { name: {} for name in _primal_vars } if output is None else None
+    out = open(output, 'w') if output is not None else None
+    logger = open(log, 'w') if log is not None else None
+    try:
+        for start in range(0, T, step):
+            length = min(window, T - start)
+            committed = length if start + length >= T else step
+            profile = load_profile[start:start+length]
+
+            key = (length, frozenset(prev) if prev is not None else None)
+            model = models.get(key)
+            if model is None:
+                model = DCOPFMultiPeriodModel('dcopf-mp', ramp=ramp, interval=interval)
+                model._build_model()
+                model.instance = model._instantiate(network, None, False, profile, prev)
+                model.append_suffix(model.instance)
+                models[key] = model
+            else: # update the loads and the boundary conditions
+                m = model.instance
+                for load_id in m.L:
+                    col = network['load'][load_id]['index']
+                    for t in range(length):
+                        m.pd[load_id,t].set_value(profile[t,col])
+                for gen_id in m.G_prev:
+                    m.pg_prev[gen_id].set_value(prev[gen_id])
+            if values is not None: # within the bounds, against the round-off of the solver
+                warmstart = {'pg': np.clip(values['pg'], pgmin[:,None], pgmax[:,None]), 'va': values['va'],
+                             'pf': np.clip(values['pf'], -rate_a[:,None], rate_a[:,None])}
+                model.setup_warmstart(_shifted_warmstart(warmstart, ids, step, length))
+
+            result = model.solve(solver, solver_option, tee=tee)
+            nwindows += 1
+            values = { name: _window_values(model.instance, name, ids[name], length) for name in _primal_vars } \
+                     if 'primal' in result['sol'] else None
+            window_cost = float(np.sum(cost[:,0:1] * values['pg'][:,:committed]**2 + cost[:,1:2] * values['pg'][:,:committed] + cost[:,2:3])) \
+                          if values is not None else float('nan')
+            if logger is not None:
+                logger.write(json.dumps({'window': nwindows - 1, 'start': start, 'length': length, 'committed': committed,
+                                         'termination_status': result['termination_status'], 'time': result['time'],
+                                         'obj_cost': window_cost}) + '\n')
+                logger.flush()
+            if values is None:
+                status = result['termination_status']
+                break
+
+            total_cost += window_cost
+            ncommitted += committed
+            for t in range(committed):
+                if out is not None:
+                    out.write(json.dumps({'period': start + t, 'window': nwindows - 1,
+                                          **{ name: dict(zip(ids[name], values[name][:,t].tolist())) for name in _primal_vars }}) + '\n')
+                else:
+                    for name in _primal_vars:
+                        sol[name].update({ str((idx, start + t)): values[name][row,t] for row, idx in enumerate(ids[name]) })
+            if out is not None:
+                out.flush()
+            prev = dict(zip(ids['pg'], values['pg'][:,committed-1].tolist())) # the terminal state of the committed periods
+            if start + length >= T:
+                break
+    finally:
+        if out is not None:
+            out.close()
+        if logger is not None:
+            logger.close()
+
+    results = {'termination_status': status,
+               'time': time.time() - tic,
+               'obj_cost': total_cost,
+               'nwindows': nwindows,
+               'nperiods': ncommitted,
+               'output': output}
+    if sol is not None:
+        results['sol'] = {'primal': sol}
+    return results
+
+
+def read_rolling_horizon(output:str) -> Dict[str,Any]:
+    """ committed periods written by `solve_rolling_horizon` as arrays
+
+    Returns:
+        Dict[str,Any]: 'pg', 'va', and 'pf' (IDs x periods), and their 'ids' and 'periods'
+    """
+    columns = { name: [] for name in _primal_vars }
+    periods, ids = [], None
+    with open(output, 'r') as f:
+        for line in f:
+            record = json.loads(line)
+            periods.append(record['period'])
+            if ids is None:
+                ids = { name: list(record[name].keys()) for name in _primal_vars }
+            for name in _primal_vars:
+                columns[name].append([record[name][idx] for idx in ids[name]])
+    results = { name: np.asarray(columns[name], dtype=float).reshape(len(periods), -1).T for name in _primal_vars }
+    results['ids'] = ids if ids is not None else { name: [] for name in _primal_vars }
+    results['periods'] = np.asarray(periods, dtype=int)
+    return results
@@ -0,0 +1,133 @@
+from typing import Dict, Any, List, Union
+import numpy as np
+from scipy.sparse import csc_array, diags
+from scipy.sparse.linalg import splu
+
+
+class DCSensitivity:
+    """ DC sensitivity factors (bus-to-branch PTDF and LODF) maintained under topology switching.
+
+    Unlike `compute_ptdf`, which works on the in-service branches re-indexed by `_preprocessing_network`,
+    this class keeps a row for every branch in the network (including out-of-service ones), so that branch indexing is stable across switching.
+    Each status change updates the PTDF with a Sherman-Morrison rank-one correction of the inverse of the bus susceptance matrix,
+    and the factors are recomputed from scratch every `refactor_every` switches to control the numerical drift.
+
+    Args:
+        network (Dict[str,Any]): pglib network
+        refactor_every (int): the number of switches between exact refactorizations. No periodic refactorization if None.
+        tol (float): tolerance to detect the switching causing network isolation
+    """
+    def __init__(self, network:Dict[str,Any], refactor_every:int = 50, tol:float = 1e-8):
+        buses = network['bus']
+        branches = network['branch']
+        self.bus_ids = list(buses.keys()) # same ordering as the bus index of `_preprocessing_network`
+        self.branch_ids = sorted(list(branches.keys()))
+        self.bus_idx = { bus_id: idx for idx, bus_id in enumerate(self.bus_ids) }
+        self.branch_idx = { branch_id: idx for idx, branch_id in enumerate(self.branch_ids) }
+
+        slack = [ self.bus_idx[bus_id] for bus_id in self.bus_ids if buses[bus_id]['bus_type'] == 3]
+        if len(slack) != 1:
+            raise ValueError(f'The number of slack buses should be 1. But it is now {len(slack)}.')
+        self.slack = slack[0]
+
+        self.f_idx = np.asarray([self.bus_idx[branches[branch_id]['f_bus']] for branch_id in self.branch_ids], dtype=int)
+        self.t_idx = np.asarray([self.bus_idx[branches[branch_id]['t_bus']] for branch_id in self.branch_ids], dtype=int)
+        r = np.asarray([branches[branch_id]['br_r'] for branch_id in self.branch_ids])
+        x = np.asarray([branches[branch_id]['br_x'] for branch_id in self.branch_ids])
+        self.b = -x / (r**2 + x**2) # susceptance
+        self.status = np.asarray([branches[branch_id]['br_status'] > 0 for branch_id in self.branch_ids])
+
+        E, B = len(self.branch_ids), len(self.bus_ids)
+        rows = np.repeat(np.arange(E), 2)
+        cols = np.stack([self.f_idx, self.t_idx], axis=1).ravel()
+        data = np.tile([1., -1.], E)
+        self.A = csc_array((data, (rows, cols)), shape=(E, B)) # branch-bus incidence matrix
+
+        self.refactor_every = refactor_every
+        self.tol = tol
+        self.nswitch = 0 # the number of switches since the last refactorization
+        self.refactorize()
+
+    def refactorize(self) -> None:
+        """ recompute the inverse of the bus susceptance matrix (X) and PTDF exactly for the current branch statuses
+        """
+        B = len(self.bus_ids)
+        b_eff = self.b * self.status
+        S_b = csc_array(self.A.T @ diags(b_eff) @ self.A).tolil()
+        S_b[self.slack,:] = 0.
+        S_b[:,self.slack] = 0.
+        S_b[self.slack,self.slack] = 1.
+
+        X = splu(csc_array(S_b)).solve(np.eye(B))
+        X[self.slack,:] = 0.
+        X[:,self.slack] = 0.
+        self.X = X # BxB
+        self.ptdf_nominal = self.b[:,None] * (self.A @ X) # ExB, flows per unit injection as if every branch is in service
+        self.nswitch = 0
+
+    @property
+    def ptdf(self) -> np.ndarray:
+        """ ExB bus-to-branch PTDF. Rows of the out-of-service branches are zero.
+        """
+        return self.ptdf_nominal * self.status[:,None]
+
+    def apply_switch(self, branch_id:str, in_service:bool) -> None:
+        """ switch a branch in or out of service and update the sensitivity factors with a rank-one correction
+
+        Args:
+            branch_id (str): branch ID
+            in_service (bool): new status of the branch
+        """
+        if branch_id not in self.branch_idx:
+            raise RuntimeError(f"Branch ID {branch_id} is not placed in the given network.")
+        l = self.branch_idx[branch_id]
+        if bool(self.status[l]) == bool(in_service):
+            return
+
+        # S_b' = S_b + delta * a a^T with a = e_f - e_t
+        delta = self.b[l] if in_service else -self.b[l]
+        f, t = self.f_idx[l], self.t_idx[l]
+        u = self.X[:,f] - self.X[:,t] # X a
+        denom = 1. + delta * (u[f] - u[t])
+        if abs(denom) <= self.tol:
+            raise ValueError(f"Switching out branch ID {branch_id} causes network isolation.")
+
+        Au = u[self.f_idx] - u[self.t_idx] # A X a
+        self.X -= (delta / denom) * np.outer(u, u)
+        self.ptdf_nominal -= (delta / denom) * np.outer(self.b * Au, u)
+        self.status[l] = bool(in_service)
+        self.nswitch += 1
+
+        if self.refactor_every is not None and self.nswitch >= self.refactor_every:
+            self.refactorize()
+
+    def lodf(self, outages:Union[str,List[str]] = 'all') -> np.ndarray:
+        """ line outage distribution factors for the current topology
+
+        Args:
+            outages (Union[str,List[str]]): 'all' (in-service branches) or branch ID list of the outages
+
+        Returns:
+            np.ndarray: ExK LODF matrix. Columns of the outages causing network isolation are nan.
+        """
+        if isinstance(outages, str):
+            if outages.lower() != 'all':
+                raise RuntimeError("The argument 'outages' should be 'all' or specify the branch ID list")
+            outages = [branch_id for branch_id, status in zip(self.branch_ids, self.status) if status]
+        outage_idxs = np.asarray([self.branch_idx[branch_id] for branch_id in outages], dtype=int)
+        if not np.all(self.status[outage_idxs]):
+            raise ValueError("Outages should be in service.")
+
+        noutage = outage_idxs.size
+        PTDF_MO = (self.ptdf @ self.A.T[:,outage_idxs]) # ExK branch-to-branch PTDF
+        PTDF_OO = PTDF_MO[outage_idxs, np.arange(noutage)]
+        islanding = np.abs(1.-PTDF_OO) <= self.tol
+        LODF = PTDF_MO * (1./np.where(islanding, 1., 1.-PTDF_OO))
+        LODF[outage_idxs, np.arange(noutage)] = -1.
+        LODF[:, islanding] = np.nan
+        return LODF
+
+    def flows(self, injection:np.ndarray) -> np.ndarray:
+        """ branch flows for bus injections (B or BxN), where the slack bus balances the injections
+        """
+        return self.ptdf @ injection
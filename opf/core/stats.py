@@ -0,0 +1,122 @@
+""" solver telemetry (`result['stats']`) parsed from the output of IPOPT, which Pyomo captures whether or not `tee` is set.
+
+    result = model.solve('ipopt')
+    result['stats']['iterations'], result['stats']['restoration_entries'], result['stats']['complementarity']
+
+The final errors are the unscaled values of IPOPT ('scaled' has the scaled ones). The time in the linear solver needs the timing table of IPOPT
+(`solver_option={'print_timing_statistics': 'yes'}`); otherwise only the split between the function evaluations and the rest of IPOPT is printed.
+"""
+from typing import Any, Dict
+import re
+
+
+_number = r'([-+]?(?:\d+\.?\d*|\.\d+)(?:[eEdD][-+]?\d+)?)'
+_iteration = re.compile(r'^\s*(\d+)(r?)\s+[-+]?\d\.\d+[eE][-+]\d+', flags=re.MULTILINE) # the rows of the iteration table ('r' in the restoration phase)
+_final = { # the final table, (scaled) and (unscaled)
+    'objective': 'Objective',
+    'dual_infeasibility': 'Dual infeasibility',
+    'constraint_violation': 'Constraint violation',
+    'variable_bound_violation': 'Variable bound violation',
+    'complementarity': 'Complementarity',
+    'nlp_error': 'Overall NLP error',
+}
+_evaluations = { # the equality and the inequality constraints are evaluated by the same callbacks (as in `ACOPFNLP.nevaluation`)
+    'objective': ['objective function'],
+    'gradient': ['objective gradient'],
+    'constraints': ['equality constraint', 'inequality constraint'],
+    'jacobian': ['equality constraint Jacobian', 'inequality constraint Jacobian'],
+    'hessian': ['Lagrangian Hessian'],
+}
+_problem = {
+    'nvariables': 'Total number of variables',
+    'nequality': 'Total number of equality constraints',
+    'ninequality': 'Total number of inequality constraints',
+}
+_linear_solver = ['LinearSystemSymbolicFactorization', 'LinearSystemFactorization', 'LinearSystemBackSolve']
+
+
+def _float(text:str) -> float:
+    return float(text.replace('D', 'e').replace('d', 'e'))
+
+
+def parse_ipopt_log(log:str) -> Dict[str,Any]:
+    """ parse the output of IPOPT (print_level >= 5, the default) into the solver statistics.
+    The entries not printed by IPOPT are None (e.g., all of them with print_level = 0).
+
+    Args:
+        log (str): output of IPOPT
+
+    Returns:
+        Dict[str,Any]: 'solver' ('ipopt'), 'iterations', 'restoration_iterations', 'restoration_entries' (the times the restoration phase started),
+                       'objective', 'dual_infeasibility', 'constraint_violation', 'variable_bound_violation', 'complementarity', 'nlp_error',
+                       'scaled' (the final errors scaled), 'evaluations' ('objective', 'gradient', 'constraints', 'jacobian', 'hessian'),
+                       'time_total', 'time_function_evaluations', 'time_linear_solver', 'timing' (the wall time of each entry of the timing table),
+                       'nvariables', 'nequality', 'ninequality', and 'exit' (the message of IPOPT)
+    """
+    stats = {'solver': 'ipopt', 'iterations': None, 'restoration_iterations': 0, 'restoration_entries': 0}
+    # the statistics are printed before and after the iteration table, which is scanned only for the iterations
+    start, end = log.find('\niter '), log.rfind('\nNumber of Iterations')
+    head = log[:start] if start >= 0 else log
+    tail = log[end:] if end >= 0 else log
+    table = log[max(start, 0):end if end >= 0 else len(log)]
+
+    restoration = False
+    last = None
+    for number, marker in _iteration.findall(table):
+        last = int(number)
+        if marker and not restoration:
+            stats['restoration_entries'] += 1
+        stats['restoration_iterations'] += bool(marker)
+        restoration = bool(marker)
+    found = re.search(r'^Number of Iterations\.*:\s*(\d+)', tail, flags=re.MULTILINE)
+    stats['iterations'] = int(found.group(1)) if found else last
+
+    stats['scaled'] = {}
+    for key, label in _final.items():
+        found = re.search(rf'^{label}\.*:\s*{_number}\s+{_number}', tail, flags=re.MULTILINE)
+        stats['scaled'][key] = _float(found.group(1)) if found else None
+        stats[key] = _float(found.group(2)) if found else None
+
+    stats['evaluations'] = {}
+    for key, labels in _evaluations.items():
+        counts = [re.search(rf'^Number of {label} evaluations\s*=\s*(\d+)', tail, flags=re.MULTILINE) for label in labels]
+        counts = [int(found.group(1)) for found in counts if found]
+        stats['evaluations'][key] = max(counts) if counts else None
+
+    for key, label in _problem.items():
+        found = re.search(rf'^{label}\.*:\s*(\d+)', head, flags=re.MULTILINE)
+        stats[key] = int(found.group(1)) if found else None
+
+    # IPOPT <= 3.13 prints 'Total CPU secs in ...', 3.14 'Total seconds in ...' (the split only with the timing table)
+    found = re.search(rf'^Total (?:CPU secs|seconds) in IPOPT \(w/o function evaluations\)\s*=\s*{_number}', tail, flags=re.MULTILINE)
+    time_ipopt = _float(found.group(1)) if found else None
+    found = re.search(rf'^Total (?:CPU secs|seconds) in NLP function evaluations\s*=\s*{_number}', tail, flags=re.MULTILINE)
+    stats['time_function_evaluations'] = _float(found.group(1)) if found else None
+    found = re.search(rf'^Total seconds in IPOPT\s*=\s*{_number}', tail, flags=re.MULTILINE)
+    if found:
+        stats['time_total'] = _float(found.group(1))
+    elif time_ipopt is not None and stats['time_function_evaluations'] is not None:
+        stats['time_total'] = time_ipopt + stats['time_function_evaluations']
+    else:
+        stats['time_total'] = None
+
+    stats['timing'] = { name: _float(wall) for name, _, _, wall in
+                        re.findall(rf'^\s*(\w[\w ]*?)\.*:\s*{_number}\s+\(sys:\s*{_number}\s+wall:\s*{_number}\)', tail, flags=re.MULTILINE) }
+    if 'Function Evaluations' in stats['timing']:
+        stats['time_function_evaluations'] = stats['timing']['Function Evaluations']
+    stats['time_linear_solver'] = sum(stats['timing'][name] for name in _linear_solver if name in stats['timing']) \
+                                  if any(name in stats['timing'] for name in _linear_solver) else None
+
+    found = re.search(r'^EXIT:\s*(.*?)\s*$', tail, flags=re.MULTILINE)
+    stats['exit'] = found.group(1) if found else None
+    return stats
+
+
+def _solver_stats(optimizer) -> Dict[str,Any]:
+    """ the statistics of the last `optimizer.solve` of Pyomo. The output of the shell solvers is kept in `optimizer._log` even without `tee`.
+    """
+    name = str(getattr(optimizer, 'name', type(optimizer).__name__))
+    log = getattr(optimizer, '_log', None)
+    if name.lower().startswith('ipopt') and isinstance(log, str):
+        return parse_ipopt_log(log)
+    return {'solver': name}
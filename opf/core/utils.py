@@ -1,6 +1,8 @@
-from typing import Dict, Any, Tuple
+from typing import Dict, Any, Tuple, List
 import numpy as np
-from scipy.sparse import csc_array
+from scipy.sparse import csc_array, diags
+
+from .profiler import _stage
 
 
 def compute_branch_susceptance_matrix(network):
@@ -133,35 +135,176 @@ def compute_line_incidence_matrix(network):
 
 def _preprocessing_network(network:Dict[str,Any]) -> None:
     if network['preprocessed']: return
-    gens = network['gen']
-    branches = network['branch']
-    genids_all = sorted(list(gens.keys())) 
-    genids = [gen_id for gen_id in genids_all if gens[gen_id]['gen_status']>0] # factor out not working generators
+    with _stage('preprocess'):
+        gens = network['gen']
+        branches = network['branch']
+        genids_all = sorted(list(gens.keys())) 
+        genids = [gen_id for gen_id in genids_all if gens[gen_id]['gen_status']>0] # factor out not working generators
 
-    branchids_all = sorted(list(branches.keys()))
-    branchids = [branch_id for branch_id in branchids_all if branches[branch_id]['br_status']>0] # factor out not working branches
+        branchids_all = sorted(list(branches.keys()))
+        branchids = [branch_id for branch_id in branchids_all if branches[branch_id]['br_status']>0] # factor out not working branches
     
-    gens_new = {}
-    for genidx, genid in enumerate(genids):
-        gen = gens[genid]
-        gen['index'] = genidx
-        gens_new[genid] = gen
-    network['gen'] = gens_new # update
-
-    branches_new = {}
-    for branchidx, branchid in enumerate(branchids):
-        branch = branches[branchid]
-        branch['index'] = branchidx
-        branches_new[branchid] = branch
-    network['branch'] = branches_new # update
+        gens_new = {}
+        for genidx, genid in enumerate(genids):
+            gen = gens[genid]
+            gen['index'] = genidx
+            gens_new[genid] = gen
+        network['gen'] = gens_new # update
+
+        branches_new = {}
+        for branchidx, branchid in enumerate(branchids):
+            branch = branches[branchid]
+            branch['index'] = branchidx
+            branches_new[branchid] = branch
+        network['branch'] = branches_new # update
     
-    for busidx, (busid, bus) in enumerate(network['bus'].items()):
-        bus['index'] = busidx
+        for busidx, (busid, bus) in enumerate(network['bus'].items()):
+            bus['index'] = busidx
     
-    for loadidx, (loadid, load) in enumerate(network['load'].items()):
-        load['index'] = loadidx
+        for loadidx, (loadid, load) in enumerate(network['load'].items()):
+            load['index'] = loadidx
     
-    for shuntidx, (shuntid, shunt) in enumerate(network['shunt'].items()):
-        shunt['index'] = shuntidx
+        for shuntidx, (shuntid, shunt) in enumerate(network['shunt'].items()):
+            shunt['index'] = shuntidx
+
+        network['preprocessed'] = True
+
+
+def _get_slack_idx(network:Dict[str,Any]) -> int:
+    buses = network['bus']
+    busids = sorted(list(buses.keys()))
+    slack = [ buses[busid]['index'] for busid in busids if buses[busid]['bus_type'] == 3]
+    if len(slack) != 1:
+        raise ValueError(f'The number of slack buses should be 1. But it is now {len(slack)}.')
+    return slack[0]
+
+
+def compute_branch_admittance(network:Dict[str,Any]) -> Dict[str,np.ndarray]:
+    """ branch parameters of the pi-model as arrays ordered by the branch indices,
+    using the same fields as `ACOPFModel._instantiate` (g, b, T_R, T_I, T_m, g_fr, b_fr, g_to, b_to).
+
+    Returns:
+        Dict[str,np.ndarray]: 'f_idx', 't_idx' (bus indices), 'g', 'b', 'T_R', 'T_I', 'T_m', 'g_fr', 'b_fr', 'g_to', 'b_to'
+    """
+    _preprocessing_network(network)
+    bus_idx = { bus_id: bus['index'] for bus_id, bus in network['bus'].items() }
+    return _branch_admittance(sorted(network['branch'].values(), key=lambda branch: branch['index']), bus_idx)
+
+
+def _branch_admittance(branchlist:List[Dict[str,Any]], bus_idx:Dict[str,int]) -> Dict[str,np.ndarray]:
+    f_idx = np.asarray([bus_idx[branch['f_bus']] for branch in branchlist], dtype=int)
+    t_idx = np.asarray([bus_idx[branch['t_bus']] for branch in branchlist], dtype=int)
+    fields = np.asarray([[branch['br_r'], branch['br_x'], branch['tap'], branch['shift'],
+                          branch['g_fr'], branch['b_fr'], branch['g_to'], branch['b_to']] for branch in branchlist], dtype=float).reshape(-1, 8)
+    r, x, T_m, shift = fields[:,0], fields[:,1], fields[:,2], fields[:,3]
+    return {
+        'f_idx': f_idx,
+        't_idx': t_idx,
+        'g': r / (r**2 + x**2),
+        'b': -x / (r**2 + x**2),
+        'T_R': T_m * np.cos(shift),
+        'T_I': T_m * np.sin(shift),
+        'T_m': T_m,
+        'g_fr': fields[:,4], 'b_fr': fields[:,5],
+        'g_to': fields[:,6], 'b_to': fields[:,7],
+    }
+
+
+def compute_branch_flow_coefficients(branch:Dict[str,np.ndarray]) -> Dict[str,np.ndarray]:
+    """ per-branch coefficients of the pi-model flows, so that (with vv = vm_f*vm_t and dva = va_f - va_t)
+
+        pf_from =  g_ff vm_f^2 + g_ft vv cos(dva) + b_ft vv sin(dva)
+        qf_from = -b_ff vm_f^2 - b_ft vv cos(dva) + g_ft vv sin(dva)
+        pf_to   =  g_tt vm_t^2 + g_tf vv cos(dva) - b_tf vv sin(dva)
+        qf_to   = -b_tt vm_t^2 - b_tf vv cos(dva) - g_tf vv sin(dva)
+
+    which are the flows of `cnst_ohm_*_exp` with the tap ratios and the phase shifts folded in.
+
+    Args:
+        branch (Dict[str,np.ndarray]): branch parameters of `compute_branch_admittance`
+
+    Returns:
+        Dict[str,np.ndarray]: 'g_ff', 'b_ff', 'g_ft', 'b_ft', 'g_tt', 'b_tt', 'g_tf', 'b_tf'
+    """
+    g, b, T_R, T_I, T_m2 = branch['g'], branch['b'], branch['T_R'], branch['T_I'], branch['T_m']**2
+    return {
+        'g_ff': (g + branch['g_fr']) / T_m2,
+        'b_ff': (b + branch['b_fr']) / T_m2,
+        'g_ft': (-g * T_R + b * T_I) / T_m2,
+        'b_ft': (-b * T_R - g * T_I) / T_m2,
+        'g_tt': g + branch['g_to'],
+        'b_tt': b + branch['b_to'],
+        'g_tf': (-g * T_R - b * T_I) / T_m2,
+        'b_tf': (-b * T_R + g * T_I) / T_m2,
+    }
+
+
+def _branch_flow_coefficients(branch:Dict[str,np.ndarray]) -> Dict[str,Tuple[np.ndarray, ...]]:
+    """ coefficients of `compute_branch_flow_coefficients` arranged in the common form of the four flows
+
+        flow = a * vm_k**2 + vm_f * vm_t * (c * cos(va_f - va_t) + s * sin(va_f - va_t))
+
+    where k is the from bus (pf_from, qf_from) or the to bus (pf_to, qf_to).
+
+    Returns:
+        Dict[str,Tuple[np.ndarray, ...]]: (a, c, s, at_from) per flow name
+    """
+    coef = compute_branch_flow_coefficients(branch)
+    return {
+        'pf_from': (coef['g_ff'], coef['g_ft'], coef['b_ft'], True),
+        'pf_to': (coef['g_tt'], coef['g_tf'], -coef['b_tf'], False),
+        'qf_from': (-coef['b_ff'], -coef['b_ft'], coef['g_ft'], True),
+        'qf_to': (-coef['b_tt'], -coef['b_tf'], -coef['g_tf'], False),
+    }
+
+
+def compute_shunt_admittance(network:Dict[str,Any]) -> np.ndarray:
+    """ B-dimensional complex vector of the bus shunt admittances (gs + j bs)
+    """
+    _preprocessing_network(network)
+    buses = network['bus']
+    shunts = network['shunt']
+    Ysh = np.zeros(len(buses), dtype=complex)
+    if len(shunts) > 0:
+        shunt_idx = np.asarray([buses[shunt['shunt_bus']]['index'] for shunt in shunts.values()], dtype=int)
+        ysh = np.asarray([shunt['gs'] + 1j*shunt['bs'] for shunt in shunts.values()], dtype=complex)
+        np.add.at(Ysh, shunt_idx, ysh)
+    return Ysh
+
+
+def _admittance_stamps(branch:Dict[str,np.ndarray]) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """ 2x2 admittance stamps (Yff, Yft, Ytf, Ytt) of the pi-model branches given by `compute_branch_admittance`
+    """
+    ys = branch['g'] + 1j*branch['b']
+    tap = branch['T_R'] + 1j*branch['T_I']
+    Yff = (ys + branch['g_fr'] + 1j*branch['b_fr']) / branch['T_m']**2
+    Yft = -ys / np.conj(tap)
+    Ytf = -ys / tap
+    Ytt = ys + branch['g_to'] + 1j*branch['b_to']
+    return Yff, Yft, Ytf, Ytt
+
+
+def _assemble_admittance_matrix(branch:Dict[str,np.ndarray], Ysh:np.ndarray) -> Tuple[csc_array, csc_array, csc_array]:
+    B = Ysh.size
+    E = branch['f_idx'].size
+    Yff, Yft, Ytf, Ytt = _admittance_stamps(branch)
+
+    rows = np.concatenate([np.arange(E), np.arange(E)])
+    cols = np.concatenate([branch['f_idx'], branch['t_idx']])
+    Yf = csc_array((np.concatenate([Yff, Yft]), (rows, cols)), shape=(E, B))
+    Yt = csc_array((np.concatenate([Ytf, Ytt]), (rows, cols)), shape=(E, B))
+
+    Cf = csc_array((np.ones(E), (branch['f_idx'], np.arange(E))), shape=(B, E))
+    Ct = csc_array((np.ones(E), (branch['t_idx'], np.arange(E))), shape=(B, E))
+    Ybus = csc_array(Cf @ Yf + Ct @ Yt + diags(Ysh))
+    return Ybus, Yf, Yt
+
+
+def compute_admittance_matrix(network:Dict[str,Any]) -> Tuple[csc_array, csc_array, csc_array]:
+    """ bus admittance matrix (Ybus) and the branch admittance matrices (Yf and Yt) giving the currents injected at the from and to ends,
+    i.e., I_bus = Ybus @ V, I_f = Yf @ V, I_t = Yt @ V. Only the in-service branches are considered.
 
-    network['preprocessed'] = True
\ No newline at end of file
+    Returns:
+        Tuple[csc_array, csc_array, csc_array]: BxB Ybus, ExB Yf, and ExB Yt
+    """
+    return _assemble_admittance_matrix(compute_branch_admittance(network), compute_shunt_admittance(network))
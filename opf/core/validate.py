@@ -0,0 +1,153 @@
+from typing import Dict, Any, List
+import time
+import numpy as np
+from scipy.sparse.linalg import splu
+
+from .utils import (compute_admittance_matrix,
+                    compute_bus_susceptance_matrix,
+                    compute_branch_susceptance_matrix,
+                    compute_generator_incidence_matrix,
+                    compute_load_incidence_matrix,
+                    compute_line_incidence_matrix,
+                    _get_slack_idx,
+                    _preprocessing_network)
+
+
+class Validator:
+    """ constraint violations of AC/DC-OPF solutions computed as array operations.
+    The network data (incidence and admittance matrices, limits) are gathered once in the constructor,
+    so keep the object to validate many solutions on the same network.
+
+    Args:
+        network (Dict[str,Any]): pglib network
+        tol (float): violations larger than `tol` are counted and indexed
+    """
+    def __init__(self, network:Dict[str,Any], tol:float = 1e-6):
+        _preprocessing_network(network)
+        self.tol = tol
+        buses = network['bus']
+        gens = network['gen']
+        branches = network['branch']
+        loads = network['load']
+        # dictionaries are ordered by the indices after `_preprocessing_network`
+        self.busids = list(buses.keys())
+        self.genids = list(gens.keys())
+        self.branchids = list(branches.keys())
+
+        getter = lambda entries, field, default=np.nan: np.fromiter((entry.get(field, default) for entry in entries.values()), dtype=float, count=len(entries))
+        self.pgmin, self.pgmax = getter(gens, 'pmin'), getter(gens, 'pmax')
+        self.qgmin, self.qgmax = getter(gens, 'qmin'), getter(gens, 'qmax')
+        self.vmmin, self.vmmax = getter(buses, 'vmin'), getter(buses, 'vmax')
+        self.pd, self.qd = getter(loads, 'pd'), getter(loads, 'qd')
+        self.rate_a = getter(branches, 'rate_a', np.inf)
+        self.rate_a[self.rate_a <= 0.] = np.inf
+        self.dvamin, self.dvamax = getter(branches, 'angmin', -np.inf), getter(branches, 'angmax', np.inf)
+        self.f_idx = np.fromiter((buses[branch['f_bus']]['index'] for branch in branches.values()), dtype=int, count=len(branches))
+        self.t_idx = np.fromiter((buses[branch['t_bus']]['index'] for branch in branches.values()), dtype=int, count=len(branches))
+
+        self.I_g = compute_generator_incidence_matrix(network).tocsr() # BxG
+        self.I_l = compute_load_incidence_matrix(network).tocsr() # BxL
+        self.I_e = compute_line_incidence_matrix(network).tocsr() # BxE
+        self.S_br = compute_branch_susceptance_matrix(network).tocsr() # ExB
+        self.slack = _get_slack_idx(network)
+        self._lu = None # DC power flow factorization (for solutions without flows or angles)
+        self._network = network
+        self.Ybus, self.Yf, self.Yt = (Y.tocsr() for Y in compute_admittance_matrix(network))
+
+    def _array(self, sol:Dict[str,float], ids:List[str]) -> np.ndarray:
+        return np.fromiter(map(sol.__getitem__, ids), dtype=float, count=len(ids))
+
+    def _summary(self, violation:np.ndarray, ids:List[str]) -> Dict[str,Any]:
+        """ max, mean, and the IDs of the violations larger than the tolerance ordered by the magnitude
+        """
+        if violation.size == 0:
+            return {'max': 0., 'mean': 0., 'nviolation': 0, 'index': []}
+        idxs = np.nonzero(violation > self.tol)[0]
+        idxs = idxs[np.argsort(-violation[idxs], kind='stable')]
+        return {'max': float(violation.max()),
+                'mean': float(violation.mean()),
+                'nviolation': int(idxs.size),
+                'index': [ids[idx] for idx in idxs]}
+
+    @staticmethod
+    def _bound_violation(x:np.ndarray, lb:np.ndarray, ub:np.ndarray) -> np.ndarray:
+        return np.maximum(np.maximum(lb - x, x - ub), 0.)
+
+    def _validate_dc(self, primal:Dict[str,Dict[str,float]]) -> Dict[str,np.ndarray]:
+        pg = self._array(primal['pg'], self.genids)
+        injection = self.I_g @ pg - self.I_l @ self.pd
+        violation = {}
+        va = self._array(primal['va'], self.busids) if 'va' in primal else None
+        if 'pf' in primal:
+            pf = self._array(primal['pf'], self.branchids)
+            if va is not None: # Ohm's law in DC
+                violation['flow'] = (np.abs(pf - self.S_br @ va), self.branchids)
+        elif va is not None:
+            pf = self.S_br @ va
+        else: # DC power flow: every bus except the slack is balanced, and the slack bus takes the total mismatch
+            if self._lu is None:
+                self._lu = splu(compute_bus_susceptance_matrix(self._network, self.slack).tocsc())
+            rhs = injection.copy()
+            rhs[self.slack] = 0.
+            va = self._lu.solve(rhs)
+            pf = self.S_br @ va
+        violation['p_balance'] = (np.abs(injection - self.I_e @ pf), self.busids)
+        violation['thermal'] = (np.maximum(np.abs(pf) - self.rate_a, 0.), self.branchids)
+        # DC angles follow the sign of the (negative) branch susceptance of `compute_branch_susceptance_matrix`
+        violation['dva'] = (self._bound_violation(va[self.t_idx] - va[self.f_idx], self.dvamin, self.dvamax), self.branchids)
+        violation['pg'] = (self._bound_violation(pg, self.pgmin, self.pgmax), self.genids)
+        return violation
+
+    def _validate_ac(self, primal:Dict[str,Dict[str,float]]) -> Dict[str,np.ndarray]:
+        pg = self._array(primal['pg'], self.genids)
+        qg = self._array(primal['qg'], self.genids)
+        vm = self._array(primal['vm'], self.busids)
+        va = self._array(primal['va'], self.busids)
+        V = vm * np.exp(1j * va)
+        Sf = V[self.f_idx] * np.conj(self.Yf @ V)
+        St = V[self.t_idx] * np.conj(self.Yt @ V)
+        Sbus = V * np.conj(self.Ybus @ V)
+        mismatch = self.I_g @ (pg + 1j*qg) - self.I_l @ (self.pd + 1j*self.qd) - Sbus
+
+        violation = {}
+        if 'pf_from' in primal: # flow variables should agree with the flows given by the voltages
+            Sf_var = self._array(primal['pf_from'], self.branchids) + 1j*self._array(primal['qf_from'], self.branchids)
+            St_var = self._array(primal['pf_to'], self.branchids) + 1j*self._array(primal['qf_to'], self.branchids)
+            violation['flow'] = (np.maximum(np.abs(Sf_var - Sf), np.abs(St_var - St)), self.branchids)
+        violation['p_balance'] = (np.abs(mismatch.real), self.busids)
+        violation['q_balance'] = (np.abs(mismatch.imag), self.busids)
+        violation['thermal'] = (np.maximum(np.maximum(np.abs(Sf), np.abs(St)) - self.rate_a, 0.), self.branchids)
+        violation['vm'] = (self._bound_violation(vm, self.vmmin, self.vmmax), self.busids)
+        violation['dva'] = (self._bound_violation(va[self.f_idx] - va[self.t_idx], self.dvamin, self.dvamax), self.branchids)
+        violation['pg'] = (self._bound_violation(pg, self.pgmin, self.pgmax), self.genids)
+        violation['qg'] = (self._bound_violation(qg, self.qgmin, self.qgmax), self.genids)
+        return violation
+
+    def validate(self, result:Dict[str,Any]) -> Dict[str,Any]:
+        """ validate a solution of `model.solve` (or `ac_power_flow`). AC solutions are detected by the voltage magnitudes ('vm').
+
+        Returns:
+            Dict[str,Any]: 'type' ('ac' or 'dc'), 'feasible', 'max_violation', 'time', and 'violations' with
+                'max', 'mean', 'nviolation', and 'index' (IDs of the violations larger than the tolerance, largest first) per constraint
+        """
+        tic = time.time()
+        primal = result['sol']['primal']
+        formulation = 'ac' if 'vm' in primal else 'dc'
+        violation = self._validate_ac(primal) if formulation == 'ac' else self._validate_dc(primal)
+        violations = { name: self._summary(v, ids) for name, (v, ids) in violation.items() }
+        max_violation = max(v['max'] for v in violations.values())
+        return {'type': formulation,
+                'feasible': max_violation <= self.tol,
+                'max_violation': max_violation,
+                'violations': violations,
+                'time': time.time() - tic}
+
+
+def validate(network:Dict[str,Any], result:Dict[str,Any], tol:float = 1e-6) -> Dict[str,Any]:
+    """ constraint violations (power balance, thermal limits against rate_a, voltage magnitudes, angle differences, and generator bounds)
+    of an AC or DC solution. See `Validator.validate` for the returned summary.
+
+        report = opf.validate(network, result)
+        print(report['feasible'], report['violations']['thermal']['index'])
+    """
+    return Validator(network, tol).validate(result)
@@ -0,0 +1,155 @@
+from typing import Dict, Any, Callable, Tuple
+import numpy as np
+from scipy.sparse import csc_array, csr_array
+
+from .utils import _branch_admittance, _admittance_stamps
+
+
+class AdmittanceMatrix:
+    """ persistent sparse bus admittance matrix (Ybus) with O(1) updates per branch or shunt.
+
+    Like `DCSensitivity`, every branch in the network (including out-of-service ones) keeps its slot, and the stored nonzero pattern
+    (every branch stamp and every diagonal) never changes: a switched-out branch leaves explicit zeros in place.
+    `Ybus`, `Yf`, and `Yt` are updated in place, so that the symbolic analysis (ordering) of downstream factorizations stays valid.
+    Subscribers registered by `subscribe` are called with a change event after every update, e.g., to invalidate cached numeric factorizations.
+
+    Args:
+        network (Dict[str,Any]): pglib network
+    """
+    def __init__(self, network:Dict[str,Any]):
+        buses = network['bus']
+        branches = network['branch']
+        self.bus_ids = list(buses.keys()) # same ordering as the bus index of `_preprocessing_network`
+        self.branch_ids = sorted(list(branches.keys()))
+        self.shunt_ids = list(network['shunt'].keys())
+        self.bus_idx = { bus_id: idx for idx, bus_id in enumerate(self.bus_ids) }
+        self.branch_idx = { branch_id: idx for idx, branch_id in enumerate(self.branch_ids) }
+        self.shunt_idx = { shunt_id: idx for idx, shunt_id in enumerate(self.shunt_ids) }
+
+        self.branch = _branch_admittance([branches[branch_id] for branch_id in self.branch_ids], self.bus_idx)
+        self.tap = self.branch['T_m'].copy()
+        self.shift = np.arctan2(self.branch['T_I'], self.branch['T_R'])
+        self.status = np.asarray([branches[branch_id]['br_status'] > 0 for branch_id in self.branch_ids])
+        shunts = network['shunt']
+        self.shunt_bus = np.asarray([self.bus_idx[shunts[shunt_id]['shunt_bus']] for shunt_id in self.shunt_ids], dtype=int)
+        self.ysh = np.asarray([shunts[shunt_id]['gs'] + 1j*shunts[shunt_id]['bs'] for shunt_id in self.shunt_ids], dtype=complex)
+
+        self._build_pattern()
+        self.rebuild()
+        self.version = 0
+        self._subscribers = []
+
+    def _build_pattern(self) -> None:
+        """ fix the nonzero patterns and the positions of each branch stamp in the data arrays
+        """
+        B, E = len(self.bus_ids), len(self.branch_ids)
+        f_idx, t_idx = self.branch['f_idx'], self.branch['t_idx']
+
+        # Ybus: entries (f,f), (f,t), (t,f), (t,t) of every branch and all the diagonals, in the CSC order (column-major, sorted rows)
+        rows = np.concatenate([f_idx, t_idx, f_idx, t_idx, np.arange(B)])
+        cols = np.concatenate([f_idx, f_idx, t_idx, t_idx, np.arange(B)])
+        keys = np.unique(cols * B + rows)
+        indptr = np.searchsorted(keys // B, np.arange(B+1))
+        self.Ybus = csc_array((np.zeros(keys.size, dtype=complex), (keys % B).astype(np.int32), indptr.astype(np.int32)), shape=(B, B))
+        pos = lambda r, c: np.searchsorted(keys, c * B + r)
+        self.pos_ff, self.pos_tf, self.pos_ft, self.pos_tt = pos(f_idx, f_idx), pos(t_idx, f_idx), pos(f_idx, t_idx), pos(t_idx, t_idx)
+        self.pos_diag = pos(np.arange(B), np.arange(B))
+
+        # Yf and Yt: row l has the entries at columns f and t, stored as CSR with two entries per row
+        indices = np.stack([f_idx, t_idx], axis=1).ravel().astype(np.int32)
+        indptr = (2 * np.arange(E+1)).astype(np.int32)
+        self.Yf = csr_array((np.zeros(2*E, dtype=complex), indices, indptr), shape=(E, B))
+        self.Yt = csr_array((np.zeros(2*E, dtype=complex), indices.copy(), indptr.copy()), shape=(E, B))
+
+    def _stamps(self, l) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """ admittance stamps of branch(es) l at the current parameters, zero if out of service
+        """
+        branch = {k: v[l] for k, v in self.branch.items()}
+        status = self.status[l]
+        return tuple(status * y for y in _admittance_stamps(branch))
+
+    def rebuild(self) -> None:
+        """ recompute all the stored values from the current parameters (e.g., to clear the accumulated round-off of the updates)
+        """
+        E = len(self.branch_ids)
+        Yff, Yft, Ytf, Ytt = self._stamps(np.arange(E))
+        data = self.Ybus.data
+        data[:] = 0.
+        np.add.at(data, self.pos_ff, Yff)
+        np.add.at(data, self.pos_ft, Yft)
+        np.add.at(data, self.pos_tf, Ytf)
+        np.add.at(data, self.pos_tt, Ytt)
+        np.add.at(data, self.pos_diag[self.shunt_bus], self.ysh)
+        self.Yf.data[0::2], self.Yf.data[1::2] = Yff, Yft
+        self.Yt.data[0::2], self.Yt.data[1::2] = Ytf, Ytt
+
+    def _update_branch(self, l:int, update:Callable[[], None]) -> None:
+        Yff0, Yft0, Ytf0, Ytt0 = self._stamps(l)
+        update()
+        Yff, Yft, Ytf, Ytt = self._stamps(l)
+        data = self.Ybus.data
+        data[self.pos_ff[l]] += Yff - Yff0
+        data[self.pos_ft[l]] += Yft - Yft0
+        data[self.pos_tf[l]] += Ytf - Ytf0
+        data[self.pos_tt[l]] += Ytt - Ytt0
+        self.Yf.data[2*l], self.Yf.data[2*l+1] = Yff, Yft
+        self.Yt.data[2*l], self.Yt.data[2*l+1] = Ytf, Ytt
+
+    def _get_branch(self, branch_id:str) -> int:
+        if branch_id not in self.branch_idx:
+            raise RuntimeError(f"Branch ID {branch_id} is not placed in the given network.")
+        return self.branch_idx[branch_id]
+
+    def set_branch_status(self, branch_id:str, in_service:bool) -> None:
+        """ switch a branch in or out of service
+        """
+        l = self._get_branch(branch_id)
+        if bool(self.status[l]) == bool(in_service):
+            return
+        def update():
+            self.status[l] = bool(in_service)
+        self._update_branch(l, update)
+        self._notify({'type': 'branch_status', 'id': branch_id, 'in_service': bool(in_service)}, l)
+
+    def set_tap(self, branch_id:str, tap:float = None, shift:float = None) -> None:
+        """ change the tap ratio and/or the phase shift (in radians) of a branch
+        """
+        l = self._get_branch(branch_id)
+        def update():
+            if tap is not None:
+                self.tap[l] = tap
+            if shift is not None:
+                self.shift[l] = shift
+            self.branch['T_m'][l] = self.tap[l]
+            self.branch['T_R'][l] = self.tap[l] * np.cos(self.shift[l])
+            self.branch['T_I'][l] = self.tap[l] * np.sin(self.shift[l])
+        self._update_branch(l, update)
+        self._notify({'type': 'tap', 'id': branch_id, 'tap': float(self.tap[l]), 'shift': float(self.shift[l])}, l)
+
+    def set_shunt(self, shunt_id:str, gs:float = None, bs:float = None) -> None:
+        """ change the conductance and/or the susceptance of a shunt
+        """
+        if shunt_id not in self.shunt_idx:
+            raise RuntimeError(f"Shunt ID {shunt_id} is not placed in the given network.")
+        s = self.shunt_idx[shunt_id]
+        ysh = complex(self.ysh[s].real if gs is None else gs, self.ysh[s].imag if bs is None else bs)
+        self.Ybus.data[self.pos_diag[self.shunt_bus[s]]] += ysh - self.ysh[s]
+        self.ysh[s] = ysh
+        self._notify({'type': 'shunt', 'id': shunt_id, 'gs': ysh.real, 'bs': ysh.imag, 'buses': (int(self.shunt_bus[s]),)})
+
+    def subscribe(self, callback:Callable[[Dict[str,Any]], None]) -> Callable[[Dict[str,Any]], None]:
+        """ register a callback called with the change event (a dictionary with 'type', 'id', 'buses', 'version', and the new values)
+        """
+        self._subscribers.append(callback)
+        return callback
+
+    def unsubscribe(self, callback:Callable[[Dict[str,Any]], None]) -> None:
+        self._subscribers.remove(callback)
+
+    def _notify(self, event:Dict[str,Any], l:int = None) -> None:
+        self.version += 1
+        if l is not None:
+            event['buses'] = (int(self.branch['f_idx'][l]), int(self.branch['t_idx'][l]))
+        event['version'] = self.version
+        for callback in list(self._subscribers):
+            callback(event)
@@ -9,9 +9,11 @@ from typing_extensions import TypeAlias
 
 from opf.io.matpower import parse_matpower, mp2data
 from opf.io.common import make_per_unit #, simplify_cost_terms
+from opf.core.profiler import _stage, _profiled
 
 FILE_LIKE: TypeAlias = Union[str, os.PathLike]
 
+@_profiled('parse_file')
 def parse_file(f:FILE_LIKE) -> None:
     sfx = Path(str(f)).suffix[1:]
     if sfx != 'm':
@@ -27,11 +29,13 @@ def parse_file(f:FILE_LIKE) -> None:
     
 
 def _parse_file(f):
-    lines = f.readlines()
-    mp_data = parse_matpower(lines)
-    data_dict = mp2data(mp_data)
+    with _stage('parse'):
+        lines = f.readlines()
+        mp_data = parse_matpower(lines)
+        data_dict = mp2data(mp_data)
     
-    make_per_unit(data_dict)
+    with _stage('make_per_unit'):
+        make_per_unit(data_dict)
     # correct_cost_functions(data)
     # simplify_cost_terms(data_dict)
     data_dict['preprocessed'] = False
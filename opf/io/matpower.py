@@ -274,7 +274,7 @@ def _split_loads_shunts(data):
             data['shunt'].append({
                 'gs': bus['gs'],
                 'bs': bus['bs'],
-                'shunt_bus': bus['bus_i'],
+                'shunt_bus': str(bus['bus_i']),
                 'status': int(bus['bus_type']!=4),
                 'id':    shunt_id
             })
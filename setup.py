@@ -67,6 +67,9 @@ setup(
     packages=packages,
     include_package_data=True,
     install_requires=['typing-extensions', 'pyomo>=6.5.0', 'numpy>=1.22.3', 'scipy>=1.10.1'],
+    extras_require={
+        'qp': ['highspy', 'osqp', 'clarabel'], # solvers of the matrix backend of DC-OPF
+    },
     project_urls={
         'Github': 'https://github.com/seonho-park/PyOPF'
     },
@@ -0,0 +1,42 @@
+""" shared helpers of the tests
+"""
+from typing import Any, Dict, List, Tuple
+from pathlib import Path
+import tempfile
+import unittest
+import numpy as np
+import pyomo.environ as pyo
+import opf
+
+
+def ipopt_available() -> bool:
+    return pyo.SolverFactory('ipopt').available(exception_flag=False)
+
+
+requires_ipopt = unittest.skipUnless(ipopt_available(), "ipopt is not installed")
+
+
+def parse_with_zero_rating(path:Path, rows:List[int]) -> Dict[str,Any]:
+    """ parse a copy of the MATPOWER file whose branches at the (0-based) `rows` of mpc.branch have RATE_A = 0
+    """
+    lines = Path(path).read_text().splitlines()
+    start = next(i for i, line in enumerate(lines) if line.startswith('mpc.branch')) + 1
+    for row in rows:
+        fields = lines[start + row].split()
+        fields[5] = '0.0'
+        lines[start + row] = '\t'.join(fields)
+    with tempfile.TemporaryDirectory() as directory:
+        copied = Path(directory) / Path(path).name
+        copied.write_text('\n'.join(lines) + '\n')
+        return opf.parse_file(copied)
+
+
+def network_and_profile(T:int, period:int = None, network:Dict[str,Any] = None) -> Tuple[Dict[str,Any],np.ndarray]:
+    """ case5 (or `network`) with the ramp rates ramp_30 = 0.1 pmax, and a T x L sinusoidal load profile of `period` (T by default) periods
+    """
+    network = network if network is not None else opf.parse_file(Path("./data/pglib_opf_case5_pjm.m"))
+    for gen in network['gen'].values():
+        gen['ramp_30'] = 0.1 * gen['pmax']
+    pd = np.asarray([load['pd'] for load in network['load'].values()])
+    profile = np.outer(0.8 + 0.3 * np.sin(np.arange(T) / (period if period is not None else T) * 2 * np.pi), pd)
+    return network, profile
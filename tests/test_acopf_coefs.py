@@ -0,0 +1,46 @@
+import unittest
+import os
+import tempfile
+import numpy as np
+import pyomo.environ as pyo
+import opf
+from pathlib import Path
+
+
+class ACOPFPrecomputedCoefsTest(unittest.TestCase):
+    def test_same_constraints(self):
+        # the Ohm's laws with the precomputed coefficients agree with the original expressions at an arbitrary point
+        instances = []
+        for precompute_coefs in [False, True]:
+            network = opf.parse_file(Path("./data/pglib_opf_case14_ieee.m"))
+            model = opf.build_model('acopf', precompute_coefs=precompute_coefs)
+            model.instantiate(network)
+            instances.append(model.instance)
+
+        rng = np.random.default_rng(0)
+        for name in ['vm', 'va', 'pf_from', 'pf_to', 'qf_from', 'qf_to']:
+            for idx in instances[0].component(name):
+                value = 1. + 0.05 * rng.normal() if name == 'vm' else rng.normal()
+                for instance in instances:
+                    instance.component(name)[idx].value = value
+
+        for name in ['cnst_ohm_pf_from', 'cnst_ohm_pf_to', 'cnst_ohm_qf_from', 'cnst_ohm_qf_to']:
+            for idx in instances[0].component(name):
+                self.assertAlmostEqual(pyo.value(instances[0].component(name)[idx].body),
+                                       pyo.value(instances[1].component(name)[idx].body), places=10)
+
+    def test_nl_size(self):
+        sizes = []
+        with tempfile.TemporaryDirectory() as tmpdir:
+            for precompute_coefs in [False, True]:
+                network = opf.parse_file(Path("./data/pglib_opf_case14_ieee.m"))
+                model = opf.build_model('acopf', precompute_coefs=precompute_coefs)
+                model.instantiate(network)
+                fn = os.path.join(tmpdir, f'{precompute_coefs}.nl')
+                model.instance.write(fn)
+                sizes.append(os.path.getsize(fn))
+        self.assertLess(sizes[1], sizes[0])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,77 @@
+import unittest
+import numpy as np
+import pyomo.environ as pyo
+import opf
+from pathlib import Path
+from helpers import requires_ipopt, parse_with_zero_rating
+
+
+class ACOPFCompactTest(unittest.TestCase):
+    def instantiate(self, model_type, **kwargs):
+        network = opf.parse_file(Path("./data/pglib_opf_case14_ieee.m"))
+        model = opf.build_model(model_type, **kwargs)
+        model.instantiate(network)
+        return model.instance
+
+    def test_size(self):
+        full = self.instantiate('acopf')
+        compact = self.instantiate('acopf-compact')
+        rated = self.instantiate('acopf-compact', rated_flow_vars=True)
+        E = len(full.E)
+        nvar = lambda instance: sum(len(v) for v in instance.component_objects(pyo.Var))
+        ncnst = lambda instance: sum(len(c) for c in instance.component_objects(pyo.Constraint))
+        self.assertEqual(nvar(full) - nvar(compact), 4*E)
+        self.assertEqual(ncnst(full) - ncnst(compact), 4*E)
+        self.assertEqual(len(rated.pf_from), len(rated.E_thermal))
+
+    def test_unrated_branch(self):
+        # the same thermal limits as `acopf` when some branches are unrated
+        network = parse_with_zero_rating(Path("./data/pglib_opf_case14_ieee.m"), [0, 3])
+        instances = {}
+        for model_type in ['acopf', 'acopf-compact']:
+            model = opf.build_model(model_type)
+            model.instantiate(network)
+            instances[model_type] = model.instance
+        for name in ['cnst_thermal_branch_from', 'cnst_thermal_branch_to']:
+            keys = list(instances['acopf'].component(name).keys())
+            self.assertEqual(keys, list(instances['acopf-compact'].component(name).keys()))
+            self.assertEqual(len(keys), len(network['branch']) - 2)
+
+    def test_same_balance(self):
+        # with the flow variables of `acopf` at the flows given by the voltages, the power balances of both formulations agree
+        full = self.instantiate('acopf')
+        compact = self.instantiate('acopf-compact', rated_flow_vars=True)
+        rng = np.random.default_rng(0)
+        for b in full.B:
+            full.vm[b].value = compact.vm[b].value = 1. + 0.05 * rng.normal()
+            full.va[b].value = compact.va[b].value = 0.1 * rng.normal()
+        for g in full.G:
+            full.pg[g].value = compact.pg[g].value = rng.normal()
+            full.qg[g].value = compact.qg[g].value = rng.normal()
+        for name in ['pf_from', 'pf_to', 'qf_from', 'qf_to']:
+            for e in full.E:
+                value = pyo.value(compact.component(name+'_exp')[e])
+                full.component(name)[e].value = value
+                if e in compact.E_var:
+                    compact.component(name)[e].value = value
+        for name in ['cnst_ohm_pf_from', 'cnst_ohm_qf_to']:
+            for e in full.E:
+                self.assertAlmostEqual(pyo.value(full.component(name)[e].body), 0., places=10)
+        for name in ['cnst_p_balance', 'cnst_q_balance']:
+            for b in full.B:
+                self.assertAlmostEqual(pyo.value(full.component(name)[b].body), pyo.value(compact.component(name)[b].body), places=10)
+
+    @requires_ipopt
+    def test_solve5(self):
+        for kwargs in [{}, {'rated_flow_vars': True}]:
+            network = opf.parse_file(Path("./data/pglib_opf_case5_pjm.m"))
+            model = opf.build_model('acopf-compact', **kwargs)
+            model.instantiate(network)
+            result = model.solve('ipopt')
+            self.assertEqual(result['termination_status'], 'optimal')
+            self.assertAlmostEqual(result['obj_cost'], 17551.8908385928, places=3)
+            self.assertEqual(len(result['sol']['primal']['pf_from']), len(network['branch']))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,50 @@
+import unittest
+import importlib.util
+import opf
+from pathlib import Path
+from helpers import requires_ipopt
+
+
+class ACOPFInitTest(unittest.TestCase):
+    @unittest.skipUnless(importlib.util.find_spec('clarabel'), 'clarabel is not installed')
+    def test_dc_init_var(self):
+        # the AC flows at the DC point are close to the DC flows, and dcopf-ptdf (without va) gives the same point
+        network = opf.parse_file(Path("./data/pglib_opf_case14_ieee.m"))
+        init_vars = []
+        for model_type in ['dcopf', 'dcopf-ptdf']:
+            model = opf.build_model(model_type, backend='matrix')
+            model.instantiate(network)
+            result = model.solve('clarabel')
+            init_vars.append(opf.dc_init_var(network, result))
+            if model_type == 'dcopf':
+                pf = result['sol']['primal']['pf']
+        init_var = init_vars[0]
+        self.assertEqual(set(init_var.keys()), {'pg', 'qg', 'vm', 'va', 'pf1', 'pf2', 'qf1', 'qf2'})
+        self.assertLess(max(abs(init_var['pf1'][e] - pf[e]) for e in pf), 0.05)
+        for key in init_var:
+            for idx in init_var[key]:
+                self.assertAlmostEqual(init_var[key][idx], init_vars[1][key][idx], places=5)
+        for gen_id, gen in network['gen'].items():
+            self.assertTrue(gen['qmin'] <= init_var['qg'][gen_id] <= gen['qmax'])
+        # the flows are the ones given by the voltages
+        report = opf.validate(network, {'sol': {'primal': {**init_var, 'pf_from': init_var['pf1'], 'pf_to': init_var['pf2'],
+                                                           'qf_from': init_var['qf1'], 'qf_to': init_var['qf2']}}})
+        self.assertLess(report['violations']['flow']['max'], 1e-10)
+
+    def test_invalid_init(self):
+        network = opf.parse_file(Path("./data/pglib_opf_case5_pjm.m"))
+        with self.assertRaises(ValueError):
+            opf.solve_acopf(network, init='warm')
+
+    @requires_ipopt
+    def test_solve5(self):
+        for init in ['flat', 'dc', 'powerflow', 'soc']:
+            network = opf.parse_file(Path("./data/pglib_opf_case5_pjm.m"))
+            result = opf.solve_acopf(network, init=init)
+            self.assertEqual(result['termination_status'], 'optimal')
+            self.assertEqual(result['init']['method'], init)
+            self.assertAlmostEqual(result['obj_cost'], 17551.8908385928, places=3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,105 @@
+import unittest
+import importlib.util
+import numpy as np
+import pyomo.environ as pyo
+import opf
+from opf.core.acopf_nlp import ACOPFNLP
+from pathlib import Path
+from scipy.sparse import coo_array
+from helpers import parse_with_zero_rating
+
+
+class ACOPFNLPTest(unittest.TestCase):
+    def setUp(self):
+        self.network = opf.parse_file(Path("./data/pglib_opf_case14_ieee.m"))
+        self.nlp = ACOPFNLP(self.network)
+        rng = np.random.default_rng(0)
+        self.x = rng.normal(size=self.nlp.n)
+        self.x[self.nlp.offset['vm']:self.nlp.offset['vm']+self.nlp.B] = 1. + 0.05 * rng.normal(size=self.nlp.B)
+        self.lagrange = rng.normal(size=self.nlp.m)
+
+    def test_pyomo_constraints(self):
+        # the constraints agree with the constraint bodies of `ACOPFModel` at an arbitrary point
+        nlp, x = self.nlp, self.x
+        model = opf.build_model('acopf')
+        model.instantiate(self.network)
+        instance = model.instance
+        ids = {'pg': list(self.network['gen'].keys()), 'vm': list(self.network['bus'].keys()), 'E': list(self.network['branch'].keys())}
+        for name, offset in nlp.offset.items():
+            var_ids = ids['pg'] if name in ['pg', 'qg'] else (ids['vm'] if name in ['vm', 'va'] else ids['E'])
+            var = getattr(instance, name)
+            for i, idx in enumerate(var_ids):
+                var[idx].value = x[offset+i]
+
+        g = nlp.constraints(x)
+        for name, offset in nlp.cnst_offset.items():
+            cnst = getattr(instance, name)
+            cnst_ids = [bus_id for bus_id in sorted(self.network['bus'].keys()) if self.network['bus'][bus_id]['bus_type'] == 3]\
+                       if name == 'cnst_slack_va' else (ids['vm'] if name.endswith('balance') else ids['E'])
+            for i, idx in enumerate(cnst_ids):
+                if idx not in cnst: # the thermal limits of the unrated branches
+                    self.assertEqual(nlp.cu[offset+i], np.inf)
+                    continue
+                c = cnst[idx]
+                # compare the residuals to the finite side of the constraint
+                if c.upper is not None:
+                    expected, actual = pyo.value(c.body) - pyo.value(c.upper), g[offset+i] - nlp.cu[offset+i]
+                else:
+                    expected, actual = pyo.value(c.body) - pyo.value(c.lower), g[offset+i] - nlp.cl[offset+i]
+                self.assertAlmostEqual(actual, expected, places=8, msg=f"{name}[{idx}]")
+
+    def test_unrated_branch(self):
+        # the parser drops the zero ratings, and the unrated branches are unlimited as in `ACOPFModel`
+        self.network = parse_with_zero_rating(Path("./data/pglib_opf_case14_ieee.m"), [0, 3])
+        self.nlp = ACOPFNLP(self.network)
+        self.assertEqual(np.count_nonzero(~self.nlp.rated), 2)
+        self.test_pyomo_constraints()
+
+    def test_derivatives(self):
+        nlp, x, h = self.nlp, self.x, 1e-6
+        J = coo_array((nlp.jacobian(x), nlp.jacobianstructure()), shape=(nlp.m, nlp.n)).toarray()
+        gradient_lagrangian = lambda x: 0.5 * nlp.gradient(x) + coo_array((nlp.jacobian(x), nlp.jacobianstructure()), shape=(nlp.m, nlp.n)).T @ self.lagrange
+        H = coo_array((nlp.hessian(x, self.lagrange, 0.5), nlp.hessianstructure()), shape=(nlp.n, nlp.n)).toarray()
+        self.assertTrue(np.all(nlp.hessianstructure()[0] >= nlp.hessianstructure()[1])) # lower triangle
+        H = H + H.T - np.diag(H.diagonal())
+        for i in range(nlp.n):
+            d = np.zeros(nlp.n); d[i] = h
+            np.testing.assert_allclose(J[:,i], (nlp.constraints(x+d) - nlp.constraints(x-d)) / (2*h), atol=1e-6)
+            np.testing.assert_allclose(H[:,i], (gradient_lagrangian(x+d) - gradient_lagrangian(x-d)) / (2*h), atol=1e-6)
+            self.assertAlmostEqual(nlp.gradient(x)[i], (nlp.objective(x+d) - nlp.objective(x-d)) / (2*h), places=5)
+
+
+class ACOPFCallbackSolveTest(unittest.TestCase):
+    def check_case5(self, solver):
+        network = opf.parse_file(Path("./data/pglib_opf_case5_pjm.m"))
+        model = opf.build_model('acopf', backend='callback')
+        self.assertEqual(model.is_constructed(), False)
+        model.instantiate(network)
+        result = model.solve(solver, extract_dual=True)
+        self.assertEqual(result['termination_status'], 'optimal')
+        self.assertAlmostEqual(result['obj_cost'] / 17551.8908385928, 1., places=6)
+        self.assertAlmostEqual(result['sol']['primal']['pg']['3'], 3.244984943109816, places=4)
+        self.assertAlmostEqual(result['sol']['primal']['vm']['1'], 1.0776176598114897, places=4)
+        self.assertAlmostEqual(result['sol']['primal']['va']['1'], 0.048935231558520996, places=4)
+        self.assertEqual(result['sol']['bound']['va'], {})
+        self.assertGreater(result['sol']['dual']['cnst_p_balance']['4'], 0.)
+
+    def test_trust_constr(self):
+        self.check_case5('trust-constr')
+
+    @unittest.skipUnless(importlib.util.find_spec('cyipopt'), 'cyipopt is not installed')
+    def test_ipopt(self):
+        self.check_case5('ipopt')
+
+    @unittest.skipUnless(importlib.util.find_spec('cyipopt'), 'cyipopt is not installed')
+    def test_ipopt_case14(self):
+        network = opf.parse_file(Path("./data/pglib_opf_case14_ieee.m"))
+        model = opf.build_model('acopf', backend='callback')
+        model.instantiate(network)
+        result = model.solve('ipopt')
+        self.assertEqual(result['termination_status'], 'optimal')
+        self.assertAlmostEqual(result['obj_cost'] / 2178.0804250673879, 1., places=6) # PGLib: 2.1781e+03
+
+
+if __name__ == '__main__':
+    unittest.main()
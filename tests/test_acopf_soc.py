@@ -0,0 +1,71 @@
+import unittest
+import numpy as np
+import pyomo.environ as pyo
+import opf
+from pathlib import Path
+from helpers import requires_ipopt
+
+
+class ACOPFSOCTest(unittest.TestCase):
+    def lifted_point(self, network, seed=0):
+        """ acopf and acopf-soc instances at the same voltages (w, wr, wi lifted from vm and va)
+        """
+        full = opf.build_model('acopf', precompute_coefs=True)
+        full.instantiate(network)
+        soc = opf.build_model('acopf-soc')
+        soc.instantiate(network)
+        full, soc = full.instance, soc.instance
+        rng = np.random.default_rng(seed)
+        slack = list(full.slack)
+        for b in full.B:
+            full.vm[b].value = 1. + 0.05 * rng.normal()
+            full.va[b].value = 0. if b in slack else 0.1 * rng.normal()
+            soc.w[b].value = full.vm[b].value**2
+        for e in full.E:
+            soc.wr[e].value = pyo.value(full.vv[e] * full.cos_dva[e])
+            soc.wi[e].value = pyo.value(full.vv[e] * full.sin_dva[e])
+        return full, soc
+
+    def test_exact_on_ac_points(self):
+        # the relaxation is tight at the points lifted from the voltages: the cones are active and the Ohm's laws are the same
+        network = opf.parse_file(Path("./data/pglib_opf_case14_ieee.m"))
+        full, soc = self.lifted_point(network)
+        for e in full.E:
+            self.assertAlmostEqual(pyo.value(soc.cnst_soc[e].body), 0., places=12)
+            for name, exp in [('pf_from', opf.core.acopf_exp.pf_from_coef_exp), ('pf_to', opf.core.acopf_exp.pf_to_coef_exp),
+                              ('qf_from', opf.core.acopf_exp.qf_from_coef_exp), ('qf_to', opf.core.acopf_exp.qf_to_coef_exp)]:
+                soc.component(name)[e].value = 0.
+                # the body of cnst_ohm_* is pf - (linear W-space flow); with pf = 0 it is the negative flow
+                self.assertAlmostEqual(-pyo.value(soc.component('cnst_ohm_'+name)[e].body), pyo.value(exp(full, e)), places=10)
+
+    def test_recover(self):
+        # vm, va, and the flows are recovered from a (tight) W-space point
+        network = opf.parse_file(Path("./data/pglib_opf_case14_ieee.m"))
+        full, soc = self.lifted_point(network, seed=1)
+        primal = {name: {str(idx): v[idx].value for idx in v} for name, v in [('pg', soc.pg), ('qg', soc.qg), ('w', soc.w), ('wr', soc.wr), ('wi', soc.wi)]}
+        init_var = opf.soc_init_var(network, {'sol': {'primal': primal}})
+        self.assertEqual(set(init_var.keys()), {'pg', 'qg', 'vm', 'va', 'pf1', 'pf2', 'qf1', 'qf2'})
+        for b in full.B:
+            self.assertAlmostEqual(init_var['vm'][b], full.vm[b].value, places=12)
+            self.assertAlmostEqual(init_var['va'][b], full.va[b].value, places=12)
+        for key, exp in [('pf1', opf.core.acopf_exp.pf_from_coef_exp), ('qf2', opf.core.acopf_exp.qf_to_coef_exp)]:
+            for e in full.E:
+                self.assertAlmostEqual(init_var[key][e], pyo.value(exp(full, e)), places=10)
+
+    @requires_ipopt
+    def test_solve5(self):
+        network = opf.parse_file(Path("./data/pglib_opf_case5_pjm.m"))
+        model = opf.build_model('acopf-soc')
+        model.instantiate(network)
+        result = model.solve('ipopt')
+        self.assertEqual(result['termination_status'], 'optimal')
+        self.assertAlmostEqual(result['obj_cost'], 14999.716, places=1) # lower bound of 17551.89
+
+        result = opf.solve_acopf_soc_warmstart(opf.parse_file(Path("./data/pglib_opf_case5_pjm.m")))
+        self.assertEqual(result['termination_status'], 'optimal')
+        self.assertAlmostEqual(result['obj_cost'], 17551.8908385928, places=3)
+        self.assertAlmostEqual(result['soc']['gap'], (17551.8908385928 - 14999.716) / 17551.8908385928, places=4)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+import unittest
+import opf
+from pathlib import Path
+import numpy as np
+import pyomo.environ as pyo
+
+
+class ACPowerFlowTest(unittest.TestCase):
+    def _check_acopf_equations(self, network, primal):
+        # the power flow solution should satisfy the Ohm's law and the power balance of the AC-OPF model
+        model = opf.build_model('acopf')
+        model.instantiate(network)
+        instance = model.instance
+        for name in ['pg', 'qg', 'vm', 'va', 'pf_from', 'pf_to', 'qf_from', 'qf_to']:
+            var = getattr(instance, name)
+            for idx in var:
+                var[idx].set_value(primal[name][idx], skip_validation=True)
+        for name in ['cnst_ohm_pf_from', 'cnst_ohm_pf_to', 'cnst_ohm_qf_from', 'cnst_ohm_qf_to', 'cnst_p_balance', 'cnst_q_balance']:
+            cnst = getattr(instance, name)
+            for idx in cnst:
+                self.assertAlmostEqual(pyo.value(cnst[idx].body), 0., places=6)
+
+    def test_ac_power_flow_case5(self):
+        matpower_fn = Path("./data/pglib_opf_case5_pjm.m")
+        network = opf.parse_file(matpower_fn)
+        result = opf.ac_power_flow(network)
+        self.assertEqual(result['termination_status'], 'converged')
+        self.assertLessEqual(result['iterations'], 5)
+        primal = result['sol']['primal']
+        for gen_id, gen in network['gen'].items():
+            self.assertAlmostEqual(primal['vm'][gen['gen_bus']], gen['vg'])
+        self._check_acopf_equations(network, primal)
+
+    def test_ac_power_flow_dispatch_case14(self):
+        matpower_fn = Path("./data/pglib_opf_case14_ieee.m")
+        network = opf.parse_file(matpower_fn)
+        # evaluate a dispatch (e.g., from DC-OPF) on the AC network
+        pg = { gen_id: gen['pmin'] + 0.5*(gen['pmax']-gen['pmin']) for gen_id, gen in network['gen'].items() }
+        result = opf.ac_power_flow(network, {'sol': {'primal': {'pg': pg}}})
+        self.assertEqual(result['termination_status'], 'converged')
+        primal = result['sol']['primal']
+        for gen_id, gen in network['gen'].items():
+            if network['bus'][gen['gen_bus']]['bus_type'] != 3:
+                self.assertAlmostEqual(primal['pg'][gen_id], pg[gen_id])
+        self._check_acopf_equations(network, primal)
+
+    def test_fast_decoupled_power_flow_case14(self):
+        matpower_fn = Path("./data/pglib_opf_case14_ieee.m")
+        network = opf.parse_file(matpower_fn)
+        result_newton = opf.ac_power_flow(network)
+        for method in ['fdxb', 'fdbx']:
+            result = opf.ac_power_flow(network, method=method)
+            self.assertEqual(result['termination_status'], 'converged')
+            for bus_id in network['bus'].keys():
+                self.assertAlmostEqual(result['sol']['primal']['vm'][bus_id], result_newton['sol']['primal']['vm'][bus_id], places=6)
+                self.assertAlmostEqual(result['sol']['primal']['va'][bus_id], result_newton['sol']['primal']['va'][bus_id], places=6)
+
+        # batched load patterns give the same solutions as the individual ones
+        fdpf = opf.FastDecoupledPowerFlow(network, 'XB')
+        scale = np.linspace(0.8, 1.1, 7)[None,:]
+        pd, qd = fdpf.setpoints['pd'][:,None] * scale, fdpf.setpoints['qd'][:,None] * scale
+        batch = fdpf.solve(pd=pd, qd=qd)
+        self.assertTrue(np.all(batch['converged']))
+        single = fdpf.solve(pd=pd[:,2], qd=qd[:,2])
+        np.testing.assert_almost_equal(single['vm'][:,0], batch['vm'][:,2])
+
+        # outages reuse the base factorizations and match the power flow of the modified network
+        outage = '10'
+        result_outage = fdpf.solve(outage=outage)
+        self.assertTrue(result_outage['converged'][0])
+        network_outage = opf.parse_file(matpower_fn)
+        network_outage['branch'][outage]['br_status'] = 0
+        result_newton_outage = opf.ac_power_flow(network_outage)
+        for bus_id, bus in network_outage['bus'].items():
+            self.assertAlmostEqual(result_outage['vm'][bus['index'],0], result_newton_outage['sol']['primal']['vm'][bus_id], places=6)
+        with self.assertRaises(ValueError): # radial branch to bus 8
+            fdpf.solve(outage='14')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,55 @@
+import unittest
+import opf
+from pathlib import Path
+from opf.core.admm import RegionSubproblem
+from opf.core.utils import _preprocessing_network
+from helpers import requires_ipopt
+
+
+class ADMMTest(unittest.TestCase):
+    def test_partition(self):
+        network = opf.parse_file(Path("./data/pglib_opf_case14_ieee.m"))
+        regions = opf.partition_network(network, n_parts=2) # a single area in the file
+        self.assertEqual(set(regions.values()), {0, 1})
+        self.assertEqual(sorted(regions), sorted(network['bus']))
+        for bus_id, bus in network['bus'].items():
+            bus['area'] = 1 if int(bus_id) <= 5 else 2
+        regions = opf.partition_network(network)
+        self.assertEqual([regions[bus_id] for bus_id in ['1', '5', '6', '14']], [0, 0, 1, 1])
+
+    def test_region_subproblem(self):
+        network = opf.parse_file(Path("./data/pglib_opf_case5_pjm.m"))
+        _preprocessing_network(network)
+        regions = {'1': 1, '2': 0, '3': 0, '4': 0, '5': 1}
+        consensus = [('vm', '1'), ('va', '1'), ('vm', '2'), ('va', '2')]
+        shared = {'network': network, 'regions': regions, 'model_type': 'acopf', 'consensus': {0: consensus},
+                  'weight': {0: [1.] * len(consensus)}, 'rho': 1e3, 'solver': 'ipopt', 'solver_option': {}}
+        m = RegionSubproblem(0, shared).instance
+        self.assertEqual(sorted(m.B), ['1', '2', '3', '4', '5']) # buses 1 and 5 are the ghosts of the tie branches
+        self.assertEqual(sorted(m.G), ['3', '4'])
+        self.assertEqual([b for b in m.B if not m.cnst_p_balance[b].active], ['1', '5'])
+        self.assertEqual(list(m.slack), ['4'])
+        self.assertEqual(network['bus']['1']['index'], 0) # the original network is not changed
+
+    @requires_ipopt
+    def test_solve_dcopf(self):
+        network = opf.parse_file(Path("./data/pglib_opf_case5_pjm.m"))
+        result = opf.solve_admm(network, 'dcopf', n_parts=2, rho=1e4, n_jobs=2)
+        self.assertEqual(result['termination_status'], 'converged')
+        self.assertAlmostEqual(result['obj_cost'] / 17479.896769813888, 1., places=4)
+        self.assertEqual(len(result['sol']['primal']['pf']), len(network['branch']))
+        last = result['admm']['iterations'][-1]
+        self.assertLessEqual(last['primal_residual'], 1e-6)
+        self.assertLessEqual(last['dual_residual'], 1e-4 * last['dual_scale'])
+
+    @requires_ipopt
+    def test_solve_dcopf_default(self):
+        # the degenerate subproblems of case14 need about 1750 iterations, within the default max_iter
+        network = opf.parse_file(Path("./data/pglib_opf_case14_ieee.m"))
+        result = opf.solve_admm(network, 'dcopf')
+        self.assertEqual(result['termination_status'], 'converged')
+        self.assertAlmostEqual(result['obj_cost'] / 2051.5263090000026, 1., places=3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,45 @@
+import unittest
+import opf
+from pathlib import Path
+import numpy as np
+
+from opf.core.contingency import get_branch_flows, get_branch_rating
+
+
+class ContingencyScreeningTest(unittest.TestCase):
+    def _dispatch(self, network):
+        return {'sol': {'primal': {'pg': {genid: gen['pg'] for genid, gen in network['gen'].items()}}}}
+
+    def test_screen_case14(self):
+        matpower_fn = Path("./data/pglib_opf_case14_ieee.m")
+        network = opf.parse_file(matpower_fn)
+        result = self._dispatch(network)
+        screened = opf.screen_contingencies(network, result, threshold=0.5)
+
+        # compare with the dense LODF
+        branchids = sorted(list(network['branch'].keys()))
+        outage_idxs = [idx for idx, branchid in enumerate(branchids) if branchid not in screened['islanding']]
+        lodf = opf.compute_lodf(network, outage_idxs)
+        pf = get_branch_flows(network, result)
+        rate = get_branch_rating(network)
+        loading = np.abs(pf[:,None] + lodf * pf[outage_idxs][None,:]) / rate[:,None]
+        self.assertEqual(screened['nviolation'], int(np.sum(loading > 0.5)))
+        self.assertAlmostEqual(screened['violations'][0]['loading'], loading.max())
+
+        loadings = [v['loading'] for v in screened['violations']]
+        self.assertEqual(loadings, sorted(loadings, reverse=True))
+        self.assertEqual(screened['islanding'], ['14']) # the radial branch to bus 8
+
+    def test_screen_top_k_parallel(self):
+        matpower_fn = Path("./data/pglib_opf_case14_ieee.m")
+        network = opf.parse_file(matpower_fn)
+        result = self._dispatch(network)
+        screened = opf.screen_contingencies(network, result, threshold=0.5)
+        screened_thread = opf.screen_contingencies(network, result, threshold=0.5, top_k=5, chunk_size=3, n_jobs=2)
+        screened_process = opf.screen_contingencies(network, result, threshold=0.5, top_k=5, chunk_size=3, n_jobs=2, parallel='process')
+        self.assertEqual(screened_thread['violations'], screened['violations'][:5])
+        self.assertEqual(screened_process['violations'], screened['violations'][:5])
+
+
+if __name__ == '__main__':
+    unittest.main()
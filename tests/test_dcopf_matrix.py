@@ -0,0 +1,94 @@
+import unittest
+import importlib.util
+import numpy as np
+import opf
+from pathlib import Path
+from helpers import parse_with_zero_rating
+
+
+def _stationarity(model, result):
+    """ max residual of Px + q = A'y + z recovered from the result dictionary
+    """
+    inst = model.instance
+    x = np.zeros(inst['A'].shape[1]); z = np.zeros_like(x); y = np.zeros(inst['A'].shape[0])
+    for name, ids, pos, bounded in inst['variables']:
+        x[pos] = [result['sol']['primal'][name][i] for i in ids]
+        if bounded:
+            z[pos] = [result['sol']['bound'][name]['lb_'+i] + result['sol']['bound'][name]['ub_'+i] for i in ids]
+    for name, ids, pos in inst['constraints']:
+        y[pos] = [result['sol']['dual'][name][i] for i in ids]
+    return np.abs(inst['P'] @ x + inst['q'] - inst['A'].T @ y - z).max()
+
+
+class DCOPFMatrixTest(unittest.TestCase):
+    def solve(self, case, model_type, solver):
+        network = opf.parse_file(Path(f"./data/{case}"))
+        model = opf.build_model(model_type, backend='matrix')
+        self.assertEqual(model.model_type, model_type)
+        model.instantiate(network)
+        return model, model.solve(solver, extract_dual=True)
+
+    def check_case5(self, solver):
+        for model_type in ['dcopf', 'dcopf-ptdf']:
+            model, result = self.solve('pglib_opf_case5_pjm.m', model_type, solver)
+            self.assertEqual(result['termination_status'], 'optimal')
+            self.assertAlmostEqual(result['obj_cost'], 17479.896769813888, places=2)
+            self.assertAlmostEqual(result['sol']['primal']['pg']['3'], 3.2349483673666066, places=5)
+            self.assertAlmostEqual(result['sol']['primal']['pg']['5'], 4.6650515988209955, places=5)
+            self.assertLess(_stationarity(model, result), 1e-4)
+            for idx, v in result['sol']['bound']['pg'].items():
+                if idx.startswith('lb_'):
+                    self.assertGreaterEqual(v, 0.)
+                else:
+                    self.assertLessEqual(v, 0.)
+            if model_type == 'dcopf':
+                self.assertAlmostEqual(result['sol']['primal']['va']['1'], -0.05735150733969868, places=5)
+                self.assertEqual(list(result['sol']['dual'].keys()), ['cnst_slack_va', 'cnst_pf', 'cnst_power_bal'])
+                self.assertEqual(result['sol']['bound']['va'], {})
+            else:
+                self.assertEqual(list(result['sol']['dual']['cnst_power_bal'].keys()), ['None'])
+
+    @unittest.skipUnless(importlib.util.find_spec('highspy'), 'highspy is not installed')
+    def test_highs(self):
+        self.check_case5('highs')
+
+    @unittest.skipUnless(importlib.util.find_spec('highspy'), 'highspy is not installed')
+    def test_unrated_branch(self):
+        # the parser drops the zero rating of the binding branch '6', which is then unlimited in both models
+        network = parse_with_zero_rating(Path("./data/pglib_opf_case5_pjm.m"), [5])
+        for model_type in ['dcopf', 'dcopf-ptdf']:
+            model = opf.build_model(model_type, backend='matrix')
+            model.instantiate(network)
+            result = model.solve('highs')
+            self.assertEqual(result['termination_status'], 'optimal')
+            self.assertAlmostEqual(result['obj_cost'], 14810., places=2)
+
+    @unittest.skipUnless(importlib.util.find_spec('osqp'), 'osqp is not installed')
+    def test_osqp(self):
+        self.check_case5('osqp')
+
+    @unittest.skipUnless(importlib.util.find_spec('clarabel'), 'clarabel is not installed')
+    def test_clarabel(self):
+        self.check_case5('clarabel')
+
+    @unittest.skipUnless(importlib.util.find_spec('highspy'), 'highspy is not installed')
+    def test_case14(self):
+        model, result = self.solve('pglib_opf_case14_ieee.m', 'dcopf', 'highs')
+        self.assertEqual(result['termination_status'], 'optimal')
+        self.assertAlmostEqual(result['obj_cost'], 2051.5262699779273, places=3)
+        self.assertAlmostEqual(result['sol']['primal']['va']['2'], 0.11768346281509813, places=6)
+        self.assertAlmostEqual(result['sol']['primal']['pf']['1'], 1.7962128752942261, places=6)
+        # every bus has the same marginal price without congestion
+        lmp = np.asarray(list(result['sol']['dual']['cnst_power_bal'].values()))
+        self.assertLess(np.ptp(lmp), 1e-6)
+
+    def test_unsupported(self):
+        with self.assertRaises(ValueError):
+            opf.build_model('acopf', backend='matrix')
+        model = opf.build_model('dcopf', backend='matrix')
+        with self.assertRaises(RuntimeError):
+            model.solve()
+
+
+if __name__ == '__main__':
+    unittest.main()
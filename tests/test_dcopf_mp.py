@@ -0,0 +1,81 @@
+import unittest
+import pyomo.environ as pyo
+import opf
+from pathlib import Path
+from helpers import requires_ipopt, parse_with_zero_rating, network_and_profile
+
+
+class DCOPFMultiPeriodTest(unittest.TestCase):
+    def test_instance(self):
+        network, profile = network_and_profile(6)
+        model = opf.build_model('dcopf-mp', interval=30.)
+        model.instantiate(network, profile)
+        m = model.instance
+        self.assertEqual(len(m.pg), 5 * 6)
+        self.assertEqual(len(m.cnst_power_bal), 5 * 6)
+        self.assertEqual(len(m.cnst_ramp), 5 * 5) # no ramp into the first period
+        self.assertEqual(len(m.cnst_ramp_init), 0)
+        self.assertAlmostEqual(pyo.value(m.ramp['1']), 0.1 * network['gen']['1']['pmax'])
+        for load_id, load in network['load'].items():
+            self.assertAlmostEqual(pyo.value(m.pd[load_id,3]), profile[3,load['index']])
+
+        model = opf.build_model('dcopf-mp', ramp='ramp_agc') # no generator has the field
+        model.instantiate(network, profile, pg_prev={'1': 0.})
+        self.assertEqual(len(model.instance.cnst_ramp), 0)
+        self.assertEqual(len(model.instance.cnst_ramp_init), 0)
+
+        model = opf.build_model('dcopf-mp')
+        model.instantiate(network, profile, pg_prev={'1': 0.})
+        self.assertEqual(list(model.instance.cnst_ramp_init), ['1'])
+        with self.assertRaises(ValueError):
+            model.instantiate(network, profile[:,:2])
+        with self.assertRaises(ValueError):
+            opf.build_model('dcopf-mp', ramp='ramp_q')
+
+    def test_unlimited_branch(self):
+        # rate_a == 0 is unlimited in the single-period, the multi-period, and the AC models
+        _, profile = network_and_profile(2)
+        network = parse_with_zero_rating(Path("./data/pglib_opf_case5_pjm.m"), [0]) # the parser drops the zero rating
+        self.assertNotIn('rate_a', network['branch']['1'])
+        model = opf.build_model('dcopf-mp')
+        model.instantiate(network, profile)
+        self.assertEqual(model.instance.pf['1',0].bounds, (None, None))
+        self.assertEqual(model.instance.pf['2',0].bounds, (-network['branch']['2']['rate_a'], network['branch']['2']['rate_a']))
+        for drop_redundant_limits in [False, True]:
+            model = opf.build_model('dcopf', drop_redundant_limits=drop_redundant_limits)
+            model.instantiate(network)
+            self.assertEqual(model.instance.pf['1'].bounds, (None, None))
+        model = opf.build_model('dcopf-ptdf')
+        model.instantiate(network)
+        self.assertNotIn('1', model.instance.cnst_pf_ptdf)
+        for model_type in ['acopf', 'acopf-soc']:
+            model = opf.build_model(model_type)
+            model.instantiate(network)
+            self.assertNotIn('1', model.instance.cnst_thermal_branch_from)
+            self.assertIn('2', model.instance.cnst_thermal_branch_to)
+
+    @requires_ipopt
+    def test_solve(self):
+        network, profile = network_and_profile(4)
+        model = opf.build_model('dcopf-mp')
+        model.instantiate(network, profile)
+        result = model.solve('ipopt')
+        self.assertEqual(result['termination_status'], 'optimal')
+
+        # the periods are the single-period DC-OPFs if the ramps are not limited
+        model = opf.build_model('dcopf-mp', ramp='ramp_agc')
+        model.instantiate(network, profile)
+        obj_mp = model.solve('ipopt')['obj_cost']
+        self.assertLessEqual(obj_mp, result['obj_cost'] + 1e-4)
+        obj_single = 0.
+        for t in range(4):
+            for load in network['load'].values():
+                load['pd'] = profile[t,load['index']]
+            single = opf.build_model('dcopf')
+            single.instantiate(network)
+            obj_single += single.solve('ipopt')['obj_cost']
+        self.assertAlmostEqual(obj_mp / obj_single, 1., places=5)
+
+
+if __name__ == '__main__':
+    unittest.main()
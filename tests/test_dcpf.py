@@ -0,0 +1,49 @@
+import unittest
+import opf
+from pathlib import Path
+import numpy as np
+
+
+class DCPowerFlowTest(unittest.TestCase):
+    def test_dc_power_flow_case14(self):
+        matpower_fn = Path("./data/pglib_opf_case14_ieee.m")
+        network = opf.parse_file(matpower_fn)
+        ptdf_g, ptdf_l = opf.compute_ptdf(network)
+        G, L = ptdf_g.shape[1], ptdf_l.shape[1]
+
+        rng = np.random.default_rng(0)
+        pg = rng.uniform(0., 1., size=(G, 100))
+        pd = rng.uniform(0., 0.5, size=(L, 100))
+        result = opf.dc_power_flow(network, pg, load=pd)
+        np.testing.assert_almost_equal(result['pf'], ptdf_g @ pg - ptdf_l @ pd)
+        np.testing.assert_almost_equal(result['p_slack'], pd.sum(axis=0) - np.delete(pg, [g['index'] for g in network['gen'].values() if g['gen_bus'] == '1'], axis=0).sum(axis=0))
+
+        # bus injections
+        p = opf.compute_generator_incidence_matrix(network) @ pg - opf.compute_load_incidence_matrix(network) @ pd
+        result_bus = opf.dc_power_flow(network, p)
+        np.testing.assert_almost_equal(result_bus['pf'], result['pf'])
+        np.testing.assert_almost_equal(result_bus['va'], result['va'])
+
+        # power balance
+        I_e = opf.compute_line_incidence_matrix(network)
+        p[0] = result['p_slack'] # bus '1' is the slack bus
+        np.testing.assert_almost_equal(I_e @ result['pf'], p)
+
+    def test_dc_power_flow_options(self):
+        matpower_fn = Path("./data/pglib_opf_case5_pjm.m")
+        network = opf.parse_file(matpower_fn)
+        rng = np.random.default_rng(0)
+        p = rng.uniform(-1., 1., size=(len(network['bus']), 50))
+        dcpf = opf.DCPowerFlow(network)
+        result = dcpf.solve(p)
+        result_chunk = dcpf.solve(p, dtype=np.float32, chunk_size=7, return_va=False)
+        self.assertEqual(result_chunk['pf'].dtype, np.float32)
+        self.assertIsNone(result_chunk['va'])
+        np.testing.assert_allclose(result_chunk['pf'], result['pf'], rtol=1e-5, atol=1e-5)
+
+        result_vector = dcpf.solve(p[:,3])
+        np.testing.assert_almost_equal(result_vector['pf'], result['pf'][:,3])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,93 @@
+import unittest
+import warnings
+import numpy as np
+import opf
+from pathlib import Path
+from helpers import requires_ipopt
+
+
+class DCSCOPFSolveTest(unittest.TestCase):
+    def test_sole_generator_contingency(self):
+        # the outage of the only generator with pmax > 0 has no participation to share, and it is excluded
+        network = opf.parse_file(Path("./data/pglib_opf_case5_pjm.m"))
+        for gen_id, gen in network['gen'].items():
+            if gen_id != '1':
+                gen['pmin'] = gen['pmax'] = 0.
+        model = opf.build_model('dcscopf')
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter('always')
+            model.instantiate(network, generator_contingency=['1', '2'], line_contingency='all')
+        self.assertTrue(any('Generator contingency ID 1 ' in str(w.message) for w in caught))
+        self.assertEqual(list(model.instance.CG), ['2'])
+        self.assertTrue(np.all(np.isfinite(model.model.godf_raw)))
+
+    @requires_ipopt
+    def test_solve_case5(self):
+        matpower_fn = Path("./data/pglib_opf_case5_pjm.m")
+        network = opf.parse_file(matpower_fn)
+        model = opf.build_model('dcscopf')
+        self.assertEqual(model.model_type, 'dcscopf')
+        model.instantiate(network, generator_contingency=[], line_contingency='all')
+        result = model.solve('ipopt', extract_contingency=True)
+
+        self.assertEqual(result['termination_status'], 'optimal')
+        self.assertAlmostEqual(result['obj_cost'], 22869.59595959595, places=2)
+        self.assertLess(len(result['contingency']['line']), len(network['branch'])*(len(network['branch'])-1))
+
+        # the solution should be secure
+        screened = opf.screen_contingencies(network, result, threshold=1.+1e-5)
+        self.assertEqual(screened['nviolation'], 0)
+
+    @requires_ipopt
+    def test_solve_case5_extensive(self):
+        matpower_fn = Path("./data/pglib_opf_case5_pjm.m")
+        network = opf.parse_file(matpower_fn)
+        model = opf.build_model('dcscopf')
+        model.instantiate(network, generator_contingency=[], line_contingency='all')
+        result = model.solve('ipopt', solve_method='extensive', extract_contingency=True)
+
+        self.assertEqual(result['termination_status'], 'optimal')
+        self.assertAlmostEqual(result['obj_cost'], 22869.59595959595, places=2)
+        self.assertEqual(len(result['contingency']['line']), len(network['branch'])*(len(network['branch'])-1))
+
+    @requires_ipopt
+    def test_solve_case5_decomposition(self):
+        matpower_fn = Path("./data/pglib_opf_case5_pjm.m")
+        network = opf.parse_file(matpower_fn)
+        for gen in network['gen'].values():
+            gen['ramp_10'] = 0.5 # corrective redispatch limit
+        model = opf.build_model('dcscopf')
+        model.instantiate(network, generator_contingency=[], line_contingency='all', n_jobs=2)
+        result = model.solve('ipopt', solve_method='decomposition', extract_contingency=True)
+
+        self.assertEqual(result['termination_status'], 'optimal')
+        self.assertAlmostEqual(result['obj_cost'], 21052.274052478126, places=1) # cheaper than the preventive one
+        self.assertAlmostEqual(result['contingency']['iterations'][-1]['gap'], 0.)
+        for redispatch in result['contingency']['redispatch'].values():
+            self.assertAlmostEqual(sum(redispatch.values()), 0., places=5)
+            for dpg in redispatch.values():
+                self.assertLessEqual(abs(dpg), 0.5 + 1e-6)
+
+    @requires_ipopt
+    def test_decomposition_bounds(self):
+        network = opf.parse_file(Path("./data/pglib_opf_case5_pjm.m"))
+        for gen in network['gen'].values():
+            gen['ramp_10'] = 0.5
+        model = opf.build_model('dcscopf')
+        model.instantiate(network, generator_contingency=[], line_contingency='all')
+        iterations = model.solve('ipopt', solve_method='decomposition', extract_contingency=True)['contingency']['iterations']
+
+        self.assertGreater(len(iterations), 1)
+        gaps = [it['gap'] for it in iterations]
+        for it in iterations[:-1]: # before the convergence
+            self.assertTrue(0. < it['gap'] < 1.)
+            self.assertGreater(it['max_violation'], model.tol)
+        for prev, it in zip(iterations, iterations[1:]):
+            self.assertLessEqual(it['ub'], prev['ub'])
+            self.assertGreaterEqual(it['lb'], prev['lb'] - 1e-6 * abs(prev['lb']))
+            self.assertLessEqual(it['gap'], prev['gap'] + 1e-8)
+        self.assertAlmostEqual(gaps[-1], 0.)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,79 @@
+import unittest
+import numpy as np
+import opf
+from pathlib import Path
+
+
+def _grid(n:int):
+    """ f_idx and t_idx of the n x n grid graph
+    """
+    idx = np.arange(n * n).reshape(n, n)
+    f_idx = np.concatenate([idx[:, :-1].ravel(), idx[:-1, :].ravel()])
+    t_idx = np.concatenate([idx[:, 1:].ravel(), idx[1:, :].ravel()])
+    return f_idx, t_idx
+
+
+class PartitionTest(unittest.TestCase):
+    def test_grid(self):
+        f_idx, t_idx = _grid(40)
+        for n_parts in [2, 4, 7]:
+            partition = opf.compute_graph_partition(f_idx, t_idx, n_parts, seed=1)
+            parts = partition['parts']
+            self.assertEqual(partition['sizes'].sum(), 1600)
+            self.assertEqual(partition['sizes'].size, n_parts)
+            self.assertLessEqual(partition['sizes'].max(), 1.03 * 1600 / n_parts + 1)
+            # the cut edges and the boundary nodes are consistent with the parts
+            np.testing.assert_array_equal(partition['cut_edges'], np.nonzero(parts[f_idx] != parts[t_idx])[0])
+            boundary = np.zeros(1600, dtype=bool)
+            boundary[f_idx[partition['cut_edges']]] = boundary[t_idx[partition['cut_edges']]] = True
+            np.testing.assert_array_equal(partition['boundary_nodes'], np.nonzero(boundary)[0])
+        # a bisection of the grid cuts about one row (40 edges)
+        self.assertLessEqual(opf.compute_graph_partition(f_idx, t_idx, 2)['cut_edges'].size, 60)
+
+    def test_seed(self):
+        f_idx, t_idx = _grid(30)
+        first = opf.compute_graph_partition(f_idx, t_idx, 5, seed=3)
+        second = opf.compute_graph_partition(f_idx, t_idx, 5, seed=3)
+        np.testing.assert_array_equal(first['parts'], second['parts'])
+        with self.assertRaises(ValueError):
+            opf.compute_graph_partition(f_idx, t_idx, 0)
+
+    def test_network(self):
+        network = opf.parse_file(Path("./data/pglib_opf_case14_ieee.m"))
+        admittance = opf.compute_branch_admittance(network)
+        f_idx, t_idx = admittance['f_idx'], admittance['t_idx']
+        regions = opf.partition_network(network, n_parts=3, method='multilevel')
+        bfs = opf.partition_network(network, n_parts=3, method='bfs')
+        self.assertEqual(set(regions.values()), {0, 1, 2})
+        parts, parts_bfs = np.empty(14, dtype=int), np.empty(14, dtype=int)
+        for bus_id, bus in network['bus'].items():
+            parts[bus['index']], parts_bfs[bus['index']] = regions[bus_id], bfs[bus_id]
+        self.assertLessEqual(np.sum(parts[f_idx] != parts[t_idx]), np.sum(parts_bfs[f_idx] != parts_bfs[t_idx]))
+
+    def test_random_tree(self):
+        # the refinement should not drain parts below the lower bound either (random trees with chords are hard to balance)
+        n = 5000
+        rng = np.random.default_rng(0)
+        parent = (rng.random(n - 1) * np.arange(1, n)).astype(int)
+        f_idx = np.concatenate([np.arange(1, n), rng.integers(0, n, 2000)])
+        t_idx = np.concatenate([parent, rng.integers(0, n, 2000)])
+        for n_parts in [4, 16]:
+            sizes = opf.compute_graph_partition(f_idx, t_idx, n_parts)['sizes']
+            self.assertEqual(sizes.sum(), n)
+            self.assertLessEqual(sizes.max(), 1.03 * n / n_parts + 1)
+            self.assertGreaterEqual(sizes.min(), 0.97 * n / n_parts - 1)
+
+    def test_star(self):
+        # the coarsening of a star stalls at the leaves, so the large star falls back to the breadth-first partition,
+        # whose leaves cut off from their regions should not all join the region of the hub
+        n = 6001
+        f_idx, t_idx = np.zeros(n - 1, dtype=int), np.arange(1, n)
+        for n_parts in [2, 4]:
+            sizes = opf.compute_graph_partition(f_idx, t_idx, n_parts)['sizes']
+            self.assertEqual(sizes.sum(), n)
+            self.assertLessEqual(sizes.max(), np.ceil(n / n_parts) * 1.03)
+            self.assertGreater(sizes.min(), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
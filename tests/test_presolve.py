@@ -0,0 +1,105 @@
+import unittest
+import importlib.util
+import numpy as np
+from scipy.optimize import linprog
+import pyomo.environ as pyo
+import opf
+from pathlib import Path
+from helpers import requires_ipopt, parse_with_zero_rating
+
+
+class ThermalLimitPresolveTest(unittest.TestCase):
+    def test_flow_bounds(self):
+        # the bounds are the optima of the LPs over the generator bounds and the power balance
+        network = opf.parse_file(Path("./data/pglib_opf_case14_ieee.m"))
+        lower, upper = opf.compute_flow_bounds(network)
+        ptdf_g, ptdf_l = opf.compute_ptdf(network)
+        gens = list(network['gen'].values())
+        pd = np.asarray([load['pd'] for load in network['load'].values()])
+        for e in range(ptdf_g.shape[0]):
+            for sign, bound in [(1., upper[e]), (-1., lower[e])]:
+                lp = linprog(-sign * ptdf_g[e], A_eq=np.ones((1, len(gens))), b_eq=[pd.sum()], bounds=[(gen['pmin'], gen['pmax']) for gen in gens])
+                self.assertAlmostEqual(-sign * lp.fun - ptdf_l[e] @ pd, bound, places=6)
+
+    @unittest.skipUnless(importlib.util.find_spec('highspy'), 'highspy is not installed')
+    def test_same_solution(self):
+        network = opf.parse_file(Path("./data/pglib_opf_case5_pjm.m"))
+        self.assertEqual(opf.redundant_thermal_limits(network), ['1', '2', '3', '4', '5'])
+        for model_type in ['dcopf', 'dcopf-ptdf']:
+            model = opf.build_model(model_type, backend='matrix', drop_redundant_limits=True)
+            model.instantiate(network)
+            result = model.solve('highs')
+            self.assertEqual(model.presolve_info['nremoved'], 5)
+            self.assertAlmostEqual(result['obj_cost'], 17479.896769813888, places=2)
+            self.assertAlmostEqual(result['sol']['primal']['pg']['3'], 3.2349483673666066, places=5)
+
+    def test_pyomo_models(self):
+        network = opf.parse_file(Path("./data/pglib_opf_case5_pjm.m"))
+        model = opf.build_model('dcopf-ptdf', drop_redundant_limits=True)
+        model.instantiate(network)
+        self.assertEqual(list(model.instance.cnst_pf_ptdf.keys()), ['6'])
+        model = opf.build_model('dcopf', drop_redundant_limits=True)
+        model.instantiate(network)
+        self.assertEqual([e for e in model.instance.E if model.instance.pf[e].has_ub()], ['6'])
+
+    def test_unrated_branch(self):
+        # the parser drops the zero rating, which is unlimited and never redundant
+        network = parse_with_zero_rating(Path("./data/pglib_opf_case5_pjm.m"), [5])
+        self.assertEqual(opf.redundant_thermal_limits(network), ['1', '2', '3', '4', '5'])
+        self.assertNotIn('6', opf.compute_nlp_scaling_factors(network)['thermal'])
+
+
+class ACPresolveTest(unittest.TestCase):
+    def test_angle_bounds(self):
+        network = opf.parse_file(Path("./data/pglib_opf_case14_ieee.m"))
+        bounds = opf.compute_angle_bounds(network)
+        self.assertEqual(bounds['1'], (0., 0.)) # slack
+        for branch in network['branch'].values():
+            # the bounds are consistent along every branch (the shortest path property)
+            f, t = bounds[branch['f_bus']], bounds[branch['t_bus']]
+            self.assertLessEqual(t[1], f[1] - branch['angmin'] + 1e-12)
+            self.assertLessEqual(f[1], t[1] + branch['angmax'] + 1e-12)
+            self.assertGreaterEqual(t[0], f[0] - branch['angmax'] - 1e-12)
+        va = opf.ac_power_flow(network)['sol']['primal']['va']
+        for bus_id, (lower, upper) in bounds.items():
+            self.assertTrue(lower <= va[bus_id] <= upper)
+
+    def test_model_bounds_and_scaling(self):
+        network = opf.parse_file(Path("./data/pglib_opf_case5_pjm.m"))
+        model = opf.build_model('acopf', tighten_bounds=True, user_scaling=True)
+        model.instantiate(network)
+        m = model.instance
+        self.assertEqual(model.presolve_info['nbounded_va'], 5)
+        self.assertAlmostEqual(m.va['2'].ub, np.pi / 3, places=12) # two branches of 30 degrees from the slack '4'
+        for e in m.E:
+            self.assertEqual(m.qf_to[e].bounds, (-network['branch'][e]['rate_a'], network['branch'][e]['rate_a']))
+            self.assertAlmostEqual(m.scaling_factor[m.cnst_thermal_branch_from[e]] * network['branch'][e]['rate_a']**2, 1., places=12)
+            self.assertLessEqual(m.scaling_factor[m.cnst_ohm_pf_from[e]], 1.)
+        self.assertAlmostEqual(m.scaling_factor[m.obj_cost], model.presolve_info['obj_scaling'], places=12)
+
+        model = opf.build_model('acopf')
+        model.instantiate(network)
+        self.assertIsNone(model.instance.va['2'].ub)
+        self.assertFalse(hasattr(model.instance, 'scaling_factor'))
+
+    @requires_ipopt
+    def test_same_solution(self):
+        for tighten_bounds, user_scaling in [(True, False), (False, True), (True, True)]:
+            model = opf.build_model('acopf', tighten_bounds=tighten_bounds, user_scaling=user_scaling)
+            model.instantiate(opf.parse_file(Path("./data/pglib_opf_case5_pjm.m")))
+            result = model.solve('ipopt')
+            self.assertEqual(result['termination_status'], 'optimal')
+            self.assertAlmostEqual(result['obj_cost'], 17551.8908385928, places=3)
+
+    @requires_ipopt
+    def test_scaling_option_not_kept(self):
+        # the user scaling is set only for the solve, so the optimizer is reusable for the models without the scaling factors
+        optimizer = pyo.SolverFactory('ipopt')
+        model = opf.build_model('acopf', user_scaling=True)
+        model.instantiate(opf.parse_file(Path("./data/pglib_opf_case5_pjm.m")))
+        self.assertEqual(model.solve(optimizer)['termination_status'], 'optimal')
+        self.assertNotIn('nlp_scaling_method', optimizer.options)
+
+
+if __name__ == '__main__':
+    unittest.main()
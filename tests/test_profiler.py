@@ -0,0 +1,72 @@
+import unittest
+import importlib.util
+import threading
+from unittest import mock
+import opf
+from opf.core.profiler import _per_stage_peaks
+from pathlib import Path
+
+
+class ProfilerTest(unittest.TestCase):
+    def test_stages(self):
+        records = []
+        with opf.profiling(callback=records.append, memory=True, components=True) as profiler:
+            network = opf.parse_file(Path("./data/pglib_opf_case14_ieee.m"))
+            model = opf.build_model('dcopf-ptdf')
+            model.instantiate(network)
+        stages = [record['stage'] for record in profiler.report()['stages']]
+        self.assertEqual(stages, ['parse_file', 'parse_file/parse', 'parse_file/make_per_unit', 'build_model',
+                                  'instantiate', 'instantiate/preprocess', 'instantiate/compute_ptdf', 'instantiate/create_instance'])
+        self.assertEqual(len(records), len(stages))
+        for record in records:
+            self.assertGreaterEqual(record['wall'], 0.)
+            self.assertGreaterEqual(record['cpu'], 0.)
+            if _per_stage_peaks:
+                self.assertGreaterEqual(record['peak_memory'], 0)
+        by_stage = { record['stage']: record for record in records }
+        self.assertGreaterEqual(by_stage['instantiate']['wall'], by_stage['instantiate/create_instance']['wall'])
+        if _per_stage_peaks:
+            self.assertGreaterEqual(by_stage['instantiate']['peak_memory'], by_stage['instantiate/compute_ptdf']['peak_memory'])
+
+        components = { record['component']: record for record in profiler.report()['components'] }
+        self.assertEqual(components['pg']['type'], 'Var')
+        self.assertEqual(components['pg']['nindices'], len(network['gen']))
+        self.assertEqual(components['pg']['stage'], 'instantiate/create_instance')
+
+    @unittest.skipUnless(importlib.util.find_spec('highspy') is not None, "highspy is not installed")
+    def test_result(self):
+        network = opf.parse_file(Path("./data/pglib_opf_case5_pjm.m"))
+        model = opf.build_model('dcopf', backend='matrix')
+        model.instantiate(network)
+        self.assertNotIn('profile', model.solve('highs')) # disabled
+        with opf.profiling() as profiler:
+            result = model.solve('highs')
+            again = model.solve('highs')
+        stages = [record['stage'] for record in result['profile']['stages']]
+        self.assertEqual(stages, ['solve', 'solve/run_solver', 'solve/extract_result'])
+        # each result has only the stages of its own solve
+        self.assertEqual([record['stage'] for record in again['profile']['stages']], stages)
+        self.assertEqual(len(profiler.report()['stages']), 2 * len(stages))
+        self.assertIsNone(result['profile']['stages'][0]['peak_memory'])
+        self.assertEqual(result['profile']['components'], [])
+
+    def test_without_peaks(self):
+        # tracemalloc.reset_peak is missing before Python 3.9, and the peak memory is then not tracked
+        with mock.patch('opf.core.profiler._per_stage_peaks', False):
+            with opf.profiling(memory=True) as profiler:
+                opf.build_model('dcopf')
+        self.assertFalse(profiler.memory)
+        self.assertIsNone(profiler.report()['stages'][0]['peak_memory'])
+
+    def test_threads(self):
+        # the profiler is not shared with the other threads
+        with opf.profiling() as profiler:
+            thread = threading.Thread(target=opf.parse_file, args=(Path("./data/pglib_opf_case5_pjm.m"),))
+            thread.start()
+            thread.join()
+            opf.build_model('dcopf')
+        self.assertEqual([record['stage'] for record in profiler.report()['stages']], ['build_model'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,91 @@
+import unittest
+import importlib.util
+import copy
+import opf
+from pathlib import Path
+
+
+def _augmented_case14():
+    """ case14 with a dangling bus, parallel circuits, a series (zero-injection, degree two) bus, and a radial load bus
+    """
+    network = opf.parse_file(Path("./data/pglib_opf_case14_ieee.m"))
+    buses, branches = network['bus'], network['branch']
+    def add_bus(bus_id):
+        bus = copy.deepcopy(buses['14'])
+        bus['bus_i'] = bus['id'] = int(bus_id)
+        buses[bus_id] = bus
+    def add_branch(branch_id, f_bus, t_bus, template='3', **fields):
+        branch = copy.deepcopy(branches[template])
+        branch.update({'id': int(branch_id), 'f_bus': f_bus, 't_bus': t_bus, **fields})
+        branches[branch_id] = branch
+
+    add_bus('100') # dangling bus with the line charging
+    add_branch('100', '4', '100', b_fr=0.02, b_to=0.03)
+    add_branch('101', branches['1']['f_bus'], branches['1']['t_bus'], template='1') # identical double circuit
+    add_branch('102', '3', '2', br_r=0.03, br_x=0.1, b_fr=0.01, b_to=0.02) # reversed parallel line with a different impedance
+    add_bus('101') # split branch 10 (9-10) into the series of 9-101-10
+    f_bus, t_bus = branches['10']['f_bus'], branches['10']['t_bus']
+    add_branch('103', '101', t_bus, template='10', br_x=0.5*branches['10']['br_x'])
+    branches['10'].update({'t_bus': '101', 'br_x': 0.5*branches['10']['br_x']})
+    add_bus('102') # radial load bus
+    add_branch('104', '102', '13', template='20')
+    network['load']['100'] = {'pd': 0.05, 'qd': 0.01, 'load_bus': '102', 'status': 1, 'id': 100}
+    return network
+
+
+class NetworkReductionTest(unittest.TestCase):
+    def test_ac_power_flow(self):
+        # the AC power flow of the reduced network gives the same voltages and flows after the expansion
+        network = _augmented_case14()
+        reduction = opf.reduce(network, level='ac')
+        self.assertEqual(reduction.summary()['bus'], (17, 16))
+        self.assertEqual(reduction.summary()['branch'], (25, 22))
+        self.assertEqual(sorted(reduction.merged.values()), [['1', '101'], ['102', '3']])
+
+        full = opf.ac_power_flow(network)['sol']['primal']
+        expanded = reduction.expand(opf.ac_power_flow(reduction.network))['sol']['primal']
+        for name in ['vm', 'va', 'pf_from', 'qf_to', 'qg']:
+            self.assertEqual(expanded[name].keys(), full[name].keys())
+            for idx in full[name]:
+                self.assertAlmostEqual(expanded[name][idx], full[name][idx], places=7)
+
+    @unittest.skipUnless(importlib.util.find_spec('highspy'), 'highspy is not installed')
+    def test_dcopf(self):
+        network = _augmented_case14()
+        model = opf.build_model('dcopf', backend='matrix')
+        model.instantiate(network)
+        full = model.solve('highs')
+
+        reduction = opf.reduce(network, level='dc')
+        self.assertEqual(reduction.summary()['bus'], (17, 14))
+        for model_type in ['dcopf', 'dcopf-ptdf']:
+            model = opf.build_model(model_type, backend='matrix')
+            model.instantiate(reduction.network)
+            result = model.solve('highs')
+            self.assertAlmostEqual(result['obj_cost'], full['obj_cost'], places=4)
+            expanded = reduction.expand(result)['sol']['primal']
+            for idx, pf in full['sol']['primal']['pf'].items():
+                self.assertAlmostEqual(expanded['pf'][idx], pf, places=5)
+            if model_type == 'dcopf':
+                for idx, va in full['sol']['primal']['va'].items():
+                    self.assertAlmostEqual(expanded['va'][idx], va, places=5)
+
+    def test_unrated_branches(self):
+        # the ratings dropped by the parser (unlimited) are merged as unlimited
+        network = _augmented_case14()
+        for branch_id in ['101', '10', '104']: # the second circuit, a branch in series, and the radial branch
+            del network['branch'][branch_id]['rate_a']
+        reduction = opf.reduce(network, level='dc')
+        self.assertEqual(reduction.merged['1'], ['1', '101'])
+        self.assertAlmostEqual(reduction.network['branch']['1']['rate_a'], 2. * network['branch']['1']['rate_a']) # the half share of the rated circuit
+        self.assertEqual(reduction.merged['10'], ['10', '103'])
+        self.assertAlmostEqual(reduction.network['branch']['10']['rate_a'], network['branch']['103']['rate_a'])
+
+    def test_invalid_level(self):
+        network = opf.parse_file(Path("./data/pglib_opf_case5_pjm.m"))
+        with self.assertRaises(ValueError):
+            opf.reduce(network, level='kron')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,56 @@
+import unittest
+import os
+import tempfile
+import numpy as np
+import opf
+from pathlib import Path
+from opf.core.rolling import _shifted_warmstart
+from helpers import requires_ipopt, parse_with_zero_rating, network_and_profile
+
+
+class RollingHorizonTest(unittest.TestCase):
+    def test_shifted_warmstart(self):
+        values = {'pg': np.arange(8.).reshape(2, 4)}
+        warmstart = _shifted_warmstart(values, {'pg': ['1', '2']}, 2, 3)['primal']['pg']
+        self.assertEqual(warmstart[str(('1', 0))], 2.)
+        self.assertEqual(warmstart[str(('2', 1))], 7.)
+        self.assertEqual(warmstart[str(('2', 2))], 7.) # the last period is repeated
+        network, profile = network_and_profile(10, 24)
+        with self.assertRaises(ValueError):
+            opf.solve_rolling_horizon(network, profile, window=4, step=5)
+
+    @requires_ipopt
+    def test_solve(self):
+        network, profile = network_and_profile(30, 24)
+        with tempfile.TemporaryDirectory() as tmpdir:
+            output, log = os.path.join(tmpdir, 'dispatch.jsonl'), os.path.join(tmpdir, 'progress.jsonl')
+            result = opf.solve_rolling_horizon(network, profile, window=12, step=6, output=output, log=log)
+            self.assertEqual(result['termination_status'], 'optimal')
+            self.assertEqual(result['nwindows'], 4) # the last window commits its 12 periods
+            self.assertEqual(result['nperiods'], 30)
+            self.assertNotIn('sol', result)
+            dispatch = opf.read_rolling_horizon(output)
+            with open(log, 'r') as f:
+                self.assertEqual(len(f.readlines()), 4)
+        np.testing.assert_array_equal(dispatch['periods'], np.arange(30))
+        self.assertEqual(dispatch['pg'].shape, (5, 30))
+        np.testing.assert_allclose(dispatch['pg'].sum(axis=0), profile.sum(axis=1), rtol=1e-6)
+        ramp = np.asarray([0.2 * network['gen'][gen_id]['pmax'] for gen_id in dispatch['ids']['pg']]) # ramp_30 over an hour
+        self.assertTrue(np.all(np.abs(np.diff(dispatch['pg'], axis=1)) <= ramp[:,None] + 1e-6)) # also across the windows
+
+        # a single window is the multi-period DC-OPF
+        result = opf.solve_rolling_horizon(network, profile, window=30)
+        model = opf.build_model('dcopf-mp')
+        model.instantiate(network, profile)
+        self.assertAlmostEqual(result['obj_cost'] / model.solve('ipopt')['obj_cost'], 1., places=5)
+
+    @requires_ipopt
+    def test_unrated_branch(self):
+        # the parser drops the zero rating of the branch, which is unlimited in the windows and in the committed flows
+        network, profile = network_and_profile(30, 24, parse_with_zero_rating(Path("./data/pglib_opf_case5_pjm.m"), [5]))
+        result = opf.solve_rolling_horizon(network, profile, window=12, step=6)
+        self.assertEqual(result['termination_status'], 'optimal')
+
+
+if __name__ == '__main__':
+    unittest.main()
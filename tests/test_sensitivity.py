@@ -0,0 +1,58 @@
+import unittest
+import copy
+import opf
+from pathlib import Path
+import numpy as np
+
+
+class DCSensitivityTest(unittest.TestCase):
+    def _full_recompute(self, network, status):
+        network = copy.deepcopy(network)
+        for branch_id, in_service in status.items():
+            network['branch'][branch_id]['br_status'] = int(in_service)
+        ptdf_g, ptdf_l = opf.compute_ptdf(network)
+        I_g = opf.compute_generator_incidence_matrix(network).toarray()
+        return network, ptdf_g, I_g
+
+    def test_apply_switch_case14(self):
+        matpower_fn = Path("./data/pglib_opf_case14_ieee.m")
+        network = opf.parse_file(matpower_fn)
+        sens = opf.DCSensitivity(copy.deepcopy(network), refactor_every=None)
+        E = len(network['branch'])
+
+        switches = [('5', False), ('10', False), ('5', True), ('3', False)]
+        for branch_id, in_service in switches:
+            sens.apply_switch(branch_id, in_service)
+        self.assertEqual(sens.ptdf.shape[0], E) # branch indexing is kept
+
+        network_new, ptdf_g, I_g = self._full_recompute(network, {'10': False, '3': False})
+        np.testing.assert_almost_equal(sens.ptdf[sens.status] @ I_g, ptdf_g)
+        np.testing.assert_almost_equal(sens.ptdf[~sens.status], 0.)
+
+        outage_idxs = [network_new['branch'][branch_id]['index'] for branch_id in ['1', '2']]
+        lodf = opf.compute_lodf(network_new, outage_idxs)
+        np.testing.assert_almost_equal(sens.lodf(['1', '2'])[sens.status], lodf)
+
+    def test_refactorize_case14(self):
+        matpower_fn = Path("./data/pglib_opf_case14_ieee.m")
+        network = opf.parse_file(matpower_fn)
+        sens = opf.DCSensitivity(copy.deepcopy(network), refactor_every=3)
+        for _ in range(5):
+            for branch_id in ['2', '7', '12']:
+                sens.apply_switch(branch_id, False)
+                sens.apply_switch(branch_id, True)
+        ptdf = sens.ptdf.copy()
+        sens.refactorize()
+        np.testing.assert_almost_equal(ptdf, sens.ptdf)
+
+    def test_islanding_case14(self):
+        matpower_fn = Path("./data/pglib_opf_case14_ieee.m")
+        network = opf.parse_file(matpower_fn)
+        sens = opf.DCSensitivity(network)
+        with self.assertRaises(ValueError):
+            sens.apply_switch('14', False) # the radial branch to bus 8
+        self.assertTrue(np.all(np.isnan(sens.lodf(['14']))))
+
+
+if __name__ == '__main__':
+    unittest.main()
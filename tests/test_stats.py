@@ -0,0 +1,116 @@
+import unittest
+import pyomo.environ as pyo
+import opf
+from pathlib import Path
+from opf.core.stats import _solver_stats
+from helpers import requires_ipopt
+
+
+IPOPT_LOG = """
+This is Ipopt version 3.14.16, running with linear solver MUMPS 5.6.2.
+
+Number of nonzeros in equality constraint Jacobian...:      344
+Number of nonzeros in inequality constraint Jacobian.:       80
+Number of nonzeros in Lagrangian Hessian.............:      282
+
+Total number of variables............................:      118
+                     variables with only lower bounds:        0
+                variables with lower and upper bounds:       34
+Total number of equality constraints.................:       97
+Total number of inequality constraints...............:       60
+
+iter    objective    inf_pr   inf_du lg(mu)  ||d||  lg(rg) alpha_du alpha_pr  ls
+   0  1.0000000e+03 3.00e+00 1.00e+02  -1.0 0.00e+00    -  0.00e+00 0.00e+00   0
+   1  1.1000000e+03 2.90e+00 9.00e+01  -1.0 1.00e+00    -  1.00e-02 1.00e-02f  1
+   2r 1.1000000e+03 2.90e+00 9.99e+02   0.5 0.00e+00    -  0.00e+00 0.00e+00R  1
+   3r 1.1500000e+03 1.00e+00 5.00e+01   0.5 2.00e+00    -  5.00e-01 5.00e-01f  1
+   4  1.2000000e+03 5.00e-01 1.00e+00  -1.7 1.00e+00    -  1.00e+00 1.00e+00h  1
+   5r 1.2000000e+03 5.00e-01 9.99e+02  -0.3 0.00e+00    -  0.00e+00 0.00e+00R  1
+   6  2.1780804e+03 1.00e-09 1.00e-10  -9.0 1.00e-05    -  1.00e+00 1.00e+00h  1
+
+Number of Iterations....: 6
+
+                                   (scaled)                 (unscaled)
+Objective...............:   2.1780804250673879e+01    2.1780804250673879e+03
+Dual infeasibility......:   1.0000000000000000e-10    1.0000000000000000e-08
+Constraint violation....:   1.0000000000000000e-09    1.0000000000000000e-09
+Variable bound violation:   0.0000000000000000e+00    0.0000000000000000e+00
+Complementarity.........:   2.5059035596800626e-09    2.5059035596800626e-07
+Overall NLP error.......:   2.5059035596800626e-09    2.5059035596800626e-07
+
+
+Number of objective function evaluations             = 9
+Number of objective gradient evaluations             = 8
+Number of equality constraint evaluations            = 9
+Number of inequality constraint evaluations          = 9
+Number of equality constraint Jacobian evaluations   = 8
+Number of inequality constraint Jacobian evaluations = 8
+Number of Lagrangian Hessian evaluations             = 7
+
+Timing Statistics:
+
+OverallAlgorithm....................:      0.012 (sys:      0.001 wall:      0.013)
+ ComputeSearchDirection.............:      0.006 (sys:      0.000 wall:      0.006)
+ LinearSystemSymbolicFactorization..:      0.001 (sys:      0.000 wall:      0.001)
+ LinearSystemFactorization..........:      0.003 (sys:      0.000 wall:      0.004)
+ LinearSystemBackSolve..............:      0.001 (sys:      0.000 wall:      0.002)
+Function Evaluations................:      0.002 (sys:      0.000 wall:      0.003)
+ Objective function.................:      0.000 (sys:      0.000 wall:      0.000)
+ Lagrangian Hessian.................:      0.001 (sys:      0.000 wall:      0.001)
+Total seconds in IPOPT                               = 0.013
+
+EXIT: Optimal Solution Found.
+"""
+
+
+class SolverStatsTest(unittest.TestCase):
+    def test_parse_ipopt_log(self):
+        stats = opf.parse_ipopt_log(IPOPT_LOG)
+        self.assertEqual(stats['solver'], 'ipopt')
+        self.assertEqual(stats['iterations'], 6)
+        self.assertEqual(stats['restoration_iterations'], 3)
+        self.assertEqual(stats['restoration_entries'], 2)
+        self.assertAlmostEqual(stats['objective'], 2178.0804250673879)
+        self.assertAlmostEqual(stats['scaled']['objective'], 21.780804250673879)
+        self.assertEqual(stats['dual_infeasibility'], 1e-8)
+        self.assertEqual(stats['complementarity'], 2.5059035596800626e-07)
+        self.assertEqual(stats['evaluations'], {'objective': 9, 'gradient': 8, 'constraints': 9, 'jacobian': 8, 'hessian': 7})
+        self.assertEqual((stats['nvariables'], stats['nequality'], stats['ninequality']), (118, 97, 60))
+        self.assertEqual(stats['time_total'], 0.013)
+        self.assertEqual(stats['time_function_evaluations'], 0.003)
+        self.assertAlmostEqual(stats['time_linear_solver'], 0.007)
+        self.assertEqual(stats['timing']['OverallAlgorithm'], 0.013)
+        self.assertEqual(stats['exit'], 'Optimal Solution Found.')
+
+    def test_parse_partial_log(self):
+        # IPOPT <= 3.13 without the timing table
+        stats = opf.parse_ipopt_log("Total CPU secs in IPOPT (w/o function evaluations)   =      0.020\n"
+                                    "Total CPU secs in NLP function evaluations           =      0.005\n")
+        self.assertAlmostEqual(stats['time_total'], 0.025)
+        self.assertEqual(stats['time_function_evaluations'], 0.005)
+        self.assertIsNone(stats['time_linear_solver'])
+        stats = opf.parse_ipopt_log('') # print_level 0
+        self.assertIsNone(stats['iterations'])
+        self.assertIsNone(stats['complementarity'])
+        self.assertEqual(stats['restoration_entries'], 0)
+
+    def test_solver_stats(self):
+        optimizer = pyo.SolverFactory('ipopt')
+        optimizer._log = IPOPT_LOG # the output kept by the shell solvers of Pyomo
+        self.assertEqual(_solver_stats(optimizer)['iterations'], 6)
+        self.assertEqual(_solver_stats(pyo.SolverFactory('gurobi_direct')), {'solver': 'gurobi_direct'})
+
+    @requires_ipopt
+    def test_solve(self):
+        network = opf.parse_file(Path("./data/pglib_opf_case5_pjm.m"))
+        model = opf.build_model('acopf')
+        model.instantiate(network)
+        stats = model.solve('ipopt', tee=False)['stats']
+        self.assertGreater(stats['iterations'], 0)
+        self.assertEqual(stats['exit'], 'Optimal Solution Found.')
+        self.assertLess(stats['nlp_error'], 1e-6)
+        self.assertIsNotNone(stats['time_function_evaluations'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,62 @@
+import unittest
+import opf
+from pathlib import Path
+import numpy as np
+
+
+class ValidateTest(unittest.TestCase):
+    def test_validate_ac(self):
+        matpower_fn = Path("./data/pglib_opf_case14_ieee.m")
+        network = opf.parse_file(matpower_fn)
+        result = opf.ac_power_flow(network)
+        report = opf.validate(network, result)
+        self.assertEqual(report['type'], 'ac')
+        violations = report['violations']
+        for name in ['flow', 'p_balance', 'q_balance']:
+            self.assertLessEqual(violations[name]['max'], 1e-6)
+
+        primal = result['sol']['primal']
+        for name, lb, ub in [('qg', 'qmin', 'qmax'), ('pg', 'pmin', 'pmax')]:
+            expected = { gen_id: max(gen[lb] - primal[name][gen_id], primal[name][gen_id] - gen[ub], 0.) for gen_id, gen in network['gen'].items() }
+            self.assertAlmostEqual(violations[name]['max'], max(expected.values()))
+            self.assertEqual(set(violations[name]['index']), { gen_id for gen_id, v in expected.items() if v > 1e-6 })
+        self.assertFalse(report['feasible'])
+
+        # perturbed voltages break the power balance
+        primal['vm']['4'] += 0.01
+        report = opf.validate(network, result)
+        self.assertEqual(report['violations']['p_balance']['index'][0], '4')
+        self.assertGreater(report['violations']['flow']['max'], 1e-3)
+
+    def test_validate_dc(self):
+        matpower_fn = Path("./data/pglib_opf_case5_pjm.m")
+        network = opf.parse_file(matpower_fn)
+        validator = opf.Validator(network)
+        pg = { gen_id: gen['pmax'] * 0.5 for gen_id, gen in network['gen'].items() }
+        pd_total = sum(load['pd'] for load in network['load'].values())
+        pg['1'] += pd_total - sum(pg.values()) # balanced
+        gens, loads = network['gen'], network['load']
+        pg_vec = np.asarray([pg[gen_id] for gen_id in gens.keys()])
+        pd_vec = np.asarray([load['pd'] for load in loads.values()])
+        pf = opf.dc_power_flow(network, pg_vec, load=pd_vec)
+
+        # PTDF-type solution (generations only)
+        report = validator.validate({'sol': {'primal': {'pg': pg}}})
+        self.assertEqual(report['type'], 'dc')
+        self.assertLessEqual(report['violations']['p_balance']['max'], 1e-8)
+        expected = { branch_id: max(abs(pf['pf'][branch['index']]) - branch['rate_a'], 0.) for branch_id, branch in network['branch'].items() }
+        self.assertAlmostEqual(report['violations']['thermal']['max'], max(expected.values()))
+        self.assertEqual(set(report['violations']['thermal']['index']), { branch_id for branch_id, v in expected.items() if v > 1e-6 })
+
+        # B-theta type solution with a flow inconsistent with the angles
+        primal = {'pg': pg,
+                  'va': { bus_id: pf['va'][bus['index']] for bus_id, bus in network['bus'].items() },
+                  'pf': { branch_id: pf['pf'][branch['index']] for branch_id, branch in network['branch'].items() }}
+        primal['pf']['2'] += 0.1
+        report = validator.validate({'sol': {'primal': primal}})
+        self.assertEqual(report['violations']['flow']['index'], ['2'])
+        self.assertAlmostEqual(report['violations']['p_balance']['max'], 0.1)
+
+
+if __name__ == '__main__':
+    unittest.main()
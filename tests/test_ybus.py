@@ -0,0 +1,51 @@
+import unittest
+import opf
+from pathlib import Path
+import numpy as np
+
+
+class AdmittanceMatrixTest(unittest.TestCase):
+    def test_admittance_matrix_updates(self):
+        matpower_fn = Path("./data/pglib_opf_case14_ieee.m")
+        network = opf.parse_file(matpower_fn)
+        ybus = opf.AdmittanceMatrix(network)
+        Ybus, Yf, Yt = opf.compute_admittance_matrix(opf.parse_file(matpower_fn))
+        np.testing.assert_almost_equal(ybus.Ybus.toarray(), Ybus.toarray())
+
+        events = []
+        ybus.subscribe(events.append)
+        indices = ybus.Ybus.indices.copy()
+        indptr = ybus.Ybus.indptr.copy()
+
+        ybus.set_branch_status('3', False)
+        ybus.set_tap('9', tap=0.95, shift=0.05)
+        ybus.set_shunt('1', bs=0.3)
+
+        network_modified = opf.parse_file(matpower_fn)
+        network_modified['branch']['3']['br_status'] = 0
+        network_modified['branch']['9']['tap'] = 0.95
+        network_modified['branch']['9']['shift'] = 0.05
+        network_modified['shunt']['1']['bs'] = 0.3
+        Ybus, Yf, Yt = opf.compute_admittance_matrix(network_modified)
+        np.testing.assert_almost_equal(ybus.Ybus.toarray(), Ybus.toarray())
+        branch_idxs = [ybus.branch_idx[branch_id] for branch_id in network_modified['branch'].keys()]
+        np.testing.assert_almost_equal(ybus.Yf.toarray()[branch_idxs], Yf.toarray())
+        np.testing.assert_almost_equal(ybus.Yt.toarray()[branch_idxs], Yt.toarray())
+
+        # the nonzero pattern is fixed
+        np.testing.assert_array_equal(ybus.Ybus.indices, indices)
+        np.testing.assert_array_equal(ybus.Ybus.indptr, indptr)
+
+        self.assertEqual([event['type'] for event in events], ['branch_status', 'tap', 'shunt'])
+        self.assertEqual(events[-1]['version'], ybus.version)
+        self.assertEqual(events[0]['buses'], (ybus.bus_idx['2'], ybus.bus_idx['3']))
+
+        # switching back restores the original values
+        ybus.set_branch_status('3', True)
+        ybus.set_tap('9', tap=network['branch']['9']['tap'], shift=network['branch']['9']['shift'])
+        ybus.set_shunt('1', bs=network['shunt']['1']['bs'])
+        np.testing.assert_almost_equal(ybus.Ybus.toarray(), opf.compute_admittance_matrix(network)[0].toarray())
+
+
+if __name__ == '__main__':
+    unittest.main()